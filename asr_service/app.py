@@ -6,10 +6,13 @@ user's learned language. The container is addressed as a generic ASR endpoint
 from Docker, even while the current deployment only loads the Danish model.
 """
 
-import io
 import logging
 import os
-import tempfile
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
 
 import numpy as np
 from flask import Flask, jsonify, request
@@ -41,6 +44,11 @@ MAX_ASR_AUDIO_BYTES = int(
 )
 ASR_LEADING_SILENCE_MS = int(os.environ.get("ASR_LEADING_SILENCE_MS", "250"))
 ASR_TRAILING_SILENCE_MS = int(os.environ.get("ASR_TRAILING_SILENCE_MS", "250"))
+ASR_SAMPLE_RATE = 16000
+# Clips of concurrent requests that arrive within ASR_BATCH_WAIT_MS of each
+# other are transcribed in one model call of at most ASR_MAX_BATCH_SIZE clips
+ASR_MAX_BATCH_SIZE = int(os.environ.get("ASR_MAX_BATCH_SIZE", "8"))
+ASR_BATCH_WAIT_MS = float(os.environ.get("ASR_BATCH_WAIT_MS", "5"))
 
 
 class ASRAudioTooLarge(ValueError):
@@ -51,6 +59,10 @@ class ASRModelUnavailable(RuntimeError):
     pass
 
 
+class ASRAudioUndecodable(ValueError):
+    pass
+
+
 def raise_if_audio_too_large(size):
     if size is not None and size > MAX_ASR_AUDIO_BYTES:
         raise ASRAudioTooLarge(
@@ -95,7 +107,7 @@ def supported_languages_for_response():
     return sorted(ASR_SUPPORTED_LANGUAGES)
 
 
-def add_asr_padding(audio):
+def add_asr_padding(samples):
     """
     Add a small silence cushion around very short learner recordings.
 
@@ -106,28 +118,147 @@ def add_asr_padding(audio):
     leading_ms = max(0, ASR_LEADING_SILENCE_MS)
     trailing_ms = max(0, ASR_TRAILING_SILENCE_MS)
 
-    if leading_ms:
-        leading_silence = (
-            AudioSegment.silent(duration=leading_ms, frame_rate=audio.frame_rate)
-            .set_channels(audio.channels)
-            .set_sample_width(audio.sample_width)
-        )
-        audio = leading_silence + audio
+    return np.pad(
+        samples,
+        (
+            leading_ms * ASR_SAMPLE_RATE // 1000,
+            trailing_ms * ASR_SAMPLE_RATE // 1000,
+        ),
+    )
 
-    if trailing_ms:
-        trailing_silence = (
-            AudioSegment.silent(duration=trailing_ms, frame_rate=audio.frame_rate)
-            .set_channels(audio.channels)
-            .set_sample_width(audio.sample_width)
+
+def decode_audio(audio_bytes):
+    """
+    Decode an upload into the 16kHz mono float32 samples that the model takes.
+
+    ffmpeg reads the upload from stdin and writes raw float32 samples to
+    stdout, resampling with its own resampler on the way, so nothing touches
+    the disk. The "cache:" protocol lets ffmpeg seek back in the pipe, which
+    MP4 uploads from Safari need.
+    """
+    process = subprocess.run(
+        [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel",
+            "error",
+            "-i",
+            "cache:pipe:0",
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(ASR_SAMPLE_RATE),
+            "-f",
+            "f32le",
+            "pipe:1",
+        ],
+        input=audio_bytes,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if process.returncode != 0 or not process.stdout:
+        raise ASRAudioUndecodable(
+            f"Could not decode audio: {process.stderr.decode(errors='ignore').strip()}"
         )
-        audio = audio + trailing_silence
 
-    return audio
+    return add_asr_padding(np.frombuffer(process.stdout, dtype=np.float32))
+
+
+class TranscriptionBatcher:
+    """
+    Transcribe the clips of concurrent requests together.
+
+    Request threads submit() their samples and wait for the result. A single
+    background thread takes the first waiting clip, collects whatever else
+    arrives within max_wait_ms (up to max_batch_size clips), and passes them
+    to the model in one transcribe() call. Most of the cost of a call on
+    short clips is per call rather than per clip, so under load the
+    throughput grows with the batch; and since only the background thread
+    ever calls the model, the model is never used from two threads at once.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size=ASR_MAX_BATCH_SIZE,
+        max_wait_ms=ASR_BATCH_WAIT_MS,
+    ):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_ms = max_wait_ms
+        self._lock = threading.Lock()
+        self._pending = None
+        self._thread = None
+        self._pid = None
+
+    def transcribe(self, samples):
+        return self.submit(samples).result()
+
+    def submit(self, samples):
+        future = Future()
+        self._running_queue().put((samples, future))
+        return future
+
+    def _running_queue(self):
+        # gunicorn loads the app in the master and then forks the workers;
+        # threads don't survive a fork, so each worker process starts its
+        # own background thread on its first request
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._pending = queue.Queue()
+                self._thread = threading.Thread(
+                    target=self._run,
+                    args=(self._pending,),
+                    name="asr-batcher",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._pending
+
+    def _run(self, pending):
+        while True:
+            batch = [pending.get()]
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(pending.get(timeout=remaining))
+                    else:
+                        batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            self._transcribe_batch(batch)
+
+    def _transcribe_batch(self, batch):
+        try:
+            transcript = self.model.transcribe(
+                [samples for samples, _ in batch],
+                batch_size=len(batch),
+                num_workers=0,
+            )
+            if not isinstance(transcript, list) or len(transcript) != len(batch):
+                raise TypeError(
+                    "Unexpected transcription output shape: "
+                    f"expected {len(batch)} Hypotheses in a list, "
+                    f"got {type(transcript).__name__}"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        for hypothesis, (_, future) in zip(transcript, batch):
+            try:
+                future.set_result(extract_transcription([hypothesis]))
+            except Exception as exc:
+                future.set_exception(exc)
 
 
 try:
     import nemo.collections.asr as nemo_asr
-    from pydub import AudioSegment
 
     ASR_AVAILABLE = True
     asr_model = nemo_asr.models.ASRModel.from_pretrained(model_name=ASR_MODEL_NAME)
@@ -141,52 +272,36 @@ try:
     # happen ONCE here. With gunicorn preload_app=True, all forked workers
     # inherit the warmed state and serve their first user request fast.
     print("ASR warmup: running dummy inference...")
-    _warmup_samples = np.zeros(16000, dtype=np.float32)  # 1s of silence at 16kHz
+    _warmup_samples = np.zeros(ASR_SAMPLE_RATE, dtype=np.float32)  # 1s of silence
     asr_model.transcribe([_warmup_samples], batch_size=1)
     print("ASR warmup complete")
+    asr_batcher = TranscriptionBatcher(asr_model)
 except ImportError as exc:
     ASR_AVAILABLE = False
     asr_model = None
+    asr_batcher = None
     print(f"ASR worker dependencies unavailable: {exc}")
 except Exception as exc:
     ASR_AVAILABLE = False
     asr_model = None
+    asr_batcher = None
     print(f"Failed to load ASR worker model {ASR_MODEL_NAME}: {exc}")
 
 
 def transcribe_audio_file(audio_storage, requested_language_code=None):
-    temp_path = None
-
     if not supports_language(requested_language_code):
         raise ValueError(
             f"Worker {ASR_WORKER_NAME} does not support '{requested_language_code}'"
         )
 
-    try:
-        audio_bytes = audio_storage.read(MAX_ASR_AUDIO_BYTES + 1)
-        raise_if_audio_too_large(len(audio_bytes))
+    audio_bytes = audio_storage.read(MAX_ASR_AUDIO_BYTES + 1)
+    raise_if_audio_too_large(len(audio_bytes))
 
-        if not ASR_AVAILABLE or asr_model is None:
-            raise ASRModelUnavailable("ASR model is not available in this worker")
+    if not ASR_AVAILABLE or asr_model is None:
+        raise ASRModelUnavailable("ASR model is not available in this worker")
 
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
-        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-        audio = add_asr_padding(audio)
-
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            temp_path = temp_file.name
-            audio.export(temp_path, format="wav")
-
-        # Use NeMo's file-path API so it loads with soundfile + librosa,
-        # giving higher-quality resampling and preprocessing than the
-        # in-memory numpy path. num_workers=0 avoids spawning dataloader
-        # subprocesses for what is always a single-clip request.
-        transcript = asr_model.transcribe([temp_path], batch_size=1, num_workers=0)
-        transcription = extract_transcription(transcript)
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
-    return transcription
+    samples = decode_audio(audio_bytes)
+    return asr_batcher.transcribe(samples)
 
 
 app = Flask(__name__)
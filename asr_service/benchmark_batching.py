@@ -0,0 +1,141 @@
+"""
+Load benchmark for the TranscriptionBatcher, on CPU, with a stand-in model.
+
+The stand-in mimics the cost structure of transcribe() on short clips: a
+fixed cost per call (NeMo builds a dataloader, moves the model into eval
+mode, sets up decoding) plus an encoder whose work grows with the audio,
+done as numpy matmuls over 25ms frames, batched like the real encoder.
+
+A number of client threads send 1-3s clips in a closed loop, once to a
+model that is called with one clip at a time (as before batching, with
+gunicorn threads = 1) and once through the batcher.
+
+Decoding is not included: both paths decode the same way.
+
+Usage:
+    python benchmark_batching.py
+    python benchmark_batching.py --clients 16 --clips 400 --call-overhead-ms 30
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+
+import app as asr_app
+
+FRAME = 400  # 25ms at 16kHz
+HOP = 160  # 10ms
+
+
+class _Hypothesis:
+    def __init__(self, text):
+        self.text = text
+
+
+class StandInModel:
+    def __init__(self, call_overhead_ms=20, hidden=256, layers=4):
+        rng = np.random.default_rng(0)
+        self.call_overhead_ms = call_overhead_ms
+        self.projection = rng.standard_normal((FRAME, hidden), dtype=np.float32)
+        self.layers = [
+            rng.standard_normal((hidden, hidden), dtype=np.float32) / hidden
+            for _ in range(layers)
+        ]
+
+    def transcribe(self, audio, batch_size=1, num_workers=0):
+        time.sleep(self.call_overhead_ms / 1000)
+
+        frame_counts = [max(1, (len(samples) - FRAME) // HOP + 1) for samples in audio]
+        frames = np.zeros((len(audio), max(frame_counts), FRAME), dtype=np.float32)
+        for i, samples in enumerate(audio):
+            samples = np.pad(samples, (0, max(0, FRAME - len(samples))))
+            windows = np.lib.stride_tricks.sliding_window_view(samples, FRAME)[::HOP]
+            frames[i, : len(windows)] = windows
+
+        hidden = np.tanh(frames @ self.projection)
+        for layer in self.layers:
+            hidden = np.tanh(hidden @ layer)
+
+        return [
+            _Hypothesis(f"{hidden[i, :count].mean():.3f}")
+            for i, count in enumerate(frame_counts)
+        ]
+
+
+def run_load(transcribe, clips, clients):
+    latencies = []
+    next_clip = iter(range(len(clips)))
+    lock = threading.Lock()
+
+    def client():
+        while True:
+            with lock:
+                index = next(next_clip, None)
+            if index is None:
+                return
+            start = time.perf_counter()
+            transcribe(clips[index])
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return (
+        len(clips) / elapsed,
+        np.percentile(latencies_ms, 50),
+        np.percentile(latencies_ms, 95),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--call-overhead-ms", type=float, default=20)
+    parser.add_argument("--max-batch-size", type=int, default=asr_app.ASR_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=asr_app.ASR_BATCH_WAIT_MS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    clips = [
+        asr_app.add_asr_padding(
+            rng.standard_normal(int(rng.uniform(1, 3) * asr_app.ASR_SAMPLE_RATE)).astype(
+                np.float32
+            )
+        )
+        for _ in range(args.clips)
+    ]
+    model = StandInModel(call_overhead_ms=args.call_overhead_ms)
+    model.transcribe(clips[:1])  # warm up BLAS
+
+    model_lock = threading.Lock()
+
+    def one_clip_per_call(samples):
+        with model_lock:
+            return model.transcribe([samples], batch_size=1)
+
+    batcher = asr_app.TranscriptionBatcher(
+        model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms
+    )
+
+    print(f"{args.clips} clips of 1-3s, {args.clients} concurrent clients\n")
+    print(f"{'':22}{'clips/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, transcribe in (
+        ("one clip per call", one_clip_per_call),
+        (f"batched (<= {args.max_batch_size})", batcher.transcribe),
+    ):
+        throughput, p50, p95 = run_load(transcribe, clips, args.clients)
+        print(f"{name:22}{throughput:10.1f}{p50:10.0f}{p95:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,9 @@ import os
 asr_service_port = os.environ.get("ASR_SERVICE_PORT", "80")
 bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{asr_service_port}")
 workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
-threads = 1
+# Requests wait on the model in threads, so that concurrent ones can be
+# batched into a single transcribe() call (see TranscriptionBatcher)
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
 preload_app = True
 
 timeout = int(os.environ.get("GUNICORN_TIMEOUT", "300"))
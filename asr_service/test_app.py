@@ -1,3 +1,6 @@
+import time
+
+import numpy as np
 import pytest
 
 import app as asr_app
@@ -57,18 +60,56 @@ def test_supports_language_accepts_any_language_for_multilingual_worker(monkeypa
 
 
 def test_add_asr_padding_adds_configured_silence(monkeypatch):
-    if not hasattr(asr_app, "AudioSegment"):
-        pytest.skip("pydub is not available in this environment")
-
     monkeypatch.setattr(asr_app, "ASR_LEADING_SILENCE_MS", 250)
     monkeypatch.setattr(asr_app, "ASR_TRAILING_SILENCE_MS", 350)
 
-    audio = asr_app.AudioSegment.silent(duration=100, frame_rate=16000).set_channels(1)
-    padded = asr_app.add_asr_padding(audio)
+    samples = np.ones(1600, dtype=np.float32)  # 100ms at 16kHz
+    padded = asr_app.add_asr_padding(samples)
+
+    assert len(padded) == 700 * 16
+    assert padded.dtype == np.float32
+    assert not padded[:4000].any() and padded[4000:5600].all()
+
+
+class _EchoModel:
+    """Transcribes a clip as its length; remembers the size of every batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def transcribe(self, audio, batch_size, num_workers):
+        self.batches.append(len(audio))
+        time.sleep(0.05)
+        return [_Hypothesis(str(len(samples))) for samples in audio]
+
+
+def test_batcher_groups_concurrent_clips_into_one_call():
+    model = _EchoModel()
+    batcher = asr_app.TranscriptionBatcher(model, max_batch_size=3, max_wait_ms=50)
+
+    futures = [batcher.submit(np.zeros(n, dtype=np.float32)) for n in range(1, 6)]
+
+    assert [future.result(timeout=5) for future in futures] == [
+        "1",
+        "2",
+        "3",
+        "4",
+        "5",
+    ]
+    assert model.batches == [3, 2]
+
+
+def test_batcher_reports_model_failure_to_every_clip_of_the_batch():
+    class _BrokenModel:
+        def transcribe(self, audio, batch_size, num_workers):
+            raise RuntimeError("CUDA out of memory")
+
+    batcher = asr_app.TranscriptionBatcher(_BrokenModel(), max_wait_ms=50)
+    futures = [batcher.submit(np.zeros(10, dtype=np.float32)) for _ in range(2)]
 
-    assert len(padded) == 700
-    assert padded.frame_rate == 16000
-    assert padded.channels == 1
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
 
 
 def test_health_returns_503_when_model_is_unavailable(monkeypatch):
@@ -18,9 +18,16 @@ import re
 import time
 import threading
 import psutil
-from flask import Flask, request, jsonify
+from flask import Flask, Response, abort, request, jsonify
 import stanza
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+
 # Monitoring - track request stats
 _stats_lock = threading.Lock()
 
@@ -249,6 +256,27 @@ def log_request(endpoint, language, chars, elapsed, is_error=False):
             _request_stats["by_language"][language]["slow"] += 1
 
 
+def request_data():
+    """
+    The request body: msgpack if the client sent msgpack (see the Stanza
+    client in zeeguu/core/tokenization/stanza_client.py), otherwise JSON.
+    """
+    if request.mimetype == MSGPACK:
+        if msgpack is None:
+            abort(415)
+        return msgpack.unpackb(request.get_data())
+    return request.get_json()
+
+
+def respond(payload):
+    """The payload in msgpack if the client prefers it (Accept), else JSON"""
+    if msgpack is not None and request.accept_mimetypes.best_match(
+        ["application/json", MSGPACK]
+    ) == MSGPACK:
+        return Response(msgpack.packb(payload), mimetype=MSGPACK)
+    return jsonify(payload)
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint with memory info."""
@@ -306,9 +334,12 @@ def tokenize_endpoint():
         {
             "tokens": [...]
         }
+
+    The request and the response can also be msgpack (Content-Type and
+    Accept application/msgpack), as for /tokenize_batch and /sentences.
     """
     start_time = time.time()
-    data = request.get_json()
+    data = request_data()
 
     if not data:
         return jsonify({"error": "JSON body required"}), 400
@@ -328,7 +359,7 @@ def tokenize_endpoint():
         return jsonify({"error": f"Unsupported language: {language}"}), 400
 
     if not text:
-        return jsonify({"tokens": []})
+        return respond({"tokens": []})
 
     try:
         tokens = tokenize_text(
@@ -337,7 +368,7 @@ def tokenize_endpoint():
         )
         elapsed = time.time() - start_time
         log_request("tokenize", language, len(text), elapsed)
-        return jsonify({"tokens": tokens})
+        return respond({"tokens": tokens})
     except Exception as e:
         elapsed = time.time() - start_time
         log_request("tokenize", language, len(text), elapsed, is_error=True)
@@ -371,7 +402,7 @@ def tokenize_batch_endpoint():
         }
     """
     start_time = time.time()
-    data = request.get_json()
+    data = request_data()
 
     if not data:
         return jsonify({"error": "JSON body required"}), 400
@@ -388,7 +419,7 @@ def tokenize_batch_endpoint():
         return jsonify({"error": f"Unsupported language: {language}"}), 400
 
     if not texts:
-        return jsonify({"results": []})
+        return respond({"results": []})
 
     total_chars = sum(len(t) for t in texts if t)
 
@@ -404,7 +435,7 @@ def tokenize_batch_endpoint():
         log_request("tokenize_batch", language, total_chars, elapsed)
         if elapsed > SLOW_REQUEST_THRESHOLD:
             print(f"STANZA-SLOW: tokenize_batch took {elapsed:.1f}s for {len(texts)} texts, {total_chars} chars ({language})")
-        return jsonify({"results": results})
+        return respond({"results": results})
     except Exception as e:
         elapsed = time.time() - start_time
         log_request("tokenize_batch", language, total_chars, elapsed, is_error=True)
@@ -511,7 +542,7 @@ def sentences_endpoint():
         }
     """
     start_time = time.time()
-    data = request.get_json()
+    data = request_data()
 
     if not data:
         return jsonify({"error": "JSON body required"}), 400
@@ -527,13 +558,13 @@ def sentences_endpoint():
         return jsonify({"error": f"Unsupported language: {language}"}), 400
 
     if not text:
-        return jsonify({"sentences": []})
+        return respond({"sentences": []})
 
     try:
         sentences = get_sentences(text, language, model)
         elapsed = time.time() - start_time
         log_request("sentences", language, len(text), elapsed)
-        return jsonify({"sentences": sentences})
+        return respond({"sentences": sentences})
     except Exception as e:
         elapsed = time.time() - start_time
         log_request("sentences", language, len(text), elapsed, is_error=True)
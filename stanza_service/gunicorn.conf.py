@@ -6,6 +6,7 @@ Key settings:
   Workers share models via copy-on-write memory, drastically reducing RAM usage.
 - workers=2: Fewer workers since tokenization is CPU-bound (not I/O bound).
   Adjust based on CPU cores and expected load.
+- worker_class=gthread: keep-alive connections (see below).
 """
 
 import os
@@ -16,6 +17,11 @@ bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
 # Worker processes - keep low since each worker loads all models (~8GB per worker)
 workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
 threads = 1  # Single-threaded since Stanza isn't thread-safe
+# The sync worker closes the connection after every response; gthread (even
+# with one thread) keeps it open for the API's pooled client, so tokenizing a
+# bookmark context doesn't pay for a new TCP connection each time
+worker_class = "gthread"
+keepalive = 30  # seconds an idle client connection is kept
 
 # DISABLED: preload_app causes PyTorch/Stanza to hang after fork
 # Each worker loads models independently (more memory but works reliably)
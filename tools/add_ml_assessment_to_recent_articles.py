@@ -23,11 +23,12 @@ Examples:
 """
 
 import argparse
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from zeeguu.api.app import create_app_for_scripts
 from zeeguu.core.model import db, Article, ArticleCefrAssessment
-from zeeguu.core.language.ml_cefr_classifier import predict_cefr_level
+from zeeguu.core.language.ml_cefr_classifier import predict_cefr_levels
 from zeeguu.logging import log
 
 # Create Flask app and push context
@@ -36,6 +37,9 @@ app.app_context().push()
 
 db_session = db.session
 
+# Articles per classifier call; one call is spread over all the cores
+PREDICTION_BATCH_SIZE = 500
+
 
 def add_ml_assessments(days=30, dry_run=False, limit=None):
     """
@@ -90,10 +94,10 @@ def add_ml_assessments(days=30, dry_run=False, limit=None):
         "errors": 0,
     }
 
-    for idx, article in enumerate(articles):
-        if idx % 10 == 0 and idx > 0:
-            log(f"  Processed {idx}/{len(articles)} articles...")
-
+    # Articles to assess, grouped by language, so that the classifier runs
+    # once per language and chunk rather than once per article
+    to_assess = defaultdict(list)
+    for article in articles:
         try:
             # Skip articles without content
             if not article.get_content():
@@ -116,52 +120,71 @@ def add_ml_assessments(days=30, dry_run=False, limit=None):
             if assessment and assessment.ml_cefr_level:
                 continue
 
+            to_assess[article.language.code].append((article, assessment))
+
+        except Exception as e:
+            log(f"  ERROR processing article {article.id}: {str(e)}")
+            stats["errors"] += 1
+            continue
+
+    processed = 0
+    for language_code, pending in to_assess.items():
+        log(f"  Classifying {len(pending)} {language_code} articles...")
+
+        for chunk_start in range(0, len(pending), PREDICTION_BATCH_SIZE):
+            chunk = pending[chunk_start : chunk_start + PREDICTION_BATCH_SIZE]
+
             # Run ML CEFR prediction
             try:
-                ml_level = predict_cefr_level(
-                    article.get_content(),
-                    article.language.code,
-                    article.get_fk_difficulty(),
-                    article.get_word_count(),
+                ml_levels = predict_cefr_levels(
+                    [
+                        (
+                            article.get_content(),
+                            article.get_fk_difficulty(),
+                            article.get_word_count(),
+                        )
+                        for article, _ in chunk
+                    ],
+                    language_code,
                 )
+            except Exception as e:
+                log(f"  ERROR predicting CEFR for {language_code} articles: {str(e)}")
+                stats["ml_assessments_failed"] += len(chunk)
+                continue
 
-                if ml_level:
-                    if not dry_run:
-                        # Create or update assessment record
-                        if not assessment:
-                            assessment = ArticleCefrAssessment(article_id=article.id)
-                            db_session.add(assessment)
+            for (article, assessment), ml_level in zip(chunk, ml_levels):
+                if not ml_level:
+                    stats["ml_assessments_failed"] += 1
+                    continue
 
-                        # Set ML assessment
-                        assessment.set_ml_assessment(ml_level, "ml")
+                if not dry_run:
+                    # Create or update assessment record
+                    if not assessment:
+                        assessment = ArticleCefrAssessment(article_id=article.id)
+                        db_session.add(assessment)
 
-                        # Also update legacy article.cefr_level if not set
-                        if not article.cefr_level:
-                            article.cefr_level = ml_level
-                            db_session.add(article)
+                    # Set ML assessment
+                    assessment.set_ml_assessment(ml_level, "ml")
 
-                    stats["ml_assessments_added"] += 1
+                    # Also update legacy article.cefr_level if not set
+                    if not article.cefr_level:
+                        article.cefr_level = ml_level
+                        db_session.add(article)
 
-                    if idx < 5 or (idx % 50 == 0):  # Log details for first few and every 50th
-                        log(
-                            f"  Article {article.id}: '{article.title[:50]}...' -> {ml_level}"
-                        )
-                else:
-                    stats["ml_assessments_failed"] += 1
+                stats["ml_assessments_added"] += 1
 
-            except Exception as e:
-                log(f"  ERROR predicting CEFR for article {article.id}: {str(e)}")
-                stats["ml_assessments_failed"] += 1
-                continue
+                # Log details for first few and every 50th
+                if stats["ml_assessments_added"] <= 5 or (
+                    stats["ml_assessments_added"] % 50 == 0
+                ):
+                    log(f"  Article {article.id}: '{article.title[:50]}...' -> {ml_level}")
 
-            # Commit every 50 articles to avoid huge transactions
-            if not dry_run and idx > 0 and idx % 50 == 0:
-                db_session.commit()
+            processed += len(chunk)
+            log(f"  Processed {processed} articles...")
 
-        except Exception as e:
-            log(f"  ERROR processing article {article.id}: {str(e)}")
-            stats["errors"] += 1
-            continue
+            # Commit every chunk to avoid huge transactions
+            if not dry_run:
+                db_session.commit()
 
     # Final commit (if not dry run)
     if not dry_run and stats["ml_assessments_added"] > 0:
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Fill in article.content_fingerprint for the articles that don't have one.
+
+New articles get it from the model when their content is set; this script
+is for the articles crawled before the column was added (see the migration
+26-10-19-e--add_article_content_fingerprint.sql). It can be interrupted
+and run again.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.backfill_article_content_fingerprints [--batch-size N]
+"""
+
+import argparse
+
+from sqlalchemy import bindparam, func, select
+
+from zeeguu.api.app import create_app_for_scripts
+from zeeguu.core.model import db, Article
+from zeeguu.core.model.article import CONTENT_FINGERPRINT_PREFIX_LENGTH
+from zeeguu.logging import log
+
+app = create_app_for_scripts()
+app.app_context().push()
+
+
+def backfill(batch_size=5000):
+    table = Article.__table__
+    set_fingerprint = (
+        table.update()
+        .where(table.c.id == bindparam("article_id"))
+        .values(content_fingerprint=bindparam("fingerprint"))
+    )
+
+    done = 0
+    last_id = 0
+    while True:
+        # Only the prefix that the fingerprint is computed from
+        articles = db.session.execute(
+            select(
+                Article.id,
+                func.substr(Article.content, 1, CONTENT_FINGERPRINT_PREFIX_LENGTH),
+            )
+            .where(Article.id > last_id)
+            .where(Article.content_fingerprint.is_(None))
+            .where(Article.content.isnot(None))
+            .order_by(Article.id)
+            .limit(batch_size)
+        ).all()
+        if not articles:
+            break
+
+        db.session.execute(
+            set_fingerprint,
+            [
+                dict(
+                    article_id=article_id,
+                    fingerprint=Article.content_fingerprint_for(prefix),
+                )
+                for article_id, prefix in articles
+            ],
+        )
+        db.session.commit()
+
+        done += len(articles)
+        last_id = articles[-1][0]
+        log(f"Fingerprinted {done} articles, last id {last_id}")
+
+    log(f"Done. Fingerprinted {done} articles.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    backfill(batch_size=args.batch_size)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Measure the startup time and memory (max RSS) of the API's create_app().
+
+Each measurement runs in a fresh interpreter so that module caches from a
+previous run do not skew the numbers.
+
+With --eager-nlp, the spaCy pipelines and the generators built on top of
+them are force-loaded right after create_app(), which reproduces the
+behaviour from before they were loaded lazily.
+
+Usage:
+    python -m tools.benchmarks.app_startup [--runs N] [--eager-nlp]
+
+Examples:
+    # Compare lazy (current) vs. eager (previous) NLP model loading
+    python -m tools.benchmarks.app_startup --runs 3
+    python -m tools.benchmarks.app_startup --runs 3 --eager-nlp
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_CHILD_SCRIPT = """
+import json, resource, sys, time
+start = time.time()
+from zeeguu.api.app import create_app
+app = create_app(testing=True)
+create_app_seconds = time.time() - start
+if {eager_nlp}:
+    from zeeguu.core.nlp_pipeline import SpacyWrappers, NoiseWordsGenerator, AutoGECTagger
+    for registry in (SpacyWrappers, NoiseWordsGenerator, AutoGECTagger):
+        for key in registry.keys():
+            registry[key]
+total_seconds = time.time() - start
+max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("BENCHMARK_RESULT " + json.dumps(dict(
+    create_app_seconds=create_app_seconds,
+    total_seconds=total_seconds,
+    max_rss_mb=max_rss_mb,
+)))
+"""
+
+
+def measure_once(eager_nlp=False):
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD_SCRIPT.format(eager_nlp=eager_nlp)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    for line in output.splitlines():
+        if line.startswith("BENCHMARK_RESULT "):
+            return json.loads(line[len("BENCHMARK_RESULT ") :])
+    raise RuntimeError(f"No benchmark result in output:\n{output}")
+
+
+def run(runs=3, eager_nlp=False):
+    results = [measure_once(eager_nlp) for _ in range(runs)]
+
+    mode = "eager NLP models" if eager_nlp else "lazy NLP models"
+    print(f"create_app() startup with {mode} ({runs} runs)")
+    for metric, unit in [
+        ("create_app_seconds", "s"),
+        ("total_seconds", "s"),
+        ("max_rss_mb", "MB"),
+    ]:
+        values = [r[metric] for r in results]
+        print(
+            f"  {metric:<20} median={statistics.median(values):8.2f}{unit}"
+            f"  min={min(values):8.2f}{unit}  max={max(values):8.2f}{unit}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--eager-nlp", action="store_true")
+    args = parser.parse_args()
+
+    run(args.runs, args.eager_nlp)
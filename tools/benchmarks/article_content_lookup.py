@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+"""
+Lookup latency of Article.find_by_content_and_source with the indexed
+content fingerprint, against the LIKE prefix match it replaced, on SQLite
+databases of synthetic articles (10k and 1M by default) spread over 100
+feeds.
+
+The article table is created with an index on feed_id, as MySQL has for
+the foreign key, so the LIKE version scans the articles of one feed rather
+than the whole table. Half of the lookups are re-crawls of an existing
+article (same content, slightly different title), half are new articles.
+The benchmark fails if the two versions ever find different articles.
+
+Usage:
+    python -m tools.benchmarks.article_content_lookup [--sizes 10000 1000000] [--lookups N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+import sqlalchemy
+from flask import Flask
+
+from zeeguu.core.model import Article
+from zeeguu.core.model.db import db
+
+FEEDS = 100
+LANGUAGE_ID = 1
+WORDS = (
+    "der die das und ist nicht ein eine zu mit auf für sich dem von den "
+    "Regierung Entscheidung Klimawandel Wirtschaft schnell gestern Hund "
+    "Katze Haus Straße Wissenschaftler Untersuchung Verantwortung Kinder"
+).split()
+
+
+def _like_find_by_content_and_source(title, content_preview, feed_id, language_id):
+    import difflib
+
+    cls = Article
+    exact_match = cls.query.filter(
+        cls.title == title,
+        cls.content.like(f"{content_preview}%"),
+        cls.feed_id == feed_id,
+        cls.language_id == language_id,
+        cls.parent_article_id == None,
+    ).first()
+    if exact_match:
+        return exact_match
+
+    candidates = cls.query.filter(
+        cls.content.like(f"{content_preview}%"),
+        cls.feed_id == feed_id,
+        cls.language_id == language_id,
+        cls.parent_article_id == None,
+    ).all()
+    for candidate in candidates:
+        if candidate.title and title:
+            similarity = difflib.SequenceMatcher(
+                None, title.lower(), candidate.title.lower()
+            ).ratio()
+            if similarity > 0.9:
+                return candidate
+    return None
+
+
+def _fill(size, rng):
+    table = Article.__table__
+    batch = []
+    articles = []
+    for i in range(size):
+        title = " ".join(rng.choices(WORDS, k=6))
+        content = " ".join(rng.choices(WORDS, k=40))
+        row = dict(
+            title=title,
+            content=content,
+            content_fingerprint=Article.content_fingerprint_for(content),
+            feed_id=i % FEEDS,
+            language_id=LANGUAGE_ID,
+        )
+        batch.append(row)
+        if rng.random() < 0.001:
+            articles.append(row)
+        if len(batch) == 50_000:
+            db.session.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+    db.session.commit()
+    return articles
+
+
+def _lookups(existing, count, rng):
+    lookups = []
+    for i in range(count):
+        if i % 2 == 0:
+            row = rng.choice(existing)
+            lookups.append((row["title"] + "!", row["content"][:1000], row["feed_id"]))
+        else:
+            content = " ".join(rng.choices(WORDS, k=40))
+            lookups.append(("A new article", content, rng.randrange(FEEDS)))
+    return lookups
+
+
+def _time(find, lookups):
+    found = []
+    start = time.perf_counter()
+    for title, preview, feed_id in lookups:
+        article = find(title, preview, feed_id, LANGUAGE_ID)
+        found.append(article.id if article else None)
+    return (time.perf_counter() - start) / len(lookups), found
+
+
+def measure(size, lookup_count):
+    rng = random.Random(size)
+    folder = tempfile.mkdtemp()
+    app = Flask("article-content-lookup-benchmark")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{folder}/articles.db"
+    db.init_app(app)
+
+    with app.app_context():
+        Article.__table__.create(db.engine)
+        db.session.execute(
+            sqlalchemy.text("CREATE INDEX article_feed ON article (feed_id)")
+        )
+        existing = _fill(size, rng)
+        lookups = _lookups(existing, lookup_count, rng)
+
+        # Warm up SQLAlchemy's statement caches
+        _time(_like_find_by_content_and_source, lookups[:2])
+        _time(Article.find_by_content_and_source, lookups[:2])
+
+        like, expected = _time(_like_find_by_content_and_source, lookups)
+        fingerprint, actual = _time(Article.find_by_content_and_source, lookups)
+        assert actual == expected, "find_by_content_and_source disagrees"
+        assert any(expected), "no lookup found its article"
+
+        db.session.remove()
+        db.engine.dispose()
+    os.remove(f"{folder}/articles.db")
+    return like, fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    # Both versions log every similar title they find
+    logging.getLogger("zeeguu.logging").setLevel(logging.WARNING)
+
+    print(f"{'articles':>10}{'LIKE prefix':>14}{'fingerprint':>14}")
+    for size in args.sizes:
+        like, fingerprint = measure(size, args.lookups)
+        print(f"{size:10}{like * 1000:12.2f}ms{fingerprint * 1000:12.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
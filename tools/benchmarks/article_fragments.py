@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Count the SQL statements (and time) that Article.create_article_fragments
+takes per article, on an in-memory SQLite DB: with the fragments created one
+by one through ArticleFragment.find_or_create, as before, and in bulk
+through ArticleFragment.create_all.
+
+The articles have 60 paragraphs, a few of which (bylines, "read more"
+links) repeat across articles and so already have a NewText row. The
+benchmark fails if the two paths store different fragments.
+
+Usage:
+    python -m tools.benchmarks.article_fragments [--articles N] [--paragraphs N]
+"""
+
+import argparse
+import random
+import time
+from unittest.mock import patch
+
+import sqlalchemy
+
+from zeeguu.core.model import Article, ArticleFragment
+from zeeguu.core.model.db import db
+from zeeguu.core.test.test_app import create_test_app
+
+BOILERPLATE = [
+    "Read more:",
+    "Sign up for our newsletter.",
+    "Photo: Ritzau Scanpix",
+    "This article was updated.",
+]
+WORDS = "der die das und ist nicht ein eine zu mit auf für sich dem von Hund Katze".split()
+
+
+def _one_by_one(session, article, fragments):
+    for text, order, formatting in fragments:
+        ArticleFragment.find_or_create(
+            session, article, text, order, formatting, commit=False
+        )
+
+
+def _html(rng, paragraphs):
+    elements = ["<h1>" + " ".join(rng.choices(WORDS, k=6)) + "</h1>"]
+    for _ in range(paragraphs - 1):
+        if rng.random() < 0.1:
+            elements.append(f"<p>{rng.choice(BOILERPLATE)}</p>")
+        else:
+            elements.append("<p>" + " ".join(rng.choices(WORDS, k=40)) + ".</p>")
+    return "".join(elements)
+
+
+def _run(session, articles, statements):
+    statements.clear()
+    start = time.perf_counter()
+    for article in articles:
+        article.create_article_fragments(session)
+        session.commit()
+    return time.perf_counter() - start, len(statements)
+
+
+def _stored(articles):
+    return [
+        [
+            (f.order, f.formatting, f.text.content)
+            for f in ArticleFragment.get_all_article_fragments_in_order(article.id)
+        ]
+        for article in articles
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    args = parser.parse_args()
+
+    app = create_test_app()
+    app.app_context().push()
+    session = db.session
+
+    statements = []
+    sqlalchemy.event.listen(
+        db.engine,
+        "before_cursor_execute",
+        lambda *_: statements.append(1),
+    )
+
+    rng = random.Random(0)
+    html = [_html(rng, args.paragraphs) for _ in range(args.articles)]
+
+    def new_articles():
+        result = session.execute(
+            Article.__table__.insert().returning(Article.__table__.c.id),
+            [dict(title="Benchmark", htmlContent=each) for each in html],
+        ).scalars()
+        ids = list(result)
+        session.commit()
+        return [session.get(Article, each) for each in ids]
+
+    before_articles = new_articles()
+    with patch.object(ArticleFragment, "create_all", _one_by_one):
+        before, before_statements = _run(session, before_articles, statements)
+
+    after_articles = new_articles()
+    after, after_statements = _run(session, after_articles, statements)
+
+    assert _stored(before_articles) == _stored(after_articles), (
+        "create_all stores different fragments"
+    )
+
+    count = args.articles
+    print(f"{count} articles of {args.paragraphs} paragraphs\n")
+    print(f"{'':16}{'statements':>12}{'ms':>8}  per article")
+    print(f"{'one by one':16}{before_statements / count:12.1f}{before / count * 1000:8.2f}")
+    print(f"{'bulk':16}{after_statements / count:12.1f}{after / count * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
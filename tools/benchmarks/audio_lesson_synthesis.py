@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Benchmark the audio lesson pipeline (VoiceSynthesizer) against a stub TTS
+provider, so that it needs neither credentials nor network.
+
+The stub sleeps --latency seconds per request (roughly what Google TTS takes
+for a sentence) and returns silent MP3 frames, longer for longer texts.
+Synthesis is timed with one request at a time per provider (how it used to
+work) and with the current TTS_CONCURRENCY, for a 3-word lesson and for a
+dialogue. Every run starts with an empty segment cache.
+
+If ffmpeg is installed, joining the segments is also timed with the decoding
+fallback, which is what joining cost before it was done at the frame level.
+
+Usage:
+    python -m tools.benchmarks.audio_lesson_synthesis [--latency SECONDS]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from zeeguu.core.audio_lessons import mp3_frames, voice_synthesizer
+from zeeguu.core.audio_lessons.mp3_frames import Mp3Format, Mp3Frame, silent_frames
+
+# MPEG 2, 24kHz, mono, 32kbps: what Google TTS produces
+_GOOGLE_TTS_FRAME = Mp3Frame(0, 0, 576, Mp3Format(2, 24000, 1), 4)
+
+_WORD_LESSON = """Teacher: Today's word is "hus". It means house. [1 seconds]
+Woman: hus [2 seconds]
+Teacher: Say it after me. [1 seconds]
+Woman: hus [3 seconds]
+Teacher: Now listen to it in a sentence. [1 seconds]
+Man: Vi bor i et stort hus ved havet. [2 seconds]
+Teacher: We live in a big house by the sea. [1 seconds]
+Woman: Hvor ligger dit hus? [2 seconds]
+Teacher: How would you say: where is your house? [3 seconds]
+Woman: Hvor ligger dit hus? [2 seconds]
+Man: Mit hus ligger i byen. [2 seconds]
+Teacher: My house is in the city. [1 seconds]"""
+
+_DIALOGUE = "\n".join(
+    f"{'Man' if i % 2 else 'Woman'}: Sætning nummer {i} i samtalen om byen. [1 seconds]"
+    for i in range(24)
+) + "\nTeacher: Now let's practice the key phrases. [2 seconds]"
+
+
+class StubVoiceSynthesizer(voice_synthesizer.VoiceSynthesizer):
+    def __init__(self, latency):
+        with patch.object(voice_synthesizer, "ZEEGUU_DATA_FOLDER", tempfile.mkdtemp()):
+            super().__init__()
+        self.latency = latency
+
+    def text_to_speech(self, text, voice_config, speaking_rate=1.0):
+        time.sleep(self.latency)
+        return silent_frames(_GOOGLE_TTS_FRAME, 0.3 * len(text.split()) / speaking_rate)
+
+
+def _synthesize(scripts, latency, concurrency):
+    synthesizer = StubVoiceSynthesizer(latency)
+    # New provider pools, sized by the patched TTS_CONCURRENCY
+    with patch.dict(voice_synthesizer.TTS_CONCURRENCY, concurrency), patch.dict(
+        voice_synthesizer._provider_executors, clear=True
+    ):
+        start = time.perf_counter()
+        paths = [
+            synthesizer._synthesize_script_to_file(
+                script, f"{synthesizer.lessons_dir}/{i}.mp3", "da", "en"
+            )
+            for i, script in enumerate(scripts)
+        ]
+        elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    durations = [synthesizer.get_audio_duration(path) for path in paths]
+    duration_elapsed = time.perf_counter() - start
+    return synthesizer, elapsed, duration_elapsed, sum(durations)
+
+
+def _time_join(synthesizer, script):
+    """Times joining an already synthesized script, at frame level and by decoding"""
+    parts = []
+    for voice_type, text, silence in voice_synthesizer.parse_script(script):
+        if voice_type != "silence":
+            config = synthesizer.get_voice_config(voice_type, "da", "en")
+            parts.append(synthesizer.get_cached_audio_path(text, config["name"], 1.0))
+        if silence > 0:
+            parts.append(silence)
+
+    output = f"{synthesizer.lessons_dir}/joined.mp3"
+    start = time.perf_counter()
+    mp3_frames.join_mp3_files(parts, output)
+    frame_level = time.perf_counter() - start
+
+    if not shutil.which("ffmpeg"):
+        return frame_level, None
+    start = time.perf_counter()
+    mp3_frames._join_by_decoding(parts, output)
+    return frame_level, time.perf_counter() - start
+
+
+def run(latency):
+    lessons = {
+        "3-word lesson": [_WORD_LESSON.replace("hus", word) for word in ("hus", "bil", "kat")],
+        "dialogue": [_DIALOGUE],
+    }
+    sequential = {provider: 1 for provider in voice_synthesizer.TTS_CONCURRENCY}
+
+    for name, scripts in lessons.items():
+        segment_count = sum(
+            1 for script in scripts for v, _, _ in voice_synthesizer.parse_script(script)
+            if v != "silence"
+        )
+        print(f"{name}: {segment_count} speech segments, {latency:.2f}s per TTS request")
+
+        _, before, _, _ = _synthesize(scripts, latency, sequential)
+        synthesizer, after, duration_time, seconds = _synthesize(scripts, latency, {})
+        print(f"  synthesis, one request at a time  {before:7.2f} s")
+        print(
+            f"  synthesis, TTS_CONCURRENCY={voice_synthesizer.TTS_CONCURRENCY['google']:<6} {after:7.2f} s"
+        )
+        print(f"  durations ({seconds:>4}s of audio)      {duration_time * 1000:7.2f} ms")
+
+        frame_level, decoding = _time_join(synthesizer, scripts[0])
+        print(f"  joining at frame level           {frame_level * 1000:7.2f} ms")
+        if decoding is not None:
+            print(f"  joining by decoding              {decoding * 1000:7.2f} ms")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--latency", type=float, default=0.4)
+    args = parser.parse_args()
+
+    run(args.latency)
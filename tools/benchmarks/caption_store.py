@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Time of looking up the captions of a video in a synthetic captions.json
+of a million captions: parsing and scanning the whole file per lookup, as
+get_captions_from_json used to, against the index of caption_store (its
+one-off build included, and reported separately).
+
+The benchmark fails if the two return different captions.
+
+Usage:
+    python -m tools.benchmarks.caption_store [--captions 1000000] [--per-video 20] [--lookups N]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from zeeguu.core.youtube_api.caption_store import CaptionStore
+
+WORDS = "vi det er og en til på med som for af har ikke den jeg du hun".split()
+
+
+def _old_captions_from_json(captions_path, video_unique_key):
+    with open(captions_path, "r", encoding="utf-8") as f:
+        caption_data = json.load(f)
+    return [
+        {
+            "time_start": caption["time_start"],
+            "time_end": caption["time_end"],
+            "text": caption["text"],
+        }
+        for caption in caption_data
+        if caption["video_unique_key"] == video_unique_key
+    ]
+
+
+def _write_captions(path, video_keys, per_video, rng):
+    captions = []
+    for key in video_keys:
+        for i in range(per_video):
+            captions.append(
+                {
+                    "video_unique_key": key,
+                    "time_start": i * 3000,
+                    "time_end": i * 3000 + 2800,
+                    "text": " ".join(rng.choices(WORDS, k=8)),
+                }
+            )
+    # Uploads come as all the captions of all the videos, not grouped
+    rng.shuffle(captions)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(captions, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--captions", type=int, default=1_000_000)
+    parser.add_argument("--per-video", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    path = os.path.join(tempfile.mkdtemp(), "captions.json")
+    video_keys = [f"v{i:010}" for i in range(args.captions // args.per_video)]
+    _write_captions(path, video_keys, args.per_video, rng)
+    lookups = rng.sample(video_keys, args.lookups)
+
+    start = time.perf_counter()
+    expected = [_old_captions_from_json(path, key) for key in lookups]
+    old = (time.perf_counter() - start) / args.lookups
+
+    store = CaptionStore(path)
+    start = time.perf_counter()
+    first = store.captions_for(lookups[0])
+    build = time.perf_counter() - start
+
+    many = rng.sample(video_keys, min(10_000, len(video_keys)))
+    start = time.perf_counter()
+    for key in many:
+        store.captions_for(key)
+    indexed = (time.perf_counter() - start) / len(many)
+
+    assert [first] + [store.captions_for(key) for key in lookups[1:]] == expected, (
+        "the index returns different captions"
+    )
+
+    size_mb = os.path.getsize(path) / 1024**2
+    print(f"{args.captions} captions of {len(video_keys)} videos, {size_mb:.0f} MB\n")
+    print(f"{'scan per lookup':24}{old * 1000:12.1f} ms per lookup")
+    print(f"{'index, first lookup':24}{build * 1000:12.1f} ms (builds the index)")
+    print(f"{'index':24}{indexed * 1000:12.3f} ms per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Benchmark the pattern matching done on every crawled article: removing
+JUNK_PATTERNS_TO_REMOVE and the disturbing / advertorial keyword checks.
+
+Runs the one-pass MultiPatternMatcher versions next to the pattern-by-pattern
+loops they replaced, over the most recent stored articles, and fails if the
+two ever disagree.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.benchmarks.content_cleaning [--limit N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from zeeguu.api.app import create_app_for_scripts
+from zeeguu.core.content_cleaning.content_cleaner import (
+    JUNK_PATTERNS_TO_REMOVE,
+    _remove_junk_patterns,
+)
+from zeeguu.core.content_quality.advertorial_detection import (
+    ADVERTORIAL_KEYWORDS,
+    has_advertorial_keywords,
+)
+from zeeguu.core.content_quality.disturbing_content_detection import (
+    DISTURBING_KEYWORDS,
+    is_disturbing_content_based_on_keywords,
+)
+from zeeguu.core.model import Article
+
+
+def _loop_remove_junk_patterns(text):
+    for junk_pattern in JUNK_PATTERNS_TO_REMOVE:
+        text = text.replace(junk_pattern, "")
+    return text
+
+
+def _loop_is_disturbing(title, content, language):
+    keywords = DISTURBING_KEYWORDS.get(language, DISTURBING_KEYWORDS["en"])
+    text_to_check = title.lower() + " " + content[:500].lower()
+    matched = [k for k in keywords if k.lower() in text_to_check]
+    if matched:
+        return True, f"Disturbing content keywords: {', '.join(matched[:3])}"
+    return False, ""
+
+
+def _loop_has_advertorial_keywords(text, threshold=2):
+    text_lower = text.lower()
+    return sum(1 for k in ADVERTORIAL_KEYWORDS if k in text_lower) >= threshold
+
+
+def _time(label, function, samples, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [function(*sample) for sample in samples]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<10} {elapsed * 1000 / repeat:9.1f} ms per pass")
+    return results
+
+
+def compare(name, loop_function, matcher_function, samples, repeat):
+    print(f"{name}:")
+    expected = _time("loops", loop_function, samples, repeat)
+    actual = _time("matcher", matcher_function, samples, repeat)
+    mismatches = sum(1 for e, a in zip(expected, actual) if e != a)
+    if mismatches:
+        raise SystemExit(f"  {mismatches} results differ from the loop version!")
+
+
+def run(limit, repeat):
+    articles = Article.query.order_by(Article.id.desc()).limit(limit).all()
+    samples = [
+        (a.title or "", a.get_content() or "", a.language.code) for a in articles
+    ]
+    total_chars = sum(len(content) for _, content, _ in samples)
+    print(f"{len(samples)} articles, {total_chars / 1_000_000:.1f}M characters\n")
+
+    compare(
+        "junk patterns",
+        _loop_remove_junk_patterns,
+        lambda text: _remove_junk_patterns(text, lambda removed: None),
+        [(content,) for _, content, _ in samples],
+        repeat,
+    )
+    compare(
+        "disturbing keywords",
+        _loop_is_disturbing,
+        is_disturbing_content_based_on_keywords,
+        samples,
+        repeat,
+    )
+    compare(
+        "advertorial keywords",
+        _loop_has_advertorial_keywords,
+        has_advertorial_keywords,
+        [(f"{title} {content[:500]}",) for title, content, _ in samples],
+        repeat,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--limit", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app_for_scripts()
+    app.app_context().push()
+
+    run(args.limit, args.repeat)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""
+Throughput, in docs/sec, of indexing articles into Elasticsearch as
+tools/mysql_to_elastic_for_articles.py used to (an es.exists per id, one
+embedding request per article, and bulk writes of 100 documents), against
+the pipeline of zeeguu/core/elastic/bulk_reindex.py.
+
+Runs offline: the articles are synthetic, in a SQLite file; ES and the
+embedding API are the local stubs (zeeguu.core.elastic.stub_server and
+zeeguu.core.semantic_vector_api.stub_server), each with a small latency per
+request. The benchmark fails if the two ways index different documents.
+
+Usage:
+    python -m tools.benchmarks.elastic_reindex [--articles N] [--workers N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# The ES and embedding API addresses are read when zeeguu is imported
+ES_PORT = _free_port()
+EMB_PORT = _free_port()
+os.environ["ZEEGUU_ES_CONN_STRING"] = f"http://127.0.0.1:{ES_PORT}"
+os.environ["ZEEGUU_EMB_API_CONN_STRING"] = f"http://127.0.0.1:{EMB_PORT}"
+
+import requests  # noqa: E402
+from elasticsearch import Elasticsearch  # noqa: E402
+from elasticsearch.helpers import bulk  # noqa: E402
+from flask import Flask  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from zeeguu.core.elastic import stub_server as es_stub  # noqa: E402
+from zeeguu.core.elastic.bulk_reindex import Checkpoint, reindex_articles  # noqa: E402
+from zeeguu.core.elastic.indexing import create_or_update_doc_for_bulk  # noqa: E402
+from zeeguu.core.elastic.settings import ES_CONN_STRING, ES_ZINDEX  # noqa: E402
+from zeeguu.core.model import Article  # noqa: E402
+from zeeguu.core.model.db import db  # noqa: E402
+from zeeguu.core.semantic_vector_api import EMB_API_CONN_STRING  # noqa: E402
+from zeeguu.core.semantic_vector_api import stub_server as embedding_stub  # noqa: E402
+from zeeguu.core.utils.caching import named_cache  # noqa: E402
+
+WORDS = "der die das und ist nicht ein eine zu mit auf für sich dem von Hund Katze".split()
+ITERATION_STEP = 100
+
+
+def _old_get_embedding_from_article(a):
+    r = requests.post(
+        url=f"{EMB_API_CONN_STRING}/get_article_embedding",
+        json={
+            "article_content": a.get_content(),
+            "article_language": a.language.name.lower(),
+        },
+        timeout=60,
+    )
+    return r.json()
+
+
+def _one_by_one(es, article_ids):
+    def docs(ids):
+        for i in ids:
+            if es.exists(index=ES_ZINDEX, id=i):
+                continue
+            article = Article.find_by_id(i)
+            yield create_or_update_doc_for_bulk(article, db.session)
+
+    with patch(
+        "zeeguu.core.elastic.indexing.get_embedding_from_article",
+        _old_get_embedding_from_article,
+    ):
+        for start in range(0, len(article_ids), ITERATION_STEP):
+            bulk(es, docs(article_ids[start : start + ITERATION_STEP]), raise_on_error=False)
+
+
+def _fill(count, rng):
+    db.create_all()
+    db.session.execute(db.metadata.tables["language"].insert(), [dict(id=1, code="da", name="Danish")])
+    db.session.execute(db.metadata.tables["domain_name"].insert(), [dict(id=1, domain_name="https://nyheder.dk")])
+    db.session.execute(db.metadata.tables["topic"].insert(), [dict(id=1, title="Sports")])
+    db.session.execute(
+        db.metadata.tables["url"].insert(),
+        [dict(id=i, path=f"/artikel/{i}", domain_name_id=1, title="") for i in range(1, count + 1)],
+    )
+    db.session.execute(
+        Article.__table__.insert(),
+        [
+            dict(
+                id=i,
+                title=" ".join(rng.choices(WORDS, k=6)),
+                content=" ".join(rng.choices(WORDS, k=400)),
+                summary=" ".join(rng.choices(WORDS, k=30)),
+                url_id=i,
+                language_id=1,
+                fk_difficulty=rng.randrange(20, 80),
+                word_count=400,
+                broken=0,
+                published_time=datetime(2026, 10, 1),
+            )
+            for i in range(1, count + 1)
+        ],
+    )
+    db.session.execute(
+        db.metadata.tables["article_topic_map"].insert(),
+        [dict(article_id=i, topic_id=1, origin_type=2) for i in range(1, count + 1)],
+    )
+    db.session.commit()
+
+
+def _indexed(es):
+    hits = es.search(index=ES_ZINDEX, size=1_000_000)["hits"]["hits"]
+    docs = sorted(
+        (hit["_source"] for hit in hits), key=lambda source: source["article_id"]
+    )
+    return [(doc["article_id"], doc["title"], doc["sem_vec"]) for doc in docs]
+
+
+def _serve(app, port):
+    server = make_server("127.0.0.1", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    logging.getLogger("elastic_transport").setLevel(logging.WARNING)
+    logging.getLogger("zeeguu.logging").setLevel(logging.WARNING)
+
+    es_app = es_stub.create_stub_app(request_overhead=0.002, per_doc_latency=0.0002)
+    embedding_app = embedding_stub.create_stub_app(
+        request_overhead=0.005, per_text_latency=0.001
+    )
+    servers = [_serve(es_app, ES_PORT), _serve(embedding_app, EMB_PORT)]
+
+    folder = tempfile.mkdtemp()
+    app = Flask("elastic-reindex-benchmark")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{folder}/articles.db"
+    db.init_app(app)
+    app.app_context().push()
+    _fill(args.articles, random.Random(0))
+    es = Elasticsearch(ES_CONN_STRING)
+    article_ids = list(range(1, args.articles + 1))
+
+    # The old way looks every article up in the index, so needs it to exist;
+    # the pipeline then starts from a deleted one
+    es.indices.create(index=ES_ZINDEX)
+    start = time.perf_counter()
+    _one_by_one(es, article_ids)
+    before = time.perf_counter() - start
+    expected = _indexed(es)
+
+    es.indices.delete(index=ES_ZINDEX)
+    named_cache("embeddings").clear()
+    start = time.perf_counter()
+    progress = reindex_articles(
+        app, es, Checkpoint(os.path.join(folder, "checkpoint.json")), workers=args.workers
+    )
+    after = time.perf_counter() - start
+    actual = _indexed(es)
+
+    assert len(expected) == args.articles, "the old way did not index every article"
+    assert actual == expected, "the pipeline indexes different documents"
+    for server in servers:
+        server.shutdown()
+
+    print(f"{args.articles} articles\n")
+    print(f"{'':26}{'docs/sec':>10}")
+    print(f"{'exists + one by one':26}{args.articles / before:10.1f}")
+    print(f"{f'pipeline, {args.workers} workers':26}{args.articles / after:10.1f}")
+    print(f"\npipeline report: {progress.report()}")
+
+
+if __name__ == "__main__":
+    main()
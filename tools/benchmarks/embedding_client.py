@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Throughput of computing embeddings through the local stub embedding API
+(zeeguu.core.semantic_vector_api.stub_server): one request per text, as
+retrieve_embeddings used to do, against the batched and cached
+EmbeddingClient.
+
+The texts are a stream in which a share of the entries repeat earlier
+ones, as when articles are re-indexed or the same search is run again.
+The stub sleeps a fixed overhead per request plus a latency per text. The
+benchmark fails if the two paths return different vectors.
+
+Usage:
+    python -m tools.benchmarks.embedding_client [--texts N] [--repeat-share 0.3] [--batch-size 32]
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from zeeguu.core.semantic_vector_api.embedding_client import EmbeddingClient
+from zeeguu.core.semantic_vector_api.stub_server import create_stub_app
+from zeeguu.core.utils.caching import Cache
+
+LANGUAGE = "danish"
+WORDS = "der die das und ist nicht ein eine zu mit auf für sich dem von Hund Katze".split()
+
+
+def _one_request_per_text(base_url, texts):
+    session = requests.Session()
+    vectors = []
+    for text in texts:
+        r = session.post(
+            f"{base_url}/get_article_embedding",
+            json={"article_content": text, "article_language": LANGUAGE},
+            timeout=60,
+        )
+        vectors.append(r.json())
+    return vectors
+
+
+def _texts(count, repeat_share, rng):
+    texts = []
+    for _ in range(count):
+        if texts and rng.random() < repeat_share:
+            texts.append(rng.choice(texts))
+        else:
+            texts.append(" ".join(rng.choices(WORDS, k=300)))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--repeat-share", type=float, default=0.3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--request-overhead", type=float, default=0.005)
+    parser.add_argument("--per-text-latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app = create_stub_app(args.request_overhead, args.per_text_latency)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    texts = _texts(args.texts, args.repeat_share, random.Random(0))
+
+    app.config["request_count"] = 0
+    start = time.perf_counter()
+    expected = _one_request_per_text(base_url, texts)
+    before = time.perf_counter() - start
+    before_requests = app.config["request_count"]
+
+    cache = Cache("benchmark-embeddings")
+    client = EmbeddingClient(
+        base_url, model_id="stub", max_batch_size=args.batch_size, cache=cache
+    )
+    app.config["request_count"] = 0
+    start = time.perf_counter()
+    # In chunks, as the indexing scripts call it, so the cache is used
+    # across calls and not only within one
+    actual = []
+    for chunk_start in range(0, len(texts), 100):
+        actual += client.embeddings(texts[chunk_start : chunk_start + 100], LANGUAGE)
+    after = time.perf_counter() - start
+    after_requests = app.config["request_count"]
+
+    assert actual == expected, "the batched client returns different vectors"
+    server.shutdown()
+
+    stats = cache.stats()
+    hit_rate = stats["hits"] / (stats["hits"] + stats["misses"])
+    print(f"{len(texts)} texts, {len(set(texts))} distinct\n")
+    print(f"{'':22}{'requests':>10}{'texts/s':>10}")
+    print(f"{'one request per text':22}{before_requests:10}{len(texts) / before:10.0f}")
+    print(f"{'batched + cached':22}{after_requests:10}{len(texts) / after:10.0f}")
+    print(f"\ncache hit rate: {hit_rate:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Profile the import time of the API at startup.
+
+Runs `create_app(testing=True)` in a fresh interpreter with
+`python -X importtime`, and reports:
+- the wall time of the imports and of create_app()
+- the slowest modules (by cumulative import time)
+- which of the known heavy modules got imported at startup
+
+The same measurement is used by zeeguu/api/test/test_startup_time.py to
+check startup against a time budget.
+
+Usage:
+    python -m tools.benchmarks.import_time [--top N]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# Modules that should only be imported when the feature that needs them
+# is used, not when a worker boots
+HEAVY_MODULES = [
+    "pydub",
+    "nltk",
+    "textblob",
+    "joblib",
+    "google.cloud.texttospeech",
+    "azure.cognitiveservices.speech",
+    "sentry_sdk",
+]
+
+_CHILD_SCRIPT = """
+import json, sys, time
+start = time.time()
+from zeeguu.api.app import create_app
+import_seconds = time.time() - start
+create_start = time.time()
+app = create_app(testing=True)
+create_app_seconds = time.time() - create_start
+print("STARTUP_RESULT " + json.dumps(dict(
+    import_seconds=import_seconds,
+    create_app_seconds=create_app_seconds,
+    total_seconds=time.time() - start,
+    loaded_heavy_modules=[m for m in {heavy_modules!r} if m in sys.modules],
+)))
+"""
+
+# e.g. "import time:       402 |        913 |   zeeguu.core.model"
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def parse_importtime(stderr):
+    """
+    Returns a list of (module, self_us, cumulative_us, depth) tuples
+    from the stderr output of `python -X importtime`.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            depth = (len(indent) - 1) // 2
+            entries.append((module, int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def profile_startup():
+    """
+    Runs create_app(testing=True) in a fresh interpreter and returns a dict
+    with the timings, the heavy modules that were loaded, and the parsed
+    import-time entries.
+    """
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _CHILD_SCRIPT.format(heavy_modules=HEAVY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith("STARTUP_RESULT "):
+            result = json.loads(line[len("STARTUP_RESULT ") :])
+    if result is None:
+        raise RuntimeError(f"No startup result in output:\n{completed.stdout}")
+
+    result["imports"] = parse_importtime(completed.stderr)
+    return result
+
+
+def print_report(result, top=25):
+    print(f"Import of zeeguu.api.app: {result['import_seconds']:.2f}s")
+    print(f"create_app(testing=True): {result['create_app_seconds']:.2f}s")
+    print(f"Total:                    {result['total_seconds']:.2f}s")
+    print()
+
+    print(f"Slowest {top} top-level imports (cumulative):")
+    top_level = [e for e in result["imports"] if e[3] == 0]
+    for module, _, cumulative_us, _ in sorted(
+        top_level, key=lambda e: e[2], reverse=True
+    )[:top]:
+        print(f"  {cumulative_us / 1e6:7.3f}s  {module}")
+    print()
+
+    print(f"Slowest {top} modules (self time):")
+    for module, self_us, _, _ in sorted(
+        result["imports"], key=lambda e: e[1], reverse=True
+    )[:top]:
+        print(f"  {self_us / 1e6:7.3f}s  {module}")
+    print()
+
+    if result["loaded_heavy_modules"]:
+        print("Heavy modules loaded at startup:")
+        for module in result["loaded_heavy_modules"]:
+            print(f"  - {module}")
+    else:
+        print("No heavy modules loaded at startup.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    print_report(profile_startup(), args.top)
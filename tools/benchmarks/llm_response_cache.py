@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Time and requests to the LLM API of a batch of low temperature Haiku prompts,
+some asked more than once (as when articles are crawled again, or many
+learners look up the same word), without the LLM response cache, with it,
+and replayed from a recording of the batch.
+
+Runs offline: the API is a local stub of the Messages API, with a latency
+per request; the replay runs with the stub turned off. The benchmark fails
+if any of the runs gets different answers.
+
+Usage:
+    python -m tools.benchmarks.llm_response_cache [--prompts N] [--distinct N] [--latency S] [--workers N]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, request
+from werkzeug.serving import make_server
+
+from zeeguu.core.llm_services import haiku_client, response_cache
+
+WORDS = "vi det er og en til på med som for af har ikke den jeg du hun".split()
+
+
+def _create_stub_app(latency):
+    app = Flask("anthropic-stub")
+    app.config["request_count"] = 0
+    lock = threading.Lock()
+
+    @app.route("/v1/messages", methods=["POST"])
+    def messages():
+        with lock:
+            app.config["request_count"] += 1
+        time.sleep(latency)
+        prompt = request.json["messages"][0]["content"]
+        return {
+            "content": [{"type": "text", "text": prompt.upper()}],
+            "stop_reason": "end_turn",
+        }
+
+    return app
+
+
+def _run(prompts, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        answers = list(
+            executor.map(lambda p: haiku_client.haiku_completion(p, 2000), prompts)
+        )
+    return time.perf_counter() - start, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--prompts", type=int, default=400)
+    parser.add_argument("--distinct", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [" ".join(rng.choices(WORDS, k=40)) for _ in range(args.distinct)]
+    # A few texts are asked for much more often than the rest
+    weights = [1 / (rank + 1) for rank in range(args.distinct)]
+    prompts = [f"Simplify: {t}" for t in rng.choices(texts, weights, k=args.prompts)]
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app = _create_stub_app(args.latency)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    haiku_client.ANTHROPIC_URL = f"http://127.0.0.1:{server.server_port}/v1/messages"
+    os.environ.setdefault("ANTHROPIC_TEXT_SIMPLIFICATION_KEY", "benchmark")
+    folder = tempfile.mkdtemp()
+
+    results = []
+    for label, mode, path in [
+        ("no cache", "off", None),
+        ("cache", "on", os.path.join(folder, "on.sqlite")),
+        ("record", "record", os.path.join(folder, "recording.sqlite")),
+        ("replay (API off)", "replay", os.path.join(folder, "recording.sqlite")),
+    ]:
+        if mode == "replay":
+            server.shutdown()
+        response_cache.configure(mode, path)
+        before = app.config["request_count"]
+        seconds, answers = _run(prompts, args.workers)
+        stats = response_cache._cache.stats() if mode != "off" else None
+        results.append((label, seconds, app.config["request_count"] - before, stats))
+        assert answers == [p.upper() for p in prompts], f"{label}: different answers"
+
+    print(
+        f"{args.prompts} prompts, {len(set(prompts))} different,"
+        f" {args.latency * 1000:.0f} ms per request, {args.workers} workers\n"
+    )
+    print(f"{'':18}{'seconds':>9}{'requests':>10}{'hits':>7}{'misses':>8}{'coalesced':>11}")
+    for label, seconds, requests_sent, stats in results:
+        counts = (
+            f"{stats['hits']:>7}{stats['misses']:>8}{stats['coalesced']:>11}"
+            if stats
+            else ""
+        )
+        print(f"{label:18}{seconds:9.2f}{requests_sent:>10}{counts}")
+
+
+if __name__ == "__main__":
+    main()
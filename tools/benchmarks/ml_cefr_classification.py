@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+"""
+Benchmark the ML-1 CEFR classifier throughput: features and prediction of
+article after article, as the backfill tools did, against
+extract_features_batch and predict_cefr_levels.
+
+Runs on synthetic articles with the real model of the language if
+$ZEEGUU_DATA_FOLDER has one, and otherwise with a random forest of the
+same shape (100 trees, n_jobs=-1, as trained by
+tools/ml/cefr_trainers/train_cefr_classifiers.py) fitted on random labels.
+
+The per-article path uses a copy of the extract_features that was
+replaced, and the benchmark fails if features or levels ever differ.
+
+Needs no DB.
+
+Usage:
+    python -m tools.benchmarks.ml_cefr_classification [--articles N] [--one-by-one N] [--language CODE]
+"""
+
+import argparse
+import random
+import re
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from zeeguu.core.language import ml_cefr_classifier
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1", "C2"]
+WORDS = (
+    "der die das und ist nicht ein eine zu mit auf für sich dem von "
+    "Regierung Entscheidung Bundesverfassungsgericht Klimawandel Wirtschaft "
+    "schnell langsam gestern morgen Hund Katze Haus Straße Wissenschaftler "
+    "Untersuchung Öffentlichkeit selbstverständlich Verantwortung Kinder"
+).split()
+ENDINGS = [". ", ". ", ". ", "? ", "! ", "; ", ": ", " — ", ", "]
+
+
+def _old_extract_features(content, fk_difficulty, word_count):
+    if not content or len(content.strip()) == 0:
+        return np.array([fk_difficulty or 50, word_count or 0] + [0.0] * 10)
+
+    char_count = len(content)
+
+    words = re.findall(r"\b\w+\b", content.lower())
+    if not words:
+        return np.array([fk_difficulty or 50, word_count or 0] + [0.0] * 10)
+
+    actual_word_count = len(words)
+    avg_word_length = np.mean([len(w) for w in words])
+    long_word_ratio = sum(1 for w in words if len(w) > 7) / actual_word_count
+
+    unique_words = len(set(words))
+    type_token_ratio = unique_words / actual_word_count if actual_word_count > 0 else 0
+
+    sentences = re.split(r"[.!?]+", content)
+    sentences = [s.strip() for s in sentences if s.strip()]
+
+    if sentences:
+        sentence_lengths = [len(re.findall(r"\b\w+\b", s)) for s in sentences]
+        avg_sentence_length = np.mean(sentence_lengths)
+        sentence_length_std = (
+            np.std(sentence_lengths) if len(sentence_lengths) > 1 else 0
+        )
+        interactive_marks = content.count("?") + content.count("!")
+        interactive_ratio = (
+            interactive_marks / len(sentences) if len(sentences) > 0 else 0
+        )
+    else:
+        avg_sentence_length = 0
+        sentence_length_std = 0
+        interactive_ratio = 0
+
+    complex_punct = content.count(";") + content.count(":") + content.count("—")
+    punct_complexity = complex_punct / actual_word_count if actual_word_count > 0 else 0
+
+    paragraphs = [p.strip() for p in content.split("\n\n") if p.strip()]
+    if paragraphs:
+        paragraph_lengths = [len(re.findall(r"\b\w+\b", p)) for p in paragraphs]
+        avg_paragraph_length = np.mean(paragraph_lengths)
+    else:
+        avg_paragraph_length = actual_word_count
+
+    avg_chars_per_word = char_count / actual_word_count if actual_word_count > 0 else 0
+
+    return np.array(
+        [
+            fk_difficulty or 50,
+            word_count or actual_word_count,
+            avg_word_length,
+            avg_chars_per_word,
+            avg_sentence_length,
+            sentence_length_std,
+            type_token_ratio,
+            long_word_ratio,
+            punct_complexity,
+            avg_paragraph_length,
+            interactive_ratio,
+            char_count,
+        ]
+    )
+
+
+def _synthetic_article(rng):
+    paragraphs = []
+    for _ in range(rng.randint(3, 12)):
+        sentences = []
+        for _ in range(rng.randint(1, 6)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(4, 25))]
+            sentences.append(" ".join(words) + rng.choice(ENDINGS))
+        paragraphs.append("".join(sentences))
+    content = "\n\n".join(paragraphs)
+    return content, rng.uniform(20, 80), len(content.split())
+
+
+def _stand_in_model(rng):
+    from sklearn.ensemble import RandomForestClassifier
+
+    features = np.array([_old_extract_features(*_synthetic_article(rng)) for _ in range(600)])
+    model = RandomForestClassifier(
+        n_estimators=100, max_depth=15, random_state=42, n_jobs=-1
+    )
+    model.fit(features, [rng.choice(LEVELS) for _ in features])
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument(
+        "--one-by-one",
+        type=int,
+        default=500,
+        help="articles to run one at a time (a predict call each is slow)",
+    )
+    parser.add_argument("--language", default="de")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    articles = [_synthetic_article(rng) for _ in range(args.articles)]
+
+    model = ml_cefr_classifier.load_model(args.language)
+    if model is None:
+        print(f"No {args.language} model found, using a stand-in forest\n")
+        model = _stand_in_model(rng)
+
+    with patch.object(ml_cefr_classifier, "load_model", return_value=model):
+        sample = articles[: args.one_by_one]
+        start = time.perf_counter()
+        old_features = [_old_extract_features(*article) for article in sample]
+        features_before = time.perf_counter() - start
+        start = time.perf_counter()
+        one_by_one = [model.predict(row.reshape(1, -1))[0] for row in old_features]
+        predict_before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matrix = ml_cefr_classifier.extract_features_batch(articles)
+        features_after = time.perf_counter() - start
+        start = time.perf_counter()
+        levels = ml_cefr_classifier.predict_cefr_levels(articles, args.language)
+        total_after = time.perf_counter() - start
+
+    assert np.array_equal(np.array(old_features), matrix[: len(sample)]), (
+        "extract_features_batch disagrees"
+    )
+    assert list(one_by_one) == levels[: len(sample)], "predict_cefr_levels disagrees"
+
+    before = len(sample) / (features_before + predict_before)
+    after = len(articles) / total_after
+    print(f"{'':28}{'articles/s':>12}")
+    print(f"{'features, one by one':28}{len(sample) / features_before:12.0f}")
+    print(f"{'features, batch':28}{len(articles) / features_after:12.0f}")
+    print(f"{'classified one by one':28}{before:12.0f}")
+    print(f"{'classified in one batch':28}{after:12.0f}")
+    print(
+        f"\n{len(articles)} articles: {len(articles) / before:.1f}s one by one, "
+        f"{total_after:.1f}s batched ({after / before:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Latency (p50, p99) of tokenizing short bookmark contexts through the Stanza
+service: with a bare requests.post and JSON per call, as StanzaServiceClient
+used to, and with the client's pooled keep-alive session, in JSON and in
+msgpack. Also reports the size of a response in each format.
+
+Needs a running Stanza service (stanza_service/, e.g. the "stanza"
+container of docker-compose.yml); the benchmark fails if it is not
+reachable, rather than timing the local fallback.
+
+Usage:
+    python -m tools.benchmarks.stanza_client [--url http://127.0.0.1:5001] [--calls N] [--language de]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+import requests
+
+# Before zeeguu.core.tokenization, which can't be the first one imported
+from zeeguu.core.model import Language
+from zeeguu.core.tokenization import TokenizerModel
+from zeeguu.core.tokenization import stanza_client
+from zeeguu.core.tokenization.stanza_client import MODEL_TYPE_MAP, StanzaServiceClient
+
+MODEL = TokenizerModel.STANZA_TOKEN_POS_DEP
+
+# Bookmark contexts are a sentence or two around the translated word
+CONTEXTS = {
+    "de": [
+        "Die Regierung hat gestern eine neue Entscheidung zum Klimawandel getroffen.",
+        "Der Hund lief schnell über die Straße, als das Auto kam.",
+        "Wissenschaftler haben eine Untersuchung über die Folgen veröffentlicht.",
+        "Sie übernahm die Verantwortung für das Projekt, obwohl sie neu war.",
+        "Die Kinder spielten im Garten, während es draußen regnete.",
+        "Nach langen Verhandlungen einigten sich die Parteien auf einen Kompromiss.",
+    ],
+    "da": [
+        "Regeringen traf i går en ny beslutning om klimaforandringerne.",
+        "Hunden løb hurtigt over vejen, da bilen kom.",
+        "Forskerne har offentliggjort en undersøgelse af følgerne.",
+        "Hun tog ansvaret for projektet, selvom hun var ny.",
+        "Børnene legede i haven, mens det regnede udenfor.",
+        "Efter lange forhandlinger blev partierne enige om et kompromis.",
+    ],
+}
+
+
+def _bare_post(url, language, text):
+    response = requests.post(
+        f"{url}/tokenize",
+        json={
+            "text": text,
+            "language": language,
+            "model": MODEL_TYPE_MAP[MODEL],
+            "flatten": True,
+            "start_token_i": 0,
+            "start_sentence_i": 0,
+            "start_paragraph_i": 0,
+        },
+        timeout=stanza_client.REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["tokens"]
+
+
+def _latencies(tokenize, texts):
+    latencies = []
+    results = []
+    for text in texts:
+        start = time.perf_counter()
+        results.append(tokenize(text))
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def _percentile(values, share):
+    return statistics.quantiles(values, n=100, method="inclusive")[share - 1]
+
+
+def _response_size(url, language, accept):
+    response = requests.post(
+        f"{url}/tokenize",
+        json={"text": CONTEXTS[language][0], "language": language},
+        headers={"Accept": accept},
+        timeout=stanza_client.REQUEST_TIMEOUT,
+    )
+    return len(response.content), response.headers.get("Content-Type")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--url", default=os.environ.get("STANZA_SERVICE_URL") or "http://127.0.0.1:5001"
+    )
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--language", default="de", choices=sorted(CONTEXTS))
+    args = parser.parse_args()
+
+    requests.get(f"{args.url}/health", timeout=5).raise_for_status()
+
+    contexts = CONTEXTS[args.language]
+    texts = [contexts[i % len(contexts)] for i in range(args.calls)]
+    # Loads the language's pipeline, if the service hasn't yet
+    _bare_post(args.url, args.language, texts[0])
+
+    runs = {}
+    runs["requests.post, JSON"] = _latencies(
+        lambda text: _bare_post(args.url, args.language, text), texts
+    )
+    language = Language(args.language, args.language)
+    for name, use_msgpack in [("pooled, JSON", False), ("pooled, msgpack", True)]:
+        with patch.multiple(
+            stanza_client,
+            STANZA_SERVICE_URL=args.url,
+            USE_MSGPACK=use_msgpack,
+            _service_speaks_msgpack=False,
+        ), patch.object(stanza_client, "_get_local_tokenizer") as fallback:
+            client = StanzaServiceClient(language, MODEL)
+            runs[name] = _latencies(client.tokenize_text, texts)
+            assert not fallback.called, "the service failed, the client fell back"
+
+    expected = runs["requests.post, JSON"][1]
+    for name, (_, results) in runs.items():
+        assert results == expected, f"{name} returns different tokens"
+
+    print(f"{args.calls} calls, {args.language} contexts of ~10 words, {args.url}\n")
+    print(f"{'':22}{'p50 ms':>8}{'p99 ms':>8}")
+    for name, (latencies, _) in runs.items():
+        p50 = _percentile(latencies, 50) * 1000
+        p99 = _percentile(latencies, 99) * 1000
+        print(f"{name:22}{p50:8.2f}{p99:8.2f}")
+
+    print()
+    for accept in ["application/json", "application/msgpack"]:
+        size, content_type = _response_size(args.url, args.language, accept)
+        print(f"response for Accept {accept}: {size} bytes ({content_type})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Latency of finding the articles similar to an article: a kNN query to
+Elasticsearch per lookup, as articles_like_this_semantic does without the
+local index (a new client and the query of build_elastic_semantic_sim_query_
+for_article), against zeeguu.core.semantic_search.vector_index.
+
+Also reports the recall@k of the ES results with respect to the exact ones
+of the local index. Against the local ES stub (the default) that is 1.0,
+since the stub's kNN is exact too; point --es at a real cluster, with the
+synthetic articles of this benchmark in --index, to measure ES's HNSW.
+
+Usage:
+    python -m tools.benchmarks.vector_index [--articles N] [--lookups N] [--es URL]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+from werkzeug.serving import make_server
+
+from zeeguu.core.elastic import stub_server as es_stub
+from zeeguu.core.elastic.elastic_query_builder import (
+    build_elastic_semantic_sim_query_for_article,
+)
+from zeeguu.core.semantic_search.vector_index import ArticleVectorIndex
+
+LANGUAGES = ["Danish", "German", "Spanish", "French"]
+DIMENSIONS = 512
+K = 10
+
+
+def _documents(count, rng):
+    # Articles cluster around topics, as real embeddings do
+    centers = rng.standard_normal((50, DIMENSIONS))
+    for article_id in range(1, count + 1):
+        center = centers[rng.integers(len(centers))]
+        yield {
+            "article_id": article_id,
+            "language": LANGUAGES[article_id % len(LANGUAGES)],
+            "topics": ["Culture"] if article_id % 3 else [],
+            "sem_vec": (center + rng.standard_normal(DIMENSIONS)).tolist(),
+        }
+
+
+def _start_stub():
+    app = es_stub.create_stub_app(request_overhead=0.002, per_doc_latency=0)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def _percentiles(seconds):
+    p50, p99 = np.percentile(np.array(seconds) * 1000, [50, 99])
+    return f"p50 {p50:8.2f} ms   p99 {p99:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--es", help="URL of an ES to use instead of the stub")
+    parser.add_argument("--index", default="zeeguu-vector-benchmark")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    logging.getLogger("elastic_transport").setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    es_url = args.es or _start_stub()
+    es = Elasticsearch(es_url, request_timeout=600)
+    if args.es is None:
+        bulk(es, ({"_index": args.index, **d} for d in _documents(args.articles, rng)))
+
+    index = ArticleVectorIndex()
+    start = time.perf_counter()
+    loaded = index.load_from_elasticsearch(es, args.index)
+    load = time.perf_counter() - start
+
+    ids = rng.choice(np.arange(1, loaded + 1), size=args.lookups, replace=False)
+    articles = [
+        SimpleNamespace(id=int(i), language=SimpleNamespace(name=LANGUAGES[i % 4]))
+        for i in ids
+    ]
+
+    es_times, es_results = [], []
+    for article in articles:
+        sem_vec = index.vector_of(article.id).tolist()
+        start = time.perf_counter()
+        body = build_elastic_semantic_sim_query_for_article(
+            K, article.language, sem_vec, article
+        )
+        hits = Elasticsearch(es_url).search(index=args.index, body=body)
+        es_times.append(time.perf_counter() - start)
+        es_results.append([h["_source"]["article_id"] for h in hits["hits"]["hits"]])
+
+    local_times, local_results = [], []
+    for article in articles:
+        start = time.perf_counter()
+        found = index.search(
+            index.vector_of(article.id),
+            K,
+            language=article.language.name,
+            exclude_ids=[article.id],
+        )
+        local_times.append(time.perf_counter() - start)
+        local_results.append([article_id for article_id, _ in found])
+
+    recall = np.mean(
+        [len(set(e) & set(l)) / len(l) for e, l in zip(es_results, local_results)]
+    )
+
+    print(f"{loaded} articles of {DIMENSIONS} dimensions, {args.lookups} lookups\n")
+    print(f"{'local index, load':24}{load * 1000:12.0f} ms (once per process)")
+    print(f"{'ES kNN query':24}{_percentiles(es_times)}")
+    print(f"{'local index':24}{_percentiles(local_times)}")
+    print(f"\nrecall@{K} of ES with respect to the local index: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
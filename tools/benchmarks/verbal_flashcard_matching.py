@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+"""
+Benchmark the string matching behind verbal flashcards: the optimal string
+alignment distance (full, and bounded by MAX_ANSWER_VARIANT_EDIT_DISTANCE as
+in answer_variants_for_bookmark), Jaro-Winkler, and the scoring of a spoken
+answer against its variants.
+
+The row-based kernels in fuzzy_match run next to the dict-of-cells and
+loop-over-window versions they replaced, on Danish words with ASR-like
+mutations, and the benchmark fails if the two ever disagree.
+
+Needs no DB.
+
+Usage:
+    python -m tools.benchmarks.verbal_flashcard_matching [--pairs N] [--repeat N]
+"""
+
+import argparse
+import random
+import time
+from unittest.mock import patch
+
+from zeeguu.core.verbal_flashcards import fuzzy_match
+from zeeguu.core.verbal_flashcards.flashcard_selection import (
+    MAX_ANSWER_VARIANT_EDIT_DISTANCE,
+)
+
+DANISH_WORDS = (
+    "hund kat hus bil bold bolden sommerfugl jordbær køleskab lejlighed "
+    "hvidvin rødgrød fødselsdag forår fjeder kilde uafhængighed sygeplejerske "
+    "undskyld selvfølgelig spændende hyggelig vindue bibliotek støvsuger "
+    "barn børnene æble øl går måske hvordan hvornår hvorfor weekend kaffe"
+).split()
+ALPHABET = "abdefghijklmnoprstuvyæøå"
+
+
+def _dict_optimal_string_alignment_distance(source, target):
+    if source == target:
+        return 0
+    if not source:
+        return len(target)
+    if not target:
+        return len(source)
+
+    distance = {}
+    for i in range(-1, len(source) + 1):
+        distance[(i, -1)] = i + 1
+    for j in range(-1, len(target) + 1):
+        distance[(-1, j)] = j + 1
+
+    for i in range(len(source)):
+        for j in range(len(target)):
+            substitution_cost = 0 if source[i] == target[j] else 1
+            distance[(i, j)] = min(
+                distance[(i - 1, j)] + 1,
+                distance[(i, j - 1)] + 1,
+                distance[(i - 1, j - 1)] + substitution_cost,
+            )
+            if (
+                i > 0
+                and j > 0
+                and source[i] == target[j - 1]
+                and source[i - 1] == target[j]
+            ):
+                distance[(i, j)] = min(
+                    distance[(i, j)], distance[(i - 2, j - 2)] + substitution_cost
+                )
+
+    return distance[(len(source) - 1, len(target) - 1)]
+
+
+def _loop_jaro_similarity(source, target):
+    if source == target:
+        return 1.0
+    if not source or not target:
+        return 0.0
+
+    match_distance = max(len(source), len(target)) // 2 - 1
+    source_matches = [False] * len(source)
+    target_matches = [False] * len(target)
+    matches = 0
+    for i in range(len(source)):
+        for j in range(
+            max(0, i - match_distance), min(i + match_distance + 1, len(target))
+        ):
+            if target_matches[j] or source[i] != target[j]:
+                continue
+            source_matches[i] = target_matches[j] = True
+            matches += 1
+            break
+    if matches == 0:
+        return 0.0
+
+    transpositions = 0
+    target_index = 0
+    for i in range(len(source)):
+        if not source_matches[i]:
+            continue
+        while not target_matches[target_index]:
+            target_index += 1
+        if source[i] != target[target_index]:
+            transpositions += 1
+        target_index += 1
+
+    return (
+        matches / len(source)
+        + matches / len(target)
+        + (matches - transpositions / 2) / matches
+    ) / 3
+
+
+def _asr_mutation(word, rng):
+    letters = list(word)
+    for _ in range(rng.randint(0, 3)):
+        edit = rng.randrange(4)
+        if edit == 0 and len(letters) > 1:
+            del letters[rng.randrange(len(letters))]
+        elif edit == 1:
+            letters.insert(rng.randint(0, len(letters)), rng.choice(ALPHABET))
+        elif edit == 2:
+            letters[rng.randrange(len(letters))] = rng.choice(ALPHABET)
+        elif len(letters) > 1:
+            i = rng.randrange(len(letters) - 1)
+            letters[i], letters[i + 1] = letters[i + 1], letters[i]
+    return "".join(letters)
+
+
+def _time(function, pairs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(source, target) for source, target in pairs]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def _report(name, before, after, count):
+    print(
+        f"{name:42}{before / count * 1e6:9.2f}µs{after / count * 1e6:9.2f}µs"
+        f"{before / after:8.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pairs", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pairs = []
+    for _ in range(args.pairs):
+        word = rng.choice(DANISH_WORDS)
+        other = (
+            _asr_mutation(word, rng) if rng.random() < 0.7 else rng.choice(DANISH_WORDS)
+        )
+        pairs.append((word, other))
+
+    print(f"{len(pairs)} word pairs, best of {args.repeat}\n")
+    print(f"{'':42}{'before':>11}{'after':>11}{'':>9}")
+
+    before, expected = _time(_dict_optimal_string_alignment_distance, pairs, args.repeat)
+    after, actual = _time(fuzzy_match.optimal_string_alignment_distance, pairs, args.repeat)
+    assert actual == expected, "optimal_string_alignment_distance disagrees"
+    _report("optimal string alignment", before, after, len(pairs))
+
+    def bounded(source, target):
+        return fuzzy_match.optimal_string_alignment_distance(
+            source, target, max_distance=MAX_ANSWER_VARIANT_EDIT_DISTANCE
+        )
+
+    after, actual = _time(bounded, pairs, args.repeat)
+    assert [d <= MAX_ANSWER_VARIANT_EDIT_DISTANCE for d in actual] == [
+        d <= MAX_ANSWER_VARIANT_EDIT_DISTANCE for d in expected
+    ], "bounded optimal_string_alignment_distance disagrees"
+    _report(
+        f"  bounded to {MAX_ANSWER_VARIANT_EDIT_DISTANCE} (answer variants)",
+        before,
+        after,
+        len(pairs),
+    )
+
+    before, expected = _time(_loop_jaro_similarity, pairs, args.repeat)
+    after, actual = _time(fuzzy_match.jaro_similarity, pairs, args.repeat)
+    assert actual == expected, "jaro_similarity disagrees"
+    _report("jaro", before, after, len(pairs))
+
+    # A spoken answer of two words against three variants, scored end to end;
+    # "before" uses the replaced kernels and scores every pair from scratch,
+    # as score_word_match did
+    submissions = []
+    for _ in range(len(pairs) // 20):
+        variants = [
+            " ".join(rng.choice(DANISH_WORDS) for _ in range(2)) for _ in range(3)
+        ]
+        spoken = " ".join(_asr_mutation(w, rng) for w in rng.choice(variants).split())
+        submissions.append((spoken, variants))
+
+    def score_pair_by_pair(spoken, variants):
+        spoken_words = spoken.split()
+        return [
+            [
+                fuzzy_match.score_word_match(user_word, expected_word, "da")
+                for user_word in spoken_words
+                for expected_word in variant.split()
+            ]
+            for variant in variants
+        ]
+
+    with patch.object(
+        fuzzy_match,
+        "optimal_string_alignment_distance",
+        _dict_optimal_string_alignment_distance,
+    ), patch.object(fuzzy_match, "jaro_similarity", _loop_jaro_similarity):
+        before, _ = _time(score_pair_by_pair, submissions, args.repeat)
+    after, _ = _time(
+        lambda spoken, variants: fuzzy_match.calculate_accuracy_against_variants(
+            spoken, variants, "da"
+        ),
+        submissions,
+        args.repeat,
+    )
+    _report("answer against 3 variants", before, after, len(submissions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Wall time and YouTube API requests of crawling a batch of videos: one by
+one through Video.find_or_create as video_dowloader used to (a videos and
+a channels request per video, the captions fetched in turn, and a commit
+per caption and tag), against ingest_videos.
+
+Runs offline, on an in-memory SQLite DB, against the YouTube API stub
+(zeeguu.core.youtube_api.stub_server) with request_overhead seconds per
+request; stub_captions with --caption-latency stands in for the caption
+fetch. The benchmark fails if the two ways store different videos.
+
+Usage:
+    python -m tools.benchmarks.video_ingestion [--videos N] [--request-overhead 0.05] [--caption-latency 0.2]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+from werkzeug.serving import make_server
+
+from zeeguu.core.content_retriever.video_dowloader import ingest_videos
+from zeeguu.core.model import Caption, Language, Url, Video
+from zeeguu.core.model.db import db
+from zeeguu.core.model.source import Source
+from zeeguu.core.model.source_type import SourceType
+from zeeguu.core.model.video_tag import VideoTag
+from zeeguu.core.model.video_tag_map import VideoTagMap
+from zeeguu.core.model.yt_channel import YTChannel
+from zeeguu.core.test.fixtures import add_source_types
+from zeeguu.core.test.test_app import create_test_app
+from zeeguu.core.youtube_api import stub_server, youtube_api
+
+
+def _old_find_or_create(session, video_unique_key, language):
+    video_info = youtube_api.fetch_video_info(video_unique_key, language.code)
+    channel_info = youtube_api.fetch_channel_info(video_info["channelId"])
+    channel = YTChannel.find_or_create(
+        session, video_info["channelId"], channel_info, channel_info["thumbnail"], language
+    )
+    url_object = Url.find_or_create(session, video_info["thumbnail"])
+    source = None
+    if video_info["broken"] == 0:
+        source = Source.find_or_create(
+            session,
+            video_info["text"],
+            SourceType.find_by_type(SourceType.VIDEO),
+            language,
+            False,
+            False,
+        )
+    video = Video(
+        video_unique_key=video_unique_key,
+        title=video_info["title"],
+        source=source,
+        description=video_info["description"],
+        published_time=video_info["publishedAt"],
+        channel=channel,
+        thumbnail_url=url_object,
+        duration=video_info["duration"],
+        language=language,
+        broken=video_info["broken"],
+    )
+    session.add(video)
+    session.commit()
+    if video_info["broken"] != 0:
+        return video
+
+    for caption in video_info["captions"]:
+        Caption.create(
+            session=session,
+            video=video,
+            time_start=caption["time_start"],
+            time_end=caption["time_end"],
+            text=caption["text"],
+        )
+    session.commit()
+    for tag_text in video_info["tags"]:
+        tag = VideoTag.find_or_create(session, tag_text)
+        if not VideoTagMap.query.filter_by(video=video, tag=tag).first():
+            session.add(VideoTagMap(video=video, tag=tag))
+            session.commit()
+    return video
+
+
+def _stored(videos):
+    return [
+        (
+            video.video_unique_key,
+            video.title,
+            video.broken,
+            video.channel.channel_id,
+            [(c.time_start, c.time_end, c.get_content()) for c in video.captions],
+            sorted(
+                m.tag.tag for m in VideoTagMap.query.filter_by(video_id=video.id)
+            ),
+        )
+        for video in sorted(videos, key=lambda v: v.video_unique_key)
+    ]
+
+
+def _reset(session):
+    for table in ["video_tag_map", "video_tag", "caption", "video", "yt_channel"]:
+        session.execute(db.metadata.tables[table].delete())
+    session.commit()
+    session.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--videos", type=int, default=100)
+    parser.add_argument("--request-overhead", type=float, default=0.05)
+    parser.add_argument("--caption-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    stub = stub_server.create_stub_app(request_overhead=args.request_overhead)
+    server = make_server("127.0.0.1", 0, stub, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    recording = stub_server.load_recording()
+
+    app = create_test_app()
+    app.app_context().push()
+    session = db.session
+    add_source_types()
+    session.add(Language("da", "Danish"))
+    session.commit()
+    language = Language.find("da")
+
+    keys = [f"bench{i:06}" for i in range(args.videos)]
+    runs = {}
+    with patch.multiple(
+        youtube_api,
+        VIDEO_URL=f"{url}/videos",
+        CHANNEL_URL=f"{url}/channels",
+        get_captions_from_json=lambda key, lang: stub_server.stub_captions(
+            recording, key, latency=args.caption_latency
+        ),
+    ), patch.object(Video, "assign_inferred_topics"), patch(
+        "zeeguu.core.elastic.indexing.index_video"
+    ):
+        for name, crawl in [
+            ("one by one", lambda: [_old_find_or_create(session, k, language) for k in keys]),
+            ("ingest_videos", lambda: ingest_videos(session, keys, "da")),
+        ]:
+            _reset(session)
+            stub.config["request_count"] = 0
+            start = time.perf_counter()
+            videos = crawl()
+            runs[name] = (
+                time.perf_counter() - start,
+                stub.config["request_count"],
+                _stored(videos),
+            )
+    server.shutdown()
+
+    expected = runs["one by one"][2]
+    assert len(expected) == args.videos, "the old way did not store every video"
+    assert runs["ingest_videos"][2] == expected, "ingest_videos stores different videos"
+
+    broken = sum(1 for video in expected if video[2] != 0)
+    print(f"{args.videos} videos ({broken} not in Danish)\n")
+    print(f"{'':16}{'seconds':>10}{'API requests':>14}")
+    for name, (seconds, requests, _) in runs.items():
+        print(f"{name:16}{seconds:10.2f}{requests:14}")
+
+
+if __name__ == "__main__":
+    main()
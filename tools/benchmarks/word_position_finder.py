@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of word_position_finder.word_appears_standalone on long
+contexts: as it used to work (two find_word_positions_in_text calls, each
+tokenizing target and context and normalizing every window), against the
+single memoized pass.
+
+Timed twice per context length: cold (each context seen for the first
+time) and warm (the same contexts again, as when several checks look at
+the same bookmark context). A regex tokenizer stands in for Stanza, which
+is far slower, so the cold numbers understate what the single tokenization
+saves. The benchmark fails if the two ever disagree.
+
+Usage:
+    python -m tools.benchmarks.word_position_finder [--lengths 100 1000 10000] [--contexts N]
+"""
+
+import argparse
+import random
+import re
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Before zeeguu.core.tokenization, which can't be the first one imported
+import zeeguu.core.model  # noqa: F401
+from zeeguu.core.tokenization import word_position_finder
+from zeeguu.core.tokenization.token import Token
+
+LANGUAGE = SimpleNamespace(code="de")
+WORDS = (
+    "der die das und ist nicht ein eine zu mit auf für sich dem von "
+    "Haus Hausboot Bootshaus Regierung Entscheidung Hund Katze Straße"
+).split()
+TARGETS = ["Haus", "Katze", "gibt auf", "Regierung", "Elefant"]
+
+
+class _RegexTokenizer:
+    def tokenize_text(self, text, as_serializable_dictionary=True):
+        tokens = []
+        sent_i = token_i = 0
+        for word in re.findall(r"\w+|[^\w\s]", text):
+            tokens.append(Token(word, 0, sent_i, token_i))
+            token_i += 1
+            if word == ".":
+                sent_i += 1
+                token_i = 0
+        return tokens
+
+
+def _old_find_word_positions_in_text(target_word, context_text, from_lang, strict_matching=False):
+    normalize = word_position_finder._normalize_token
+    tokenizer = word_position_finder._get_tokenizer(from_lang)
+    target_tokens = list(tokenizer.tokenize_text(target_word, as_serializable_dictionary=False))
+    context_tokens = list(tokenizer.tokenize_text(context_text, as_serializable_dictionary=False))
+    target_normalized = [normalize(t.text) for t in target_tokens]
+    target_len = len(target_normalized)
+    if target_len == 0:
+        return {"found_positions": [], "tokens_list": context_tokens}
+
+    found_positions = []
+    for i in range(len(context_tokens) - target_len + 1):
+        context_slice = [normalize(context_tokens[i + j].text) for j in range(target_len)]
+        if strict_matching:
+            matches = context_slice == target_normalized
+        else:
+            matches = all(
+                t == c or t in c or c in t for t, c in zip(target_normalized, context_slice)
+            )
+        if matches:
+            token = context_tokens[i]
+            found_positions.append(
+                {"sentence_i": token.sent_i, "token_i": token.token_i, "tokens_matched": target_len}
+            )
+    return {"found_positions": found_positions, "tokens_list": context_tokens}
+
+
+def _old_word_appears_standalone(target_word, context_text, from_lang):
+    strict = _old_find_word_positions_in_text(target_word, context_text, from_lang, True)
+    fuzzy = _old_find_word_positions_in_text(target_word, context_text, from_lang, False)
+    if strict["found_positions"]:
+        return {"standalone": True, "only_in_compounds": False, "compound_examples": []}
+    if fuzzy["found_positions"]:
+        examples = []
+        for pos in fuzzy["found_positions"]:
+            for token in fuzzy["tokens_list"]:
+                if token.sent_i == pos["sentence_i"] and token.token_i == pos["token_i"]:
+                    examples.append(token.text)
+                    break
+        return {"standalone": False, "only_in_compounds": True, "compound_examples": examples}
+    return {"standalone": False, "only_in_compounds": False, "compound_examples": []}
+
+
+def _context(length, rng):
+    words = []
+    while len(words) < length:
+        sentence = rng.choices(WORDS, k=rng.randint(6, 14))
+        words += sentence[:-1] + [sentence[-1] + "."]
+    return " ".join(words[:length])
+
+
+def _time(check, cases):
+    results = []
+    start = time.perf_counter()
+    for target, context in cases:
+        results.append(check(target, context, LANGUAGE))
+    return (time.perf_counter() - start) / len(cases), results
+
+
+def _comparable(result):
+    return (result["standalone"], result["only_in_compounds"], result["compound_examples"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--contexts", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'tokens':>8}{'':6}{'old':>10}{'cold':>10}{'warm':>10}   us per check")
+    with patch.object(word_position_finder, "_get_tokenizer", lambda language: _RegexTokenizer()):
+        for length in args.lengths:
+            cases = [
+                (target, _context(length, rng))
+                for _ in range(args.contexts)
+                for target in TARGETS
+            ]
+            word_position_finder._tokenized.clear()
+
+            old, expected = _time(_old_word_appears_standalone, cases)
+            cold, actual = _time(word_position_finder.word_appears_standalone, cases)
+            warm, _ = _time(word_position_finder.word_appears_standalone, cases)
+
+            assert [_comparable(r) for r in actual] == [_comparable(r) for r in expected], (
+                "word_appears_standalone disagrees with the old implementation"
+            )
+            print(f"{length:8}{'':6}{old * 1e6:10.0f}{cold * 1e6:10.0f}{warm * 1e6:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Compare the memory and lookup speed of the wordstats LanguageInfo loader
+against the memory-mapped CompactLanguageInfo.
+
+Memory is measured in a fresh interpreter per loader after loading the
+languages and looking up every word of their lists once (so that the whole
+index is paged in). RssAnon is private to the process, and paid again by
+every worker; RssFile is the mapped index, shared by all the workers.
+
+Lookups are 100k words drawn from the frequency list, with one in five
+not in it: Word.stats per word, CompactLanguageInfo.get per word, and one
+ranks_for call. The benchmark fails if the ranks ever differ.
+
+Indexes are built in a temporary folder unless --index-folder is given.
+Needs no DB.
+
+Usage:
+    python -m tools.benchmarks.wordstats_memory [--languages de da en] [--index-folder PATH]
+"""
+
+import argparse
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from wordstats import LanguageInfo, Word
+
+from zeeguu.core.word_stats.compact_language_info import CompactLanguageInfo
+
+_CHILD_SCRIPT = """
+import json, time
+from wordstats import LanguageInfo
+from zeeguu.core.word_stats.compact_language_info import CompactLanguageInfo
+languages, compact, folder = {languages!r}, {compact!r}, {folder!r}
+start = time.time()
+infos = [
+    CompactLanguageInfo.open(folder, code) if compact else LanguageInfo.load(code)
+    for code in languages
+]
+load_seconds = time.time() - start
+for info in infos:
+    words = info.all_words()
+    if compact:
+        info.ranks_for(words)
+    else:
+        [info[word].rank for word in words]
+    del words
+status = dict(
+    line.split(":", 1)
+    for line in open("/proc/self/status")
+    if line.startswith(("VmRSS", "Rss"))
+)
+print("BENCHMARK_RESULT " + json.dumps(dict(
+    load_seconds=load_seconds,
+    **{{key: int(value.split()[0]) / 1024 for key, value in status.items()}},
+)))
+"""
+
+
+def _measure_memory(languages, compact, folder):
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            _CHILD_SCRIPT.format(languages=languages, compact=compact, folder=folder),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    for line in output.splitlines():
+        if line.startswith("BENCHMARK_RESULT "):
+            return json.loads(line[len("BENCHMARK_RESULT ") :])
+    raise RuntimeError(f"No benchmark result in output:\n{output}")
+
+
+def _time(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--languages", nargs="+", default=["de", "da", "en"])
+    parser.add_argument("--index-folder")
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    folder = args.index_folder or tempfile.mkdtemp()
+    for code in args.languages:
+        if CompactLanguageInfo.open(folder, code) is None:
+            CompactLanguageInfo.build(LanguageInfo.load(code), folder)
+
+    print(f"Memory after looking up every word of {', '.join(args.languages)}\n")
+    print(f"{'':22}{'load s':>8}{'RssAnon':>10}{'RssFile':>10}{'total':>10}")
+    for name, compact in (("wordstats", False), ("memory-mapped", True)):
+        result = _measure_memory(args.languages, compact, folder)
+        print(
+            f"{name:22}{result['load_seconds']:8.1f}{result['RssAnon']:8.0f}MB"
+            f"{result['RssFile']:8.0f}MB{result['VmRSS']:8.0f}MB"
+        )
+
+    code = args.languages[0]
+    Word.stats_dict[code] = full = LanguageInfo.load(code)
+    compact = CompactLanguageInfo.open(folder, code)
+
+    rng = random.Random(0)
+    words = full.all_words()
+    lookups = [
+        rng.choice(words) if rng.random() < 0.8 else rng.choice(words) + "qx"
+        for _ in range(args.lookups)
+    ]
+
+    print(f"\n{len(lookups)} {code} lookups{'':6}{'words/s':>12}")
+    before, expected = _time(lambda: [Word.stats(word, code).rank for word in lookups])
+    print(f"{'Word.stats per word':28}{len(lookups) / before:12.0f}")
+    after, actual = _time(lambda: [compact[word].rank for word in lookups])
+    assert actual == expected, "CompactLanguageInfo.get disagrees"
+    print(f"{'compact, per word':28}{len(lookups) / after:12.0f}")
+    after, actual = _time(lambda: compact.ranks_for(lookups))
+    assert actual == expected, "ranks_for disagrees"
+    print(f"{'compact, ranks_for':28}{len(lookups) / after:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
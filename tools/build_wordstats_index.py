@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Build the memory-mapped wordstats index of the learnable languages (or of
+the given ones) in $ZEEGUU_DATA_FOLDER/wordstats_index.
+
+The API builds missing indexes at startup when PRELOAD_WORDSTATS is set;
+this script is for building them ahead of a deploy, and for rebuilding them
+after upgrading the wordstats package. Running processes keep reading the
+index they opened until they restart.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.build_wordstats_index [--rebuild] [LANGUAGE ...]
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+from wordstats import LanguageInfo
+
+from zeeguu.core.model import Language
+from zeeguu.core.word_stats import INDEX_FOLDER, CompactLanguageInfo
+from zeeguu.logging import log
+
+
+def build_indexes(language_codes, rebuild=False):
+    for language_code in language_codes:
+        path = CompactLanguageInfo.path(INDEX_FOLDER, language_code)
+        if rebuild:
+            shutil.rmtree(path, ignore_errors=True)
+        elif CompactLanguageInfo.open(INDEX_FOLDER, language_code) is not None:
+            log(f"{language_code}: already built")
+            continue
+
+        start = time.time()
+        info = CompactLanguageInfo.build(LanguageInfo.load(language_code), INDEX_FOLDER)
+        log(f"{language_code}: {len(info)} words in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "languages",
+        nargs="*",
+        default=Language.CODES_OF_LANGUAGES_THAT_CAN_BE_LEARNED,
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="replace the existing indexes"
+    )
+    args = parser.parse_args()
+
+    if not INDEX_FOLDER:
+        parser.error("ZEEGUU_DATA_FOLDER is not set")
+
+    os.makedirs(INDEX_FOLDER, exist_ok=True)
+    build_indexes(args.languages, rebuild=args.rebuild)
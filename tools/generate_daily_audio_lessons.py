@@ -12,15 +12,19 @@ For each recently-active user with an ENABLED subscription for their currently
 -learned language, we generate today's lesson unless: it isn't a scheduled day,
 they already have one for their local "today", or generation is PAUSED because
 the most recent lesson wasn't engaged with (DailyAudioLesson.waiting_paused_for,
-from #643 — avoids piling up unheard lessons). Generation reuses the on-demand
-pipeline (prepare_lesson_generation + generate_daily_lesson), synchronously.
+from #643 — avoids piling up unheard lessons).
+
+The work is done by DailyLessonScheduler (core/audio_lessons/daily_lesson_scheduler.py):
+meaning lessons shared by several users are generated once, scripts and TTS
+run in parallel, and the meanings of tomorrow's lessons are prepared too.
+Everything is checkpointed in the DB, so rerunning after a failure is cheap.
 
 Usage:
-    python generate_daily_audio_lessons.py [--send-email] [--dry-run] [--days N] [--user-id ID]
+    python generate_daily_audio_lessons.py [--send-email] [--dry-run] [--days N] [--user-id ID] [--llm-concurrency N]
 """
 
 import argparse
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 
 parser = argparse.ArgumentParser(
     description="Pre-generate daily audio lessons for opted-in active users"
@@ -29,6 +33,9 @@ parser.add_argument("--send-email", action="store_true", help="Send summary emai
 parser.add_argument("--dry-run", action="store_true", help="Report what would happen without generating")
 parser.add_argument("--days", type=int, default=30, help="Active-user window in days (default: 30)")
 parser.add_argument("--user-id", type=int, default=None, help="Only process this user (for testing)")
+parser.add_argument(
+    "--llm-concurrency", type=int, default=None, help="Lesson scripts written at the same time"
+)
 args = parser.parse_args()
 
 DAYS_SINCE_ACTIVE = args.days
@@ -39,32 +46,15 @@ from zeeguu.api.app import create_app_for_scripts
 app = create_app_for_scripts()
 app.app_context().push()
 
-import signal
 import time
-from collections import defaultdict
-
-try:
-    from zoneinfo import ZoneInfo
-except ImportError:  # Python < 3.9
-    ZoneInfo = None
 
-from zeeguu.core.model import (
-    db,
-    User,
-    UserWord,
-    DailyAudioLesson,
-    DailyAudioSubscription,
-    AudioLessonGenerationProgress,
+from zeeguu.core.model import User
+from zeeguu.core.audio_lessons.daily_lesson_scheduler import (
+    DailyLessonScheduler,
+    LLM_CONCURRENCY,
 )
-from zeeguu.core.audio_lessons.daily_lesson_generator import DailyLessonGenerator
-from zeeguu.core.audio_lessons.script_generator import VALID_LESSON_TYPES
-from zeeguu.core.audio_lessons.suggestion_validator import validate_suggestion
 from zeeguu.core.emailer.zeeguu_mailer import ZeeguuMailer
 
-PER_USER_TIMEOUT_SECONDS = 600
-
-generator = DailyLessonGenerator()
-
 
 class OutputCapture:
     def __init__(self):
@@ -85,106 +75,6 @@ def output(text=""):
     output_capture.write(text + "\n")
 
 
-class TimeoutException(Exception):
-    pass
-
-
-def user_timezone_offset_minutes(user):
-    """Best-effort: the user's current UTC offset in minutes, derived from their
-    stored timezone (e.g. "Europe/Copenhagen"). Defaults to 0/UTC when unknown,
-    in which case far-west users may have "today" still be "yesterday" at run
-    time — the frontend fallback covers that miss."""
-    tz_name = getattr(user, "timezone", None)
-    if not tz_name or ZoneInfo is None:
-        return 0
-    try:
-        offset = datetime.now(ZoneInfo(tz_name)).utcoffset()
-        return int(offset.total_seconds() // 60) if offset else 0
-    except Exception:
-        return 0
-
-
-def resolve_suggestion(user, lesson_type, raw_suggestion):
-    """Mirror the endpoint's canonicalization: reuse a cached canonical form if
-    the user has had this exact subject before, otherwise validate it.
-
-    Returns (canonical_suggestion, is_general) or raises ValueError if the
-    subject is rejected by the validator."""
-    if not raw_suggestion or lesson_type not in ("topic", "situation"):
-        return None, False
-
-    cached = DailyAudioLesson.find_canonical_for_raw_suggestion(user, raw_suggestion)
-    if cached:
-        return cached, False
-
-    is_valid, result = validate_suggestion(raw_suggestion, lesson_type, user.native_language.name)
-    if not is_valid:
-        raise ValueError(result.get("reason", "rejected"))
-    return result["canonical"], result["is_general"]
-
-
-def generate_for_user(user, lesson_type, raw_suggestion, timezone_offset):
-    """Run the full prepare+generate pipeline synchronously for one user.
-    Returns one of: "generated", "exists", "skipped:<reason>", "failed:<reason>"."""
-    # Pause gate (before any LLM work): skip if today's lesson already exists,
-    # or if generation is paused (most recent lesson not engaged with) — so
-    # unheard lessons don't pile up until the learner returns.
-    if generator.today_lesson_exists(user, timezone_offset):
-        return "exists"
-    if DailyAudioLesson.waiting_paused_for(user, user.learned_language.id):
-        return "skipped:paused"
-
-    try:
-        canonical, is_general = resolve_suggestion(user, lesson_type, raw_suggestion)
-    except ValueError as e:
-        return f"skipped:invalid-subject ({e})"
-
-    result = generator.prepare_lesson_generation(user, timezone_offset, canonical, lesson_type)
-
-    if result.get("lesson_id"):
-        return "exists"
-    if result.get("error"):
-        return f"skipped:{result['error']}"
-    if "selected_word_ids" not in result:
-        return "failed:unexpected-preparation-result"
-
-    # Rebuild the prepared word objects (prepare returns IDs). .in_() doesn't
-    # preserve order, so re-sort to the original selection order.
-    selected_words = UserWord.query.filter(UserWord.id.in_(result["selected_word_ids"])).all()
-    word_order = {wid: i for i, wid in enumerate(result["selected_word_ids"])}
-    selected_words.sort(key=lambda w: word_order.get(w.id, 0))
-    unscheduled_words = (
-        UserWord.query.filter(UserWord.id.in_(result["unscheduled_word_ids"])).all()
-        if result["unscheduled_word_ids"]
-        else []
-    )
-    progress = AudioLessonGenerationProgress.query.get(result["progress_id"])
-
-    def timeout_handler(signum, frame):
-        raise TimeoutException("generation timed out")
-
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(PER_USER_TIMEOUT_SECONDS)
-    try:
-        generator.generate_daily_lesson(
-            user=user,
-            selected_words=selected_words,
-            unscheduled_words=unscheduled_words,
-            origin_language=result["origin_language"],
-            translation_language=result["translation_language"],
-            cefr_level=result["cefr_level"],
-            progress=progress,
-            raw_suggestion=raw_suggestion,
-            canonical_suggestion=canonical,
-            lesson_type=lesson_type,
-            is_general=is_general,
-        )
-        db.session.commit()
-        return "generated"
-    finally:
-        signal.alarm(0)
-
-
 # --- main ---------------------------------------------------------------
 
 if args.user_id:
@@ -195,73 +85,13 @@ else:
     output(f"Finding users active in the last {DAYS_SINCE_ACTIVE} days...")
 output("=" * 80)
 
-counts = defaultdict(int)
-language_breakdown = defaultdict(int)
 start_time = time.time()
 
-for index, user_id in enumerate(user_ids, start=1):
-    user = User.find_by_id(user_id)
-    if not user:
-        continue
-
-    try:
-        language = user.learned_language
-        sub = DailyAudioSubscription.find(user, language)
-
-        # No subscription, or turned off → not generating for this user.
-        if sub is None or not sub.enabled:
-            counts["not-subscribed"] += 1
-            continue
-        lesson_type, raw_suggestion = sub.lesson_type, sub.raw_suggestion
-        if lesson_type not in VALID_LESSON_TYPES:
-            output(f"{index}. {user.name}: invalid lesson_type {lesson_type!r} — skipping")
-            counts["skipped"] += 1
-            continue
-
-        subject = raw_suggestion or ("study words" if lesson_type == "three_words_lesson" else "?")
-        timezone_offset = user_timezone_offset_minutes(user)
-        today_local = datetime.now(timezone(timedelta(minutes=timezone_offset))).date()
-
-        # Not a scheduled day for this subscription (e.g. Mon/Wed/Fri schedule).
-        if not sub.scheduled_on(today_local):
-            counts["not-due"] += 1
-            continue
-
-        if DRY_RUN:
-            # Read-only: don't create a progress record or generate. Engagement
-            # pause + today-exists gates are #643's (reused here).
-            if generator.today_lesson_exists(user, timezone_offset):
-                output(f"{index}. {user.name} [{language.name}] — already has today's lesson")
-                counts["exists"] += 1
-                continue
-            if DailyAudioLesson.waiting_paused_for(user, language.id):
-                output(f"{index}. {user.name} [{language.name}] — paused (last lesson < 50% listened)")
-                counts["paused"] += 1
-                continue
-            output(f"{index}. {user.name} [{language.name}] — WOULD generate {lesson_type}: {subject}")
-            counts["would-generate"] += 1
-            language_breakdown[language.name] += 1
-            continue
-
-        outcome = generate_for_user(user, lesson_type, raw_suggestion, timezone_offset)
-        counts[outcome.split(":")[0]] += 1
-        if outcome == "generated":
-            language_breakdown[user.learned_language.name] += 1
-            output(f"{index}. {user.name} [{user.learned_language.name}] — ✓ generated {lesson_type}: {subject}")
-        elif outcome == "exists":
-            output(f"{index}. {user.name} [{user.learned_language.name}] — already has today's lesson")
-        else:
-            output(f"{index}. {user.name} [{user.learned_language.name}] — {outcome} ({lesson_type}: {subject})")
-
-    except TimeoutException:
-        db.session.rollback()
-        counts["failed"] += 1
-        output(f"{index}. user {user_id} — ✗ timeout")
-    except Exception as e:
-        db.session.rollback()
-        counts["failed"] += 1
-        output(f"{index}. user {user_id} — ✗ error: {e}")
-        continue
+scheduler = DailyLessonScheduler(
+    llm_concurrency=args.llm_concurrency or LLM_CONCURRENCY, output=output
+)
+counts = scheduler.run(user_ids, dry_run=DRY_RUN)
+language_breakdown = scheduler.language_breakdown
 
 processing_time = time.time() - start_time
 
@@ -0,0 +1,26 @@
+/*
+  Search index for the friends feature's /search_users.
+
+  User.search used to run `username LIKE '%term%'` over the whole user table
+  on every keystroke. user_search_trigram stores, for every position in the
+  lowercased (and accent-stripped) username and name, the gram of up to three
+  characters starting there, so a search becomes an index range scan on
+  trigram followed by a check of the few candidate users.
+
+  The binary collation is on purpose: grams are normalized in Python, and a
+  case/accent-insensitive collation would make e.g. 'abc' and 'äbc' collide
+  on the primary key.
+
+  Anonymous users are not indexed.
+
+  Ordering: run this BEFORE deploying the model change, then populate it with
+      python -m tools.rebuild_user_search_index
+*/
+
+CREATE TABLE user_search_trigram (
+    trigram VARCHAR(3) NOT NULL,
+    user_id INT NOT NULL,
+    PRIMARY KEY (trigram, user_id),
+    KEY ix_user_search_trigram_user_id (user_id),
+    CONSTRAINT fk_user_search_trigram_user FOREIGN KEY (user_id) REFERENCES user (id) ON DELETE CASCADE
+) DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_bin;
@@ -0,0 +1,29 @@
+/*
+  Per-user daily session duration rollups for the leaderboards.
+
+  The exercise/reading/listening time leaderboards used to sum the raw
+  session tables over the whole period on every request. Closed days are now
+  rolled up into user_daily_activity by tools/rollup_daily_activity.py (run
+  nightly); daily_activity_rollup_day records which days have been rolled up,
+  since a day without any activity has no user_daily_activity rows.
+
+  The leaderboards fall back to the raw tables for days that are not rolled
+  up, so the tables can be created and backfilled at any time:
+      python -m tools.rollup_daily_activity
+*/
+
+CREATE TABLE user_daily_activity (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    exercise_time INT NOT NULL DEFAULT 0,
+    reading_time INT NOT NULL DEFAULT 0,
+    listening_time INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day),
+    KEY ix_user_daily_activity_day (day),
+    CONSTRAINT fk_user_daily_activity_user FOREIGN KEY (user_id) REFERENCES user (id)
+) COLLATE = utf8_bin;
+
+CREATE TABLE daily_activity_rollup_day (
+    day DATE NOT NULL PRIMARY KEY,
+    rolled_up_at DATETIME
+);
@@ -0,0 +1,28 @@
+/*
+  Work queue for the LLM pass over crawled articles (CEFR assessment,
+  summaries, classification, and simplification with SIMPLIFY_AT_CRAWL).
+
+  The crawler used to call the LLM inline for every article, so a slow
+  response held up the ingestion of all the other feeds. It now enqueues one
+  job per article, and zeeguu/operations/crawler/enrichment_worker.py
+  processes them per provider, lowest priority value first. Failed jobs are
+  retried with exponential backoff (next_attempt_at) up to a few times.
+*/
+
+CREATE TABLE article_enrichment_job (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    article_id INT NOT NULL,
+    provider VARCHAR(32) NOT NULL,
+    priority INT NOT NULL DEFAULT 0,
+    status ENUM('pending', 'running', 'done', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    started_at DATETIME,
+    finished_at DATETIME,
+    outcome VARCHAR(512),
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY uq_article_enrichment_job_article (article_id),
+    KEY ix_article_enrichment_job_claim (provider, status, priority, id),
+    CONSTRAINT fk_article_enrichment_job_article FOREIGN KEY (article_id)
+        REFERENCES article (id) ON DELETE CASCADE
+) COLLATE = utf8mb4_unicode_ci;
@@ -0,0 +1,26 @@
+/*
+  Index of the answers verbal flashcards accept for a cue (the lowercased
+  translation), so that finding the answer variants of a card is one index
+  read instead of a Meaning-Phrase-Phrase join on content_lower.
+
+  Maintained by mapper events on Meaning; populate it for the existing
+  meanings with:
+
+      python -m tools.rebuild_answer_variant_index
+*/
+
+CREATE TABLE answer_variant (
+    meaning_id INT NOT NULL PRIMARY KEY,
+    origin_language_id INT NOT NULL,
+    translation_language_id INT NOT NULL,
+    cue_key VARCHAR(255) NOT NULL,
+    answer VARCHAR(255) NOT NULL,
+    canonical_form VARCHAR(255) NOT NULL,
+    KEY answer_variant_cue (origin_language_id, translation_language_id, cue_key),
+    CONSTRAINT fk_answer_variant_meaning FOREIGN KEY (meaning_id)
+        REFERENCES meaning (id) ON DELETE CASCADE,
+    CONSTRAINT fk_answer_variant_origin_language FOREIGN KEY (origin_language_id)
+        REFERENCES language (id),
+    CONSTRAINT fk_answer_variant_translation_language FOREIGN KEY (translation_language_id)
+        REFERENCES language (id)
+) COLLATE = utf8mb4_bin;
@@ -0,0 +1,13 @@
+/*
+  Hash of the normalized beginning of an article's content (see
+  Article.content_fingerprint_for), so that Article.find_by_content_and_source
+  is an index probe instead of a LIKE prefix scan over the feed's articles.
+
+  Set for new articles by the model; fill it in for the existing ones with:
+
+      python -m tools.backfill_article_content_fingerprints
+*/
+
+ALTER TABLE article
+    ADD COLUMN content_fingerprint VARCHAR(64) NULL,
+    ADD KEY article_content_fingerprint (feed_id, content_fingerprint);
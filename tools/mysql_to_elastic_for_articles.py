@@ -1,163 +1,80 @@
-# coding=utf-8
-from zeeguu.core.elastic.indexing import (
-    create_or_update_doc_for_bulk,
-)
-from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk, scan
-import zeeguu.core
-from zeeguu.core.model import Article
+#!/usr/bin/env python
+"""
+Index the articles of the DB that are not in Elasticsearch yet.
+
+By default the articles with topics that are not inferred are indexed
+first, so the topic inference can learn from them; --without-topics
+indexes the rest. The articles are read in id order, in chunks, by a
+pipeline (zeeguu/core/elastic/bulk_reindex.py) that builds the documents in
+parallel and streams them to ES.
+
+The progress is saved in a checkpoint file, one per mode: an interrupted
+run continues where it stopped. --restart starts from the first article
+again; the articles already in ES are skipped either way, so it's only
+slower. The ids that failed are listed in the checkpoint file.
+
+Usage:
+    python -m tools.mysql_to_elastic_for_articles [--without-topics] [--limit N] [--workers N] [--chunk-size N] [--restart] [--delete-index]
+"""
+
+import argparse
+import os
 from datetime import datetime
-from sqlalchemy.orm.exc import NoResultFound
+
+from elasticsearch import Elasticsearch
+
 from zeeguu.api.app import create_app_for_scripts
-from zeeguu.core.model import ArticleTopicMap
+from zeeguu.core.elastic.bulk_reindex import Checkpoint, reindex_articles
 from zeeguu.core.elastic.settings import ES_ZINDEX, ES_CONN_STRING
-from zeeguu.core.model.article_topic_map import TopicOriginType
-import numpy as np
-from tqdm import tqdm
-import time
 
 app = create_app_for_scripts()
 app.app_context().push()
-# First we should only index with topics so we can do
-# inference based on the articles that have topics.
-
-# These parameters can be changed based on need.
-#   DELETE_INDEX - used to re-index from scratch. Default: False
-#   INDEX_WITH_TOPIC_ONLY - determines which articles are indexed. If set to True,
-# only the articles which have a topic assigned to them are index. If false, then
-# only the articles without the topic will be added. Default: True
-#   TOTAL_ITEMS - total items to be indexed, the IDs are sampled and this is used to
-# have a variety of different articles in ES. Default: 5000
-# NOTE: If you want to index all the articles, you shoud pass a number that's higher
-# or equal to the number of articles in the DB
-#   ITERATION_STEP - number of articles to index before reporting. Default: 1000
-DELETE_INDEX = False
-INDEX_WITH_TOPIC = True
-TOTAL_ITEMS = 1000
-ITERATION_STEP = 100
-
-print(ES_CONN_STRING)
-es = Elasticsearch(ES_CONN_STRING)
-db_session = zeeguu.core.model.db.session
-print(es.info())
-
-
-def fetch_articles_by_id(id_list):
-    for i in id_list:
-        try:
-            if es.exists(index=ES_ZINDEX, id=i):
-                print(f"Skipped for: '{i}', article already in ES.")
-                continue
-            article = Article.find_by_id(i)
-            if not article:
-                print(f"Skipped for: '{i}', article not in DB.")
-                continue
-            yield article
-        except NoResultFound:
-            print(f"fail for: '{i}'")
-        except Exception as e:
-            print(f"fail for: '{i}', {e}")
-
-
-def gen_docs(articles_w_topics):
-    for article in articles_w_topics:
-        try:
-            yield create_or_update_doc_for_bulk(article, db_session)
-        except Exception as e:
-            print(f"fail for: '{article.id}', {e}")
 
 
 def main():
-    if DELETE_INDEX:
-        try:
-            es.options(ignore_status=[400, 404], request_timeout=120).indices.delete(
-                index=ES_ZINDEX
-            )
-            print("Deleted index 'zeeguu'!")
-        except Exception as e:
-            print(f"Failed to delete: {e}")
-
-    # Sample Articles that have topics assigned and are not inferred
-    if INDEX_WITH_TOPIC:
-        target_ids = np.array(
-            [
-                a_id[0]
-                for a_id in db_session.query(Article.id)
-                .join(ArticleTopicMap)
-                .filter(
-                    ArticleTopicMap.origin_type != TopicOriginType.INFERRED
-                )  # Do not index Inferred topics
-                .filter(Article.broken != 1)  # Filter out documents that are broken
-                # .filter(Article.language_id == 2)  # If only one language
-                .distinct()
-            ]
-        )
-        print("Got articles with topics, total: ", len(target_ids))
-    else:
-        # index w/o topic
-        # Note: these two are exclusive;
-        # If you ever want to reindex everything, you'll have to modify this
-        articles_with_topic = set(
-            [
-                art_id_w_topic[0]
-                for art_id_w_topic in db_session.query(
-                    ArticleTopicMap.article_id
-                ).distinct()
-            ]
-        )
-        target_ids = np.array(
-            list(
-                set([a_id[0] for a_id in db_session.query(Article.id)])
-                - articles_with_topic
-            )
-        )
-        print("Got articles without topics, total: ", len(target_ids))
-
-    total_articles_in_es = 0
-    if len(target_ids) == 0:
-        print("No articles found! Exiting...")
-        return
-    if es.indices.exists(index=ES_ZINDEX):
-        es_query = {"query": {"match_all": {}}}
-        scan_results = scan(es, index=ES_ZINDEX, query=es_query)
-        ids_in_es = set(
-            [
-                int(hit["_source"]["article_id"])
-                for hit in scan_results
-                if "article_id" in hit["_source"]
-            ]
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--without-topics", action="store_true")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after about N new documents")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: in the current folder)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint")
+    parser.add_argument("--delete-index", action="store_true", help="Re-index from scratch")
+    args = parser.parse_args()
+
+    mode = "without_topics" if args.without_topics else "with_topics"
+    checkpoint_path = args.checkpoint or f"mysql_to_elastic_for_articles.{mode}.json"
+
+    print(ES_CONN_STRING)
+    es = Elasticsearch(ES_CONN_STRING)
+    print(es.info())
+
+    if args.delete_index:
+        es.options(ignore_status=[400, 404], request_timeout=120).indices.delete(
+            index=ES_ZINDEX
         )
-        total_articles_in_es = len(ids_in_es)
-        target_ids_not_in_es = list(filter(lambda x: x not in ids_in_es, target_ids))
-    else:
-        # The index was deleted / doesn't exist:
-        target_ids_not_in_es = target_ids
-
-    print(f"""Total articles in ES: {total_articles_in_es}""")
-    print(f"""Total articles missing: {len(target_ids_not_in_es)}""")
-    print(f"""Indexing a total of: {TOTAL_ITEMS}, in batches of: {ITERATION_STEP}""")
-
-    # I noticed that if a document is not added then it won't let me query the ES search.
-    total_added = 0
-    errors_encountered = []
-    final_count_of_articles = min(TOTAL_ITEMS, len(target_ids_not_in_es))
-    sampled_ids = np.random.choice(
-        target_ids_not_in_es, final_count_of_articles, replace=False
+        print(f"Deleted index '{ES_ZINDEX}'!")
+
+    if (args.restart or args.delete_index) and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    checkpoint = Checkpoint(checkpoint_path)
+    if checkpoint.last_id:
+        print(f"Resuming after article {checkpoint.last_id} ({checkpoint_path})")
+
+    progress = reindex_articles(
+        app,
+        es,
+        checkpoint,
+        with_topics=not args.without_topics,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        limit=args.limit,
     )
-    for i_start in tqdm(range(0, final_count_of_articles, ITERATION_STEP)):
-        sub_sample = sampled_ids[i_start : i_start + ITERATION_STEP]
-        res_bulk, error_bulk = bulk(
-            es, gen_docs(fetch_articles_by_id(sub_sample)), raise_on_error=False
-        )
-        total_added += res_bulk
-        errors_encountered += error_bulk
-        total_bulk_errors = len(error_bulk)
-        if total_bulk_errors > 0:
-            print(f"## Warning, {total_bulk_errors} failed to index. With errors: ")
-            print(error_bulk)
-        print(f"Batch finished. ADDED:{res_bulk} | ERRORS: {total_bulk_errors}")
-    print(errors_encountered)
-    print(f"Total articles added: {total_added}")
+
+    print(f"Done: {progress.report()}, up to article {checkpoint.last_id}")
+    if checkpoint.failed_ids:
+        print(f"Failed article ids: {checkpoint.failed_ids}")
 
 
 if __name__ == "__main__":
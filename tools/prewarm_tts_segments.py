@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Synthesizes the fixed phrases that daily lessons are stitched together with,
+so that no user has to wait for them: the teacher's transitions, dialogue
+intros and outros (in every teacher language), and the closing phrases
+(with the woman voice, in every learned language).
+
+Also moves segments from before the sharded store (directly in
+audio/segments/) into their shards, and reports the size of the store.
+
+Needs no DB; only the TTS credentials.
+
+Usage:
+    python -m tools.prewarm_tts_segments                   # all languages
+    python -m tools.prewarm_tts_segments --languages da,de
+    python -m tools.prewarm_tts_segments --dry-run         # only count what's missing
+"""
+
+import argparse
+
+from zeeguu.core.audio_lessons.lesson_builder import (
+    CLOSING_PHRASES,
+    DIALOGUE_INTRO_PHRASES,
+    DIALOGUE_OUTRO_PHRASES,
+    OUTRO_PHRASES,
+    TRANSITION_PHRASES,
+)
+from zeeguu.core.audio_lessons.voice_synthesizer import VoiceSynthesizer
+
+TEACHER_PHRASES = (
+    TRANSITION_PHRASES,
+    DIALOGUE_INTRO_PHRASES,
+    DIALOGUE_OUTRO_PHRASES,
+    OUTRO_PHRASES,
+)
+
+
+def phrase_requests(languages=None):
+    """(text, voice_type, language_code, speaking_rate, teacher_language) tuples"""
+    requests = []
+    for phrases_per_language in TEACHER_PHRASES:
+        for language, phrases in phrases_per_language.items():
+            if languages is None or language in languages:
+                # As LessonBuilder._synthesize_teacher_phrase asks for them
+                requests += [(text, "teacher", language, 1.0, language) for text in phrases]
+
+    for language, phrases in CLOSING_PHRASES.items():
+        if languages is None or language in languages:
+            # As LessonBuilder._synthesize_learned_language_phrase asks for them
+            requests += [(text, "woman", language, 0.9, language) for text in phrases]
+
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--languages", help="Comma separated language codes (default: all)"
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    languages = set(args.languages.split(",")) if args.languages else None
+
+    synthesizer = VoiceSynthesizer()
+    store = synthesizer.segment_store
+
+    imported = store.import_flat_files()
+    if imported:
+        print(f"Moved {imported} segments into the sharded store")
+
+    requests = phrase_requests(languages)
+    missing = [
+        request
+        for request in requests
+        if not store.lookup(
+            synthesizer.get_voice_config(request[1], request[2], request[4])["name"],
+            request[0],
+            request[3],
+        )
+    ]
+    print(f"{len(requests)} phrases, {len(missing)} not synthesized yet")
+
+    if missing and not args.dry_run:
+        synthesizer.synthesize_segments(
+            missing,
+            on_progress=lambda done, total, _: print(f"  {done}/{total}", end="\r"),
+        )
+        print()
+
+    stats = store.stats()
+    print(
+        f"Segment store: {stats['segments']} segments, "
+        f"{stats['bytes'] / 1024**2:.1f} of {stats['max_bytes'] / 1024**2:.0f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
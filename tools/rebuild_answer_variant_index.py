@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+(Re)build the answer_variant index used for the answer variants of verbal
+flashcards.
+
+The index is kept up to date by mapper events on Meaning; this script is for
+populating it after the migration, for rebuilding it from scratch, or after
+registering a normalizer for another language. Invalid meanings and meanings
+in languages without a normalizer are skipped.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.rebuild_answer_variant_index [--batch-size N]
+"""
+
+import argparse
+
+from zeeguu.api.app import create_app_for_scripts
+from zeeguu.core.model import db, AnswerVariant, Meaning
+from zeeguu.logging import log
+
+app = create_app_for_scripts()
+app.app_context().push()
+
+
+def rebuild_index(batch_size=10000):
+    log("Clearing answer_variant...")
+    db.session.execute(AnswerVariant.__table__.delete())
+    db.session.commit()
+
+    indexed = 0
+    skipped = 0
+    last_id = 0
+    while True:
+        meanings = db.session.execute(
+            AnswerVariant.indexed_meanings_query()
+            .where(Meaning.id > last_id)
+            .order_by(Meaning.id)
+            .limit(batch_size)
+        ).all()
+        if not meanings:
+            break
+
+        rows = [AnswerVariant.row_for(*meaning) for meaning in meanings]
+        rows = [row for row in rows if row]
+        skipped += len(meanings) - len(rows)
+        indexed += len(rows)
+
+        if rows:
+            db.session.execute(AnswerVariant.__table__.insert(), rows)
+        db.session.commit()
+
+        last_id = meanings[-1][0]
+        log(f"Indexed {indexed} meanings (skipped {skipped}), last id {last_id}")
+
+    log(f"Done. Indexed {indexed} meanings, skipped {skipped}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    rebuild_index(args.batch_size)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+(Re)build the user_search_trigram index used by User.search.
+
+The index is kept up to date by mapper events on User; this script is for
+populating it after the migration, or for rebuilding it from scratch.
+Anonymous users are skipped.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.rebuild_user_search_index [--batch-size N]
+"""
+
+import argparse
+
+from zeeguu.api.app import create_app_for_scripts
+from zeeguu.core.model import db, User, UserSearchTrigram
+from zeeguu.logging import log
+
+app = create_app_for_scripts()
+app.app_context().push()
+
+
+def rebuild_index(batch_size=1000):
+    log("Clearing user_search_trigram...")
+    db.session.execute(UserSearchTrigram.__table__.delete())
+    db.session.commit()
+
+    indexed = 0
+    skipped = 0
+    last_id = 0
+    while True:
+        users = (
+            User.query.filter(User.id > last_id)
+            .order_by(User.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not users:
+            break
+
+        rows = []
+        for user in users:
+            grams = UserSearchTrigram.grams_for_user(user)
+            if not grams:
+                skipped += 1
+                continue
+            rows.extend({"trigram": gram, "user_id": user.id} for gram in grams)
+            indexed += 1
+
+        if rows:
+            db.session.execute(UserSearchTrigram.__table__.insert(), rows)
+        db.session.commit()
+
+        last_id = users[-1].id
+        log(f"Indexed {indexed} users (skipped {skipped} anonymous), last id {last_id}")
+
+    log(f"Done. Indexed {indexed} users, skipped {skipped}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    rebuild_index(args.batch_size)
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Roll up the session durations of every closed day into user_daily_activity,
+which the leaderboards read instead of the raw session tables.
+
+Meant to run nightly. Days that are already rolled up are skipped, unless
+--from-date is given, in which case the days from then on are recomputed.
+
+Usage:
+    source ~/.venvs/z_env/bin/activate && python -m tools.rollup_daily_activity [--from-date YYYY-MM-DD]
+"""
+
+import argparse
+from datetime import datetime
+
+from zeeguu.api.app import create_app_for_scripts
+from zeeguu.core.model import db, DailyActivityRollupDay
+from zeeguu.core.leaderboards.daily_activity_rollup import roll_up_closed_days
+from zeeguu.logging import log
+
+app = create_app_for_scripts()
+app.app_context().push()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--from-date", type=str, default=None)
+    args = parser.parse_args()
+
+    first_day = None
+    if args.from_date:
+        first_day = datetime.strptime(args.from_date, "%Y-%m-%d").date()
+        # Forget the markers so that these days get recomputed
+        DailyActivityRollupDay.query.filter(
+            DailyActivityRollupDay.day >= first_day
+        ).delete()
+        db.session.commit()
+
+    days = roll_up_closed_days(first_day)
+    log(f"Rolled up {days} days")
@@ -23,9 +23,6 @@ logging.getLogger("elastic_transport.node_pool").setLevel(logging.ERROR)
 # Suppress verbose Azure SDK HTTP logging (shows response headers, etc.)
 logging.getLogger("azure.core.pipeline.policies.http_logging_policy").setLevel(logging.WARNING)
 
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
-
 # newspaper3k probes `<site>/feed` and `<site>/feeds` on every crawl to
 # auto-discover RSS; sites that don't expose those paths (e.g. rtve.es)
 # return 404 and newspaper logs CRITICAL. The crawler then falls back to
@@ -46,6 +43,9 @@ def _sentry_before_send(event, hint):
 
 
 if os.environ.get("SENTRY_DSN"):
+    import sentry_sdk
+    from sentry_sdk.integrations.flask import FlaskIntegration
+
     sentry_sdk.init(
         dsn=os.environ.get("SENTRY_DSN"),
         integrations=[FlaskIntegration()],
@@ -223,27 +223,46 @@ def create_app(testing=False):
         from zeeguu.api.utils.security_checks import check_security_config
         check_security_config(app)
 
-    # Preload wordstats in production for faster response times
-    if app.config.get("PRELOAD_WORDSTATS", False):
+    # Wordstats are read from memory-mapped indexes, shared by all the
+    # workers (see zeeguu.core.word_stats.CompactLanguageInfo). Opening one
+    # is cheap; with PRELOAD_WORDSTATS the missing ones are built first.
+    from zeeguu.core.model import Language
+    from zeeguu.core.word_stats import use_compact_word_stats
+
+    # Use CODES_OF_LANGUAGES_THAT_CAN_BE_LEARNED for preloading
+    # (these are the languages that have wordstats data)
+    language_codes = Language.CODES_OF_LANGUAGES_THAT_CAN_BE_LEARNED
+    preload_wordstats = app.config.get("PRELOAD_WORDSTATS", False)
+
+    start_time = time.time()
+    indexed = use_compact_word_stats(language_codes, build_missing=preload_wordstats)
+    not_indexed = [code for code in language_codes if code not in indexed]
+    warning(
+        f"*** Wordstats: {len(indexed)} languages memory-mapped in {time.time() - start_time:.2f}s"
+    )
+
+    if preload_wordstats and not_indexed:
+        # No index folder (ZEEGUU_DATA_FOLDER is not set): load in memory
         warning("*** Preloading wordstats dictionaries...")
         start_time = time.time()
-        from wordstats import LanguageInfo
-
-        # Get all supported languages from the database
-        from zeeguu.core.model import Language
+        from wordstats import Word, LanguageInfo
 
-        # Use CODES_OF_LANGUAGES_THAT_CAN_BE_LEARNED for preloading
-        # (these are the languages that have wordstats data)
-        language_codes = Language.CODES_OF_LANGUAGES_THAT_CAN_BE_LEARNED
-
-        # Preload all language dictionaries
-        LanguageInfo.load_in_memory_for(language_codes)
+        LanguageInfo.load_in_memory_for(
+            [code for code in not_indexed if code not in Word.stats_dict]
+        )
 
         elapsed = time.time() - start_time
-        warning(f"*** Wordstats preloaded {len(language_codes)} languages in {elapsed:.2f}s")
-    else:
+        warning(f"*** Wordstats preloaded {len(not_indexed)} languages in {elapsed:.2f}s")
+    elif not_indexed:
         warning("*** Wordstats will use lazy loading (PRELOAD_WORDSTATS=False)")
 
+    # The in-process index of the article embeddings loads in the background;
+    # until it's ready the semantic searches go to ES
+    from zeeguu.core.semantic_search import vector_index
+
+    if vector_index.USE_LOCAL_VECTOR_INDEX and not testing:
+        vector_index.load_in_background()
+
     # Preload Stanza tokenizers to avoid blocking during requests
     # This must run inside app context since it needs the database
     # Skip preloading during tests to avoid 8+ second overhead per test file
@@ -56,3 +56,4 @@ from . import badges
 from . import friends
 from . import leaderboards
 from . import status
+from . import metrics
@@ -2,7 +2,6 @@ import json
 import traceback
 
 import flask
-import sentry_sdk
 from flask import request, Response
 
 from zeeguu.api.utils.json_result import json_result
@@ -295,7 +294,9 @@ def alternative_sentences(user_word_id):
 
     except Exception as e:
         log(f"Error generating examples for user_word {user_word_id}: {e}")
-        sentry_sdk.capture_exception(
+        from sentry_sdk import capture_exception
+
+        capture_exception(
             e,
             tags={
                 "endpoint": "alternative_sentences",
@@ -10,7 +10,7 @@ from zeeguu.api.utils.json_result import json_result
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.core.leaderboards.leaderboards import exercise_time_leaderboard, exercises_done_leaderboard, \
     read_articles_leaderboard, reading_time_leaderboard, listening_time_leaderboard, \
-    friend_leaderboard_user_ids_subquery
+    friend_leaderboard_user_ids_subquery, cached_leaderboard
 from . import api
 
 LeaderboardMetric = Callable[[int, int, Optional[datetime], Optional[datetime]], list]
@@ -60,12 +60,15 @@ def friends_leaderboard():
     if error_response:
         return error_response
 
-    metric = LEADERBOARD_METRICS.get(request.args.get("metric"))
+    metric_name = request.args.get("metric")
+    metric = LEADERBOARD_METRICS.get(metric_name)
 
     if not metric:
         return make_error(400, "Invalid leaderboard metric")
 
-    rows = metric(
+    rows = cached_leaderboard(
+        metric_name,
+        metric,
         friend_leaderboard_user_ids_subquery(flask.g.user_id, params["to_date"]),
         params["limit"],
         params["from_date"],
@@ -123,7 +126,8 @@ def cohort_leaderboard(cohort_id: int):
     if error_response:
         return error_response
 
-    metric = LEADERBOARD_METRICS.get(request.args.get("metric"))
+    metric_name = request.args.get("metric")
+    metric = LEADERBOARD_METRICS.get(metric_name)
 
     if not metric:
         return make_error(400, "Invalid leaderboard metric")
@@ -133,7 +137,9 @@ def cohort_leaderboard(cohort_id: int):
     if not user.is_member_of_cohort(cohort_id) and int(cohort_id) not in teacher_cohort_ids:
         return make_error(403, "You can only view leaderboards for cohorts you belong to or teach.")
 
-    rows = metric(
+    rows = cached_leaderboard(
+        metric_name,
+        metric,
         cohort_leaderboard_user_ids_subquery(cohort_id),
         params["limit"],
         params["from_date"],
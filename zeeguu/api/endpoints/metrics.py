@@ -0,0 +1,75 @@
+"""
+/metrics — hits, misses, evictions and memory of the in-process caches
+(see zeeguu.core.utils.caching), in the Prometheus text format, or as
+JSON with ?format=json.
+
+The numbers are per worker process: every worker has its own caches.
+"""
+
+import os
+
+import flask
+
+from . import api
+from zeeguu.api.utils.route_wrappers import requires_session, only_admins
+from zeeguu.core.utils.caching import all_cache_stats
+
+# stat name -> (prometheus metric name, type, help)
+_CACHE_METRICS = {
+    "hits": ("zeeguu_cache_hits_total", "counter", "Lookups that found an entry"),
+    "misses": ("zeeguu_cache_misses_total", "counter", "Lookups that found no entry"),
+    "evictions": (
+        "zeeguu_cache_evictions_total",
+        "counter",
+        "Entries evicted to stay within the size limits",
+    ),
+    "expirations": (
+        "zeeguu_cache_expirations_total",
+        "counter",
+        "Entries dropped because their TTL passed",
+    ),
+    "loads": ("zeeguu_cache_loads_total", "counter", "Calls of the loader on a miss"),
+    "coalesced": (
+        "zeeguu_cache_coalesced_total",
+        "counter",
+        "Misses that waited for a load already in progress",
+    ),
+    "load_failures": (
+        "zeeguu_cache_load_failures_total",
+        "counter",
+        "Calls of the loader that raised",
+    ),
+    "load_seconds": (
+        "zeeguu_cache_load_seconds_total",
+        "counter",
+        "Time spent in the loader",
+    ),
+    "entries": ("zeeguu_cache_entries", "gauge", "Entries in the cache"),
+    "bytes": ("zeeguu_cache_bytes", "gauge", "Approximate size of the entries"),
+}
+
+
+def _prometheus_text(stats):
+    lines = []
+    pid = os.getpid()
+    for stat, (metric, metric_type, help_text) in _CACHE_METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for cache in stats:
+            if cache[stat] is None:
+                continue
+            labels = f'cache="{cache["name"]}",backend="{cache["backend"]}",pid="{pid}"'
+            lines.append(f"{metric}{{{labels}}} {cache[stat]}")
+    return "\n".join(lines) + "\n"
+
+
+@api.route("/metrics", methods=["GET"])
+@requires_session
+@only_admins
+def metrics():
+    stats = all_cache_stats()
+    if flask.request.args.get("format") == "json":
+        return flask.jsonify({"pid": os.getpid(), "caches": stats})
+    return flask.Response(
+        _prometheus_text(stats), mimetype="text/plain; version=0.0.4"
+    )
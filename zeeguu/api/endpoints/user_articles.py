@@ -18,7 +18,6 @@ from zeeguu.core.model import (
 
 from zeeguu.api.utils.route_wrappers import cross_domain, requires_session
 from zeeguu.api.utils.json_result import json_result
-from sentry_sdk import capture_exception
 from . import api
 
 
@@ -331,6 +330,8 @@ def user_articles_foryou():
 
         traceback.print_exc()
         print("Failed with: ", e)
+        from sentry_sdk import capture_exception
+
         capture_exception(e)
         # Usually no recommendations when the user has not liked any articles
         articles = []
@@ -12,6 +12,7 @@ import requests_mock
 from zeeguu.api.app import create_app
 from zeeguu.core.model.db import db as _db
 from zeeguu.core.test.mocking_the_web import mock_requests_get
+from zeeguu.core.utils.caching import clear_all_caches
 
 
 # Tables whose data persists across tests (expensive to recreate).
@@ -73,6 +74,10 @@ def db_cleanup(app):
                 _db.session.execute(table.delete())
         _db.session.commit()
 
+    # Ids are reused after the wipe, so entries cached for one test's user
+    # would show up in the next test
+    clear_all_caches()
+
 
 @pytest.fixture()
 def _mock_web():
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from tools.benchmarks.import_time import profile_startup
+
+# Generous by default, since CI machines vary a lot; tighten locally with
+# ZEEGUU_STARTUP_BUDGET_SECONDS to catch regressions in worker boot time
+STARTUP_BUDGET_SECONDS = float(os.environ.get("ZEEGUU_STARTUP_BUDGET_SECONDS", 60))
+
+
+@pytest.fixture(scope="module")
+def startup_profile():
+    return profile_startup()
+
+
+def test_startup_time_is_within_budget(startup_profile):
+    result = startup_profile
+
+    assert result["total_seconds"] < STARTUP_BUDGET_SECONDS, (
+        f"create_app(testing=True) took {result['total_seconds']:.1f}s, "
+        f"budget is {STARTUP_BUDGET_SECONDS:.1f}s. "
+        f"Run `python -m tools.benchmarks.import_time` to see what got slower."
+    )
+
+
+def test_heavy_modules_are_not_imported_at_startup(startup_profile):
+    result = startup_profile
+
+    assert result["loaded_heavy_modules"] == [], (
+        f"These modules should be imported on first use, not at startup: "
+        f"{result['loaded_heavy_modules']}"
+    )
@@ -251,6 +251,24 @@ def test_verbal_flashcards_paginates_results(client):
     assert first_page["flashcards"][0]["id"] != second_page["flashcards"][0]["id"]
 
 
+def test_verbal_flashcards_are_served_while_redis_is_down(client, monkeypatch):
+    from zeeguu.core.test.redis_down import cache_with_redis_down
+    from zeeguu.core.verbal_flashcards import flashcard_selection
+
+    monkeypatch.setattr(
+        flashcard_selection,
+        "_flashcard_collection_cache",
+        cache_with_redis_down("test-verbal-flashcard-collections", ttl_seconds=60),
+    )
+    _prepare_bookmark_support()
+    _create_level_3_flashcard(client, word="moder", translation="mother")
+
+    first = client.get("/verbal_flashcards")
+    again = client.get("/verbal_flashcards")
+
+    assert first["total"] == again["total"] == 1
+
+
 def test_sanitize_spoken_text_keeps_danish_letters_and_normalizes_spacing():
     from zeeguu.core.verbal_flashcards.text_normalization import sanitize_spoken_text
 
@@ -363,6 +381,38 @@ def test_score_word_match_allows_one_edit_for_two_letter_words():
     assert result["allowedOptimalStringAlignmentDistance"] == 0
 
 
+def test_optimal_string_alignment_distance_counts_transpositions_once():
+    from zeeguu.core.verbal_flashcards.fuzzy_match import (
+        optimal_string_alignment_distance,
+    )
+
+    assert optimal_string_alignment_distance("bold", "bolden") == 2
+    assert optimal_string_alignment_distance("hsu", "hus") == 1
+    assert optimal_string_alignment_distance("ca", "abc") == 3
+    assert optimal_string_alignment_distance("", "kat") == 3
+
+
+def test_bounded_optimal_string_alignment_distance_is_exact_within_the_bound():
+    from zeeguu.core.verbal_flashcards.fuzzy_match import (
+        optimal_string_alignment_distance,
+    )
+
+    assert optimal_string_alignment_distance("bold", "bolden", max_distance=2) == 2
+    assert optimal_string_alignment_distance("forår", "fjeder", max_distance=2) == 3
+    assert optimal_string_alignment_distance("kat", "sommerfugl", max_distance=2) == 3
+
+
+def test_jaro_winkler_similarity_matches_reference_values():
+    from zeeguu.core.verbal_flashcards.fuzzy_match import (
+        jaro_similarity,
+        jaro_winkler_similarity,
+    )
+
+    assert round(jaro_similarity("martha", "marhta"), 3) == 0.944
+    assert round(jaro_winkler_similarity("martha", "marhta"), 3) == 0.961
+    assert jaro_similarity("abc", "xyz") == 0.0
+
+
 def test_calculate_accuracy_ignores_word_order_and_matches_fuzzily():
     from zeeguu.core.verbal_flashcards.fuzzy_match import calculate_accuracy
 
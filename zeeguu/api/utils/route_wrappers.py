@@ -4,12 +4,16 @@ from werkzeug.exceptions import BadRequestKeyError
 
 from zeeguu.logging import log
 from zeeguu.core.model.session import Session
+from zeeguu.core.utils.caching import named_cache
 
-from datetime import datetime, timedelta
+from datetime import datetime
 import zeeguu
 
-SESSION_CACHE = {}
 SESSION_CACHE_TIMEOUT = 60  # Seconds
+# session uuid -> user id; shared between the workers if a shared cache is configured
+SESSION_CACHE = named_cache(
+    "sessions", ttl_seconds=SESSION_CACHE_TIMEOUT, max_entries=100_000, shared=True
+)
 
 # Only require email verification for users created after this date
 # Existing users before this date are grandfathered in
@@ -50,14 +54,8 @@ def requires_session(view):
             if not session_uuid:
                 raise KeyError("No session found")
 
-            user_id, session_expiry_time = SESSION_CACHE.get(
-                session_uuid,
-                (
-                    None,
-                    None,
-                ),
-            )
-            if session_expiry_time is None or datetime.now() > session_expiry_time:
+            user_id = SESSION_CACHE.get(session_uuid)
+            if user_id is None:
                 from zeeguu.api.utils.session_helpers import (
                     is_session_too_old,
                     force_user_to_relog,
@@ -72,10 +70,7 @@ def requires_session(view):
                     force_user_to_relog(session_object)
                     flask.abort(401)
                 user_id = session_object.user_id
-                SESSION_CACHE[session_uuid] = (
-                    user_id,
-                    datetime.now() + timedelta(0, SESSION_CACHE_TIMEOUT),
-                )
+                SESSION_CACHE[session_uuid] = user_id
 
             flask.g.user_id = user_id
             flask.g.session_uuid = session_uuid
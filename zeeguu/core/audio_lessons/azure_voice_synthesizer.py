@@ -9,8 +9,8 @@ Requires environment variables:
 
 import os
 import azure.cognitiveservices.speech as speechsdk
-from io import BytesIO
-from pydub import AudioSegment
+
+from zeeguu.core.audio_lessons.mp3_frames import duration_in_seconds
 
 
 class AzureVoiceSynthesizer:
@@ -99,7 +99,7 @@ class AzureVoiceSynthesizer:
     def get_audio_duration(self, audio_bytes: bytes) -> float:
         """
         Calculate duration of audio in seconds.
-        Uses pydub like the Google version for consistency.
+        Reads the MP3 frame headers like the Google version, for consistency.
 
         Args:
             audio_bytes: MP3 audio data
@@ -107,5 +107,4 @@ class AzureVoiceSynthesizer:
         Returns:
             Duration in seconds
         """
-        audio = AudioSegment.from_mp3(BytesIO(audio_bytes))
-        return len(audio) / 1000.0  # Convert milliseconds to seconds
+        return duration_in_seconds(audio_bytes)
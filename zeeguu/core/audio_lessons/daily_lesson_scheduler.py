@@ -0,0 +1,417 @@
+"""
+Batch generation of the daily audio lessons of all subscribed learners.
+
+Generating a lesson on demand (DailyLessonGenerator.prepare_lesson_generation
++ generate_daily_lesson) does everything for one user, one step after the
+other: an LLM call per word for the script, then TTS for every line of every
+script, then the assembly. The scheduler instead works in phases over all the
+users at once:
+
+1. plan: which subscribed users are due a lesson today, and with which words
+2. prepare_meanings: the AudioLessonMeanings those words need. A meaning
+   lesson is shared by all the learners of that meaning with the same native
+   language, so every one is generated once, however many users need it. The
+   scripts are written LLM_CONCURRENCY at a time, and all their lines are
+   synthesized in one batch (bounded per TTS provider, see TTS_CONCURRENCY).
+3. assemble: each user's lesson, which by now only joins existing audio
+4. the meanings for tomorrow's lessons, so that tomorrow's run (or the
+   learner, if they generate it themselves) only has to assemble them
+
+Every AudioLessonMeaning is committed as soon as its script exists, and again
+once it has its audio, and the TTS segments are cached, so a rerun after a
+crash or a timeout only does the work that is still missing.
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone, timedelta
+from typing import NamedTuple
+
+from zeeguu.config import ZEEGUU_DATA_FOLDER
+from zeeguu.core.audio_lessons.daily_lesson_generator import (
+    DailyLessonGenerator,
+    _ai_generator_for,
+)
+from zeeguu.core.audio_lessons.script_generator import (
+    THREE_WORDS_LESSON,
+    VALID_LESSON_TYPES,
+    generate_lesson_script,
+)
+from zeeguu.core.audio_lessons.voice_config import is_language_supported_for_audio
+from zeeguu.core.audio_lessons.word_selector import select_words_for_audio_lesson
+from zeeguu.logging import log
+
+# How many lesson scripts are written by the LLM at the same time
+LLM_CONCURRENCY = 4
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+
+def user_timezone_offset_minutes(user):
+    """Best-effort: the user's current UTC offset in minutes, derived from their
+    stored timezone (e.g. "Europe/Copenhagen"). Defaults to 0/UTC when unknown,
+    in which case far-west users may have "today" still be "yesterday" at run
+    time — the frontend fallback covers that miss."""
+    tz_name = getattr(user, "timezone", None)
+    if not tz_name or ZoneInfo is None:
+        return 0
+    try:
+        offset = datetime.now(ZoneInfo(tz_name)).utcoffset()
+        return int(offset.total_seconds() // 60) if offset else 0
+    except Exception:
+        return 0
+
+
+def resolve_suggestion(user, lesson_type, raw_suggestion):
+    """Mirror the endpoint's canonicalization: reuse a cached canonical form if
+    the user has had this exact subject before, otherwise validate it.
+
+    Returns (canonical_suggestion, is_general) or raises ValueError if the
+    subject is rejected by the validator."""
+    from zeeguu.core.audio_lessons.suggestion_validator import validate_suggestion
+    from zeeguu.core.model import DailyAudioLesson
+
+    if not raw_suggestion or lesson_type not in ("topic", "situation"):
+        return None, False
+
+    cached = DailyAudioLesson.find_canonical_for_raw_suggestion(user, raw_suggestion)
+    if cached:
+        return cached, False
+
+    is_valid, result = validate_suggestion(raw_suggestion, lesson_type, user.native_language.name)
+    if not is_valid:
+        raise ValueError(result.get("reason", "rejected"))
+    return result["canonical"], result["is_general"]
+
+
+class DueLesson(NamedTuple):
+    user: object
+    subscription: object
+    timezone_offset: int
+    canonical_suggestion: str
+    is_general: bool
+    selected_words: list
+    unscheduled_words: list
+
+
+class MeaningToPrepare(NamedTuple):
+    user_word: object
+    origin_language: str
+    translation_language: str
+    cefr_level: str
+
+
+class DailyLessonScheduler:
+    def __init__(self, generator=None, llm_concurrency=LLM_CONCURRENCY, output=log):
+        self.generator = generator or DailyLessonGenerator()
+        self.llm_concurrency = llm_concurrency
+        self.output = output
+        self.counts = defaultdict(int)
+        self.language_breakdown = defaultdict(int)
+
+    def run(self, user_ids, dry_run=False):
+        due = self.plan(user_ids)
+        if dry_run:
+            for lesson in due:
+                self.output(
+                    f"{lesson.user.name} [{lesson.user.learned_language.name}] — "
+                    f"WOULD generate {self._describe(lesson)}"
+                )
+                self.counts["would-generate"] += 1
+                self.language_breakdown[lesson.user.learned_language.name] += 1
+            return self.counts
+
+        self.prepare_meanings(
+            self._meaning_to_prepare(lesson.user, user_word)
+            for lesson in due
+            for user_word in lesson.selected_words
+        )
+        for lesson in due:
+            self.assemble(lesson)
+
+        self.prepare_meanings(self._tomorrows_meanings(user_ids))
+        return self.counts
+
+    # --- plan -------------------------------------------------------------
+
+    def plan(self, user_ids):
+        """The lessons to generate today, one per due subscription"""
+        from zeeguu.core.model import (
+            User,
+            DailyAudioLesson,
+            DailyAudioSubscription,
+            AudioLessonGenerationProgress,
+        )
+
+        due = []
+        for user_id in user_ids:
+            user = User.find_by_id(user_id)
+            if not user:
+                continue
+
+            subscription = DailyAudioSubscription.find(user, user.learned_language)
+            skipped = self._reason_to_skip(user, subscription)
+            if skipped:
+                self.counts[skipped] += 1
+                continue
+
+            timezone_offset = user_timezone_offset_minutes(user)
+            today_local = datetime.now(timezone(timedelta(minutes=timezone_offset))).date()
+            if not subscription.scheduled_on(today_local):
+                self.counts["not-due"] += 1
+                continue
+            if self.generator.today_lesson_exists(user, timezone_offset):
+                self.counts["exists"] += 1
+                continue
+            if DailyAudioLesson.waiting_paused_for(user, user.learned_language.id):
+                self.counts["paused"] += 1
+                continue
+            if AudioLessonGenerationProgress.find_active_for_user(user):
+                # The learner is generating it themselves right now
+                self.counts["in-progress"] += 1
+                continue
+
+            try:
+                canonical, is_general = resolve_suggestion(
+                    user, subscription.lesson_type, subscription.raw_suggestion
+                )
+            except ValueError as e:
+                self.output(f"{user.name}: invalid subject ({e}) — skipping")
+                self.counts["skipped"] += 1
+                continue
+
+            selected_words, unscheduled_words = [], []
+            if not canonical:
+                selected_words, unscheduled_words = select_words_for_audio_lesson(
+                    user, 3, return_unscheduled_info=True, log_enabled=False
+                )
+                if len(selected_words) < 2:
+                    self.counts["not-enough-words"] += 1
+                    continue
+
+            due.append(
+                DueLesson(
+                    user,
+                    subscription,
+                    timezone_offset,
+                    canonical,
+                    is_general,
+                    selected_words,
+                    unscheduled_words,
+                )
+            )
+
+        self.output(f"{len(due)} lessons to generate")
+        return due
+
+    def _reason_to_skip(self, user, subscription):
+        if subscription is None or not subscription.enabled:
+            return "not-subscribed"
+        if subscription.lesson_type not in VALID_LESSON_TYPES:
+            return "skipped"
+        if not (
+            is_language_supported_for_audio(user.learned_language.code)
+            and is_language_supported_for_audio(user.native_language.code)
+        ):
+            return "unsupported-language"
+        return None
+
+    def _tomorrows_meanings(self, user_ids):
+        """The words tomorrow's word lessons will most likely be made of"""
+        from zeeguu.core.model import User, DailyAudioSubscription, DailyAudioLesson
+
+        for user_id in user_ids:
+            user = User.find_by_id(user_id)
+            if not user:
+                continue
+            subscription = DailyAudioSubscription.find(user, user.learned_language)
+            if (
+                self._reason_to_skip(user, subscription)
+                or subscription.lesson_type != THREE_WORDS_LESSON
+                or DailyAudioLesson.waiting_paused_for(user, user.learned_language.id)
+            ):
+                continue
+
+            timezone_offset = user_timezone_offset_minutes(user)
+            tomorrow_local = datetime.now(
+                timezone(timedelta(minutes=timezone_offset))
+            ).date() + timedelta(days=1)
+            if not subscription.scheduled_on(tomorrow_local):
+                continue
+
+            # Today's lesson exists by now, so its words are not selected again
+            for user_word in select_words_for_audio_lesson(user, 3, log_enabled=False):
+                yield self._meaning_to_prepare(user, user_word)
+
+    @staticmethod
+    def _meaning_to_prepare(user, user_word):
+        return MeaningToPrepare(
+            user_word,
+            user.learned_language.code,
+            user.native_language.code,
+            user.cefr_level_for_learned_language(),
+        )
+
+    # --- prepare_meanings -------------------------------------------------
+
+    def prepare_meanings(self, meanings_to_prepare):
+        """Makes sure every meaning has an AudioLessonMeaning with audio"""
+        from zeeguu.core.model import Language, AudioLessonMeaning
+
+        needs_script = {}
+        needs_audio = []
+        seen = set()
+        for item in meanings_to_prepare:
+            meaning = item.user_word.meaning
+            key = (meaning.id, item.translation_language)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            teacher_language = Language.find_or_create(item.translation_language)
+            existing = AudioLessonMeaning.find(meaning=meaning, teacher_language=teacher_language)
+            if existing is None:
+                needs_script[key] = item
+            elif not os.path.exists(ZEEGUU_DATA_FOLDER + existing.audio_file_path):
+                needs_audio.append((existing, item))
+
+        self.output(
+            f"{len(seen)} distinct meanings: {len(needs_script)} need a script, "
+            f"{len(needs_audio)} only audio"
+        )
+        self.counts["meanings-shared"] += len(seen)
+
+        needs_audio += self._write_scripts(needs_script)
+        self._synthesize(needs_audio)
+
+    def _write_scripts(self, needs_script):
+        """LLM calls in parallel; the rows are created in this thread, which owns the session"""
+        from zeeguu.core.model import db, Language, AudioLessonMeaning
+
+        if not needs_script:
+            return []
+
+        written = []
+        with ThreadPoolExecutor(
+            max_workers=self.llm_concurrency, thread_name_prefix="lesson-script"
+        ) as executor:
+            futures = {
+                executor.submit(
+                    generate_lesson_script,
+                    origin_word=item.user_word.meaning.origin.content,
+                    translation_word=item.user_word.meaning.translation.content,
+                    origin_language=item.origin_language,
+                    translation_language=item.translation_language,
+                    cefr_level=item.cefr_level,
+                ): item
+                for item in needs_script.values()
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                word = item.user_word.meaning.origin.content
+                try:
+                    generated = future.result()
+                    audio_lesson_meaning = AudioLessonMeaning(
+                        meaning=item.user_word.meaning,
+                        script=generated.script,
+                        difficulty_level=item.cefr_level,
+                        teacher_language=Language.find_or_create(item.translation_language),
+                        ai_generator=_ai_generator_for(generated),
+                    )
+                    db.session.add(audio_lesson_meaning)
+                    # Checkpoint: a rerun only has to synthesize this one
+                    db.session.commit()
+                    written.append((audio_lesson_meaning, item))
+                    self.counts["scripts-written"] += 1
+                except Exception as e:
+                    db.session.rollback()
+                    self.output(f"✗ Failed to write the script for {word}: {e}")
+                    self.counts["scripts-failed"] += 1
+
+        return written
+
+    def _synthesize(self, needs_audio):
+        """One TTS batch for all the scripts, then every lesson is only a join"""
+        from zeeguu.core.model import db
+
+        if not needs_audio:
+            return
+
+        synthesizer = self.generator.voice_synthesizer
+        requests = []
+        for audio_lesson_meaning, item in needs_audio:
+            requests += synthesizer.script_segment_requests(
+                audio_lesson_meaning.script,
+                item.origin_language,
+                item.translation_language,
+                item.cefr_level,
+            )
+        try:
+            synthesizer.synthesize_segments(requests)
+        except Exception as e:
+            # Whatever was synthesized is cached; the lessons below retry the rest
+            self.output(f"✗ TTS batch failed: {e}")
+
+        for audio_lesson_meaning, item in needs_audio:
+            try:
+                mp3_path = synthesizer.generate_lesson_audio(
+                    audio_lesson_meaning_id=audio_lesson_meaning.id,
+                    teacher_language_code=item.translation_language,
+                    script=audio_lesson_meaning.script,
+                    language_code=item.origin_language,
+                    cefr_level=item.cefr_level,
+                )
+                audio_lesson_meaning.duration_seconds = synthesizer.get_audio_duration(mp3_path)
+                db.session.commit()
+                self.counts["meanings-synthesized"] += 1
+            except Exception as e:
+                db.session.rollback()
+                self.output(
+                    f"✗ Failed to synthesize the lesson for {item.user_word.meaning.origin.content}: {e}"
+                )
+                self.counts["meanings-failed"] += 1
+
+    # --- assemble ---------------------------------------------------------
+
+    def assemble(self, lesson):
+        from zeeguu.core.model import db
+
+        user = lesson.user
+        try:
+            result = self.generator.generate_daily_lesson(
+                user=user,
+                selected_words=lesson.selected_words,
+                unscheduled_words=lesson.unscheduled_words,
+                origin_language=user.learned_language.code,
+                translation_language=user.native_language.code,
+                cefr_level=user.cefr_level_for_learned_language(),
+                raw_suggestion=lesson.subscription.raw_suggestion,
+                canonical_suggestion=lesson.canonical_suggestion,
+                lesson_type=lesson.subscription.lesson_type,
+                is_general=lesson.is_general,
+            )
+        except Exception as e:
+            db.session.rollback()
+            result = {"error": str(e)}
+
+        if result.get("error"):
+            self.output(f"{user.name} [{user.learned_language.name}] — ✗ {result['error']}")
+            self.counts["failed"] += 1
+            return
+
+        self.output(
+            f"{user.name} [{user.learned_language.name}] — ✓ generated {self._describe(lesson)}"
+        )
+        self.counts["generated"] += 1
+        self.language_breakdown[user.learned_language.name] += 1
+
+    @staticmethod
+    def _describe(lesson):
+        subject = lesson.subscription.raw_suggestion or (
+            ", ".join(w.meaning.origin.content for w in lesson.selected_words)
+        )
+        return f"{lesson.subscription.lesson_type}: {subject}"
@@ -4,9 +4,9 @@ Lesson builder for combining individual audio lessons into daily lessons.
 
 import os
 import random
-from pydub import AudioSegment
 
 from zeeguu.config import ZEEGUU_DATA_FOLDER
+from zeeguu.core.audio_lessons.mp3_frames import join_mp3_files
 from zeeguu.core.model import DailyAudioLesson
 from zeeguu.logging import log
 
@@ -252,27 +252,25 @@ class LessonBuilder:
         # Create directory if it doesn't exist
         os.makedirs(self.daily_lessons_dir, exist_ok=True)
 
-    def _synthesize_teacher_phrase(self, voice_synthesizer, teacher_language: str, text: str) -> AudioSegment:
-        """Synthesize a short teacher phrase."""
-        audio_path = voice_synthesizer.synthesize_segment(
+    def _synthesize_teacher_phrase(self, voice_synthesizer, teacher_language: str, text: str) -> str:
+        """Synthesize a short teacher phrase. Returns the path of the MP3."""
+        return voice_synthesizer.synthesize_segment(
             text=text,
             voice_type="teacher",
             language_code=teacher_language,
             speaking_rate=1.0,
             teacher_language=teacher_language,
         )
-        return AudioSegment.from_mp3(audio_path)
 
-    def _synthesize_learned_language_phrase(self, voice_synthesizer, learned_language: str, text: str) -> AudioSegment:
+    def _synthesize_learned_language_phrase(self, voice_synthesizer, learned_language: str, text: str) -> str:
         """Synthesize a phrase in the learned language (using the woman voice)."""
-        audio_path = voice_synthesizer.synthesize_segment(
+        return voice_synthesizer.synthesize_segment(
             text=text,
             voice_type="woman",
             language_code=learned_language,
             speaking_rate=0.9,
             teacher_language=learned_language,
         )
-        return AudioSegment.from_mp3(audio_path)
 
     def _get_outro_segments(self, voice_synthesizer, teacher_language: str, learned_language: str = None, is_dialogue=False) -> list:
         """Generate outro. Teacher wraps up, then closing in the learned language."""
@@ -286,7 +284,7 @@ class LessonBuilder:
             phrases = OUTRO_PHRASES.get(teacher_language, OUTRO_PHRASES["en"])
 
         segments.append(self._synthesize_teacher_phrase(voice_synthesizer, teacher_language, random.choice(phrases)))
-        segments.append(AudioSegment.silent(duration=1500))
+        segments.append(1.5)
 
         # Positive closing in the LEARNED language
         closing_lang = learned_language or teacher_language
@@ -295,12 +293,12 @@ class LessonBuilder:
 
         return segments
 
-    def _get_dialogue_intro_audio(self, voice_synthesizer, teacher_language: str) -> AudioSegment:
+    def _get_dialogue_intro_audio(self, voice_synthesizer, teacher_language: str) -> str:
         """Generate a short teacher intro before a dialogue segment."""
         phrases = DIALOGUE_INTRO_PHRASES.get(teacher_language, DIALOGUE_INTRO_PHRASES["en"])
         return self._synthesize_teacher_phrase(voice_synthesizer, teacher_language, random.choice(phrases))
 
-    def _get_transition_audio(self, voice_synthesizer, teacher_language: str) -> AudioSegment:
+    def _get_transition_audio(self, voice_synthesizer, teacher_language: str) -> str:
         """Generate a short teacher transition phrase between segments."""
         phrases = TRANSITION_PHRASES.get(teacher_language, TRANSITION_PHRASES["en"])
         return self._synthesize_teacher_phrase(voice_synthesizer, teacher_language, random.choice(phrases))
@@ -315,6 +313,7 @@ class LessonBuilder:
         Returns:
             Path to the generated daily lesson MP3 file
         """
+        # MP3 file paths and seconds of silence, in order
         audio_segments = []
         content_segment_count = 0
 
@@ -342,10 +341,10 @@ class LessonBuilder:
                 content_segment_count += 1
                 if content_segment_count > 1 and voice_synthesizer and teacher_language:
                     # Add silence then transition phrase
-                    audio_segments.append(AudioSegment.silent(duration=2000))
+                    audio_segments.append(2.0)
                     transition = self._get_transition_audio(voice_synthesizer, teacher_language)
                     audio_segments.append(transition)
-                    audio_segments.append(AudioSegment.silent(duration=1500))
+                    audio_segments.append(1.5)
 
                 # Use the individual meaning lesson audio
                 relative_path = segment.audio_lesson_meaning.audio_file_path
@@ -363,7 +362,7 @@ class LessonBuilder:
                 if voice_synthesizer and teacher_language:
                     intro = self._get_dialogue_intro_audio(voice_synthesizer, teacher_language)
                     audio_segments.append(intro)
-                    audio_segments.append(AudioSegment.silent(duration=1500))
+                    audio_segments.append(1.5)
 
                 relative_path = segment.audio_lesson_dialogue.audio_file_path
                 if relative_path.startswith("/audio/"):
@@ -383,8 +382,7 @@ class LessonBuilder:
 
             if audio_path and os.path.exists(audio_path):
                 log(f"Adding segment audio: {audio_path}")
-                audio_segment = AudioSegment.from_mp3(audio_path)
-                audio_segments.append(audio_segment)
+                audio_segments.append(audio_path)
             else:
                 log(
                     f"Warning: Audio file not found for segment {segment.id}: {audio_path}"
@@ -392,23 +390,18 @@ class LessonBuilder:
 
         # Add outro after all segments
         if voice_synthesizer and teacher_language and content_segment_count > 0:
-            audio_segments.append(AudioSegment.silent(duration=2000))
+            audio_segments.append(2.0)
             has_dialogue = any(s.segment_type == "dialogue_lesson" for s in segments_list)
             audio_segments.extend(self._get_outro_segments(voice_synthesizer, teacher_language, learned_language, is_dialogue=has_dialogue))
 
-        # Combine all audio segments
-        if audio_segments:
-            combined_audio = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined_audio += segment
-        else:
+        if not audio_segments:
             # Create a short silence if no audio segments
             log("Warning: No audio segments found, creating empty lesson")
-            combined_audio = AudioSegment.silent(duration=1000)  # 1 second silence
+            audio_segments = [1.0]
 
-        # Save the final daily lesson audio
+        # Join the segments into the final daily lesson audio
         output_path = os.path.join(self.daily_lessons_dir, f"{daily_lesson.id}.mp3")
-        combined_audio.export(output_path, format="mp3")
+        join_mp3_files(audio_segments, output_path)
 
         log(f"Generated daily lesson audio: {output_path}")
         return output_path
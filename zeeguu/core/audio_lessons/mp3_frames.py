@@ -0,0 +1,237 @@
+"""
+Reading and joining MP3 files at the frame level, without decoding them.
+
+An MP3 file is a sequence of self-contained frames, each starting with a
+4 byte header that gives its length and how many samples it holds. This lets
+us compute the duration of a file by walking the headers, and join files by
+concatenating their frames, instead of decoding everything with ffmpeg,
+joining the PCM and encoding the whole lesson again.
+
+Only MPEG Layer III is supported, which is what both Google and Azure TTS
+produce. Files can only be joined at the frame level if they have the same
+MPEG version, sample rate and number of channels; join_mp3_files falls back
+to decoding (with pydub) otherwise.
+"""
+
+from typing import List, NamedTuple, Union
+
+_ID3V2_HEADER_SIZE = 10
+
+# Indexed by the 2 version bits of the header
+_MPEG_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+
+_LAYER3_BITRATES_KBPS = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_LAYER3_BITRATES_KBPS[2.5] = _LAYER3_BITRATES_KBPS[2]
+
+_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+
+_MONO = 0b11
+
+
+class Mp3Format(NamedTuple):
+    version: float
+    sample_rate: int
+    channels: int
+
+
+class Mp3Frame(NamedTuple):
+    offset: int
+    length: int
+    samples: int
+    format: Mp3Format
+    bitrate_index: int
+
+
+class CannotJoinAtFrameLevel(Exception):
+    pass
+
+
+def _parse_header(data: bytes, offset: int):
+    """The Mp3Frame starting at offset, or None if there's no valid header there"""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset : offset + 4]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = _MPEG_VERSIONS.get((b1 >> 3) & 0b11)
+    layer_bits = (b1 >> 1) & 0b11
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    if (
+        version is None
+        or layer_bits != 0b01  # Layer III
+        or bitrate_index in (0, 15)  # free format / invalid
+        or sample_rate_index == 3
+    ):
+        return None
+
+    bitrate = _LAYER3_BITRATES_KBPS[version][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 1
+    samples = 1152 if version == 1 else 576
+    length = samples // 8 * bitrate // sample_rate + padding
+    channels = 1 if (b3 >> 6) == _MONO else 2
+
+    return Mp3Frame(
+        offset, length, samples, Mp3Format(version, sample_rate, channels), bitrate_index
+    )
+
+
+def _side_info_size(format: Mp3Format) -> int:
+    if format.version == 1:
+        return 17 if format.channels == 1 else 32
+    return 9 if format.channels == 1 else 17
+
+
+def _is_info_frame(data: bytes, frame: Mp3Frame) -> bool:
+    """The Xing / Info / VBRI frame encoders put first only describes the file"""
+    tag_offset = frame.offset + 4 + _side_info_size(frame.format)
+    return data[tag_offset : tag_offset + 4] in (b"Xing", b"Info") or (
+        data[frame.offset + 36 : frame.offset + 40] == b"VBRI"
+    )
+
+
+def audio_frames(data: bytes) -> List[Mp3Frame]:
+    """The audio frames in the MP3 data, skipping tags and the info frame"""
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= _ID3V2_HEADER_SIZE:
+        # The size is a 28 bit "syncsafe" integer: 7 bits per byte
+        size = 0
+        for byte in data[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        has_footer = data[5] & 0x10
+        offset = _ID3V2_HEADER_SIZE + size + (10 if has_footer else 0)
+
+    frames = []
+    while offset + 4 <= len(data):
+        frame = _parse_header(data, offset)
+        if frame is None:
+            if data[offset : offset + 3] == b"TAG":
+                # ID3v1 tag at the end of the file
+                break
+            # Garbage between frames; resynchronize on the next header
+            offset += 1
+            continue
+        if offset + frame.length > len(data):
+            # Truncated last frame
+            break
+        if frames or not _is_info_frame(data, frame):
+            frames.append(frame)
+        offset += frame.length
+
+    return frames
+
+
+def duration_in_seconds(data: bytes) -> float:
+    frames = audio_frames(data)
+    return sum(frame.samples / frame.format.sample_rate for frame in frames)
+
+
+def silent_frames(template: Mp3Frame, seconds: float) -> bytes:
+    """
+    Frames of silence in the template's format and bitrate. A frame whose
+    side info is all zeros carries no spectral data and decodes to silence.
+    """
+    header = bytearray(4)
+    header[0] = 0xFF
+    version_bits = {v: k for k, v in _MPEG_VERSIONS.items()}[template.format.version]
+    # Layer III, no CRC
+    header[1] = 0xE0 | (version_bits << 3) | (0b01 << 1) | 1
+    sample_rate_index = _SAMPLE_RATES[template.format.version].index(
+        template.format.sample_rate
+    )
+    header[2] = (template.bitrate_index << 4) | (sample_rate_index << 2)
+    header[3] = (_MONO if template.format.channels == 1 else 0b01) << 6
+
+    unpadded_length = _parse_header(bytes(header), 0).length
+    frame = bytes(header) + bytes(unpadded_length - 4)
+
+    count = round(seconds * template.format.sample_rate / template.samples)
+    return frame * count
+
+
+def join_mp3_files(parts: List[Union[str, float]], output_path: str) -> str:
+    """
+    Writes the concatenation of parts to output_path. A part is the path of
+    an MP3 file, or a number of seconds of silence.
+    """
+    try:
+        data = _join_at_frame_level(parts)
+    except CannotJoinAtFrameLevel:
+        return _join_by_decoding(parts, output_path)
+
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return output_path
+
+
+def _join_at_frame_level(parts) -> bytes:
+    files = {}
+    for part in parts:
+        if isinstance(part, str) and part not in files:
+            with open(part, "rb") as f:
+                data = f.read()
+            frames = audio_frames(data)
+            if not frames:
+                raise CannotJoinAtFrameLevel(f"No MP3 frames in {part}")
+            files[part] = (data, frames)
+
+    formats = {frame.format for _, frames in files.values() for frame in frames}
+    if len(formats) != 1:
+        raise CannotJoinAtFrameLevel(f"Different formats: {formats}")
+
+    # Silence is encoded like the first audio file, so that a constant
+    # bitrate lesson stays constant bitrate
+    template = next(iter(files.values()))[1][0] if files else None
+
+    chunks = []
+    for part in parts:
+        if isinstance(part, str):
+            data, frames = files[part]
+            chunks.append(data[frames[0].offset : frames[-1].offset + frames[-1].length])
+        elif template is not None:
+            chunks.append(silent_frames(template, part))
+
+    if not chunks:
+        raise CannotJoinAtFrameLevel("Nothing but silence")
+
+    return b"".join(chunks)
+
+
+def _join_by_decoding(parts, output_path) -> str:
+    """Decode all the parts, join the PCM in one pass, and encode once"""
+    from pydub import AudioSegment
+
+    clips = {part: AudioSegment.from_mp3(part) for part in parts if isinstance(part, str)}
+    reference = next(iter(clips.values()), AudioSegment.silent(duration=1000))
+
+    def _pcm(part):
+        if isinstance(part, str):
+            segment = clips[part]
+        else:
+            segment = AudioSegment.silent(
+                duration=part * 1000, frame_rate=reference.frame_rate
+            )
+        return (
+            segment.set_frame_rate(reference.frame_rate)
+            .set_channels(reference.channels)
+            .set_sample_width(reference.sample_width)
+            .raw_data
+        )
+
+    combined = AudioSegment(
+        data=b"".join(_pcm(part) for part in parts) or reference.raw_data,
+        sample_width=reference.sample_width,
+        frame_rate=reference.frame_rate,
+        channels=reference.channels,
+    )
+    combined.export(output_path, format="mp3")
+    return output_path
@@ -0,0 +1,234 @@
+"""
+On-disk store for synthesized TTS segments.
+
+A segment is addressed by the hash of (voice, text, speaking rate), and
+stored under two levels of shard directories named after the hash
+(segments/3f/a2/<voice>_<hash>.mp3), so that no directory grows to hundreds
+of thousands of entries.
+
+A small SQLite index next to the files keeps the size and last access time
+of every segment. This makes it cheap to evict the least recently used
+segments when the store grows beyond its disk budget
+(TTS_SEGMENT_STORE_MAX_BYTES).
+
+Segments from before the store, which lived directly in segments/, are moved
+into their shard the first time they are looked up (or all at once with
+import_flat_files).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from zeeguu.logging import log
+
+TTS_SEGMENT_STORE_MAX_BYTES = int(
+    os.environ.get("ZEEGUU_TTS_SEGMENT_STORE_MAX_BYTES", 20 * 1024**3)
+)
+
+# Evicting goes down to this fraction of the budget, so that it doesn't
+# run again on the very next write
+_EVICTION_LOW_WATER_MARK = 0.9
+
+# Last access times are only updated when older than this, so that a
+# popular segment doesn't cost a write on every lesson
+_TOUCH_INTERVAL_SECONDS = 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS segment (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segment_last_access ON segment (last_access);
+CREATE TABLE IF NOT EXISTS total (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO total (id, bytes) VALUES (0, 0);
+"""
+
+
+class SegmentStore:
+    def __init__(self, root_dir, max_bytes=TTS_SEGMENT_STORE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root_dir, "index.sqlite3")
+        os.makedirs(root_dir, exist_ok=True)
+
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+        with self._db() as db:
+            db.executescript(_SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.index_path, timeout=30)
+            # Readers don't block the writer, and vice versa; the store is
+            # shared by all the API and cron processes
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def _file_name(voice_id, text, speaking_rate):
+        content_hash = hashlib.md5(
+            f"{voice_id}:{text}:{speaking_rate}".encode("utf-8")
+        ).hexdigest()
+        return f"{voice_id}_{content_hash}.mp3", content_hash
+
+    def relative_path(self, voice_id, text, speaking_rate=1.0):
+        file_name, content_hash = self._file_name(voice_id, text, speaking_rate)
+        return os.path.join(content_hash[:2], content_hash[2:4], file_name)
+
+    def path_for(self, voice_id, text, speaking_rate=1.0):
+        return os.path.join(
+            self.root_dir, self.relative_path(voice_id, text, speaking_rate)
+        )
+
+    def lookup(self, voice_id, text, speaking_rate=1.0):
+        """The path of the stored segment, or None if it has to be synthesized"""
+        relative_path = self.relative_path(voice_id, text, speaking_rate)
+        path = os.path.join(self.root_dir, relative_path)
+
+        db = self._db()
+        row = db.execute(
+            "SELECT last_access FROM segment WHERE path = ?", (relative_path,)
+        ).fetchone()
+
+        if row is not None:
+            if not os.path.exists(path):
+                # Deleted behind the store's back
+                self._forget(relative_path)
+                return None
+            now = time.time()
+            if now - row[0] > _TOUCH_INTERVAL_SECONDS:
+                with db:
+                    db.execute(
+                        "UPDATE segment SET last_access = ? WHERE path = ?",
+                        (now, relative_path),
+                    )
+            return path
+
+        flat_path = os.path.join(
+            self.root_dir, self._file_name(voice_id, text, speaking_rate)[0]
+        )
+        if os.path.exists(flat_path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(flat_path, path)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self._index(relative_path, f.read())
+            return path
+
+        return None
+
+    def put(self, voice_id, text, speaking_rate, audio_content: bytes) -> str:
+        """Stores the segment and returns its path"""
+        relative_path = self.relative_path(voice_id, text, speaking_rate)
+        path = os.path.join(self.root_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first, so that a concurrent reader never
+        # sees half of a segment
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(audio_content)
+        os.replace(temporary_path, path)
+
+        self._index(relative_path, audio_content)
+        self.evict_if_needed()
+        return path
+
+    def _index(self, relative_path, audio_content):
+        now = time.time()
+        db = self._db()
+        with db:
+            previous = db.execute(
+                "SELECT size FROM segment WHERE path = ?", (relative_path,)
+            ).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO segment (path, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (relative_path, len(audio_content), now, now),
+            )
+            db.execute(
+                "UPDATE total SET bytes = bytes + ? WHERE id = 0",
+                (len(audio_content) - (previous[0] if previous else 0),),
+            )
+
+    def _forget(self, relative_path):
+        db = self._db()
+        with db:
+            row = db.execute(
+                "SELECT size FROM segment WHERE path = ?", (relative_path,)
+            ).fetchone()
+            if row is None:
+                return
+            db.execute("DELETE FROM segment WHERE path = ?", (relative_path,))
+            db.execute("UPDATE total SET bytes = bytes - ? WHERE id = 0", (row[0],))
+
+    def total_bytes(self):
+        return self._db().execute("SELECT bytes FROM total WHERE id = 0").fetchone()[0]
+
+    def evict_if_needed(self):
+        if self.max_bytes is None or self.total_bytes() <= self.max_bytes:
+            return 0
+        return self.evict(int(self.max_bytes * _EVICTION_LOW_WATER_MARK))
+
+    def evict(self, target_bytes):
+        """Deletes least recently used segments until the store fits target_bytes"""
+        evicted = 0
+        db = self._db()
+        while self.total_bytes() > target_bytes:
+            oldest = db.execute(
+                "SELECT path FROM segment ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not oldest:
+                break
+            for (relative_path,) in oldest:
+                try:
+                    os.remove(os.path.join(self.root_dir, relative_path))
+                except FileNotFoundError:
+                    pass
+                self._forget(relative_path)
+                evicted += 1
+                if self.total_bytes() <= target_bytes:
+                    break
+
+        if evicted:
+            log(f"Evicted {evicted} TTS segments, store is now {self.total_bytes()} bytes")
+        return evicted
+
+    def import_flat_files(self):
+        """Moves the segments stored before sharding into their shards"""
+        imported = 0
+        for entry in os.scandir(self.root_dir):
+            if not (entry.is_file() and entry.name.endswith(".mp3")):
+                continue
+            content_hash = entry.name.rsplit("_", 1)[-1][: -len(".mp3")]
+            relative_path = os.path.join(content_hash[:2], content_hash[2:4], entry.name)
+            path = os.path.join(self.root_dir, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(entry.path, path)
+            with open(path, "rb") as f:
+                self._index(relative_path, f.read())
+            imported += 1
+
+        self.evict_if_needed()
+        return imported
+
+    def stats(self):
+        count, oldest_access = self._db().execute(
+            "SELECT COUNT(*), MIN(last_access) FROM segment"
+        ).fetchone()
+        return {
+            "segments": count,
+            "bytes": self.total_bytes(),
+            "max_bytes": self.max_bytes,
+            "oldest_access": oldest_access,
+        }
@@ -4,10 +4,9 @@ Uses Azure for languages not well-supported by Google (e.g., Greek with male voi
 """
 
 import os
-import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Tuple
-from google.cloud import texttospeech
-from pydub import AudioSegment
 
 from zeeguu.config import ZEEGUU_DATA_FOLDER
 from zeeguu.core.audio_lessons.voice_config import (
@@ -16,20 +15,43 @@ from zeeguu.core.audio_lessons.voice_config import (
     normalize_language_code,
     VOICE_CONFIG,
 )
-from zeeguu.core.audio_lessons.azure_voice_synthesizer import AzureVoiceSynthesizer
+from zeeguu.core.audio_lessons.mp3_frames import duration_in_seconds, join_mp3_files
 from zeeguu.core.audio_lessons.script_parser import parse_script
+from zeeguu.core.audio_lessons.segment_store import SegmentStore
 from zeeguu.logging import log
 
+# How many TTS requests are sent to a provider at the same time, by all
+# the scripts being synthesized in the process
+TTS_CONCURRENCY = {"google": 8, "azure": 4}
+
+# One pool of TTS_CONCURRENCY workers per provider, shared by every
+# synthesize_segments call, so that lessons synthesized in parallel don't
+# multiply the requests in flight
+_provider_executors = {}
+_provider_executors_lock = threading.Lock()
+
+
+def _provider_executor(provider):
+    with _provider_executors_lock:
+        if provider not in _provider_executors:
+            _provider_executors[provider] = ThreadPoolExecutor(
+                max_workers=TTS_CONCURRENCY.get(provider, 1),
+                thread_name_prefix=f"tts-{provider}",
+            )
+        return _provider_executors[provider]
+
 
 class VoiceSynthesizer:
     """Handles text-to-speech synthesis and audio file management."""
 
     def __init__(self):
-        """Initialize the Google Cloud TTS client and Azure TTS client if needed."""
-        self.google_client = texttospeech.TextToSpeechClient()
-
-        # Initialize Azure client (lazy initialization on first use)
+        """Set up the audio folders. The TTS clients are created on first use."""
+        # The google/azure SDKs and pydub are imported where they are used,
+        # so that importing this module at API startup stays cheap
+        self.google_client = None
         self.azure_client = None
+        # Segments are synthesized from several threads
+        self._client_lock = threading.Lock()
 
         self.audio_dir = ZEEGUU_DATA_FOLDER + "/audio"
         self.lessons_dir = os.path.join(self.audio_dir, "lessons")
@@ -37,7 +59,7 @@ class VoiceSynthesizer:
 
         # Create directories if they don't exist
         os.makedirs(self.lessons_dir, exist_ok=True)
-        os.makedirs(self.segments_dir, exist_ok=True)
+        self.segment_store = SegmentStore(self.segments_dir)
 
     def _uses_azure(self, language_code: str) -> bool:
         """Check if this language uses Azure instead of Google."""
@@ -48,10 +70,24 @@ class VoiceSynthesizer:
         except ValueError:
             return False
 
-    def _get_azure_client(self) -> AzureVoiceSynthesizer:
+    def _get_google_client(self):
+        """Get or create the Google Cloud TTS client (lazy initialization)."""
+        with self._client_lock:
+            if self.google_client is None:
+                from google.cloud import texttospeech
+
+                self.google_client = texttospeech.TextToSpeechClient()
+        return self.google_client
+
+    def _get_azure_client(self):
         """Get or create the Azure TTS client (lazy initialization)."""
-        if self.azure_client is None:
-            self.azure_client = AzureVoiceSynthesizer()
+        with self._client_lock:
+            if self.azure_client is None:
+                from zeeguu.core.audio_lessons.azure_voice_synthesizer import (
+                    AzureVoiceSynthesizer,
+                )
+
+                self.azure_client = AzureVoiceSynthesizer()
         return self.azure_client
 
     def get_voice_config(self, voice_type: str, language_code: str, teacher_language: str = None) -> dict:
@@ -107,6 +143,8 @@ class VoiceSynthesizer:
             )
         else:
             # Use Google TTS (default)
+            from google.cloud import texttospeech
+
             synthesis_input = texttospeech.SynthesisInput(text=text)
 
             voice = texttospeech.VoiceSelectionParams(
@@ -118,7 +156,7 @@ class VoiceSynthesizer:
                 speaking_rate=speaking_rate,
             )
 
-            response = self.google_client.synthesize_speech(
+            response = self._get_google_client().synthesize_speech(
                 input=synthesis_input, voice=voice, audio_config=audio_config
             )
 
@@ -128,11 +166,7 @@ class VoiceSynthesizer:
         self, text: str, voice_id: str, speaking_rate: float = 1.0
     ) -> str:
         """Get the cached audio file path for given text and voice."""
-        # Create a hash of the text, voice, and speaking rate for filename
-        content_hash = hashlib.md5(
-            f"{voice_id}:{text}:{speaking_rate}".encode("utf-8")
-        ).hexdigest()
-        return os.path.join(self.segments_dir, f"{voice_id}_{content_hash}.mp3")
+        return self.segment_store.path_for(voice_id, text, speaking_rate)
 
     def synthesize_segment(
         self, text: str, voice_type: str, language_code: str, speaking_rate: float = 1.0, teacher_language: str = None
@@ -147,65 +181,124 @@ class VoiceSynthesizer:
         voice_id = voice_config["name"]
 
         # Check if we already have this audio cached
-        cached_path = self.get_cached_audio_path(text, voice_id, speaking_rate)
-        if os.path.exists(cached_path):
+        cached_path = self.segment_store.lookup(voice_id, text, speaking_rate)
+        if cached_path:
             log(f"Using cached audio for: {text[:50]}...")
             return cached_path
 
-        # Generate new audio
-        log(
-            f"Generating TTS for ({voice_type}) at {speaking_rate}x speed: {text[:50]}..."
-        )
-        audio_content = self.text_to_speech(text, voice_config, speaking_rate)
+        return self._generate_segment(text, voice_config, speaking_rate, voice_type)
 
-        # Save to cache
-        with open(cached_path, "wb") as f:
-            f.write(audio_content)
+    def _provider_for(self, voice_config: dict) -> str:
+        return "azure" if self._uses_azure(voice_config["language_code"]) else "google"
 
-        return cached_path
+    def synthesize_segments(self, requests, on_progress=None) -> List[str]:
+        """
+        Synthesize many segments at once; the ones that are not cached yet are
+        sent to the TTS providers concurrently, at most TTS_CONCURRENCY
+        requests at a time per provider (counting those of other calls).
 
-    def _synthesize_script_to_file(self, script, output_path, language_code, teacher_language_code, cefr_level=None, on_progress=None):
-        """Shared logic: parse script, synthesize all segments, combine and export to output_path."""
-        segments = parse_script(script)
-        audio_segments = []
+        Args:
+            requests: (text, voice_type, language_code, speaking_rate, teacher_language) tuples
+            on_progress: called with (done, total, voice_type) as segments become available
 
-        speech_segments = [(v, t, s) for v, t, s in segments if v != "silence"]
-        total_speech_segments = len(speech_segments)
-        current_speech_segment = 0
+        Returns:
+            The paths of the MP3 files, in the order of the requests
+        """
+        paths = []
+        to_generate = {}  # path -> (text, voice_config, speaking_rate, voice_type)
+        for text, voice_type, language_code, speaking_rate, teacher_language in requests:
+            voice_config = self.get_voice_config(voice_type, language_code, teacher_language)
+            path = self.get_cached_audio_path(text, voice_config["name"], speaking_rate)
+            paths.append(path)
+            if path not in to_generate and not self.segment_store.lookup(
+                voice_config["name"], text, speaking_rate
+            ):
+                to_generate[path] = (text, voice_config, speaking_rate, voice_type)
+
+        total = len(requests)
+        done = total - sum(paths.count(path) for path in to_generate)
+        if on_progress and done:
+            on_progress(done, total, requests[0][1])
+
+        if not to_generate:
+            return paths
+
+        log(f"Generating TTS for {len(to_generate)} of {total} segments")
+        futures = {}
+        try:
+            for path, (text, voice_config, speaking_rate, voice_type) in to_generate.items():
+                executor = _provider_executor(self._provider_for(voice_config))
+                future = executor.submit(
+                    self._generate_segment, text, voice_config, speaking_rate, voice_type
+                )
+                futures[future] = path
+
+            # Progress is reported from the calling thread, which is the one
+            # that owns the db session the progress is recorded in
+            for future in as_completed(futures):
+                future.result()
+                path = futures[future]
+                done += paths.count(path)
+                if on_progress:
+                    on_progress(done, total, to_generate[path][3])
+        except BaseException:
+            # The pools are shared: only this call's requests are dropped
+            for future in futures:
+                future.cancel()
+            raise
+
+        return paths
 
+    def _generate_segment(self, text, voice_config, speaking_rate, voice_type):
+        log(
+            f"Generating TTS for ({voice_type}) at {speaking_rate}x speed: {text[:50]}..."
+        )
+        audio_content = self.text_to_speech(text, voice_config, speaking_rate)
+        return self.segment_store.put(
+            voice_config["name"], text, speaking_rate, audio_content
+        )
+
+    def script_segment_requests(self, script, language_code, teacher_language_code, cefr_level=None):
+        """The synthesize_segments requests for the speech in a script, in order."""
         # Determine speaking rate based on CEFR level
         speaking_rate = 1.0
         if cefr_level and cefr_level in ("A1", "A2"):
             speaking_rate = 0.9
 
-        for voice_type, text, silence_duration in segments:
-            if voice_type == "silence":
-                silence = AudioSegment.silent(duration=silence_duration * 1000)
-                audio_segments.append(silence)
-            else:
-                current_speech_segment += 1
-                if on_progress:
-                    on_progress(current_speech_segment, total_speech_segments, voice_type)
-
+        requests = []
+        for voice_type, text, _ in parse_script(script):
+            if voice_type != "silence":
                 rate = speaking_rate if voice_type in ["man", "woman", "teacherl2"] else 1.0
-                audio_path = self.synthesize_segment(
-                    text, voice_type, language_code, rate, teacher_language_code
-                )
-                audio_segment = AudioSegment.from_mp3(audio_path)
-                audio_segments.append(audio_segment)
+                requests.append((text, voice_type, language_code, rate, teacher_language_code))
+        return requests
+
+    def _synthesize_script_to_file(self, script, output_path, language_code, teacher_language_code, cefr_level=None, on_progress=None):
+        """Shared logic: parse script, synthesize all segments, join them into output_path."""
+        segments = parse_script(script)
+        requests = self.script_segment_requests(
+            script, language_code, teacher_language_code, cefr_level
+        )
+        audio_paths = iter(self.synthesize_segments(requests, on_progress))
 
-                if silence_duration > 0:
-                    silence = AudioSegment.silent(duration=silence_duration * 1000)
-                    audio_segments.append(silence)
+        # MP3 file paths and seconds of silence, in order
+        parts = []
+        for voice_type, text, silence_duration in segments:
+            if voice_type != "silence":
+                parts.append(next(audio_paths))
+            if silence_duration > 0:
+                parts.append(silence_duration)
 
-        if audio_segments:
-            combined_audio = audio_segments[0]
-            for segment in audio_segments[1:]:
-                combined_audio += segment
-        else:
-            combined_audio = AudioSegment.silent(duration=1000)
+        if not any(isinstance(part, str) for part in parts):
+            parts = [1.0]
 
-        combined_audio.export(output_path, format="mp3")
+        try:
+            join_mp3_files(parts, output_path)
+        except FileNotFoundError:
+            # A cached segment was evicted (by another process's put) after
+            # it was looked up; this synthesizes just the missing ones again
+            log(f"Segments evicted before joining {output_path}, synthesizing them again")
+            self.synthesize_segments(requests)
+            join_mp3_files(parts, output_path)
         log(f"Generated audio: {output_path}")
         return output_path
 
@@ -222,8 +315,12 @@ class VoiceSynthesizer:
     def get_audio_duration(self, audio_path: str) -> int:
         """Get the duration of an audio file in seconds."""
         try:
-            audio = AudioSegment.from_mp3(audio_path)
-            return int(audio.duration_seconds)
+            # Walks the frame headers; much cheaper than decoding the file
+            with open(audio_path, "rb") as f:
+                duration = duration_in_seconds(f.read())
+            if not duration:
+                raise ValueError("no MP3 frames found")
+            return int(duration)
         except Exception as e:
             log(f"Warning: Could not get audio duration from {audio_path}: {str(e)}")
             log("Falling back to estimated duration based on file size")
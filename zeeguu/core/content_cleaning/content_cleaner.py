@@ -1,5 +1,6 @@
 import zeeguu.core
 from zeeguu.core.model import Article, Language
+from zeeguu.core.util.multi_pattern import MultiPatternMatcher
 from nltk.tokenize import sent_tokenize
 import os
 import json
@@ -73,11 +74,16 @@ JUNK_COUNT_FILEPATH = os.path.join(
 with open(JUNK_COUNT_FILEPATH, "r", encoding="utf-8") as f:
     json_data = json.load(f)
     JUNK_COUNT_PATTERNS = [sent for lang in json_data.values() for sent in lang]
+JUNK_COUNT_PATTERN_SET = frozenset(JUNK_COUNT_PATTERNS)
 
 JUNK_PREFIXES = [
     "Der er ikke oplæsning af denne artikel, så den oplæses derfor med maskinstemme."
 ]
 
+# Finds all the JUNK_PATTERNS_TO_REMOVE in one pass, so that str.replace
+# only runs for the (few) patterns that are actually in an article
+JUNK_PATTERN_MATCHER = MultiPatternMatcher(JUNK_PATTERNS_TO_REMOVE)
+
 """
 
     Sometimes newspaper/readability still leaves some individual fragments
@@ -96,9 +102,9 @@ def normalize_sent(text: str):
 def filter_noise_patterns(
     article, sent_filter_set, crawl_report=None, feed=None, url=None
 ):
-    clean_artcile = ""
+    clean_paragraphs = []
     for paragraph in article.split("\n\n"):
-        clean_paragraph = ""
+        clean_sents = []
         is_prev_skip = False
         for sent in sent_tokenize(paragraph):
             if is_prev_skip and len(sent) <= 10:
@@ -114,60 +120,65 @@ def filter_noise_patterns(
                     crawl_report.add_sent_removed(feed, sent, url)
                 is_prev_skip = True
                 continue
-            clean_paragraph += sent + " "
+            clean_sents.append(sent + " ")
+        clean_paragraph = "".join(clean_sents)
         if len(clean_paragraph) < 10:
             continue
-        clean_artcile += clean_paragraph + "\n\n"
-    return clean_artcile.strip()
+        clean_paragraphs.append(clean_paragraph + "\n\n")
+    return "".join(clean_paragraphs).strip()
 
 
-def cleanup_non_content_bits_w_crawl_report(text: str, crawl_report, feed, url) -> str:
-    if text is None:
-        return None
-    new_text = text
-    new_text = filter_noise_patterns(
-        text, set(JUNK_COUNT_PATTERNS), crawl_report, feed, url
-    )
+def _remove_junk_patterns(text: str, on_removed) -> str:
+    found = JUNK_PATTERN_MATCHER.found_in(text)
     for junk_pattern in JUNK_PATTERNS_TO_REMOVE:
-        cleaned = new_text.replace(junk_pattern, "")
+        if junk_pattern not in found:
+            continue
+        cleaned = text.replace(junk_pattern, "")
 
-        if cleaned != new_text:
-            crawl_report.add_sent_removed(feed, junk_pattern, url)
+        if cleaned != text:
+            on_removed(junk_pattern)
             print(f"- cleaned: {junk_pattern}")
-            new_text = cleaned
-
-    clean_text = ""
-    for junk_prefix in JUNK_PREFIXES:
-        for each in new_text.split("\n"):
-            if each.startswith(junk_prefix):
-                print(">>>> dropping the Paragraph: " + each)
-                crawl_report.add_sent_removed(feed, junk_pattern, url)
-                continue
-            clean_text += each + "\n"
+            text = cleaned
+            # Removing a pattern can join text into, or break up, other patterns
+            found = JUNK_PATTERN_MATCHER.found_in(text)
 
-    return clean_text
+    return text
 
 
-def cleanup_non_content_bits(text: str):
-    new_text = text
-    new_text = filter_noise_patterns(text, set(JUNK_COUNT_PATTERNS))
+def _drop_junk_prefixed_paragraphs(text: str, on_removed) -> str:
+    kept = []
+    for each in text.split("\n"):
+        junk_prefix = next((p for p in JUNK_PREFIXES if each.startswith(p)), None)
+        if junk_prefix is not None:
+            print(">>>> dropping the Paragraph: " + each)
+            on_removed(junk_prefix)
+            continue
+        kept.append(each + "\n")
 
-    for junk_pattern in JUNK_PATTERNS_TO_REMOVE:
-        cleaned = new_text.replace(junk_pattern, "")
+    return "".join(kept)
 
-        if cleaned != new_text:
-            print(f"- cleaned: {junk_pattern}")
-            new_text = cleaned
 
-    clean_text = ""
-    for junk_prefix in JUNK_PREFIXES:
-        for each in new_text.split("\n"):
-            if each.startswith(junk_prefix):
-                print(">>>> dropping the Paragraph: " + each)
-                continue
-            clean_text += each + "\n"
+def cleanup_non_content_bits_w_crawl_report(text: str, crawl_report, feed, url) -> str:
+    if text is None:
+        return None
+
+    def record_removal(removed):
+        crawl_report.add_sent_removed(feed, removed, url)
+
+    new_text = filter_noise_patterns(
+        text, JUNK_COUNT_PATTERN_SET, crawl_report, feed, url
+    )
+    new_text = _remove_junk_patterns(new_text, record_removal)
+    return _drop_junk_prefixed_paragraphs(new_text, record_removal)
+
+
+def cleanup_non_content_bits(text: str):
+    def ignore_removal(removed):
+        pass
 
-    return clean_text
+    new_text = filter_noise_patterns(text, JUNK_COUNT_PATTERN_SET)
+    new_text = _remove_junk_patterns(new_text, ignore_removal)
+    return _drop_junk_prefixed_paragraphs(new_text, ignore_removal)
 
 
 def cleanup_all_articles_in_language(language_code):
@@ -5,6 +5,8 @@ This module provides URL pattern matching and keyword detection
 to identify advertorial/promotional content before expensive LLM processing.
 """
 
+from zeeguu.core.util.multi_pattern import MultiPatternMatcher
+
 # URL patterns that indicate advertorial content
 ADVERTORIAL_URL_PATTERNS = [
     "/bons-plans/",
@@ -42,6 +44,9 @@ ADVERTORIAL_KEYWORDS = [
     # Add more keywords as discovered
 ]
 
+ADVERTORIAL_URL_PATTERN_MATCHER = MultiPatternMatcher(ADVERTORIAL_URL_PATTERNS)
+ADVERTORIAL_KEYWORD_MATCHER = MultiPatternMatcher(ADVERTORIAL_KEYWORDS)
+
 
 def is_advertorial_url(url: str) -> bool:
     """
@@ -57,7 +62,7 @@ def is_advertorial_url(url: str) -> bool:
         return False
 
     url_lower = url.lower()
-    return any(pattern in url_lower for pattern in ADVERTORIAL_URL_PATTERNS)
+    return bool(ADVERTORIAL_URL_PATTERN_MATCHER.found_in(url_lower))
 
 
 def has_advertorial_keywords(text: str, threshold: int = 2) -> bool:
@@ -75,7 +80,7 @@ def has_advertorial_keywords(text: str, threshold: int = 2) -> bool:
         return False
 
     text_lower = text.lower()
-    keyword_count = sum(1 for keyword in ADVERTORIAL_KEYWORDS if keyword in text_lower)
+    keyword_count = len(ADVERTORIAL_KEYWORD_MATCHER.found_in(text_lower))
     return keyword_count >= threshold
 
 
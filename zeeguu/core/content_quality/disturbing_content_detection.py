@@ -5,6 +5,10 @@ This provides fast keyword-based detection before expensive LLM processing.
 Articles flagged here will still be saved but marked appropriately.
 """
 
+from functools import lru_cache
+
+from zeeguu.core.util.multi_pattern import MultiPatternMatcher
+
 # Keywords by language for detecting disturbing content
 # Focus on words that appear in headlines/titles about violent/tragic current events.
 #
@@ -205,6 +209,12 @@ DISTURBING_KEYWORDS = {
 }
 
 
+@lru_cache(maxsize=None)
+def _keyword_matcher(language):
+    keywords = DISTURBING_KEYWORDS.get(language, DISTURBING_KEYWORDS["en"])
+    return MultiPatternMatcher(keyword.lower() for keyword in keywords)
+
+
 def is_disturbing_content_based_on_keywords(title: str = None, content: str = None, language: str = "en") -> tuple[bool, str]:
     """
     Check if article contains disturbing content (violence, death, disaster, tragedy).
@@ -234,10 +244,8 @@ def is_disturbing_content_based_on_keywords(title: str = None, content: str = No
         text_to_check += " " + content[:500].lower()
 
     # Check for disturbing keywords
-    matched_keywords = []
-    for keyword in keywords:
-        if keyword.lower() in text_to_check:
-            matched_keywords.append(keyword)
+    found = _keyword_matcher(language).found_in(text_to_check)
+    matched_keywords = [keyword for keyword in keywords if keyword.lower() in found]
 
     # Require at least one keyword match
     if matched_keywords:
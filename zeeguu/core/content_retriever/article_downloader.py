@@ -24,7 +24,8 @@ from zeeguu.core.semantic_search import (
 )
 from zeeguu.core.content_quality.quality_filter import sufficient_quality
 from zeeguu.core.content_cleaning import cleanup_text_w_crawl_report
-from zeeguu.core.model import Url, Feed, UrlKeyword, Topic
+from zeeguu.core.util.multi_pattern import matcher_for
+from zeeguu.core.model import Url, Feed, UrlKeyword, Topic, ArticleEnrichmentJob
 from zeeguu.core.model.article_topic_map import TopicOriginType
 from zeeguu.core.model.source_type import SourceType
 from zeeguu.core.model.source import Source
@@ -39,9 +40,10 @@ from zeeguu.core.elastic.indexing import index_in_elasticsearch
 from zeeguu.core.content_retriever import (
     readability_download_and_parse,
 )
-from zeeguu.core.llm_services.simplification_and_classification import (
-    simplify_and_classify,
-    assess_summarize_and_classify,
+from zeeguu.core.content_retriever.article_enrichment import (
+    DEFAULT_PROVIDER,
+    enrich_article,
+    topic_demand_priority,
 )
 from zeeguu.core.content_quality.advertorial_detection import is_advertorial
 from zeeguu.core.content_quality.disturbing_content_detection import (
@@ -160,9 +162,9 @@ def should_filter_by_source_keywords(url, title):
 
     for domain, keywords in SOURCE_CONTENT_FILTERS.items():
         if domain in url_lower:
-            for keyword in keywords:
-                if keyword in title_lower:
-                    return True, f"Filtered by source rule: {domain} + '{keyword}' in title"
+            keyword = matcher_for(tuple(keywords)).first_found_in(title_lower)
+            if keyword is not None:
+                return True, f"Filtered by source rule: {domain} + '{keyword}' in title"
 
     return False, ""
 
@@ -296,7 +298,7 @@ def extract_article_image(np_article):
 
 
 def download_from_feed(
-    feed: Feed, session, crawl_report, limit=1000, save_in_elastic=True, simplification_provider=None, topic_simplification_counts=None
+    feed: Feed, session, crawl_report, limit=1000, save_in_elastic=True, simplification_provider=None, topic_simplification_counts=None, enqueue_enrichment=False
 ):
     """
 
@@ -430,6 +432,7 @@ def download_from_feed(
                 crawl_report,
                 simplification_provider=simplification_provider,
                 topic_simplification_counts=topic_simplification_counts,
+                enqueue_enrichment=enqueue_enrichment,
             )
             # The article is fetched + saved; disarm now so the alarm can't fire
             # during the ES-indexing/bookkeeping below — a timeout there would
@@ -624,7 +627,7 @@ def get_todays_simplified_counts_by_language_topic(session, language_id):
     return {topic_id: count for topic_id, count in results}
 
 
-def download_feed_item(session, feed, feed_item, url, crawl_report, simplification_provider=None, topic_simplification_counts=None):
+def download_feed_item(session, feed, feed_item, url, crawl_report, simplification_provider=None, topic_simplification_counts=None, enqueue_enrichment=False):
     import html
 
     title = html.unescape(feed_item["title"])
@@ -735,7 +738,6 @@ def download_feed_item(session, feed, feed_item, url, crawl_report, simplificati
     # the ArticleTopicMap entries from the session. Store the data we need.
     # Fixes ZEEGUU-API-X1: ObjectDeletedError when accessing topics after rollback.
     article_topic_ids = [t.topic_id for t in new_article.topics]
-    article_topic_names = [t.topic.title for t in new_article.topics]
 
     # Pre-tokenize and cache summary/title to avoid expensive CPU work during user requests
     log(f"   Caching tokenization...")
@@ -767,99 +769,30 @@ def download_feed_item(session, feed, feed_item, url, crawl_report, simplificati
         )
         _save_classifications(session, new_article, [("DISTURBING", "KEYWORD")])
 
-    # The per-(language, topic) daily simplification cap only exists to bound the
-    # cost of pre-generating simplified versions at crawl time. In on-demand mode
-    # no simplified children are created here, so the cap does not apply — every
-    # article still gets the cheap assess+summarize+classify pass.
-    if SIMPLIFY_AT_CRAWL:
-        # topic_simplification_counts is keyed by (language_id, topic_id) tuple
-        # Note: article_topic_ids/names were captured earlier before potential rollback
-        language_id = feed.language_id
-        lang_code = feed.language.code
-        max_for_lang = get_max_simplified_for_language(lang_code)
-
-        if topic_simplification_counts is not None and article_topic_ids:
-            # Check if ANY topic still needs simplified articles today for this language
-            needs_simplification = False
-            for topic_id in article_topic_ids:
-                key = (language_id, topic_id)
-                current_count = topic_simplification_counts.get(key, 0)
-                if current_count < max_for_lang:
-                    needs_simplification = True
-                    break
-
-            if not needs_simplification:
-                log(f"   ⏭ Skipping simplification - daily cap ({max_for_lang}/topic) reached for: {article_topic_names}")
-                return new_article
-
-    # On-demand mode: assess + summarize + classify only (no simplified children).
-    # Legacy mode: also pre-generate simplified versions for every sub-level.
-    if SIMPLIFY_AT_CRAWL:
-        log(f"   Calling LLM for simplification and classification...")
-    else:
-        log(f"   Calling LLM for assessment and summary (on-demand simplification)...")
-    llm_start_time = time()
-    try:
-        classify_fn = (
-            simplify_and_classify if SIMPLIFY_AT_CRAWL else assess_summarize_and_classify
+    if enqueue_enrichment:
+        # The LLM pass runs in the enrichment workers, so that a slow LLM
+        # response doesn't hold up the crawl of the other feeds
+        priority = topic_demand_priority(
+            feed.language_id, article_topic_ids, topic_simplification_counts
         )
-        simplified_articles, llm_classifications = classify_fn(
-            session, new_article, simplification_provider=simplification_provider
+        ArticleEnrichmentJob.enqueue(
+            session, new_article, simplification_provider or DEFAULT_PROVIDER, priority
         )
-        llm_duration = time() - llm_start_time
-        log(f"   ✓ LLM call completed in {llm_duration:.1f}s")
-        if simplified_articles:
-            log(
-                f"   Created {len(simplified_articles)} simplified versions"
-            )
-            # Pre-tokenize each simplified child's title/summary too. These are what
-            # the recommended feed renders as tappable preview cards; caching them
-            # here keeps that off the request path (mirrors the original above).
-            for simplified in simplified_articles:
-                _cache_article_tokenization(simplified, session)
-            # Update topic simplification counts after successful simplification
-            # Key is (language_id, topic_id) to track per language
-            if topic_simplification_counts is not None:
-                for topic_id in article_topic_ids:
-                    key = (language_id, topic_id)
-                    topic_simplification_counts[key] = topic_simplification_counts.get(key, 0) + 1
-        else:
-            log(
-                f"   No simplified versions created"
-            )
+        session.commit()
+        log(f"   Queued for LLM enrichment (priority {priority})")
+        return new_article
 
-        # Save LLM-based classifications. The keyword-based DISTURBING flag was
-        # already persisted above, right after keyword detection, so it survives
-        # even when simplification is skipped or errors out.
-        _save_classifications(session, new_article, llm_classifications)
+    try:
+        new_article, _ = enrich_article(
+            session,
+            new_article,
+            article_topic_ids,
+            simplification_provider=simplification_provider,
+            topic_simplification_counts=topic_simplification_counts,
+        )
     except Exception as e:
-        llm_duration = time() - llm_start_time
-        error_msg = str(e).lower()
-
-        # Check if LLM detected advertorial - always save for pattern analysis
-        if "advertorial" in error_msg:
-            log(f"   ✗ LLM detected advertorial content after {llm_duration:.1f}s, marking article as broken")
-            new_article.set_as_broken(session, LowQualityTypes.ADVERTORIAL_LLM)
-        # Check if LLM detected paywall - sample to avoid DB bloat
-        elif "paywall" in error_msg:
-            should_save = _should_save_paywall_sample(session, new_article.language)
-            if should_save:
-                log(f"   ✗ LLM detected paywall after {llm_duration:.1f}s - saving as sample for pattern analysis")
-                new_article.set_as_broken(session, LowQualityTypes.LLM_PAYWALL_PATTERN)
-            else:
-                log(
-                    f"   ✗ LLM detected paywall after {llm_duration:.1f}s - skipping (daily quota of {MAX_PAYWALL_SAMPLES_PER_DAY_PER_LANGUAGE} samples reached)"
-                )
-                # Don't save the article - delete it
-                session.delete(new_article)
-                session.commit()
-                return None
-        else:
-            # Don't fail the entire crawl if simplification fails for other reasons
-            log(
-                f"   ✗ LLM failed after {llm_duration:.1f}s for article {new_article.id}: {str(e)}"
-            )
-            capture_to_sentry(e)
+        # Don't fail the entire crawl if simplification fails for other reasons
+        capture_to_sentry(e)
 
     return new_article
 
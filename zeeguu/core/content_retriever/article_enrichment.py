@@ -0,0 +1,237 @@
+"""
+The LLM pass over a freshly crawled article: CEFR assessment, level
+summaries, classification and, with SIMPLIFY_AT_CRAWL, the simplified
+versions.
+
+This used to run inside download_feed_item, under the per-article watchdog
+and the per-feed time budget, so one slow LLM response (the timeout is 180s)
+held up the ingestion of all the other feeds. The crawler now enqueues an
+ArticleEnrichmentJob instead, and the workers in
+zeeguu/operations/crawler/enrichment_worker.py call run_enrichment_job.
+"""
+
+from collections import defaultdict
+from time import time
+
+from zeeguu.core.model.article_broken_code_map import LowQualityTypes
+from zeeguu.logging import log
+
+# What the crawler (zeeguu/operations/crawler/crawl.py) uses by default
+DEFAULT_PROVIDER = "deepseek"
+
+# Articles without topics can't be matched against the topic demand, so
+# they go after all the others
+NO_TOPIC_PRIORITY = 1_000_000
+
+
+def topic_demand_priority(language_id, topic_ids, topic_simplification_counts):
+    """
+    Priority of an article's enrichment job; lower goes first. It's the
+    number of articles simplified today in the least served of the article's
+    topics, so that the topics that got the fewest articles today catch up.
+    """
+    if not topic_ids:
+        return NO_TOPIC_PRIORITY
+    if topic_simplification_counts is None:
+        return 0
+    return min(
+        topic_simplification_counts.get((language_id, topic_id), 0)
+        for topic_id in topic_ids
+    )
+
+
+def todays_topic_simplification_counts(session, language_id):
+    """The crawler's topic_simplification_counts, for one language, from the DB"""
+    from zeeguu.core.content_retriever.article_downloader import (
+        get_todays_simplified_counts_by_language_topic,
+    )
+
+    counts = defaultdict(int)
+    for topic_id, count in get_todays_simplified_counts_by_language_topic(
+        session, language_id
+    ).items():
+        counts[(language_id, topic_id)] = count
+    return counts
+
+
+def enrich_article(
+    session,
+    article,
+    article_topic_ids,
+    simplification_provider=None,
+    topic_simplification_counts=None,
+    job=None,
+):
+    """
+    Runs the LLM pass over the article. Returns (article, outcome), where
+    article is None if it was deleted.
+
+    The LLM detecting an advertorial or a paywall is an answer, not a failure,
+    and is dealt with here; any other exception is raised, so that the caller
+    can retry.
+    """
+    from zeeguu.core.content_retriever.article_downloader import (
+        MAX_PAYWALL_SAMPLES_PER_DAY_PER_LANGUAGE,
+        SIMPLIFY_AT_CRAWL,
+        _cache_article_tokenization,
+        _save_classifications,
+        _should_save_paywall_sample,
+        get_max_simplified_for_language,
+    )
+    from zeeguu.core.llm_services.simplification_and_classification import (
+        simplify_and_classify,
+        assess_summarize_and_classify,
+    )
+
+    language_id = article.language_id
+
+    # The per-(language, topic) daily simplification cap only exists to bound the
+    # cost of pre-generating simplified versions at crawl time. In on-demand mode
+    # no simplified children are created here, so the cap does not apply — every
+    # article still gets the cheap assess+summarize+classify pass.
+    if SIMPLIFY_AT_CRAWL:
+        # topic_simplification_counts is keyed by (language_id, topic_id) tuple
+        max_for_lang = get_max_simplified_for_language(article.language.code)
+
+        if topic_simplification_counts is not None and article_topic_ids:
+            # Check if ANY topic still needs simplified articles today for this language
+            needs_simplification = any(
+                topic_simplification_counts.get((language_id, topic_id), 0)
+                < max_for_lang
+                for topic_id in article_topic_ids
+            )
+            if not needs_simplification:
+                log(
+                    f"   ⏭ Skipping simplification - daily cap ({max_for_lang}/topic) reached"
+                )
+                return article, "skipped: daily simplification cap reached"
+
+    # On-demand mode: assess + summarize + classify only (no simplified children).
+    # Legacy mode: also pre-generate simplified versions for every sub-level.
+    if SIMPLIFY_AT_CRAWL:
+        log(f"   Calling LLM for simplification and classification...")
+    else:
+        log(f"   Calling LLM for assessment and summary (on-demand simplification)...")
+    llm_start_time = time()
+    try:
+        classify_fn = (
+            simplify_and_classify if SIMPLIFY_AT_CRAWL else assess_summarize_and_classify
+        )
+        simplified_articles, llm_classifications = classify_fn(
+            session, article, simplification_provider=simplification_provider
+        )
+    except Exception as e:
+        llm_duration = time() - llm_start_time
+        error_msg = str(e).lower()
+
+        # Check if LLM detected advertorial - always save for pattern analysis
+        if "advertorial" in error_msg:
+            log(f"   ✗ LLM detected advertorial content after {llm_duration:.1f}s, marking article as broken")
+            article.set_as_broken(session, LowQualityTypes.ADVERTORIAL_LLM)
+            return article, "advertorial"
+
+        # Check if LLM detected paywall - sample to avoid DB bloat
+        if "paywall" in error_msg:
+            if _should_save_paywall_sample(session, article.language):
+                log(f"   ✗ LLM detected paywall after {llm_duration:.1f}s - saving as sample for pattern analysis")
+                article.set_as_broken(session, LowQualityTypes.LLM_PAYWALL_PATTERN)
+                return article, "paywall (kept as sample)"
+
+            log(
+                f"   ✗ LLM detected paywall after {llm_duration:.1f}s - skipping (daily quota of {MAX_PAYWALL_SAMPLES_PER_DAY_PER_LANGUAGE} samples reached)"
+            )
+            # Don't save the article - delete it (and its job, which refers to it)
+            if job is not None:
+                session.delete(job)
+            session.delete(article)
+            session.commit()
+            return None, "paywall (deleted)"
+
+        log(f"   ✗ LLM failed after {llm_duration:.1f}s for article {article.id}: {str(e)}")
+        raise
+
+    log(f"   ✓ LLM call completed in {time() - llm_start_time:.1f}s")
+    if simplified_articles:
+        log(f"   Created {len(simplified_articles)} simplified versions")
+        # Pre-tokenize each simplified child's title/summary too. These are what
+        # the recommended feed renders as tappable preview cards; caching them
+        # here keeps that off the request path (mirrors the original's).
+        for simplified in simplified_articles:
+            _cache_article_tokenization(simplified, session)
+        # Update topic simplification counts after successful simplification
+        # Key is (language_id, topic_id) to track per language
+        if topic_simplification_counts is not None:
+            for topic_id in article_topic_ids:
+                key = (language_id, topic_id)
+                topic_simplification_counts[key] = topic_simplification_counts.get(key, 0) + 1
+    else:
+        log(f"   No simplified versions created")
+
+    # Save LLM-based classifications. The keyword-based DISTURBING flag was
+    # already persisted by the crawler, so it survives even when simplification
+    # is skipped or errors out.
+    _save_classifications(session, article, llm_classifications)
+
+    return article, f"enriched ({len(simplified_articles)} simplified versions)"
+
+
+def run_enrichment_job(session, job):
+    """
+    Processes one claimed ArticleEnrichmentJob: enriches the article, updates
+    its search index entry, and marks the job done, or failed (to be retried).
+    """
+    from zeeguu.core.content_retriever.article_downloader import SIMPLIFY_AT_CRAWL
+    from zeeguu.core.elastic.indexing import create_or_update_article, remove_from_index
+
+    article = job.article
+
+    # Idempotency: the job may be handed out again after a worker died
+    # half way, or the article may have been assessed by other means
+    if article.broken:
+        job.mark_done(session, "skipped: article is broken")
+        return
+    if article.simplified_versions:
+        job.mark_done(session, "skipped: already simplified")
+        return
+    if article.cefr_level and not SIMPLIFY_AT_CRAWL:
+        job.mark_done(session, "skipped: already assessed")
+        return
+
+    log(f"[enrich] article {article.id} ({job.provider}, attempt {job.attempts}): {article.title[:60]}")
+    topic_ids = [each.topic_id for each in article.topics]
+    try:
+        article, outcome = enrich_article(
+            session,
+            article,
+            topic_ids,
+            simplification_provider=job.provider,
+            topic_simplification_counts=todays_topic_simplification_counts(
+                session, article.language_id
+            ),
+            job=job,
+        )
+    except Exception as e:
+        session.rollback()
+        from sentry_sdk import capture_exception as capture_to_sentry
+
+        capture_to_sentry(e)
+        job.mark_failed(session, e)
+        return
+
+    if article is None:
+        # Deleted, together with its job
+        return
+
+    session.commit()
+    try:
+        if article.broken:
+            remove_from_index(article)
+        else:
+            create_or_update_article(article, session)
+    except Exception as e:
+        from sentry_sdk import capture_exception as capture_to_sentry
+
+        capture_to_sentry(e)
+        log(f"[enrich] could not update the index for article {article.id}: {e}")
+
+    job.mark_done(session, outcome)
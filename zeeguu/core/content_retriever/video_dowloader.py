@@ -1,6 +1,10 @@
 import zeeguu.core
 from zeeguu.core import model
-from zeeguu.core.youtube_api.youtube_api import get_video_unique_keys
+from zeeguu.core.youtube_api.youtube_api import (
+    CAPTION_WORKERS,
+    fetch_videos_info,
+    get_video_unique_keys,
+)
 
 db_session = zeeguu.core.model.db.session
 
@@ -55,20 +59,40 @@ YT_CATEGORY_IDS = {
 
 def get_videos_for_language(lang, max_results):
     print("Getting videos for: " + lang)
+    video_ids = []
     for topic_name, topicId in YT_TOPIC_IDS.items():
         print("Crawling topic: " + topic_name)
-        video_ids = get_video_unique_keys(
+        video_ids += get_video_unique_keys(
             lang, topic_id=topicId, max_results=max_results
         )
-        for video_id in video_ids:
-            print(model.Video.find_or_create(db_session, video_id, lang))
     for category_name, category_id in YT_CATEGORY_IDS.items():
         print("Crawling category: " + category_name)
-        video_ids = get_video_unique_keys(
+        video_ids += get_video_unique_keys(
             lang, category_id=category_id, max_results=max_results
         )
-        for video_id in video_ids:
-            print(model.Video.find_or_create(db_session, video_id, lang))
+    for video in ingest_videos(db_session, video_ids, lang):
+        print(video)
+
+
+def ingest_videos(session, video_unique_keys, lang, workers=CAPTION_WORKERS):
+    """
+    Video.find_or_create for many videos at once: the ones already in the
+    DB are filtered out with one query, the metadata and channels of the
+    others are fetched in batches of 50, and their captions on a pool of
+    workers.
+
+    :return: the new videos
+    """
+    video_unique_keys = list(dict.fromkeys(video_unique_keys))
+    known = model.Video.existing_unique_keys(session, video_unique_keys)
+    new_keys = [each for each in video_unique_keys if each not in known]
+    print(f"{len(known)} of {len(video_unique_keys)} videos already crawled")
+    if not new_keys:
+        return []
+
+    language = model.Language.find(lang)
+    video_infos = fetch_videos_info(new_keys, lang, workers=workers)
+    return model.Video.create_all(session, video_infos, language)
 
 
 def crawl(max_results=50):
@@ -0,0 +1,294 @@
+"""
+Streaming (re)indexing of articles into Elasticsearch, for full rebuilds of
+the index (tools/mysql_to_elastic_for_articles.py).
+
+A pipeline of three stages:
+- the article ids are read from MySQL in chunks, paginated on the id
+  (WHERE id > last ORDER BY id LIMIT n), so every read is an index range
+- a pool of threads turns each chunk into bulk actions: one query to ES for
+  the articles of the chunk that are already indexed, and for the others
+  the embeddings of the chunk in a few requests and a document_from_article
+- the actions are streamed to ES with streaming_bulk while the next chunks
+  are being built
+
+The last article id up to which every chunk has been written is saved in a
+checkpoint file, so an interrupted run continues from there.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from elasticsearch import NotFoundError
+from elasticsearch.helpers import streaming_bulk
+from sqlalchemy import or_, select
+
+from zeeguu.core.elastic.indexing import document_from_article
+from zeeguu.core.elastic.settings import ES_ZINDEX
+from zeeguu.core.model import Article, ArticleTopicMap
+from zeeguu.core.model.article_topic_map import TopicOriginType
+from zeeguu.core.model.db import db
+from zeeguu.core.semantic_vector_api import get_embeddings_from_articles
+from zeeguu.logging import log
+
+
+class Checkpoint:
+    """
+    The progress of a reindex, in a JSON file: the article id up to which
+    everything is indexed, and the ids that failed on the way
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.last_id = 0
+        self.indexed = 0
+        self.failed_ids = []
+        if path and os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.last_id = saved["last_id"]
+            self.indexed = saved["indexed"]
+            self.failed_ids = saved["failed_ids"]
+
+    def save(self):
+        if not self.path:
+            return
+        staging = f"{self.path}.tmp"
+        with open(staging, "w") as f:
+            json.dump(
+                dict(
+                    last_id=self.last_id,
+                    indexed=self.indexed,
+                    failed_ids=self.failed_ids,
+                ),
+                f,
+            )
+        os.replace(staging, self.path)
+
+
+def article_id_chunks(session, after_id, chunk_size, with_topics=True):
+    """
+    The ids of the articles to index, greater than after_id, in ascending
+    chunks of chunk_size.
+
+    with_topics: the articles that have a topic given by a human (or by their
+    feed), which are the ones the topic inference learns from, leaving out
+    the broken ones; otherwise the articles without any topic.
+    """
+    query = select(Article.id)
+    if with_topics:
+        query = (
+            query.where(or_(Article.broken == None, Article.broken != 1))
+            .join(ArticleTopicMap)
+            .where(ArticleTopicMap.origin_type != TopicOriginType.INFERRED)
+            .distinct()
+        )
+    else:
+        query = query.where(
+            ~select(ArticleTopicMap.article_id)
+            .where(ArticleTopicMap.article_id == Article.id)
+            .exists()
+        )
+
+    last_id = after_id
+    while True:
+        ids = (
+            session.execute(
+                query.where(Article.id > last_id)
+                .order_by(Article.id)
+                .limit(chunk_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return
+        yield ids
+        last_id = ids[-1]
+
+
+def indexed_article_ids(es, article_ids, index=ES_ZINDEX):
+    """The ones of the article_ids that already have a document in the index"""
+    try:
+        response = es.search(
+            index=index,
+            query={"terms": {"article_id": article_ids}},
+            source=["article_id"],
+            size=len(article_ids),
+        )
+    except NotFoundError:
+        # No index yet (a fresh cluster, or after --delete-index): the first
+        # bulk write creates it
+        return set()
+    return {hit["_source"]["article_id"] for hit in response["hits"]["hits"]}
+
+
+def _chunk_actions(app, es, article_ids, index):
+    """
+    Runs in a worker thread: the bulk actions for the articles of the chunk
+    that are not indexed yet, and the ids of the ones that failed
+    """
+    with app.app_context():
+        try:
+            indexed = indexed_article_ids(es, article_ids, index)
+            to_index = [each for each in article_ids if each not in indexed]
+            articles = (
+                Article.query.filter(Article.id.in_(to_index))
+                .order_by(Article.id)
+                .all()
+            )
+            try:
+                get_embeddings_from_articles(articles)
+            except Exception as e:
+                # document_from_article asks for them one by one
+                log(f"Batched embeddings failed for articles {to_index[:3]}...: {e}")
+
+            actions = []
+            failed = []
+            for article in articles:
+                try:
+                    doc = document_from_article(article, db.session)
+                except Exception as e:
+                    log(f"Failed to build the document of article {article.id}: {e}")
+                    failed.append(article.id)
+                    continue
+                actions.append(
+                    (article.id, {"_op_type": "create", "_index": index, "_source": doc})
+                )
+            return actions, failed
+        finally:
+            db.session.remove()
+
+
+class _Progress:
+    """
+    Follows the results of streaming_bulk, which come in the order of the
+    actions, and moves the checkpoint past a chunk once all of its documents
+    have been acknowledged
+    """
+
+    def __init__(self, checkpoint, report_every):
+        self.checkpoint = checkpoint
+        self.report_every = report_every
+        self.chunks = deque()
+        self.indexed = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self.finished = None
+        self.last_report = self.started
+
+    def chunk_sent(self, last_id, article_ids, failed_ids):
+        self.checkpoint.failed_ids += failed_ids
+        self.failed += len(failed_ids)
+        self.chunks.append((last_id, deque(article_ids)))
+        self._advance()
+
+    def document_written(self, ok, result):
+        _, pending = self.chunks[0]
+        article_id = pending.popleft()
+        if ok:
+            self.indexed += 1
+            self.checkpoint.indexed += 1
+        else:
+            log(f"Failed to index article {article_id}: {result}")
+            self.failed += 1
+            self.checkpoint.failed_ids.append(article_id)
+        self._advance()
+
+    def _advance(self):
+        moved = False
+        while self.chunks and not self.chunks[0][1]:
+            self.checkpoint.last_id = self.chunks.popleft()[0]
+            moved = True
+        if moved:
+            self.checkpoint.save()
+
+        now = time.monotonic()
+        if now - self.last_report >= self.report_every:
+            self.last_report = now
+            log(f"{self.report()}, up to article {self.checkpoint.last_id}")
+
+    def docs_per_second(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.indexed / max(elapsed, 1e-9)
+
+    def report(self):
+        return (
+            f"{self.indexed} indexed, {self.failed} failed, "
+            f"{self.docs_per_second():.1f} docs/sec"
+        )
+
+
+def reindex_articles(
+    app,
+    es,
+    checkpoint,
+    with_topics=True,
+    chunk_size=200,
+    workers=4,
+    limit=None,
+    bulk_chunk_size=500,
+    index=ES_ZINDEX,
+    report_every=10,
+):
+    """
+    Indexes the articles after checkpoint.last_id that are not in ES yet.
+
+    limit: stop once this many documents have been sent; checked between
+    chunks, so up to chunk_size more can be indexed.
+
+    Returns the _Progress, with the counts and the docs/sec of the run.
+    """
+    progress = _Progress(checkpoint, report_every)
+
+    def actions(executor):
+        in_flight = deque()
+        chunks = article_id_chunks(
+            db.session, checkpoint.last_id, chunk_size, with_topics
+        )
+        sent = 0
+        exhausted = False
+
+        while True:
+            # Keeps the workers busy, without reading the whole table ahead
+            while not exhausted and len(in_flight) < 2 * workers:
+                if limit is not None and sent >= limit:
+                    exhausted = True
+                    break
+                ids = next(chunks, None)
+                if ids is None:
+                    exhausted = True
+                    break
+                in_flight.append(
+                    (ids[-1], executor.submit(_chunk_actions, app, es, ids, index))
+                )
+            if not in_flight or (limit is not None and sent >= limit):
+                # The chunks still in flight are for the next run
+                for _, future in in_flight:
+                    future.cancel()
+                return
+
+            last_id, future = in_flight.popleft()
+            chunk_actions, failed = future.result()
+            sent += len(chunk_actions)
+            progress.chunk_sent(
+                last_id, [article_id for article_id, _ in chunk_actions], failed
+            )
+            for _, action in chunk_actions:
+                yield action
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for ok, result in streaming_bulk(
+            es,
+            actions(executor),
+            chunk_size=bulk_chunk_size,
+            raise_on_error=False,
+            raise_on_exception=False,
+        ):
+            progress.document_written(ok, result)
+
+    progress.finished = time.monotonic()
+    checkpoint.save()
+    return progress
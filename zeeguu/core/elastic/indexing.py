@@ -6,6 +6,7 @@ from zeeguu.core.model.article_classification import ArticleClassification, Clas
 from elasticsearch import Elasticsearch
 from zeeguu.core.elastic.settings import ES_CONN_STRING, ES_ZINDEX
 from zeeguu.core.elastic.basic_ops import es_update, es_index, es_exists, es_delete
+from zeeguu.core.semantic_search import vector_index
 from zeeguu.core.semantic_vector_api import (
     get_embedding_from_article,
     get_embedding_from_video,
@@ -203,6 +204,7 @@ def create_or_update_article(article, session):
         doc = document_from_article(article, session)
         res = es_index(body=doc)
 
+    vector_index.article_indexed(doc)
     return res
 
 
@@ -251,6 +253,7 @@ def index_in_elasticsearch(new_article, session):
     try:
         doc = document_from_article(new_article, session)
         es_index(doc)
+        vector_index.article_indexed(doc)
 
     except Exception as e:
         from sentry_sdk import capture_exception
@@ -263,6 +266,7 @@ def index_in_elasticsearch(new_article, session):
 
 def remove_from_index(article):
 
+    vector_index.article_removed(article.id)
     hit = get_article_hit_in_es(article.id)
     if not hit:
         # Article was never indexed (or already removed) — nothing to do.
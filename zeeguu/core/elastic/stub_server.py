@@ -0,0 +1,300 @@
+"""
+An in-memory stand-in for Elasticsearch, for benchmarking and testing the
+indexing tools offline.
+
+Speaks the part of the REST API that they use: info, index / update /
+get / exists of a document, mget, _bulk (index, create, update, delete),
+_count, and _search with match_all, term, terms, match, exists and bool
+queries, a _source filter, sort with search_after, and exact (brute
+force) knn on a dense vector field with cosine similarity; creating,
+deleting and checking indices. Like ES, reads of an index that doesn't
+exist are a 404 index_not_found_exception, while writes create it.
+Each request sleeps request_overhead seconds plus per_doc_latency seconds
+per document it writes, to model the round trip and the indexing work.
+
+Usage:
+    python -m zeeguu.core.elastic.stub_server [--port 9200] [--request-overhead 0.002] [--per-doc-latency 0.0002]
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+
+import numpy as np
+from flask import Flask, jsonify, request
+
+
+def _values(source, field):
+    # field.keyword is the unanalyzed copy of field; lists match by element
+    value = source.get(field.removesuffix(".keyword"))
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _clauses(query, occurrence):
+    clauses = query.get(occurrence, [])
+    return [clauses] if isinstance(clauses, dict) else clauses
+
+
+def _matches(query, source):
+    if not query or "match_all" in query:
+        return True
+    if "term" in query:
+        [(field, value)] = query["term"].items()
+        value = value["value"] if isinstance(value, dict) else value
+        return value in _values(source, field)
+    if "terms" in query:
+        [(field, values)] = query["terms"].items()
+        return any(each in values for each in _values(source, field))
+    if "match" in query:
+        [(field, value)] = query["match"].items()
+        value = value["query"] if isinstance(value, dict) else value
+        # An empty query analyzes to no terms, so matches nothing
+        return value != "" and value in _values(source, field)
+    if "exists" in query:
+        return bool(_values(source, query["exists"]["field"]))
+    if "bool" in query:
+        query = query["bool"]
+        required = _clauses(query, "filter") + _clauses(query, "must")
+        return all(_matches(clause, source) for clause in required) and not any(
+            _matches(clause, source) for clause in _clauses(query, "must_not")
+        )
+    raise ValueError(f"Query not supported by the stub: {query}")
+
+
+def _knn_hits(knn, documents):
+    """The k documents most similar to the query vector, with ES's cosine score"""
+    candidates = [
+        (doc_id, source)
+        for doc_id, source in documents
+        if source.get(knn["field"]) is not None and _matches(knn.get("filter"), source)
+    ]
+    if not candidates:
+        return []
+    vectors = np.array([source[knn["field"]] for _, source in candidates], dtype=float)
+    query = np.asarray(knn["query_vector"], dtype=float)
+    cosines = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    best = np.argsort(-cosines, kind="stable")[: knn["k"]]
+    return [(candidates[i][0], candidates[i][1], (1 + cosines[i]) / 2) for i in best]
+
+
+def _sorted(hits, sort, search_after):
+    [(field, order)] = (sort[0] if isinstance(sort[0], dict) else {sort[0]: "asc"}).items()
+    order = order["order"] if isinstance(order, dict) else order
+    hits = sorted(hits, key=lambda hit: hit[1][field], reverse=order == "desc")
+    if search_after:
+        [after] = search_after
+        hits = [
+            hit
+            for hit in hits
+            if (hit[1][field] < after if order == "desc" else hit[1][field] > after)
+        ]
+    return hits
+
+
+def _filtered(source, includes):
+    if includes is None or includes is True:
+        return source
+    if includes is False:
+        return None
+    if isinstance(includes, str):
+        includes = includes.split(",")
+    return {field: source[field] for field in includes if field in source}
+
+
+def create_stub_app(request_overhead=0.002, per_doc_latency=0.0002):
+    app = Flask("elasticsearch-stub")
+    app.config["request_count"] = 0
+    indices = {}
+    lock = threading.Lock()
+
+    def documents(index):
+        return indices.setdefault(index, {})
+
+    def index_not_found(index):
+        # Like ES, reads don't create the index that writes would
+        error = dict(type="index_not_found_exception", reason=f"no such index [{index}]")
+        return jsonify(error=dict(root_cause=[error], **error), status=404), 404
+
+    def wait(written=0):
+        with lock:
+            app.config["request_count"] += 1
+        time.sleep(request_overhead + per_doc_latency * written)
+
+    @app.after_request
+    def product_header(response):
+        # The Python client refuses servers that don't announce themselves
+        response.headers["X-Elastic-Product"] = "Elasticsearch"
+        return response
+
+    @app.route("/", methods=["GET", "HEAD"])
+    def info():
+        return jsonify(
+            name="stub",
+            cluster_name="stub",
+            version={"number": "8.12.0", "build_flavor": "default"},
+            tagline="You Know, for Search",
+        )
+
+    @app.route("/<index>", methods=["DELETE"])
+    def delete_index(index):
+        with lock:
+            indices.pop(index, None)
+        return jsonify(acknowledged=True)
+
+    @app.route("/<index>", methods=["PUT"])
+    def create_index(index):
+        with lock:
+            documents(index)
+        return jsonify(acknowledged=True, index=index)
+
+    @app.route("/<index>", methods=["HEAD"])
+    def index_exists(index):
+        return ("", 200) if index in indices else ("", 404)
+
+    @app.route("/<index>/_doc/<doc_id>", methods=["GET", "HEAD"])
+    def get(index, doc_id):
+        wait()
+        if index not in indices:
+            return index_not_found(index)
+        source = documents(index).get(doc_id)
+        if source is None:
+            return jsonify(_index=index, _id=doc_id, found=False), 404
+        return jsonify(_index=index, _id=doc_id, found=True, _source=source)
+
+    @app.route("/<index>/_doc", methods=["POST"])
+    @app.route("/<index>/_doc/<doc_id>", methods=["PUT", "POST"])
+    def index_document(index, doc_id=None):
+        wait(written=1)
+        doc_id = doc_id or uuid.uuid4().hex
+        with lock:
+            documents(index)[doc_id] = request.get_json(force=True)
+        return jsonify(_index=index, _id=doc_id, result="created"), 201
+
+    @app.route("/<index>/_update/<doc_id>", methods=["POST"])
+    def update_document(index, doc_id):
+        wait(written=1)
+        if index not in indices:
+            return index_not_found(index)
+        with lock:
+            docs = documents(index)
+            if doc_id not in docs:
+                return jsonify(error=dict(type="document_missing_exception")), 404
+            docs[doc_id] = {**docs[doc_id], **request.get_json(force=True)["doc"]}
+        return jsonify(_index=index, _id=doc_id, result="updated")
+
+    @app.route("/_mget", methods=["POST", "GET"])
+    @app.route("/<index>/_mget", methods=["POST", "GET"])
+    def mget(index=None):
+        wait()
+        body = request.get_json(force=True)
+        requested = body.get("docs") or [{"_id": each} for each in body["ids"]]
+        docs = []
+        for each in requested:
+            doc_index = each.get("_index", index)
+            source = documents(doc_index).get(str(each["_id"]))
+            doc = dict(_index=doc_index, _id=each["_id"], found=source is not None)
+            if source is not None:
+                doc["_source"] = _filtered(
+                    source, each.get("_source", request.args.get("_source"))
+                )
+            docs.append(doc)
+        return jsonify(docs=docs)
+
+    @app.route("/<index>/_search", methods=["POST", "GET"])
+    def search(index):
+        wait()
+        if index not in indices:
+            return index_not_found(index)
+        body = request.get_json(force=True, silent=True) or {}
+        size = int(body.get("size", request.args.get("size", 10)))
+        includes = body.get("_source", request.args.get("_source"))
+        with lock:
+            docs = list(documents(index).items())
+        if "knn" in body:
+            found = _knn_hits(body["knn"], docs)
+            size = min(size, body["knn"]["k"])
+        else:
+            found = [
+                (doc_id, source, 1.0)
+                for doc_id, source in docs
+                if _matches(body.get("query"), source)
+            ]
+        if "sort" in body:
+            found = _sorted(found, body["sort"], body.get("search_after"))
+        hits = [
+            dict(_index=index, _id=doc_id, _score=score, _source=_filtered(source, includes))
+            for doc_id, source, score in found
+        ]
+        return jsonify(
+            took=0,
+            timed_out=False,
+            hits=dict(total=dict(value=len(hits), relation="eq"), hits=hits[:size]),
+        )
+
+    @app.route("/<index>/_count", methods=["POST", "GET"])
+    def count(index):
+        if index not in indices:
+            return index_not_found(index)
+        body = request.get_json(force=True, silent=True) or {}
+        with lock:
+            matching = [
+                source
+                for source in documents(index).values()
+                if _matches(body.get("query"), source)
+            ]
+        return jsonify(count=len(matching))
+
+    @app.route("/_bulk", methods=["POST", "PUT"])
+    @app.route("/<index>/_bulk", methods=["POST", "PUT"])
+    def bulk(index=None):
+        lines = [json.loads(line) for line in request.get_data().splitlines() if line.strip()]
+        items = []
+        errors = False
+        position = 0
+        with lock:
+            while position < len(lines):
+                [(op, meta)] = lines[position].items()
+                position += 1
+                docs = documents(meta.get("_index", index))
+                doc_id = str(meta["_id"]) if "_id" in meta else uuid.uuid4().hex
+                status = 200
+                if op == "delete":
+                    status = 200 if docs.pop(doc_id, None) is not None else 404
+                else:
+                    body = lines[position]
+                    position += 1
+                    if op == "create" and doc_id in docs:
+                        status = 409
+                    elif op == "update":
+                        if doc_id in docs:
+                            docs[doc_id] = {**docs[doc_id], **body["doc"]}
+                        else:
+                            status = 404
+                    else:
+                        docs[doc_id] = body
+                        status = 201
+                item = dict(_index=meta.get("_index", index), _id=doc_id, status=status)
+                if status >= 300:
+                    errors = True
+                    item["error"] = dict(type="stub_error", reason=f"{op} failed")
+                items.append({op: item})
+        wait(written=len(items))
+        return jsonify(took=0, errors=errors, items=items)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--request-overhead", type=float, default=0.002)
+    parser.add_argument("--per-doc-latency", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    create_stub_app(args.request_overhead, args.per_doc_latency).run(
+        port=args.port, threaded=True
+    )
@@ -2,8 +2,8 @@ import random
 
 from zeeguu.core.word_stats import lang_info
 from zeeguu.core.word_filter import (
-    BAD_WORD_LIST,
-    PROPER_NAMES_LIST,
+    bad_word_list,
+    proper_names_list,
     remove_words_based_on_list,
 )
 
@@ -18,9 +18,9 @@ def similar_words(word, language, user, number_of_words_to_return=2):
         candidates = [each.meaning.origin.content for each in words_the_user_must_study]
     else:
         candidates = lang_info(language.code).all_words()
-        candidates_filtered = remove_words_based_on_list(candidates, BAD_WORD_LIST)
+        candidates_filtered = remove_words_based_on_list(candidates, bad_word_list())
         candidates_filtered = remove_words_based_on_list(
-            candidates_filtered, PROPER_NAMES_LIST
+            candidates_filtered, proper_names_list()
         )
         # Update candidates to be based on the filtered words.
         candidates = [w for w in candidates_filtered if len(w) > 1]
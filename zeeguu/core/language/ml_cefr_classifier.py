@@ -13,10 +13,18 @@ import os
 import re
 import pickle
 import numpy as np
+from zeeguu.core.utils.caching import named_cache
 from zeeguu.logging import log
 
-# Module-level cache for loaded models (avoids disk I/O on every prediction)
-_MODEL_CACHE = {}
+# Loaded models (avoids disk I/O on every prediction)
+_MODEL_CACHE = named_cache("ml_cefr_models")
+
+
+# The same matches as \b\w+\b, which the models were trained with
+_WORD = re.compile(r"\w+")
+_SENTENCE_END = re.compile(r"[.!?]+")
+
+FEATURE_COUNT = 12
 
 
 def extract_features(content, fk_difficulty, word_count):
@@ -37,43 +45,63 @@ def extract_features(content, fk_difficulty, word_count):
     11. Interactive ratio (questions/exclamations per sentence)
     12. Character count
     """
+    return np.array(_feature_row(content, fk_difficulty, word_count))
+
+
+def extract_features_batch(articles):
+    """
+    Features of many articles as one (n, 12) matrix, ready for a single
+    predict call.
+
+    articles: iterable of (content, fk_difficulty, word_count)
+    """
+    rows = [_feature_row(*article) for article in articles]
+    if not rows:
+        return np.empty((0, FEATURE_COUNT))
+    return np.array(rows, dtype=float)
+
 
-    if not content or len(content.strip()) == 0:
-        # Return default features for empty content
-        return np.array([fk_difficulty or 50, word_count or 0] + [0.0] * 10)
+def _feature_row(content, fk_difficulty, word_count):
+    # The features must stay exactly those the models were trained with;
+    # this computes them with fewer passes over the text than the original
+    # version (e.g. sum / len for the means, which is what np.mean gives
+    # for integers), but to the same values.
+    if not content or not content.strip():
+        # Default features for empty content
+        return [fk_difficulty or 50, word_count or 0] + [0.0] * 10
 
-    # Basic counts
     char_count = len(content)
 
     # Word-level features
-    words = re.findall(r"\b\w+\b", content.lower())
+    words = _WORD.findall(content.lower())
     if not words:
-        return np.array([fk_difficulty or 50, word_count or 0] + [0.0] * 10)
+        return [fk_difficulty or 50, word_count or 0] + [0.0] * 10
 
     actual_word_count = len(words)
-    avg_word_length = np.mean([len(w) for w in words])
-    long_word_ratio = sum(1 for w in words if len(w) > 7) / actual_word_count
+    word_lengths = list(map(len, words))
+    avg_word_length = sum(word_lengths) / actual_word_count
+    long_word_ratio = (
+        sum(1 for length in word_lengths if length > 7) / actual_word_count
+    )
 
     # Vocabulary richness (type-token ratio)
-    unique_words = len(set(words))
-    type_token_ratio = unique_words / actual_word_count if actual_word_count > 0 else 0
+    type_token_ratio = len(set(words)) / actual_word_count
 
     # Sentence-level features
-    sentences = re.split(r"[.!?]+", content)
-    sentences = [s.strip() for s in sentences if s.strip()]
-
-    if sentences:
-        sentence_lengths = [len(re.findall(r"\b\w+\b", s)) for s in sentences]
-        avg_sentence_length = np.mean(sentence_lengths)
+    sentence_lengths = [
+        len(_WORD.findall(sentence))
+        for sentence in _SENTENCE_END.split(content)
+        if sentence and not sentence.isspace()
+    ]
+    if sentence_lengths:
+        avg_sentence_length = sum(sentence_lengths) / len(sentence_lengths)
         sentence_length_std = (
             np.std(sentence_lengths) if len(sentence_lengths) > 1 else 0
         )
 
         # Interactive ratio (questions/exclamations)
         interactive_marks = content.count("?") + content.count("!")
-        interactive_ratio = (
-            interactive_marks / len(sentences) if len(sentences) > 0 else 0
-        )
+        interactive_ratio = interactive_marks / len(sentence_lengths)
     else:
         avg_sentence_length = 0
         sentence_length_std = 0
@@ -81,37 +109,36 @@ def extract_features(content, fk_difficulty, word_count):
 
     # Punctuation complexity
     complex_punct = content.count(";") + content.count(":") + content.count("—")
-    punct_complexity = complex_punct / actual_word_count if actual_word_count > 0 else 0
+    punct_complexity = complex_punct / actual_word_count
 
     # Paragraph-level features
-    paragraphs = [p.strip() for p in content.split("\n\n") if p.strip()]
-    if paragraphs:
-        paragraph_lengths = [len(re.findall(r"\b\w+\b", p)) for p in paragraphs]
-        avg_paragraph_length = np.mean(paragraph_lengths)
+    paragraph_lengths = [
+        len(_WORD.findall(paragraph))
+        for paragraph in content.split("\n\n")
+        if paragraph and not paragraph.isspace()
+    ]
+    if paragraph_lengths:
+        avg_paragraph_length = sum(paragraph_lengths) / len(paragraph_lengths)
     else:
         avg_paragraph_length = actual_word_count  # Treat entire text as one paragraph
 
     # Average chars per word (different from avg_word_length)
-    avg_chars_per_word = char_count / actual_word_count if actual_word_count > 0 else 0
-
-    features = np.array(
-        [
-            fk_difficulty or 50,  # 1. FK difficulty
-            word_count or actual_word_count,  # 2. Word count
-            avg_word_length,  # 3. Average word length
-            avg_chars_per_word,  # 4. Average chars per word
-            avg_sentence_length,  # 5. Average sentence length
-            sentence_length_std,  # 6. Sentence length std dev
-            type_token_ratio,  # 7. Type-token ratio
-            long_word_ratio,  # 8. Long word ratio
-            punct_complexity,  # 9. Punctuation complexity
-            avg_paragraph_length,  # 10. Average paragraph length
-            interactive_ratio,  # 11. Interactive ratio
-            char_count,  # 12. Character count
-        ]
-    )
-
-    return features
+    avg_chars_per_word = char_count / actual_word_count
+
+    return [
+        fk_difficulty or 50,  # 1. FK difficulty
+        word_count or actual_word_count,  # 2. Word count
+        avg_word_length,  # 3. Average word length
+        avg_chars_per_word,  # 4. Average chars per word
+        avg_sentence_length,  # 5. Average sentence length
+        sentence_length_std,  # 6. Sentence length std dev
+        type_token_ratio,  # 7. Type-token ratio
+        long_word_ratio,  # 8. Long word ratio
+        punct_complexity,  # 9. Punctuation complexity
+        avg_paragraph_length,  # 10. Average paragraph length
+        interactive_ratio,  # 11. Interactive ratio
+        char_count,  # 12. Character count
+    ]
 
 
 def load_model(language_code):
@@ -126,17 +153,19 @@ def load_model(language_code):
     Returns:
         model: Trained sklearn RandomForestClassifier, or None if not found
     """
-    # Check cache first (negative cache uses None to short-circuit retries)
-    if language_code in _MODEL_CACHE:
-        return _MODEL_CACHE[language_code]
+    # None is cached too, to short-circuit retries for missing models
+    return _MODEL_CACHE.get_or_load(
+        language_code, lambda: _load_model_from_disk(language_code)
+    )
+
 
+def _load_model_from_disk(language_code):
     try:
         data_folder = os.environ.get("ZEEGUU_DATA_FOLDER")
         if not data_folder:
             log(
                 f"ZEEGUU_DATA_FOLDER not set, ML classifier unavailable for {language_code}"
             )
-            _MODEL_CACHE[language_code] = None
             return None
 
         model_path = os.path.join(
@@ -148,7 +177,6 @@ def load_model(language_code):
 
         if not os.path.exists(model_path):
             log(f"ML model not found for {language_code}: {model_path}")
-            _MODEL_CACHE[language_code] = None
             return None
 
         log(f"Loading ML CEFR model for {language_code} from {model_path}")
@@ -157,14 +185,12 @@ def load_model(language_code):
         # Pickle file may be {"model": <clf>, "metadata": ...} or the raw clf
         model = data.get("model") if isinstance(data, dict) else data
 
-        _MODEL_CACHE[language_code] = model
         return model
 
     except Exception as e:
         import traceback
         log(f"Failed to load ML model for {language_code}: {e}")
         log(f"ML classifier traceback: {traceback.format_exc()}")
-        _MODEL_CACHE[language_code] = None
         return None
 
 
@@ -181,16 +207,40 @@ def predict_cefr_level(content, language_code, fk_difficulty, word_count):
     Returns:
         CEFR level string ('A1', 'A2', 'B1', 'B2', 'C1', 'C2') or None if model unavailable
     """
+    return predict_cefr_levels(
+        [(content, fk_difficulty, word_count)], language_code
+    )[0]
+
+
+def predict_cefr_levels(articles, language_code):
+    """
+    Predict the CEFR levels of many articles in one language with a single
+    predict call.
+
+    The forest spreads a predict call over all the cores, which costs far
+    more than the prediction itself for a single article; batch jobs should
+    call this rather than predict_cefr_level in a loop.
+
+    Args:
+        articles: list of (content, fk_difficulty, word_count)
+        language_code: ISO language code of all the articles
+
+    Returns:
+        list with a CEFR level string (or None) per article
+    """
+    if not articles:
+        return []
+
     model = load_model(language_code)
     if model is None:
-        return None
+        return [None] * len(articles)
 
-    features = extract_features(content, fk_difficulty, word_count).reshape(1, -1)
+    features = extract_features_batch(articles)
 
     try:
-        return model.predict(features)[0]
+        return list(model.predict(features))
     except Exception as e:
         import traceback
         log(f"ML prediction failed for {language_code}: {e}")
         log(f"ML classifier prediction traceback: {traceback.format_exc()}")
-        return None
+        return [None] * len(articles)
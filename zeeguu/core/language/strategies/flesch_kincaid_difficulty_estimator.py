@@ -1,4 +1,3 @@
-import nltk
 import pyphen
 import math
 
@@ -69,6 +68,9 @@ class FleschKincaidDifficultyEstimator(DifficultyEstimatorStrategy):
             )
             number_of_syllables += syllables_in_word * freq
 
+        # nltk is slow to import and only needed here
+        import nltk
+
         number_of_sentences = len(nltk.sent_tokenize(text))
 
         constants = cls.get_constants_for_language(language)
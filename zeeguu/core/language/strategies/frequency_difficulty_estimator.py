@@ -1,4 +1,3 @@
-from nltk import SnowballStemmer
 from wordstats import Word, WordInfo
 from zeeguu.core import model
 from zeeguu.core.language.difficulty_estimator_strategy import DifficultyEstimatorStrategy
@@ -35,6 +34,8 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
 
         estimator = cls(language)
 
+        from nltk import SnowballStemmer
+
         freq_list = load_language_from_hermit(language.code)
 
         word_dict = dict()
@@ -69,6 +70,8 @@ class FrequencyDifficultyEstimator(DifficultyEstimatorStrategy):
                     discrete: string [EASY, MEDIUM, HARD]
         """
         # Calculate difficulty for each word
+        from nltk import SnowballStemmer
+
         words = split_words_from_text(text)
 
         stemmer = SnowballStemmer(self.language.name.lower())
@@ -2,11 +2,9 @@ import string
 
 from zeeguu.core import model
 from zeeguu.core.language.difficulty_estimator_strategy import DifficultyEstimatorStrategy
-import nltk
 import math
 import re
 from wordstats import Word
-from textblob import TextBlob
 
 
 class WordRankDifficultyEstimator(DifficultyEstimatorStrategy):
@@ -41,6 +39,9 @@ class WordRankDifficultyEstimator(DifficultyEstimatorStrategy):
 
     @classmethod
     def word_rank_readability_score(cls, text: str, language: 'model.Language'):
+        # textblob and nltk are slow to import; only load them when needed
+        import nltk
+        from textblob import TextBlob
 
         langtb = TextBlob(text).detect_language()
         words = nltk.word_tokenize(text)
@@ -0,0 +1,164 @@
+"""
+Per-user daily rollups of the session durations used by the leaderboards.
+
+A day is only rolled up once it is closed: sessions keep growing while the
+user is active, and a session that starts just before midnight can still
+be extended the next morning, so we wait until the day before yesterday.
+
+The leaderboards combine the rollups (for the whole days that have been
+rolled up) with the raw session tables (for the rest of the period), so the
+results are the same whether or not the rollup has run.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import func
+
+from zeeguu.core.model.daily_activity_rollup_day import DailyActivityRollupDay
+from zeeguu.core.model.db import db
+from zeeguu.core.model.user_daily_activity import UserDailyActivity
+from zeeguu.logging import log
+
+
+def duration_session_models():
+    """Maps each UserDailyActivity column to the session model it sums."""
+    from zeeguu.core.model.user_exercise_session import UserExerciseSession
+    from zeeguu.core.model.user_listening_session import UserListeningSession
+    from zeeguu.core.model.user_reading_session import UserReadingSession
+
+    return {
+        "exercise_time": UserExerciseSession,
+        "reading_time": UserReadingSession,
+        "listening_time": UserListeningSession,
+    }
+
+
+def last_closed_day(today: date = None):
+    today = today or date.today()
+    return today - timedelta(days=2)
+
+
+def roll_up_day(day: date, session=None):
+    """
+    (Re)computes the UserDailyActivity rows of the given day. Does not commit.
+    """
+    session = session or db.session
+    day_start = datetime.combine(day, time.min)
+    day_end = day_start + timedelta(days=1)
+
+    totals = {}
+    for column, session_model in duration_session_models().items():
+        rows = (
+            session.query(session_model.user_id, func.sum(session_model.duration))
+            .filter(session_model.start_time >= day_start)
+            .filter(session_model.start_time < day_end)
+            .group_by(session_model.user_id)
+            .all()
+        )
+        for user_id, total in rows:
+            if user_id is None or not total:
+                continue
+            totals.setdefault(user_id, {})[column] = int(total)
+
+    session.query(UserDailyActivity).filter(UserDailyActivity.day == day).delete()
+    session.bulk_insert_mappings(
+        UserDailyActivity,
+        [
+            {
+                **{column: 0 for column in duration_session_models()},
+                **values,
+                "user_id": user_id,
+                "day": day,
+            }
+            for user_id, values in totals.items()
+        ],
+    )
+
+    marker = session.get(DailyActivityRollupDay, day)
+    if marker:
+        marker.rolled_up_at = datetime.now()
+    else:
+        session.add(DailyActivityRollupDay(day))
+
+    return len(totals)
+
+
+def roll_up_closed_days(first_day: date = None, session=None):
+    """
+    Rolls up every closed day that isn't rolled up yet, committing per day.
+    Without first_day, starts from the first day after the latest rolled up
+    one (or from the earliest session, the very first time).
+    """
+    session = session or db.session
+    last_day = last_closed_day()
+
+    if first_day is None:
+        latest = session.query(func.max(DailyActivityRollupDay.day)).scalar()
+        if latest is not None:
+            first_day = latest + timedelta(days=1)
+        else:
+            earliest_starts = [
+                session.query(func.min(model.start_time)).scalar()
+                for model in duration_session_models().values()
+            ]
+            earliest_starts = [each for each in earliest_starts if each is not None]
+            if not earliest_starts:
+                return 0
+            first_day = min(earliest_starts).date()
+
+    already_rolled_up = {
+        each.day
+        for each in session.query(DailyActivityRollupDay.day)
+        .filter(DailyActivityRollupDay.day >= first_day)
+        .all()
+    }
+
+    days_rolled_up = 0
+    day = first_day
+    while day <= last_day:
+        if day not in already_rolled_up:
+            user_count = roll_up_day(day, session)
+            session.commit()
+            days_rolled_up += 1
+            log(f"Rolled up {day}: {user_count} active users")
+        day += timedelta(days=1)
+
+    return days_rolled_up
+
+
+def rolled_up_window(from_date: datetime = None, to_date: datetime = None, session=None):
+    """
+    Returns (first_day, last_day): the longest run of consecutive rolled up
+    days that lie completely within [from_date, to_date], or None if there
+    is no such day. Either bound can be None, for an open-ended period.
+    """
+    session = session or db.session
+
+    query = session.query(DailyActivityRollupDay.day)
+    if from_date is not None:
+        # Only whole days count: a from_date of 10:00 excludes that day
+        first_whole_day = from_date.date()
+        if from_date != datetime.combine(first_whole_day, time.min):
+            first_whole_day += timedelta(days=1)
+        query = query.filter(DailyActivityRollupDay.day >= first_whole_day)
+    if to_date is not None:
+        # to_date is inclusive, so the day is whole only if to_date is its last instant
+        last_whole_day = to_date.date()
+        if to_date < datetime.combine(last_whole_day, time.max):
+            last_whole_day -= timedelta(days=1)
+        query = query.filter(DailyActivityRollupDay.day <= last_whole_day)
+
+    days = sorted(each.day for each in query.all())
+    if not days:
+        return None
+
+    best = current = (days[0], days[0])
+    for day in days[1:]:
+        if day == current[1] + timedelta(days=1):
+            current = (current[0], day)
+        else:
+            current = (day, day)
+        if (current[1] - current[0]) > (best[1] - best[0]):
+            best = current
+
+    return best
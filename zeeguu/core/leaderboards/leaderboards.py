@@ -1,11 +1,27 @@
-from datetime import datetime
+import hashlib
+from datetime import datetime, time as day_time, timedelta
 
-from sqlalchemy import func, and_, case, or_, literal
+from sqlalchemy import func, and_, case, or_, literal, select
 
+from zeeguu.core.leaderboards.daily_activity_rollup import rolled_up_window
 from zeeguu.core.model import User
 from zeeguu.core.model.db import db
 from zeeguu.core.model.friendship import Friendship
 from zeeguu.core.model.user_avatar import UserAvatar
+from zeeguu.core.model.user_daily_activity import UserDailyActivity
+from zeeguu.core.utils.caching import named_cache
+
+# Leaderboards are polled by every friend of a user, and the underlying
+# sums are expensive; results are cached briefly per (member set, metric,
+# period, limit)
+LEADERBOARD_CACHE_TTL_SECONDS = 60
+LEADERBOARD_CACHE_MAX_ENTRIES = 1000
+_leaderboard_cache = named_cache(
+    "leaderboards",
+    ttl_seconds=LEADERBOARD_CACHE_TTL_SECONDS,
+    max_entries=LEADERBOARD_CACHE_MAX_ENTRIES,
+    shared=True,
+)
 
 
 def exercise_time_leaderboard(
@@ -20,24 +36,13 @@ def exercise_time_leaderboard(
     """
     from zeeguu.core.model.user_exercise_session import UserExerciseSession
 
-    total_duration = func.coalesce(func.sum(UserExerciseSession.duration), 0)
-
-    joins = [
-        (
-            UserExerciseSession,
-            and_(
-                UserExerciseSession.user_id == User.id,
-                *([UserExerciseSession.start_time >= from_date] if from_date else []),
-                *([UserExerciseSession.start_time <= to_date] if to_date else []),
-            )
-        )
-    ]
-
-    return _leaderboard_base(
+    return _duration_leaderboard(
+        UserExerciseSession,
+        UserDailyActivity.exercise_time,
         user_ids_subquery,
-        total_duration,
-        joins,
         limit,
+        from_date,
+        to_date,
     )
 
 
@@ -53,24 +58,13 @@ def listening_time_leaderboard(
     """
     from zeeguu.core.model.user_listening_session import UserListeningSession
 
-    total_duration = func.coalesce(func.sum(UserListeningSession.duration), 0)
-
-    joins = [
-        (
-            UserListeningSession,
-            and_(
-                UserListeningSession.user_id == User.id,
-                *([UserListeningSession.start_time >= from_date] if from_date else []),
-                *([UserListeningSession.start_time <= to_date] if to_date else []),
-            )
-        )
-    ]
-
-    return _leaderboard_base(
+    return _duration_leaderboard(
+        UserListeningSession,
+        UserDailyActivity.listening_time,
         user_ids_subquery,
-        total_duration,
-        joins,
         limit,
+        from_date,
+        to_date,
     )
 
 
@@ -120,24 +114,13 @@ def reading_time_leaderboard(
     """
     from zeeguu.core.model.user_reading_session import UserReadingSession
 
-    total_duration = func.coalesce(func.sum(UserReadingSession.duration), 0)
-
-    joins = [
-        (
-            UserReadingSession,
-            and_(
-                UserReadingSession.user_id == User.id,
-                *([UserReadingSession.start_time >= from_date] if from_date else []),
-                *([UserReadingSession.start_time <= to_date] if to_date else []),
-            )
-        )
-    ]
-
-    return _leaderboard_base(
+    return _duration_leaderboard(
+        UserReadingSession,
+        UserDailyActivity.reading_time,
         user_ids_subquery,
-        total_duration,
-        joins,
         limit,
+        from_date,
+        to_date,
     )
 
 
@@ -192,6 +175,32 @@ def exercises_done_leaderboard(
     )
 
 
+def cached_leaderboard(
+        metric_name: str,
+        metric,
+        user_ids_subquery,
+        limit: int = None,
+        from_date=None,
+        to_date=None,
+):
+    """
+    Return metric(user_ids_subquery, limit, from_date, to_date), cached for
+    LEADERBOARD_CACHE_TTL_SECONDS. The key contains a hash of the members
+    of the leaderboard, so that a new friend invalidates it right away.
+    """
+    user_ids = sorted(
+        row.user_id for row in db.session.query(user_ids_subquery.c.user_id).all()
+    )
+    member_hash = hashlib.sha1(
+        ",".join(str(each) for each in user_ids).encode("utf-8")
+    ).hexdigest()
+    key = (member_hash, metric_name, from_date, to_date, limit)
+
+    return _leaderboard_cache.get_or_load(
+        key, lambda: metric(user_ids_subquery, limit, from_date, to_date)
+    )
+
+
 def friend_leaderboard_user_ids_subquery(user_id: int, to_date=None):
     # For each friendship row touching this user, select "the other user".
     to_date = to_date or datetime.now()
@@ -222,6 +231,75 @@ def cohort_leaderboard_user_ids_subquery(cohort_id: int):
     )
 
 
+def _duration_leaderboard(
+        session_model,
+        rollup_column,
+        user_ids_subquery,
+        limit,
+        from_date,
+        to_date,
+):
+    """
+    Leaderboard of the total session_model.duration per user. The whole days
+    that have been rolled up are read from UserDailyActivity; only the rest
+    of the period is summed from the raw session table.
+    """
+    member_ids = select(user_ids_subquery.c.user_id)
+
+    raw_filters = [
+        session_model.user_id.in_(member_ids),
+        *([session_model.start_time >= from_date] if from_date else []),
+        *([session_model.start_time <= to_date] if to_date else []),
+    ]
+
+    totals = []
+    window = rolled_up_window(from_date, to_date)
+    if window:
+        first_day, last_day = window
+        window_start = datetime.combine(first_day, day_time.min)
+        window_end = datetime.combine(last_day + timedelta(days=1), day_time.min)
+        raw_filters.append(
+            or_(
+                session_model.start_time < window_start,
+                session_model.start_time >= window_end,
+            )
+        )
+        totals.append(
+            db.session.query(
+                UserDailyActivity.user_id.label("user_id"),
+                func.sum(rollup_column).label("value"),
+            )
+            .filter(UserDailyActivity.user_id.in_(member_ids))
+            .filter(UserDailyActivity.day >= first_day)
+            .filter(UserDailyActivity.day <= last_day)
+            .group_by(UserDailyActivity.user_id)
+            .subquery()
+        )
+
+    totals.append(
+        db.session.query(
+            session_model.user_id.label("user_id"),
+            func.sum(session_model.duration).label("value"),
+        )
+        .filter(*raw_filters)
+        .group_by(session_model.user_id)
+        .subquery()
+    )
+
+    # Each subquery has (at most) one row per user, so the joins don't fan out
+    total_duration = func.coalesce(func.sum(totals[0].c.value), 0)
+    for each in totals[1:]:
+        total_duration = total_duration + func.coalesce(func.sum(each.c.value), 0)
+    joins = [(each, each.c.user_id == User.id) for each in totals]
+
+    return _leaderboard_base(
+        user_ids_subquery,
+        total_duration,
+        joins,
+        limit,
+    )
+
+
 def _leaderboard_base(
         user_ids_subquery,
         value_expr,
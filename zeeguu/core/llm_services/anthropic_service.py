@@ -15,6 +15,8 @@ from zeeguu.logging import log
 
 class AnthropicService(LLMService):
     """Service for Anthropic's Claude API"""
+
+    provider = "anthropic"
     
     def __init__(self, api_key: Optional[str] = None, timeout: int = 120):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
@@ -34,7 +36,7 @@ class AnthropicService(LLMService):
     
     def _make_api_request(self, prompt: Dict, max_tokens: int = 1000, temperature: float = 0.7) -> str:
         """Make single API request - fail fast, no retries"""
-        try:
+        def request():
             response = self.client.messages.create(
                 model=self.model,
                 max_tokens=max_tokens,
@@ -45,6 +47,9 @@ class AnthropicService(LLMService):
                 ]
             )
             return response.content[0].text
+
+        try:
+            return self._cached_request(prompt, max_tokens, temperature, request)
         except Exception as e:
             log(f"Anthropic API failed: {e}")
             raise e
@@ -17,6 +17,8 @@ from zeeguu.logging import log
 class DeepSeekService(LLMService):
     """Service for DeepSeek API"""
 
+    provider = "deepseek"
+
     def __init__(self, api_key: Optional[str] = None, timeout: int = 120):
         self.api_key = api_key or os.environ.get("DEEPSEEK_API_KEY")
         if not self.api_key:
@@ -28,7 +30,13 @@ class DeepSeekService(LLMService):
         self.timeout = timeout
 
     def _make_deepseek_request(self, prompt: Dict, max_tokens: int = 1000, temperature: float = 0.7) -> str:
-        """Make DeepSeek API request with timeout"""
+        """Make DeepSeek API request with timeout, unless its response is cached"""
+        return self._cached_request(
+            prompt, max_tokens, temperature,
+            lambda: self._post_deepseek_request(prompt, max_tokens, temperature)
+        )
+
+    def _post_deepseek_request(self, prompt: Dict, max_tokens: int, temperature: float) -> str:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -20,6 +20,7 @@ from typing import Optional
 import requests
 from zeeguu.logging import log
 from zeeguu.core.llm_services import models
+from zeeguu.core.llm_services.response_cache import cached_completion
 
 HAIKU_MODEL = models.ANTHROPIC_HAIKU
 ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
@@ -27,10 +28,29 @@ ANTHROPIC_VERSION = "2023-06-01"
 
 
 def _post(prompt: str, max_tokens: int, temperature: float, timeout: int) -> requests.Response:
+    """
+    The response of the API, or the cached one for the same request (see
+    response_cache); only 200s are cached.
+    """
+    # Its own provider name: what is cached here is the HTTP response, not
+    # the text that the other Anthropic callers cache
+    return cached_completion(
+        "anthropic:haiku_client",
+        HAIKU_MODEL,
+        None,
+        prompt,
+        max_tokens,
+        temperature,
+        lambda: _send(prompt, max_tokens, temperature, timeout),
+        cacheable=lambda response: response.status_code == 200,
+    )
+
+
+def _send(prompt: str, max_tokens: int, temperature: float, timeout: int) -> requests.Response:
     api_key = os.environ.get("ANTHROPIC_TEXT_SIMPLIFICATION_KEY")
     if not api_key:
         raise RuntimeError("ANTHROPIC_TEXT_SIMPLIFICATION_KEY not set")
-    return requests.post(
+    response = requests.post(
         ANTHROPIC_URL,
         headers={
             "x-api-key": api_key,
@@ -45,6 +65,9 @@ def _post(prompt: str, max_tokens: int, temperature: float, timeout: int) -> req
         },
         timeout=timeout,
     )
+    # The request has the API key in its headers; the response may be cached
+    response.request = None
+    return response
 
 
 def haiku_completion(
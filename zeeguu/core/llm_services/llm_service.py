@@ -5,10 +5,24 @@ import os
 from typing import List, Dict, Optional
 
 from zeeguu.logging import log
+from .response_cache import cached_completion
 
 
 class LLMService:
     """Base class for LLM services"""
+
+    # Names the API in the keys of the cached responses (see response_cache)
+    provider = None
+
+    def _cached_request(self, prompt: Dict, max_tokens: int, temperature: float, request):
+        """
+        request() for the system/user prompt, unless the response to the same
+        request is in the LLM response cache.
+        """
+        return cached_completion(
+            self.provider, self.model, prompt["system"], prompt["user"],
+            max_tokens, temperature, request
+        )
     
     def generate_examples(self, word: str, translation: str, source_lang: str, 
                          target_lang: str, cefr_level: str, prompt_version: str, count: int = 3) -> List[Dict]:
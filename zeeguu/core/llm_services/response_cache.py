@@ -0,0 +1,152 @@
+"""
+Responses of the LLM APIs, cached by what was asked: provider, model, system
+prompt, prompt, max_tokens and temperature (hashed into the key).
+
+Many of the prompts we send are asked again with the same text, e.g. the
+temperature 0 validations of TranslationValidator, or the simplification of
+an article that is crawled again; their answers can be reused.
+
+ZEEGUU_LLM_CACHE selects the mode:
+- off (the default): every request goes to the API
+- on: the responses to requests of a temperature up to CACHE_MAX_TEMPERATURE
+  are cached for TTL_SECONDS, up to MAX_ENTRIES of them; at a higher
+  temperature the caller wants a different answer every time
+- record: every response is kept, without expiry or limits
+- replay: responses only come from the cache, nothing goes to the APIs; a
+  request that was not recorded raises LLMResponseNotRecorded. With a run
+  recorded before, this lets the pipelines run (and be benchmarked) offline
+
+The cache is an SQLite file (ZEEGUU_LLM_CACHE_PATH, by default
+llm_response_cache.sqlite in ZEEGUU_DATA_FOLDER) shared by all the processes.
+It is a named cache ("llm_responses"), so its hits, misses and coalesced
+requests are in /metrics. Identical requests in flight at the same time in
+a process are sent only once.
+
+Failed requests, and responses the caller says are not cacheable (e.g. a
+non-200), are not cached. In the on mode, when the cache itself fails (e.g.
+the file stays locked, or the disk is read only), requests go to the API.
+The cache is not emptied by clear_all_caches, so tests can replay a
+recording.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from zeeguu.config import ZEEGUU_DATA_FOLDER
+from zeeguu.core.utils.caching import Cache, register_cache
+from zeeguu.logging import log
+
+MODES = ("off", "on", "record", "replay")
+
+CACHE_MAX_TEMPERATURE = 0.3
+TTL_SECONDS = 30 * 24 * 3600
+MAX_ENTRIES = 100_000
+
+_NOT_RECORDED = object()
+
+
+class LLMResponseNotRecorded(Exception):
+    pass
+
+
+class _NotCacheable(Exception):
+    """Carries a response that must not be cached out of the cache's loader"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def _default_path():
+    path = os.environ.get("ZEEGUU_LLM_CACHE_PATH")
+    if path is None and ZEEGUU_DATA_FOLDER:
+        path = os.path.join(ZEEGUU_DATA_FOLDER, "llm_response_cache.sqlite")
+    return path
+
+
+_mode = "off"
+_cache = None
+
+
+def configure(mode, path=None):
+    """
+    Switches the cache to mode (see the module docstring), kept in the
+    SQLite file at path (by default, as configured in the environment).
+    """
+    global _mode, _cache
+
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM cache mode: {mode}")
+    path = path or _default_path()
+    if mode != "off" and path is None:
+        log("No ZEEGUU_LLM_CACHE_PATH nor ZEEGUU_DATA_FOLDER, not caching")
+        mode = "off"
+
+    cache = None
+    if mode == "on":
+        cache = Cache(
+            "llm_responses", max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS, path=path
+        )
+    elif mode in ("record", "replay"):
+        cache = Cache("llm_responses", path=path)
+    if cache is not None:
+        register_cache(cache)
+    _cache, _mode = cache, mode
+
+
+def response_key(provider, model, system, prompt, max_tokens, temperature):
+    request = [provider, model, system, prompt, max_tokens, float(temperature)]
+    return hashlib.sha256(json.dumps(request).encode("utf-8")).hexdigest()
+
+
+def cached_completion(
+    provider, model, system, prompt, max_tokens, temperature, request, cacheable=None
+):
+    """
+    The response to a request to an LLM API: request() or, depending on the
+    mode, the cached response to the same request.
+
+    :param provider: part of the key; callers whose responses are of
+        different types (e.g. an HTTP response and its text) must use
+        different ones, even for the same API
+    :param cacheable: called with the response of request(); if it returns
+        False the response is returned, but not cached
+    """
+    if _mode == "off" or (_mode == "on" and temperature > CACHE_MAX_TEMPERATURE):
+        return request()
+
+    key = response_key(provider, model, system, prompt, max_tokens, temperature)
+
+    if _mode == "replay":
+        response = _cache.get(key, _NOT_RECORDED)
+        if response is _NOT_RECORDED:
+            raise LLMResponseNotRecorded(f"{provider} {model}: {prompt[:80]!r}")
+        return response
+
+    responses = []
+
+    def load():
+        response = request()
+        responses.append(response)
+        if cacheable is not None and not cacheable(response):
+            raise _NotCacheable(response)
+        return response
+
+    try:
+        return _cache.get_or_load(key, load)
+    except _NotCacheable as e:
+        return e.response
+    except sqlite3.Error as e:
+        if _mode != "on":
+            raise
+        log(f"LLM response cache failed ({e}), not caching")
+        # Not asking again if the request was sent before the cache failed
+        return responses[0] if responses else request()
+
+
+_configured_mode = os.environ.get("ZEEGUU_LLM_CACHE", "off").lower() or "off"
+if _configured_mode not in MODES:
+    log(f"Unknown ZEEGUU_LLM_CACHE mode {_configured_mode}, not caching")
+    _configured_mode = "off"
+configure(_configured_mode)
@@ -32,6 +32,7 @@ from typing import Optional, List
 from zeeguu.logging import log
 from zeeguu.core.model.language import Language
 from zeeguu.core.llm_services import models
+from zeeguu.core.llm_services.response_cache import cached_completion
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +68,31 @@ class TranslationValidator:
             raise ValueError("ANTHROPIC_API_KEY not set")
         self.client = anthropic.Anthropic(api_key=api_key, timeout=30)
 
+    def _complete(self, prompt: str, max_tokens: int) -> str:
+        """
+        The text of the response to a temperature 0, single-turn prompt, or
+        the cached one for the same prompt (see response_cache).
+        """
+
+        def request():
+            response = self.client.messages.create(
+                model=self.MODEL_NAME,
+                max_tokens=max_tokens,
+                temperature=0,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            return response.content[0].text
+
+        return cached_completion(
+            "anthropic:translation_validator",
+            self.MODEL_NAME,
+            None,
+            prompt,
+            max_tokens,
+            0,
+            request,
+        )
+
     def validate_and_classify(
         self,
         word: str,
@@ -103,13 +129,7 @@ class TranslationValidator:
         )
 
         try:
-            response = self.client.messages.create(
-                model=self.MODEL_NAME,
-                max_tokens=200,
-                temperature=0,  # Deterministic for validation
-                messages=[{"role": "user", "content": prompt}],
-            )
-            response_text = response.content[0].text.strip()
+            response_text = self._complete(prompt, max_tokens=200).strip()
             return self._parse_response(response_text)
 
         except Exception as e:
@@ -156,13 +176,7 @@ class TranslationValidator:
             # Estimate tokens: ~50 per response line
             max_tokens = len(items) * 60
 
-            response = self.client.messages.create(
-                model=self.MODEL_NAME,
-                max_tokens=max_tokens,
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            response_text = response.content[0].text.strip()
+            response_text = self._complete(prompt, max_tokens=max_tokens).strip()
             return self._parse_batch_response(response_text, len(items))
 
         except Exception as e:
@@ -296,13 +310,7 @@ class TranslationValidator:
         )
 
         try:
-            response = self.client.messages.create(
-                model=self.MODEL_NAME,
-                max_tokens=10,
-                temperature=0,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            response_text = response.content[0].text.strip().upper()
+            response_text = self._complete(prompt, max_tokens=10).strip().upper()
             return response_text == "YES"
 
         except Exception as e:
@@ -13,7 +13,9 @@ from .article_tokenization_cache import ArticleTokenizationCache
 from .text import Text
 from .phrase import Phrase
 from .user import User
+from .user_search_trigram import UserSearchTrigram
 from .meaning import Meaning
+from .answer_variant import AnswerVariant
 from .meaning_report import MeaningReport
 from .user_word import UserWord
 from .bookmark import Bookmark
@@ -27,6 +29,7 @@ from .user_onboarding_message import UserOnboardingMessage
 
 from .article_broken_code_map import ArticleBrokenMap, LowQualityTypes
 from .article_classification import ArticleClassification, ClassificationType, DetectionMethod
+from .article_enrichment_job import ArticleEnrichmentJob
 from .user_article_broken_report import UserArticleBrokenReport
 from .bookmark_context import BookmarkContext
 from .article_fragment_context import ArticleFragmentContext
@@ -135,3 +138,7 @@ from .friend_request import FriendRequest
 from .friendship import Friendship
 from .shared_article import SharedArticle
 
+# leaderboards
+from .user_daily_activity import UserDailyActivity
+from .daily_activity_rollup_day import DailyActivityRollupDay
+
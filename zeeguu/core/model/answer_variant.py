@@ -0,0 +1,177 @@
+import sqlalchemy
+from sqlalchemy.orm import aliased
+
+from zeeguu.core.model.db import db
+from zeeguu.core.model.language import Language
+from zeeguu.core.model.meaning import Meaning
+from zeeguu.core.model.phrase import Phrase
+from zeeguu.core.verbal_flashcards.text_normalization import (
+    UnsupportedLanguageError,
+    normalizer_for,
+)
+
+
+class AnswerVariant(db.Model):
+    """
+    Index of the answers that verbal flashcards may accept for a cue.
+
+    One row per meaning that is not known to be invalid, keyed by the
+    languages and the lowercased translation (the cue shown on the card),
+    with the origin word and its canonical form precomputed. The answer
+    variants of a card are then a single index range read, instead of a
+    Meaning ⨝ Phrase ⨝ Phrase query on the lowercased translation followed
+    by the normalization of every candidate.
+
+    Only meanings whose origin language has a verbal-flashcard normalizer
+    are indexed.
+
+    The index is maintained by the mapper events at the bottom of this file;
+    tools/rebuild_answer_variant_index.py builds it for existing meanings.
+    """
+
+    __tablename__ = "answer_variant"
+    # Binary collation: the cue key is lowercased in Python, and a case or
+    # accent insensitive collation would match cues that Python considers
+    # different
+    __table_args__ = (
+        db.Index(
+            "answer_variant_cue",
+            "origin_language_id",
+            "translation_language_id",
+            "cue_key",
+        ),
+        {"mysql_collate": "utf8mb4_bin"},
+    )
+
+    meaning_id = db.Column(
+        db.Integer,
+        db.ForeignKey(Meaning.id, ondelete="CASCADE"),
+        primary_key=True,
+    )
+    origin_language_id = db.Column(
+        db.Integer, db.ForeignKey(Language.id), nullable=False
+    )
+    translation_language_id = db.Column(
+        db.Integer, db.ForeignKey(Language.id), nullable=False
+    )
+    cue_key = db.Column(db.String(255), nullable=False)
+    answer = db.Column(db.String(255), nullable=False)
+    canonical_form = db.Column(db.String(255), nullable=False)
+
+    def __repr__(self):
+        return f"<AnswerVariant {self.cue_key!r} -> {self.answer!r} Meaning:{self.meaning_id}>"
+
+    @staticmethod
+    def cue_key_for(translation: str):
+        return (translation or "").lower().strip()
+
+    @classmethod
+    def indexed_meanings_query(cls):
+        """
+        Select of the columns row_for needs, for every meaning; filter it
+        on Meaning.id
+        """
+        origin = aliased(Phrase)
+        translation = aliased(Phrase)
+        return (
+            sqlalchemy.select(
+                Meaning.id,
+                Meaning.validated,
+                origin.content,
+                Language.id,
+                Language.code,
+                translation.content,
+                translation.language_id,
+            )
+            .select_from(Meaning)
+            .join(origin, Meaning.origin_id == origin.id)
+            .join(Language, origin.language_id == Language.id)
+            .join(translation, Meaning.translation_id == translation.id)
+        )
+
+    @classmethod
+    def row_for(
+        cls,
+        meaning_id,
+        validated,
+        origin,
+        origin_language_id,
+        origin_language_code,
+        translation,
+        translation_language_id,
+    ):
+        """The index row for a meaning, or None if it doesn't belong in the index"""
+        if validated == Meaning.INVALID:
+            return None
+        try:
+            normalizer = normalizer_for(origin_language_code)
+        except UnsupportedLanguageError:
+            return None
+
+        return {
+            "meaning_id": meaning_id,
+            "origin_language_id": origin_language_id,
+            "translation_language_id": translation_language_id,
+            "cue_key": cls.cue_key_for(translation),
+            "answer": origin,
+            "canonical_form": normalizer.canonical_form(origin),
+        }
+
+    @classmethod
+    def reindex_meaning(cls, connection, meaning_id):
+        """
+        Replaces the row of the given meaning. Works on a core connection so
+        that it can be called from within a flush (see the listeners below).
+        """
+        table = cls.__table__
+        connection.execute(table.delete().where(table.c.meaning_id == meaning_id))
+
+        found = connection.execute(
+            cls.indexed_meanings_query().where(Meaning.id == meaning_id)
+        ).first()
+        row = cls.row_for(*found) if found else None
+        if row:
+            connection.execute(table.insert(), [row])
+
+    @classmethod
+    def answers_for_cue(cls, origin_language_id, translation_language_id, cue, limit):
+        """(answer, canonical_form) pairs for the cue, oldest meaning first"""
+        return (
+            db.session.query(cls.answer, cls.canonical_form)
+            .filter(cls.origin_language_id == origin_language_id)
+            .filter(cls.translation_language_id == translation_language_id)
+            .filter(cls.cue_key == cls.cue_key_for(cue))
+            .order_by(cls.meaning_id)
+            .limit(limit)
+            .all()
+        )
+
+
+_INDEXED_MEANING_ATTRIBUTES = (
+    "validated",
+    "origin",
+    "origin_id",
+    "translation",
+    "translation_id",
+)
+
+
+@sqlalchemy.event.listens_for(Meaning, "after_insert")
+def index_new_meaning(mapper, connection, target):
+    AnswerVariant.reindex_meaning(connection, target.id)
+
+
+@sqlalchemy.event.listens_for(Meaning, "after_update")
+def reindex_updated_meaning(mapper, connection, target):
+    state = sqlalchemy.inspect(target)
+    if any(
+        state.attrs[attribute].history.has_changes()
+        for attribute in _INDEXED_MEANING_ATTRIBUTES
+    ):
+        AnswerVariant.reindex_meaning(connection, target.id)
+
+
+@sqlalchemy.event.listens_for(Meaning, "after_delete")
+def remove_deleted_meaning_from_index(mapper, connection, target):
+    table = AnswerVariant.__table__
+    connection.execute(table.delete().where(table.c.meaning_id == target.id))
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, and_, or_
+from sqlalchemy.orm import relationship
+
+from zeeguu.core.model.db import db
+
+
+class ArticleEnrichmentJob(db.Model):
+    """
+    An article waiting for its LLM pass: CEFR assessment, level summaries,
+    classification and (with SIMPLIFY_AT_CRAWL) the simplified versions.
+
+    The crawler only enqueues these, so that a slow LLM can't stall the
+    ingestion of other feeds; the workers in
+    zeeguu/operations/crawler/enrichment_worker.py process them, lowest
+    priority value first (see article_enrichment.topic_demand_priority).
+
+    One job per article, so enqueueing twice is a no-op. A failed job is
+    retried with exponential backoff, up to MAX_ATTEMPTS times.
+    """
+
+    __tablename__ = "article_enrichment_job"
+    __table_args__ = {"mysql_collate": "utf8mb4_unicode_ci"}
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    MAX_ATTEMPTS = 4
+    RETRY_BASE_DELAY_SECONDS = 60
+    # A job that has been running for longer than this belongs to a worker
+    # that died; it's handed out again. Well above the 180s LLM timeout.
+    STALE_AFTER_SECONDS = 15 * 60
+
+    id = Column(Integer, primary_key=True)
+
+    article_id = Column(
+        Integer,
+        ForeignKey("article.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    article = relationship("Article")
+
+    provider = Column(String(32), nullable=False)
+    priority = Column(Integer, nullable=False, default=0)
+
+    status = Column(
+        Enum(PENDING, RUNNING, DONE, FAILED, name="enrichment_job_status"),
+        nullable=False,
+        default=PENDING,
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    outcome = Column(String(512))
+
+    created_at = Column(DateTime, nullable=False)
+
+    def __init__(self, article, provider, priority=0):
+        self.article = article
+        self.provider = provider
+        self.priority = priority
+        self.status = self.PENDING
+        self.attempts = 0
+        self.created_at = datetime.now()
+        self.next_attempt_at = self.created_at
+
+    def __repr__(self):
+        return f"<ArticleEnrichmentJob article={self.article_id} {self.status}>"
+
+    @classmethod
+    def enqueue(cls, session, article, provider, priority=0):
+        """Adds a job for the article, unless it has one already. Does not commit."""
+        if article.id is not None:
+            existing = cls.query.filter_by(article_id=article.id).first()
+            if existing:
+                return existing
+
+        job = cls(article, provider, priority)
+        session.add(job)
+        return job
+
+    @classmethod
+    def claim_next(cls, session, provider):
+        """
+        Marks the most urgent job that is due for the given provider as
+        running, and returns it (or None). Safe with concurrent workers:
+        on MySQL the row is locked with SKIP LOCKED, so two workers never
+        claim the same job.
+        """
+        now = datetime.now()
+        job = (
+            session.query(cls)
+            .filter(cls.provider == provider)
+            .filter(
+                or_(
+                    and_(cls.status == cls.PENDING, cls.next_attempt_at <= now),
+                    and_(
+                        cls.status == cls.RUNNING,
+                        cls.started_at < now - timedelta(seconds=cls.STALE_AFTER_SECONDS),
+                    ),
+                )
+            )
+            .order_by(cls.priority, cls.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            session.rollback()
+            return None
+
+        job.status = cls.RUNNING
+        job.started_at = now
+        job.attempts += 1
+        session.commit()
+        return job
+
+    def mark_done(self, session, outcome=None):
+        self.status = self.DONE
+        self.finished_at = datetime.now()
+        self.outcome = outcome[:512] if outcome else None
+        session.commit()
+
+    def mark_failed(self, session, error):
+        """Schedules a retry with exponential backoff, or gives up."""
+        self.outcome = str(error)[:512]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = self.FAILED
+            self.finished_at = datetime.now()
+        else:
+            self.status = self.PENDING
+            delay = self.RETRY_BASE_DELAY_SECONDS * 2 ** (self.attempts - 1)
+            self.next_attempt_at = datetime.now() + timedelta(seconds=delay)
+        session.commit()
+
+    @classmethod
+    def pending_count(cls, provider=None):
+        query = cls.query.filter(cls.status.in_([cls.PENDING, cls.RUNNING]))
+        if provider is not None:
+            query = query.filter(cls.provider == provider)
+        return query.count()
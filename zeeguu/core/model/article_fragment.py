@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Integer
+from sqlalchemy import Column, String, ForeignKey, Integer, select
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -92,3 +92,45 @@ class ArticleFragment(db.Model):
             if commit:
                 session.commit()
             return new
+
+    @classmethod
+    def create_all(cls, session, article, fragments):
+        """
+        Bulk version of find_or_create(..., commit=False) for all the
+        fragments of an article: the texts are resolved together (see
+        NewText.find_or_create_all) and the fragments inserted with one
+        executemany. Fragments that the article already has are skipped.
+
+        :param fragments: list of (text, order, formatting)
+        """
+        from zeeguu.core.model.new_text import NewText
+
+        if not fragments:
+            return
+
+        if article.id is None:
+            session.flush()
+
+        text_ids = NewText.find_or_create_all(session, [text for text, _, _ in fragments])
+        existing = {
+            (text_id, order)
+            for text_id, order in session.execute(
+                select(cls.text_id, cls.order).where(cls.article_id == article.id)
+            )
+        }
+
+        rows = []
+        for text, order, formatting in fragments:
+            text_id = text_ids[text.strip()]
+            if (text_id, order) in existing:
+                continue
+            rows.append(
+                dict(
+                    article_id=article.id,
+                    text_id=text_id,
+                    order=order,
+                    formatting=formatting,
+                )
+            )
+        if rows:
+            session.execute(cls.__table__.insert(), rows)
@@ -46,6 +46,37 @@ class Caption(db.Model):
         session.commit()
         return caption
 
+    @classmethod
+    def create_all(cls, session, video, captions):
+        """
+        Bulk version of create, without committing: the texts are resolved
+        together (see NewText.find_or_create_all) and the captions inserted
+        with one executemany.
+
+        :param captions: list of {time_start, time_end, text} dicts
+        """
+        if not captions:
+            return
+
+        if video.id is None:
+            session.flush()
+
+        text_ids = NewText.find_or_create_all(
+            session, [caption["text"] for caption in captions]
+        )
+        session.execute(
+            cls.__table__.insert(),
+            [
+                dict(
+                    video_id=video.id,
+                    time_start=caption["time_start"],
+                    time_end=caption["time_end"],
+                    text_id=text_ids[caption["text"].strip()],
+                )
+                for caption in captions
+            ],
+        )
+
     @classmethod
     def find_by_id(cls, caption_id: int):
         return cls.query.filter_by(id=caption_id).first()
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from zeeguu.core.model.db import db
+
+
+class DailyActivityRollupDay(db.Model):
+    """
+    The days for which UserDailyActivity has been computed. A day without
+    activity has no UserDailyActivity rows, so this is how we tell "rolled
+    up, nobody was active" apart from "not rolled up yet".
+    """
+
+    __tablename__ = "daily_activity_rollup_day"
+
+    day = db.Column(db.Date, primary_key=True)
+    rolled_up_at = db.Column(db.DateTime)
+
+    def __init__(self, day):
+        self.day = day
+        self.rolled_up_at = datetime.now()
+
+    def __repr__(self):
+        return f"<DailyActivityRollupDay {self.day}>"
@@ -76,7 +76,7 @@ class Friendship(db.Model):
           - "user_languages": the list of active language of the friend (a list of
             UserLanguage objects)
         """
-        from zeeguu.core.model import UserLanguage
+        from zeeguu.core.model import Language, UserLanguage
 
         # Each friendship row stores both user ids but doesn't tell us which one
         # is "the other person" relative to the caller. The CASE expression derives
@@ -84,19 +84,22 @@ class Friendship(db.Model):
         # and vice versa. This lets us do a single join to User instead of the
         # OR-of-ANDs pattern that would otherwise be required.
         other_user_id = case((cls.user_a_id == user_id, cls.user_b_id), else_=cls.user_a_id)
+        # Language is selected too so that serializing user_language.language
+        # is answered from the identity map instead of one query per friend.
         rows = (
-            db.session.query(User, cls, UserAvatar, UserLanguage)
+            db.session.query(User, cls, UserAvatar, UserLanguage, Language)
             .select_from(cls)
             .filter(or_(cls.user_a_id == user_id, cls.user_b_id == user_id))
             .filter(cls.deleted_at.is_(None))
             .join(User, User.id == other_user_id)
             .outerjoin(UserAvatar, UserAvatar.user_id == User.id)
             .outerjoin(UserLanguage, UserLanguage.user_id == User.id)
+            .outerjoin(Language, Language.id == UserLanguage.language_id)
             .all()
         )
 
         grouped = {}
-        for user, friendship, avatar, language in rows:
+        for user, friendship, avatar, language, _ in rows:
             key = friendship.id
 
             if key not in grouped:
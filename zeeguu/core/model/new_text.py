@@ -1,7 +1,7 @@
 import sqlalchemy.orm
 import time
 
-from sqlalchemy import UnicodeText
+from sqlalchemy import UnicodeText, select
 
 from zeeguu.core.util import long_hash
 from zeeguu.core.model.db import db
@@ -80,3 +80,57 @@ class NewText(db.Model):
                         print("exception of second degree in find NewText..." + str(i))
                         time.sleep(0.3)
                         continue
+
+    @classmethod
+    def find_or_create_all(cls, session, texts):
+        """
+        find_or_create for many texts at once, without committing: one query
+        for the rows that exist, one insert for all the missing ones, and one
+        query for their ids.
+
+        :param texts: strings; like find_or_create, they are stripped
+        :return: dict from stripped text to NewText id
+        """
+        texts_by_hash = {}
+        for text in texts:
+            clean_text = text.strip()
+            texts_by_hash.setdefault(long_hash(clean_text), clean_text)
+        if not texts_by_hash:
+            return {}
+
+        ids_by_hash = cls._ids_by_hash(session, texts_by_hash)
+        missing = [each for each in texts_by_hash if each not in ids_by_hash]
+        if missing:
+            # content_hash is unique: the rows that a concurrent transaction
+            # has inserted meanwhile are skipped, and then read back with a
+            # locking read, which sees them even if committed after this
+            # transaction's snapshot was taken
+            session.execute(
+                cls.__table__.insert()
+                .prefix_with("IGNORE", dialect="mysql")
+                .prefix_with("OR IGNORE", dialect="sqlite"),
+                [
+                    dict(content=texts_by_hash[each], content_hash=each)
+                    for each in missing
+                ],
+            )
+            ids_by_hash.update(cls._ids_by_hash(session, missing, locking=True))
+
+        return {texts_by_hash[each]: text_id for each, text_id in ids_by_hash.items()}
+
+    @classmethod
+    def _ids_by_hash(cls, session, hashes, locking=False):
+        query = (
+            select(cls.id, cls.content_hash)
+            .where(cls.content_hash.in_(list(hashes)))
+            .order_by(cls.id)
+        )
+        if locking:
+            query = query.with_for_update(read=True)
+
+        ids = {}
+        for text_id, content_hash in session.execute(query):
+            # The oldest row, if there are duplicates from before the
+            # unique index
+            ids.setdefault(content_hash, text_id)
+        return ids
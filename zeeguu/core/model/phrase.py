@@ -1,10 +1,10 @@
 import sqlalchemy.orm
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy import Computed
-from wordstats import Word
 
 from zeeguu.core.model.db import db
 from zeeguu.core.model.language import Language
+from zeeguu.core.word_stats import ranks_for
 
 
 class Phrase(db.Model):
@@ -47,20 +47,28 @@ class Phrase(db.Model):
         try:
             words = self.content.split()
             if len(words) > 1:
-                ranks = []
-                for single_word in words:
-                    try:
-                        r = Word.stats(single_word, self.language.code).rank
-                        if r is not None:
-                            ranks.append(r)
-                    except Exception:
-                        # If we can't get rank for a word, treat it as very rare
-                        ranks.append(self.IMPOSSIBLE_RANK)
-                return max(ranks) if ranks else None
-            return Word.stats(self.content, self.language.code).rank
+                return self._rank_of_rarest_word(words)
+            return ranks_for([self.content], self.language.code)[0]
         except Exception:
             return None
 
+    def _rank_of_rarest_word(self, words):
+        try:
+            ranks = ranks_for(words, self.language.code)
+        except Exception:
+            # Look the words up one by one, so that a failing word doesn't
+            # take the ranks of the others with it
+            ranks = [self._rank_of_word(word) for word in words]
+        ranks = [rank for rank in ranks if rank is not None]
+        return max(ranks) if ranks else None
+
+    def _rank_of_word(self, word):
+        try:
+            return ranks_for([word], self.language.code)[0]
+        except Exception:
+            # If we can't get rank for a word, treat it as very rare
+            return self.IMPOSSIBLE_RANK
+
     @classmethod
     def _calculate_rank_async(cls, phrase_id):
         """Backfill a phrase's rank in a background thread (re-querying by id), so the
@@ -138,35 +146,27 @@ class Phrase(db.Model):
             words = self.content.split()
             if len(words) > 1:
                 try:
-                    ranks = []
-                    for single_word in words:
-                        try:
-                            rank = Word.stats(single_word, self.language.code).rank
-                            if rank is not None:
-                                ranks.append(rank)
-                        except:
-                            # If we can't get rank for a word, treat it as very rare
-                            ranks.append(self.IMPOSSIBLE_RANK)
+                    # Take the highest rank (least frequent word)
+                    rank = self._rank_of_rarest_word(words)
+                    if rank is None:
+                        return
+                    self.rank = rank
+
+                    # Use a separate session to avoid deadlocks
+                    from zeeguu.core.model import db
+                    from sqlalchemy.orm import sessionmaker
                     
-                    if ranks:
-                        # Take the highest rank (least frequent word)
-                        self.rank = max(ranks)
-                        
-                        # Use a separate session to avoid deadlocks
-                        from zeeguu.core.model import db
-                        from sqlalchemy.orm import sessionmaker
-                        
-                        # Create a new session for this update
-                        Session = sessionmaker(bind=db.engine)
-                        separate_session = Session()
-                        try:
-                            # Get the phrase in the separate session and update it
-                            phrase_to_update = separate_session.query(Phrase).filter(Phrase.id == self.id).first()
-                            if phrase_to_update:
-                                phrase_to_update.rank = self.rank
-                                separate_session.commit()
-                        finally:
-                            separate_session.close()
+                    # Create a new session for this update
+                    Session = sessionmaker(bind=db.engine)
+                    separate_session = Session()
+                    try:
+                        # Get the phrase in the separate session and update it
+                        phrase_to_update = separate_session.query(Phrase).filter(Phrase.id == self.id).first()
+                        if phrase_to_update:
+                            phrase_to_update.rank = self.rank
+                            separate_session.commit()
+                    finally:
+                        separate_session.close()
                 except Exception:
                     pass  # Keep rank as None if we can't calculate it
 
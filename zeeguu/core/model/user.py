@@ -1391,9 +1391,13 @@ class User(db.Model):
         Search users by username (partial match) or exact name.
         Returns a list of (User, UserAvatar) tuples. Callers are responsible
         for annotating results with friendship / friend-request data.
+
+        Candidates come from the UserSearchTrigram index (which also leaves
+        out anonymous users), so only those rows are checked and ranked.
         """
         from sqlalchemy import or_
         from zeeguu.core.model.user_avatar import UserAvatar
+        from zeeguu.core.model.user_search_trigram import UserSearchTrigram
 
         term = term.lower()
         if not term:
@@ -1418,7 +1422,11 @@ class User(db.Model):
         return (
             db.session.query(cls, UserAvatar)
             .select_from(cls)
-            .filter(or_(*filters), cls.id != current_user_id, ~cls.email.endswith(cls.ANONYMOUS_EMAIL_DOMAIN))
+            .filter(
+                cls.id.in_(UserSearchTrigram.matching_user_ids(term)),
+                or_(*filters),
+                cls.id != current_user_id,
+            )
             .outerjoin(UserAvatar, UserAvatar.user_id == cls.id)
             .order_by(
                 relevance,
@@ -0,0 +1,33 @@
+from zeeguu.core.model.db import db
+from zeeguu.core.model.user import User
+
+
+class UserDailyActivity(db.Model):
+    """
+    Per-user, per-day totals of the session durations (in milliseconds),
+    so that the leaderboards don't have to aggregate the raw session tables
+    over the whole period on every request.
+
+    Rows are only written for days listed in DailyActivityRollupDay; see
+    zeeguu.core.leaderboards.daily_activity_rollup.
+    """
+
+    __tablename__ = "user_daily_activity"
+    __table_args__ = dict(mysql_collate="utf8_bin")
+
+    user_id = db.Column(db.Integer, db.ForeignKey(User.id), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+
+    exercise_time = db.Column(db.Integer, default=0, nullable=False)
+    reading_time = db.Column(db.Integer, default=0, nullable=False)
+    listening_time = db.Column(db.Integer, default=0, nullable=False)
+
+    def __init__(self, user_id, day, exercise_time=0, reading_time=0, listening_time=0):
+        self.user_id = user_id
+        self.day = day
+        self.exercise_time = exercise_time
+        self.reading_time = reading_time
+        self.listening_time = listening_time
+
+    def __repr__(self):
+        return f"<UserDailyActivity User:{self.user_id} {self.day}>"
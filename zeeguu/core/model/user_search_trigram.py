@@ -0,0 +1,139 @@
+import unicodedata
+
+import sqlalchemy
+from sqlalchemy import func
+
+from zeeguu.core.model.db import db
+from zeeguu.core.model.user import User
+
+
+class UserSearchTrigram(db.Model):
+    """
+    Search index for the username and name of users, used by User.search.
+
+    For every position in the (normalized) username and name we store the
+    gram of (up to) three characters starting there. A search term of three
+    or more characters can then only occur in users that have all of the
+    term's trigrams; a shorter term is a prefix of one of the user's grams.
+    Both are index range scans, so the substring search no longer has to
+    scan the whole user table. The few candidates that survive are then
+    checked with the original filters.
+
+    Anonymous users are not indexed at all.
+
+    The index is maintained by the mapper events at the bottom of this file;
+    tools/rebuild_user_search_index.py builds it for existing users.
+    """
+
+    __tablename__ = "user_search_trigram"
+    # Binary collation: the grams are normalized in Python, and with a
+    # case/accent-insensitive collation 'abc' and 'äbc' would collide on the PK
+    __table_args__ = {"mysql_collate": "utf8mb4_bin"}
+
+    GRAM_LENGTH = 3
+
+    trigram = db.Column(db.String(GRAM_LENGTH), primary_key=True)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey(User.id, ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+    def __init__(self, trigram, user_id):
+        self.trigram = trigram
+        self.user_id = user_id
+
+    def __repr__(self):
+        return f"<UserSearchTrigram {self.trigram!r} User:{self.user_id}>"
+
+    @staticmethod
+    def normalize(text: str):
+        """
+        Lowercase and strip accents, so that the candidate set is a superset
+        of what the case and accent insensitive MySQL collation would match.
+        """
+        decomposed = unicodedata.normalize("NFKD", text.lower())
+        return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+    @classmethod
+    def grams_for(cls, text: str):
+        if not text:
+            return set()
+        text = cls.normalize(text)
+        return {text[i : i + cls.GRAM_LENGTH] for i in range(len(text))}
+
+    @classmethod
+    def grams_for_user(cls, user: User):
+        if user.email and user.email.endswith(User.ANONYMOUS_EMAIL_DOMAIN):
+            return set()
+        return cls.grams_for(user.username) | cls.grams_for(user.name)
+
+    @classmethod
+    def reindex_user(cls, connection, user: User):
+        """
+        Replaces the grams of the given user. Works on a core connection so
+        that it can be called from within a flush (see the listeners below).
+        """
+        table = cls.__table__
+        connection.execute(table.delete().where(table.c.user_id == user.id))
+
+        grams = cls.grams_for_user(user)
+        if grams:
+            connection.execute(
+                table.insert(),
+                [{"trigram": gram, "user_id": user.id} for gram in sorted(grams)],
+            )
+
+    @classmethod
+    def matching_user_ids(cls, term: str):
+        """
+        Returns a select of the ids of users whose username or name might
+        contain the given term. A superset: callers should still filter.
+        """
+        term = cls.normalize(term)
+
+        if len(term) < cls.GRAM_LENGTH:
+            escaped = (
+                term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            return (
+                sqlalchemy.select(cls.user_id)
+                .where(cls.trigram.like(f"{escaped}%", escape="\\"))
+                .distinct()
+            )
+
+        term_grams = {
+            term[i : i + cls.GRAM_LENGTH]
+            for i in range(len(term) - cls.GRAM_LENGTH + 1)
+        }
+        return (
+            sqlalchemy.select(cls.user_id)
+            .where(cls.trigram.in_(term_grams))
+            .group_by(cls.user_id)
+            .having(func.count(func.distinct(cls.trigram)) == len(term_grams))
+        )
+
+
+_INDEXED_USER_ATTRIBUTES = ("username", "name", "email")
+
+
+@sqlalchemy.event.listens_for(User, "after_insert")
+def index_new_user(mapper, connection, target):
+    UserSearchTrigram.reindex_user(connection, target)
+
+
+@sqlalchemy.event.listens_for(User, "after_update")
+def reindex_updated_user(mapper, connection, target):
+    state = sqlalchemy.inspect(target)
+    if any(
+        state.attrs[attribute].history.has_changes()
+        for attribute in _INDEXED_USER_ATTRIBUTES
+    ):
+        UserSearchTrigram.reindex_user(connection, target)
+
+
+@sqlalchemy.event.listens_for(User, "after_delete")
+def remove_deleted_user_from_index(mapper, connection, target):
+    table = UserSearchTrigram.__table__
+    connection.execute(table.delete().where(table.c.user_id == target.id))
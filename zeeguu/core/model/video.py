@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from sqlalchemy import select
+
 from zeeguu.core.model.db import db
 from zeeguu.core.model.caption import Caption
 from zeeguu.core.model.language import Language
@@ -101,14 +103,9 @@ class Video(db.Model):
         user-shared videos, callers pass enforce_language=False and
         enforce_caption_length=False (the user chose the video, so we don't reject
         it on language detection or caption length)."""
-        from zeeguu.core.elastic.indexing import index_video
-
         # Import here to avoid circular dependency:
         # video -> youtube_api -> util -> compute_fk -> model -> video
-        from zeeguu.core.youtube_api.youtube_api import (
-            fetch_video_info,
-            fetch_channel_info,
-        )
+        from zeeguu.core.youtube_api.youtube_api import fetch_video_info
 
         video = (
             session.query(cls).filter(cls.video_unique_key == video_unique_key).first()
@@ -133,13 +130,67 @@ class Video(db.Model):
         if isinstance(language, str):
             language = session.query(Language).filter_by(code=language).first()
 
-        channel_info = fetch_channel_info(video_info["channelId"])
+        new_videos = cls.create_all(session, [video_info], language)
+        return new_videos[0] if new_videos else None
 
-        thumbnail_url = channel_info["thumbnail"]
-        channel = YTChannel.find_or_create(
-            session, video_info["channelId"], channel_info, thumbnail_url, language
+    @classmethod
+    def existing_unique_keys(cls, session, video_unique_keys):
+        """The ones of video_unique_keys that are already in the DB, with one query"""
+        if not video_unique_keys:
+            return set()
+        return set(
+            session.scalars(
+                select(cls.video_unique_key).where(
+                    cls.video_unique_key.in_(list(video_unique_keys))
+                )
+            )
         )
 
+    @classmethod
+    def create_all(cls, session, video_infos, language):
+        """
+        Stores videos fetched with fetch_video_info / fetch_videos_info.
+        The info of the channels that aren't in the DB yet is fetched in
+        one go (see fetch_channels_info); videos whose channel the API
+        doesn't return are skipped.
+
+        :return: the new videos
+        """
+        from zeeguu.core.youtube_api.youtube_api import fetch_channels_info
+
+        channel_ids = {each["channelId"] for each in video_infos}
+        channels = {
+            channel.channel_id: channel
+            for channel in session.query(YTChannel).filter(
+                YTChannel.channel_id.in_(channel_ids)
+            )
+        }
+        channel_infos = fetch_channels_info(
+            [each for each in channel_ids if each not in channels]
+        )
+
+        new_videos = []
+        for video_info in video_infos:
+            channel_id = video_info["channelId"]
+            if channel_id not in channels:
+                if channel_id not in channel_infos:
+                    print(
+                        f"Channel {channel_id} of video {video_info['video_unique_key']} not found. Skipping..."
+                    )
+                    continue
+                channel_info = channel_infos[channel_id]
+                channels[channel_id] = YTChannel.find_or_create(
+                    session, channel_id, channel_info, channel_info["thumbnail"], language
+                )
+            new_videos.append(
+                cls._create(session, video_info, channels[channel_id], language)
+            )
+        return new_videos
+
+    @classmethod
+    def _create(cls, session, video_info, channel, language):
+        from zeeguu.core.elastic.indexing import index_video
+
         url_object = Url.find_or_create(session, video_info["thumbnail"])
 
         # TODO: Remove this temporary workaround (this is because source_id is unique in video table)
@@ -156,7 +207,7 @@ class Video(db.Model):
             )
 
         new_video = cls(
-            video_unique_key=video_unique_key,
+            video_unique_key=video_info["video_unique_key"],
             title=video_info["title"],
             source=source,
             description=video_info["description"],
@@ -169,42 +220,24 @@ class Video(db.Model):
         )
         session.add(new_video)
 
-        try:
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-
         # Skip captions and topic if video is broken (this also means that the video is not indexed)
-        if video_info["broken"] != 0:
-            return new_video
+        if video_info["broken"] == 0:
+            try:
+                session.flush()
+                Caption.create_all(session, new_video, video_info["captions"])
+                VideoTagMap.create_all(session, new_video, video_info["tags"])
+            except Exception as e:
+                session.rollback()
+                raise e
 
-        # Add captions
         try:
-            for caption in video_info["captions"]:
-                new_caption = Caption.create(
-                    session=session,
-                    video=new_video,
-                    time_start=caption["time_start"],
-                    time_end=caption["time_end"],
-                    text=caption["text"],
-                )
-                session.add(new_caption)
             session.commit()
         except Exception as e:
             session.rollback()
             raise e
 
-        try:
-            for tag_text in video_info["tags"]:
-                new_tag = VideoTag.find_or_create(session, tag_text)
-                video_tag_map = VideoTagMap.find_or_create(
-                    session, video=new_video, tag=new_tag
-                )
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
+        if video_info["broken"] != 0:
+            return new_video
 
         # add topic
         print("Adding topic")
@@ -212,7 +245,7 @@ class Video(db.Model):
             new_video.assign_inferred_topics(session)
         except Exception as e:
             print(
-                f"Error adding topic to video ({video_unique_key}) with elastic search: {e}"
+                f"Error adding topic to video ({new_video.video_unique_key}) with elastic search: {e}"
             )
             print("Video will be saved without a topic for now.")
             session.rollback()
@@ -1,3 +1,5 @@
+from sqlalchemy import select
+
 from zeeguu.core.model.db import db
 
 
@@ -38,3 +40,33 @@ class VideoTag(db.Model):
             raise e
 
         return new_tag
+
+    @classmethod
+    def find_or_create_all(cls, session, tag_texts):
+        """
+        find_or_create for many tags at once, without committing: one query
+        for the tags that exist, one insert for the missing ones, and one
+        query for their ids.
+
+        :return: dict from tag text to VideoTag id
+        """
+        tag_texts = list(dict.fromkeys(tag_texts))
+        if not tag_texts:
+            return {}
+
+        ids = cls._ids_by_tag(session, tag_texts)
+        missing = [each for each in tag_texts if each not in ids]
+        if missing:
+            session.execute(cls.__table__.insert(), [dict(tag=each) for each in missing])
+            ids.update(cls._ids_by_tag(session, missing))
+        return ids
+
+    @classmethod
+    def _ids_by_tag(cls, session, tag_texts):
+        ids = {}
+        for tag_id, tag in session.execute(
+            select(cls.id, cls.tag).where(cls.tag.in_(tag_texts)).order_by(cls.id)
+        ):
+            # tag is not unique: the oldest row, if there are duplicates
+            ids.setdefault(tag, tag_id)
+        return ids
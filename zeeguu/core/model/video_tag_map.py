@@ -35,3 +35,26 @@ class VideoTagMap(db.Model):
             session.add(new_v_t_map)
             session.commit()
             return new_v_t_map
+
+    @classmethod
+    def create_all(cls, session, video, tag_texts):
+        """
+        Maps a new video to all of its tags (see VideoTag.find_or_create_all)
+        with one executemany, without committing.
+        """
+        from zeeguu.core.model.video_tag import VideoTag
+
+        tag_ids = VideoTag.find_or_create_all(session, tag_texts)
+        if not tag_ids:
+            return
+
+        if video.id is None:
+            session.flush()
+
+        session.execute(
+            cls.__table__.insert(),
+            [
+                dict(video_id=video.id, tag_id=each)
+                for each in sorted(set(tag_ids.values()))
+            ],
+        )
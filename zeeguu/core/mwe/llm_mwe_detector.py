@@ -19,9 +19,9 @@ import hashlib
 import logging
 import re
 from typing import List, Dict, Optional
-from threading import Lock
 
 from zeeguu.core.llm_services import models
+from zeeguu.core.utils.caching import named_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +36,8 @@ LANG_NAMES = {
 # MWE Cache - In-memory cache for batch MWE results
 # =============================================================================
 
-_mwe_cache: Dict[str, List] = {}
-_mwe_cache_lock = Lock()
 _MWE_CACHE_MAX_SIZE = 500
+_mwe_cache = named_cache("mwe_results", max_entries=_MWE_CACHE_MAX_SIZE)
 
 
 def _get_cache_key(language_code: str, sentences: List[List[Dict]]) -> str:
@@ -52,28 +51,19 @@ def _get_cache_key(language_code: str, sentences: List[List[Dict]]) -> str:
 
 def _get_cached_mwe(cache_key: str) -> Optional[List]:
     """Get cached MWE results if available."""
-    with _mwe_cache_lock:
-        return _mwe_cache.get(cache_key)
+    return _mwe_cache.get(cache_key)
 
 
 def _set_cached_mwe(cache_key: str, results: List) -> None:
-    """Cache MWE results with simple LRU eviction."""
-    with _mwe_cache_lock:
-        if len(_mwe_cache) >= _MWE_CACHE_MAX_SIZE:
-            # Remove first 10% of entries
-            keys_to_remove = list(_mwe_cache.keys())[:_MWE_CACHE_MAX_SIZE // 10]
-            for k in keys_to_remove:
-                del _mwe_cache[k]
-        _mwe_cache[cache_key] = results
+    """Cache MWE results; the least recently used ones are evicted."""
+    _mwe_cache.set(cache_key, results)
 
 
 def clear_mwe_cache() -> int:
     """Clear the MWE cache. Returns number of entries cleared."""
-    with _mwe_cache_lock:
-        count = len(_mwe_cache)
-        _mwe_cache.clear()
-        logger.info(f"Cleared {count} entries from MWE cache")
-        return count
+    count = _mwe_cache.clear()
+    logger.info(f"Cleared {count} entries from MWE cache")
+    return count
 
 
 class LLMMWEStrategy:
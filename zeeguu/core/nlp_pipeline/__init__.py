@@ -1,23 +1,79 @@
-from .spacy_wrapper import SpacyWrapper
-from .confusion_generator import NoiseGenerator
-from .automatic_gec_tagging import AutoGECTagging
-from .reduce_context import ContextReducer
-import confusionwords
-from confusionwords import ConfusionSets
-
-# Initialize the models, use the WV.
-SPACY_EN_MODEL = SpacyWrapper("english", False, True)
-SPACY_DK_MODEL = SpacyWrapper("danish", False, True)
-SPACY_DE_MODEL = SpacyWrapper("german", False, True)
-
-SpacyWrappers = {"en": SPACY_EN_MODEL, "da": SPACY_DK_MODEL, "de": SPACY_DE_MODEL}
-
-NoiseWordsGenerator = {
-    "da": NoiseGenerator(SPACY_DK_MODEL, "danish",
-                         confusionwords.ConfusionSets["da"].get_lemma_set(),
-                         confusionwords.ConfusionSets["da"].get_filter_dictionary(),
-                         confusionwords.ConfusionSets["da"].word_list)
-}
-AutoGECTagger = {
-    "da": AutoGECTagging(SPACY_DK_MODEL, "danish")
+import importlib
+import os
+
+from .lazy_registry import LazyRegistry
+
+# The models are loaded on first use (not at import time) since the
+# endpoints that need them are rarely called and each *_md model costs
+# several seconds of startup and a few hundred MB of RAM per worker.
+# Optionally, set NLP_PIPELINE_IDLE_EVICTION_SECONDS to drop models that
+# have not been used for a while.
+_idle_eviction_seconds = os.environ.get("NLP_PIPELINE_IDLE_EVICTION_SECONDS")
+NLP_PIPELINE_IDLE_EVICTION_SECONDS = (
+    int(_idle_eviction_seconds) if _idle_eviction_seconds else None
+)
+
+
+# The classes are imported on first use too: they all import spacy, which
+# is slow to import and not installed everywhere this package is imported
+_CLASS_MODULES = {
+    "SpacyWrapper": ".spacy_wrapper",
+    "NoiseGenerator": ".confusion_generator",
+    "AutoGECTagging": ".automatic_gec_tagging",
+    "ContextReducer": ".reduce_context",
 }
+
+
+def __getattr__(name):
+    if name in _CLASS_MODULES:
+        module = importlib.import_module(_CLASS_MODULES[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _danish_noise_generator():
+    import confusionwords
+
+    from .confusion_generator import NoiseGenerator
+
+    confusion_set = confusionwords.ConfusionSets["da"]
+    return NoiseGenerator(
+        SpacyWrappers["da"],
+        "danish",
+        confusion_set.get_lemma_set(),
+        confusion_set.get_filter_dictionary(),
+        confusion_set.word_list,
+    )
+
+
+def _spacy_wrapper(language):
+    from .spacy_wrapper import SpacyWrapper
+
+    return SpacyWrapper(language, False, True)
+
+
+def _danish_gec_tagger():
+    from .automatic_gec_tagging import AutoGECTagging
+
+    return AutoGECTagging(SpacyWrappers["da"], "danish")
+
+
+# Use the WV models.
+SpacyWrappers = LazyRegistry(
+    {
+        "en": lambda: _spacy_wrapper("english"),
+        "da": lambda: _spacy_wrapper("danish"),
+        "de": lambda: _spacy_wrapper("german"),
+    },
+    idle_eviction_seconds=NLP_PIPELINE_IDLE_EVICTION_SECONDS,
+)
+
+NoiseWordsGenerator = LazyRegistry(
+    {"da": _danish_noise_generator},
+    idle_eviction_seconds=NLP_PIPELINE_IDLE_EVICTION_SECONDS,
+)
+
+AutoGECTagger = LazyRegistry(
+    {"da": _danish_gec_tagger},
+    idle_eviction_seconds=NLP_PIPELINE_IDLE_EVICTION_SECONDS,
+)
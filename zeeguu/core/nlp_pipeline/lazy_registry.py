@@ -0,0 +1,95 @@
+import threading
+import time
+
+from zeeguu.logging import log
+
+
+class LazyRegistry:
+    """
+    Dictionary-like registry whose values are only built on first access.
+
+    The spaCy pipelines and the generators built on top of them take seconds
+    and hundreds of MB to load, while the endpoints that use them are rarely
+    called. Registering a factory per key instead of an instance means that
+    a worker only pays for the models it actually serves.
+
+    Initialization is single-flight: when several threads ask for the same
+    key at once, only one runs the factory and the others wait for its result.
+
+    If idle_eviction_seconds is given, instances that have not been accessed
+    for that long are dropped (and rebuilt on the next access).
+    """
+
+    def __init__(self, factories: dict, idle_eviction_seconds=None):
+        self._factories = dict(factories)
+        self._instances = {}
+        self._last_access = {}
+        self._idle_eviction_seconds = idle_eviction_seconds
+        self._registry_lock = threading.Lock()
+        self._key_locks = {key: threading.Lock() for key in self._factories}
+
+    def __contains__(self, key):
+        return key in self._factories
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def keys(self):
+        return self._factories.keys()
+
+    def get(self, key, default=None):
+        if key not in self._factories:
+            return default
+        return self[key]
+
+    def __getitem__(self, key):
+        if key not in self._factories:
+            raise KeyError(key)
+
+        self._evict_idle(except_key=key)
+
+        instance = self._instances.get(key)
+        if instance is None:
+            # Double-checked locking: another thread might be building it
+            with self._key_locks[key]:
+                instance = self._instances.get(key)
+                if instance is None:
+                    start = time.time()
+                    instance = self._factories[key]()
+                    log(
+                        f"LazyRegistry: loaded '{key}' in {time.time() - start:.2f}s"
+                    )
+                    with self._registry_lock:
+                        self._instances[key] = instance
+
+        self._last_access[key] = time.monotonic()
+        return instance
+
+    def is_loaded(self, key):
+        return key in self._instances
+
+    def loaded_keys(self):
+        return list(self._instances.keys())
+
+    def evict(self, key):
+        with self._registry_lock:
+            self._instances.pop(key, None)
+            self._last_access.pop(key, None)
+
+    def _evict_idle(self, except_key=None):
+        if not self._idle_eviction_seconds or not self._instances:
+            return
+
+        now = time.monotonic()
+        with self._registry_lock:
+            for key in list(self._instances.keys()):
+                if key == except_key:
+                    continue
+                last_access = self._last_access.get(key, now)
+                if now - last_access > self._idle_eviction_seconds:
+                    log(f"LazyRegistry: evicting idle '{key}'")
+                    self._instances.pop(key, None)
+                    self._last_access.pop(key, None)
@@ -20,6 +20,12 @@ from zeeguu.core.semantic_vector_api import (
     get_embedding_from_article,
     get_embedding_from_text,
 )
+from zeeguu.core.semantic_search.vector_index import local_vector_index
+
+
+def _articles_and_hits(hit_list):
+    articles = _to_articles_from_ES_hits(hit_list)
+    return [a for a in articles if a is not None and not a.broken], hit_list
 
 
 @time_this
@@ -45,8 +51,22 @@ def articles_like_this_tfidf(article: Article):
 
 @time_this
 def articles_like_this_semantic(article: Article):
+    index = local_vector_index()
+    sem_vec = index.vector_of(article.id) if index is not None else None
+    if sem_vec is None:
+        sem_vec = get_embedding_from_article(article)
+    if sem_vec is None:
+        # Embedding service unavailable, return empty results
+        return [], []
+
+    if index is not None:
+        found = index.search(
+            sem_vec, 10, language=article.language.name, exclude_ids=[article.id]
+        )
+        return _articles_and_hits(index.hits(found))
+
     query_body = build_elastic_semantic_sim_query_for_article(
-        10, article.language, get_embedding_from_article(article), article
+        10, article.language, sem_vec, article
     )
     final_article_mix = []
 
@@ -76,7 +96,12 @@ def get_article_w_topics_based_on_text_similarity(text, k: int = 9, filter_ids=N
     if embedding is None:
         # Embedding service unavailable, return empty results
         return [], []
-        
+
+    index = local_vector_index()
+    if index is not None:
+        found = index.search(embedding, k, exclude_ids=filter_ids, require_topics=True)
+        return _articles_and_hits(index.hits(found))
+
     query_body = build_elastic_semantic_sim_query_for_topic_cls(
         k, embedding, filter_ids=filter_ids
     )
@@ -136,9 +161,18 @@ def get_topic_classification_based_on_similar_content(
 
 @time_this
 def find_articles_based_on_text(text, k: int = 9):  # hood = (slang) neighborhood
-    query_body = build_elastic_semantic_sim_query_for_text(
-        k, get_embedding_from_text(text)
-    )
+    embedding = get_embedding_from_text(text)
+    if embedding is None:
+        # Embedding service unavailable, return empty results
+        return [], []
+
+    index = local_vector_index()
+    if index is not None:
+        # Only articles: the local index doesn't have the videos
+        found = index.search(embedding, k)
+        return _articles_and_hits(index.hits(found))
+
+    query_body = build_elastic_semantic_sim_query_for_text(k, embedding)
     final_article_mix = []
 
     try:
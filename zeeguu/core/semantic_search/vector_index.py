@@ -0,0 +1,323 @@
+"""
+An in-process index of the article embeddings (sem_vec) in Elasticsearch,
+to answer the semantic similarity lookups without a kNN query to ES.
+
+Turned on with ZEEGUU_LOCAL_VECTOR_INDEX=true. A background thread,
+started with the app (or by the first lookup), loads the embeddings of
+all the articles from ES into one numpy matrix per language (normalized
+rows, float32: ~2KB per article). A lookup is then a brute
+force matrix-vector product, which is exact, unlike ES's approximate kNN,
+and takes milliseconds at the size of the index (tens of thousands of
+articles per language); filters are boolean masks over the rows.
+
+The index is kept fresh in three ways:
+- articles indexed or removed in this process (see zeeguu.core.elastic.
+  indexing) are added or dropped right away
+- every REFRESH_SECONDS, the thread fetches the articles that other
+  processes (the crawler) added to ES since, i.e. with a higher article_id
+- every RECONCILE_SECONDS, the thread loads a fresh index, which then
+  replaces the one in use; this is how the articles that other processes
+  removed, re-embedded or re-tagged catch up
+
+While the index is off, or isn't loaded yet, the lookups go to ES as before.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from zeeguu.logging import log
+
+USE_LOCAL_VECTOR_INDEX = os.environ.get(
+    "ZEEGUU_LOCAL_VECTOR_INDEX", ""
+).lower() in ("1", "true", "yes")
+
+REFRESH_SECONDS = 60
+# Reload the whole index this often
+RECONCILE_SECONDS = 60 * 60
+# Documents per request when loading the index from ES
+PAGE_SIZE = 1000
+# Wait this long before trying to load again after ES failed us
+RETRY_SECONDS = 300
+
+
+class _LanguageSegment:
+    """The rows of one language; grows by doubling, rows are never moved"""
+
+    def __init__(self, dimensions):
+        self.vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self.article_ids = np.zeros(0, dtype=np.int64)
+        self.has_topics = np.zeros(0, dtype=bool)
+        self.alive = np.zeros(0, dtype=bool)
+        self.count = 0
+
+    def append(self, article_id, vector, has_topics):
+        if self.count == len(self.article_ids):
+            capacity = max(64, 2 * self.count)
+            self.vectors = _grown(self.vectors, capacity)
+            self.article_ids = _grown(self.article_ids, capacity)
+            self.has_topics = _grown(self.has_topics, capacity)
+            self.alive = _grown(self.alive, capacity)
+        row = self.count
+        self.vectors[row] = vector
+        self.article_ids[row] = article_id
+        self.has_topics[row] = has_topics
+        self.alive[row] = True
+        self.count += 1
+        return row
+
+    def scores(self, query, exclude_ids, require_topics):
+        """Cosine similarities of the rows, -inf for the rows filtered out"""
+        n = self.count
+        mask = self.alive[:n].copy()
+        if require_topics:
+            mask &= self.has_topics[:n]
+        if exclude_ids:
+            mask &= ~np.isin(self.article_ids[:n], exclude_ids)
+        scores = self.vectors[:n] @ query
+        scores[~mask] = -np.inf
+        return scores
+
+
+def _grown(array, capacity):
+    bigger = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    bigger[: len(array)] = array
+    return bigger
+
+
+def _normalized(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class ArticleVectorIndex:
+    def __init__(self):
+        self._segments = {}
+        # article_id -> (language, row)
+        self._rows = {}
+        # article_id -> titles of the human assigned topics
+        self._topics = {}
+        self._lock = threading.Lock()
+        self.max_article_id = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, article_id, language, sem_vec, topics):
+        """
+        Adds an article, or replaces it if it's already in. topics are
+        the human assigned ones (the "topics" field of the ES document).
+        """
+        vector = _normalized(sem_vec)
+        with self._lock:
+            self._drop(article_id)
+            segment = self._segments.get(language)
+            if segment is None:
+                segment = self._segments[language] = _LanguageSegment(len(vector))
+            row = segment.append(article_id, vector, bool(topics))
+            self._rows[article_id] = (language, row)
+            self._topics[article_id] = list(topics or [])
+            self.max_article_id = max(self.max_article_id, article_id)
+
+    def add_document(self, doc):
+        """add, from an article document as indexed in ES"""
+        if doc.get("article_id") is None or doc.get("sem_vec") is None:
+            return
+        self.add(doc["article_id"], doc["language"], doc["sem_vec"], doc.get("topics"))
+
+    def remove(self, article_id):
+        with self._lock:
+            self._drop(article_id)
+
+    def _drop(self, article_id):
+        # Must be called with self._lock held
+        found = self._rows.pop(article_id, None)
+        if found is not None:
+            language, row = found
+            self._segments[language].alive[row] = False
+            del self._topics[article_id]
+
+    def vector_of(self, article_id):
+        """The (normalized) embedding of the article, or None if it's not in"""
+        with self._lock:
+            found = self._rows.get(article_id)
+            if found is None:
+                return None
+            language, row = found
+            return self._segments[language].vectors[row].copy()
+
+    def hits(self, found):
+        """
+        ES-like hits for the results of search: _score, and a _source with
+        article_id, language and topics (not the rest of the document)
+        """
+        with self._lock:
+            return [
+                {
+                    "_id": str(article_id),
+                    "_score": score,
+                    "_source": {
+                        "article_id": article_id,
+                        "language": self._rows[article_id][0],
+                        "topics": self._topics[article_id],
+                    },
+                }
+                for article_id, score in found
+                if article_id in self._rows
+            ]
+
+    def search(
+        self, query_vector, k, language=None, exclude_ids=None, require_topics=False
+    ):
+        """
+        The k articles most similar to query_vector, as (article_id, score)
+        from the most similar, where score is ES's for cosine similarity,
+        (1 + cosine) / 2.
+
+        :param language: name of the language, as in the ES documents;
+            None for all
+        :param exclude_ids: article ids to leave out
+        :param require_topics: only articles with human assigned topics
+        """
+        query = _normalized(query_vector)
+        exclude_ids = list(exclude_ids or [])
+        with self._lock:
+            if language is None:
+                segments = list(self._segments.values())
+            elif language in self._segments:
+                segments = [self._segments[language]]
+            else:
+                segments = []
+            candidates = []
+            for segment in segments:
+                scores = segment.scores(query, exclude_ids, require_topics)
+                if len(scores) > k:
+                    best = np.argpartition(-scores, k - 1)[:k]
+                else:
+                    best = np.arange(len(scores))
+                candidates += [
+                    (float(scores[i]), int(segment.article_ids[i]))
+                    for i in best
+                    if scores[i] != -np.inf
+                ]
+
+        candidates.sort(key=lambda each: (-each[0], each[1]))
+        return [(article_id, (1 + cosine) / 2) for cosine, article_id in candidates[:k]]
+
+    def load_from_elasticsearch(self, es, index, after_article_id=0):
+        """
+        Adds the articles of the ES index with an article_id higher than
+        after_article_id, paging through them in article_id order.
+        """
+        query = {"bool": {"filter": [{"exists": {"field": "article_id"}}]}}
+        added = 0
+        while True:
+            hits = es.search(
+                index=index,
+                query=query,
+                sort=[{"article_id": "asc"}],
+                search_after=[after_article_id],
+                size=PAGE_SIZE,
+                source=["article_id", "language", "topics", "sem_vec"],
+            )["hits"]["hits"]
+            for hit in hits:
+                self.add_document(hit["_source"])
+                after_article_id = hit["_source"]["article_id"]
+            added += len(hits)
+            if len(hits) < PAGE_SIZE:
+                return added
+
+
+_index = None
+# The index being loaded from scratch while _index is still in use
+_building = None
+_worker = None
+_worker_lock = threading.Lock()
+_refreshed_at = 0.0
+_reconciled_at = 0.0
+_failed_at = None
+
+
+def local_vector_index():
+    """
+    The ArticleVectorIndex, or None if it is turned off or not loaded yet
+    (then use ES). Never waits for ES: when the index is due for loading
+    or refreshing, that is started in the background.
+    """
+    if not USE_LOCAL_VECTOR_INDEX:
+        return None
+    now = time.monotonic()
+    due = _index is None or now - _refreshed_at >= REFRESH_SECONDS
+    if due and (_failed_at is None or now - _failed_at >= RETRY_SECONDS):
+        load_in_background()
+    return _index
+
+
+def load_in_background():
+    """
+    Starts loading, or refreshing, the index in a daemon thread, unless
+    one is already at it. Returns the thread.
+    """
+    global _worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_update, name="vector-index", daemon=True
+            )
+            _worker.start()
+        return _worker
+
+
+def _update():
+    global _index, _building, _refreshed_at, _reconciled_at, _failed_at
+
+    from elasticsearch import Elasticsearch
+
+    from zeeguu.core.elastic.settings import ES_CONN_STRING, ES_ZINDEX
+
+    start = time.monotonic()
+    reload = _index is None or start - _reconciled_at >= RECONCILE_SECONDS
+    try:
+        es = Elasticsearch(ES_CONN_STRING)
+        if reload:
+            _building = ArticleVectorIndex()
+            added = _building.load_from_elasticsearch(es, ES_ZINDEX)
+            _index = _building
+            _reconciled_at = start
+        else:
+            added = _index.load_from_elasticsearch(
+                es, ES_ZINDEX, _index.max_article_id
+            )
+    except Exception as e:
+        log(f"Vector index: could not load from ES, using ES for now: {e}")
+        _failed_at = time.monotonic()
+        return
+    finally:
+        _building = None
+
+    if reload or added:
+        log(
+            f"Vector index: {added} articles {'loaded' if reload else 'added'}"
+            f" in {time.monotonic() - start:.1f}s, {len(_index)} in all"
+        )
+    _refreshed_at = time.monotonic()
+    _failed_at = None
+
+
+def _loaded_indexes():
+    return {_index, _building} - {None}
+
+
+def article_indexed(doc):
+    """Call with the document of an article just indexed in ES"""
+    for index in _loaded_indexes():
+        index.add_document(doc)
+
+
+def article_removed(article_id):
+    for index in _loaded_indexes():
+        index.remove(article_id)
@@ -1,6 +1,8 @@
 from .retrieve_embeddings import (
     get_embedding_from_article,
+    get_embeddings_from_articles,
     get_embedding_from_text,
     get_embedding_from_video,
     EMB_API_CONN_STRING,
 )
+from .embedding_client import EmbeddingClient
@@ -0,0 +1,127 @@
+import os
+import threading
+
+import numpy as np
+import requests
+
+from zeeguu.core.util import long_hash
+from zeeguu.core.utils.caching import named_cache
+from zeeguu.logging import log
+
+EMB_API_CONN_STRING = os.environ.get(
+    "ZEEGUU_EMB_API_CONN_STRING", "http://127.0.0.1:8000"
+)
+
+# Part of the cache key: change it when the embedding API switches models,
+# so that vectors of the old model are not reused
+EMB_MODEL_ID = os.environ.get("ZEEGUU_EMB_MODEL_ID", EMB_API_CONN_STRING)
+
+MAX_TEXTS_PER_REQUEST = 32
+
+# About 15k vectors of 512 floats; in Redis, shared by all the processes,
+# when ZEEGUU_SHARED_CACHE_URL is set
+_vectors = named_cache("embeddings", max_bytes=64 * 1024 * 1024, shared=True)
+
+
+class EmbeddingClient:
+    """
+    Client of the embedding API that sends up to max_batch_size texts per
+    request, and never asks twice for the same text: the texts of a call are
+    deduplicated, and the vectors cached under (model id, content hash).
+
+    Embedding APIs without the batch endpoint (/get_article_embeddings) are
+    sent one request per distinct text.
+    """
+
+    def __init__(
+        self,
+        base_url=EMB_API_CONN_STRING,
+        model_id=EMB_MODEL_ID,
+        max_batch_size=MAX_TEXTS_PER_REQUEST,
+        timeout=60,
+        cache=_vectors,
+    ):
+        self.base_url = base_url
+        self.model_id = model_id
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.cache = cache
+        self._batch_endpoint_available = True
+        # requests.Session is not thread safe, and this client is shared by
+        # the threads of an API worker
+        self._local = threading.local()
+
+    def embedding(self, text, language=None):
+        return self.embeddings([text], language)[0]
+
+    def embeddings(self, texts, language=None):
+        """
+        The vectors of the texts (lists of floats, in the same order),
+        all in the given language
+        """
+        keys = [self._cache_key(text, language) for text in texts]
+
+        vectors = {}
+        to_compute = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in to_compute:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                to_compute[key] = text
+            else:
+                vectors[key] = cached
+
+        pending = list(to_compute.items())
+        for start in range(0, len(pending), self.max_batch_size):
+            batch = pending[start : start + self.max_batch_size]
+            computed = self._request([text for _, text in batch], language)
+            for (key, _), vector in zip(batch, computed):
+                vector = np.asarray(vector, dtype=np.float64)
+                self.cache.set(key, vector)
+                vectors[key] = vector
+
+        return [vectors[key].tolist() for key in keys]
+
+    def _cache_key(self, text, language):
+        return self.model_id, long_hash(f"{language or ''}\n{text}")
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _request(self, texts, language):
+        if self._batch_endpoint_available:
+            data = {"article_contents": texts}
+            if language:
+                data["article_language"] = language
+            r = self._session().post(
+                f"{self.base_url}/get_article_embeddings", json=data, timeout=self.timeout
+            )
+            if r.status_code in (404, 405):
+                log("Embedding API has no batch endpoint; sending one text per request")
+                self._batch_endpoint_available = False
+            else:
+                r.raise_for_status()
+                return _checked(r.json()["embeddings"], len(texts))
+
+        return [self._request_one(text, language) for text in texts]
+
+    def _request_one(self, text, language):
+        data = {"article_content": text}
+        if language:
+            data["article_language"] = language
+        r = self._session().post(
+            f"{self.base_url}/get_article_embedding", json=data, timeout=self.timeout
+        )
+        r.raise_for_status()
+        return _checked([r.json()], 1)[0]
+
+
+def _checked(vectors, expected_count):
+    if len(vectors) != expected_count or not all(
+        isinstance(vector, list) for vector in vectors
+    ):
+        raise ValueError(f"Unexpected response from the embedding API: {vectors!r:.200}")
+    return vectors
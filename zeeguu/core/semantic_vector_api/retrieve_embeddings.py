@@ -1,48 +1,48 @@
-import os
-import requests
-from zeeguu.core.model import Article
-
+from collections import defaultdict
 
-EMB_API_CONN_STRING = os.environ.get(
-    "ZEEGUU_EMB_API_CONN_STRING", "http://127.0.0.1:8000"
+from zeeguu.core.model import Article
+from zeeguu.core.semantic_vector_api.embedding_client import (
+    EMB_API_CONN_STRING,
+    EmbeddingClient,
 )
 
+# Shared by all the callers, so that they share the batch endpoint detection
+embedding_client = EmbeddingClient()
+
 
 def get_embedding_from_video(v):
 
     # TODO: At some point update the Embedding API to not talk only about articles
-    r = requests.post(
-        url=f"{EMB_API_CONN_STRING}/get_article_embedding",
-        json={
-            "article_content": v.get_content(),
-            "article_language": v.language.name.lower(),
-        },
-        timeout=60,
-    )
-    return r.json()
+    return embedding_client.embedding(v.get_content(), v.language.name.lower())
 
 
 def get_embedding_from_article(a: Article):
-    r = requests.post(
-        url=f"{EMB_API_CONN_STRING}/get_article_embedding",
-        json={
-            "article_content": a.get_content(),
-            "article_language": a.language.name.lower(),
-        },
-        timeout=60,
-    )
-    return r.json()
+    return embedding_client.embedding(a.get_content(), a.language.name.lower())
+
+
+def get_embeddings_from_articles(articles):
+    """
+    The embeddings of the articles, in the same order; batched per language,
+    and cached, so a later get_embedding_from_article of any of them does not
+    call the API again
+    """
+    by_language = defaultdict(list)
+    for position, article in enumerate(articles):
+        by_language[article.language.name.lower()].append(position)
+
+    embeddings = [None] * len(articles)
+    for language, positions in by_language.items():
+        vectors = embedding_client.embeddings(
+            [articles[position].get_content() for position in positions], language
+        )
+        for position, vector in zip(positions, vectors):
+            embeddings[position] = vector
+    return embeddings
 
 
 def get_embedding_from_text(text: str, language: str = None):
-    data = {
-        "article_content": text,
-    }
-    if language:
-        data["article_language"] = language
     try:
-        r = requests.post(url=f"{EMB_API_CONN_STRING}/get_article_embedding", json=data, timeout=60)
-        return r.json()
+        return embedding_client.embedding(text, language)
     except Exception as e:
         print(f"Warning: Embedding service unavailable: {e}")
         return None
@@ -0,0 +1,64 @@
+"""
+A stand-in for the embedding API, for benchmarking and developing offline.
+
+Serves /get_article_embedding and /get_article_embeddings like the real
+API, with unit vectors derived from the SHA-256 of (language, text): the
+same text always gets the same vector, and different texts get unrelated
+ones. Each request sleeps request_overhead seconds plus per_text_latency
+seconds per text, to model the cost of the round trip and of the model.
+
+Usage:
+    python -m zeeguu.core.semantic_vector_api.stub_server [--port 8000] [--request-overhead 0.005] [--per-text-latency 0.001]
+"""
+
+import argparse
+import hashlib
+import time
+
+import numpy as np
+from flask import Flask, jsonify, request
+
+DIMENSIONS = 512
+
+
+def stub_embedding(text, language=None, dimensions=DIMENSIONS):
+    seed = hashlib.sha256(f"{language or ''}\n{text}".encode("utf-8")).digest()
+    rng = np.random.default_rng(int.from_bytes(seed[:8], "little"))
+    vector = rng.standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def create_stub_app(request_overhead=0.005, per_text_latency=0.001):
+    app = Flask("embedding-api-stub")
+    app.config["request_count"] = 0
+
+    def computed(texts, language):
+        app.config["request_count"] += 1
+        time.sleep(request_overhead + per_text_latency * len(texts))
+        return [stub_embedding(text, language) for text in texts]
+
+    @app.route("/get_article_embedding", methods=["POST"])
+    def get_article_embedding():
+        data = request.get_json()
+        [vector] = computed([data["article_content"]], data.get("article_language"))
+        return jsonify(vector)
+
+    @app.route("/get_article_embeddings", methods=["POST"])
+    def get_article_embeddings():
+        data = request.get_json()
+        vectors = computed(data["article_contents"], data.get("article_language"))
+        return jsonify({"embeddings": vectors})
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--request-overhead", type=float, default=0.005)
+    parser.add_argument("--per-text-latency", type=float, default=0.001)
+    args = parser.parse_args()
+
+    create_stub_app(args.request_overhead, args.per_text_latency).run(
+        port=args.port, threaded=True
+    )
@@ -150,6 +150,15 @@ def mock_requests_get(m):
         f"{EMB_API_CONN_STRING}/get_article_embedding",
         json=np.random.random(512).tolist(),
     )
+    m.post(
+        f"{EMB_API_CONN_STRING}/get_article_embeddings",
+        json=lambda request, context: {
+            "embeddings": [
+                np.random.random(512).tolist()
+                for _ in request.json()["article_contents"]
+            ]
+        },
+    )
 
 
 def mock_readability_call(url):
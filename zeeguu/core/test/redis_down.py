@@ -0,0 +1,30 @@
+"""
+A Redis that went down, for testing that the shared caches (see
+zeeguu.core.utils.caching) keep working without it.
+"""
+
+from unittest.mock import patch
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from zeeguu.core.utils import caching
+
+
+class UnreachableRedis:
+    """A Redis client for which every command fails to connect"""
+
+    def __getattr__(self, command):
+        def fail(*args, **kwargs):
+            raise RedisConnectionError("Connection refused")
+
+        return fail
+
+
+def cache_with_redis_down(name, **policy):
+    """A shared Cache, kept in a Redis that fails every command"""
+
+    def redis_that_went_down(name):
+        return caching.RedisBackend(UnreachableRedis(), name)
+
+    with patch.object(caching, "_shared_backend", redis_that_went_down):
+        return caching.Cache(name, shared=True, **policy)
@@ -0,0 +1,50 @@
+import zeeguu.core
+from zeeguu.core.model import AnswerVariant, Language, Meaning, Phrase
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+
+session = zeeguu.core.model.db.session
+
+
+class AnswerVariantTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+        self.danish = Language.find_or_create("da")
+        self.english = Language.find_or_create("en")
+
+    def _meaning(self, origin, translation, origin_language="da"):
+        # Not Meaning.find_or_create: its phrases compute their rank in a
+        # background thread, which trips over the test's sqlite session
+        meaning = Meaning(
+            Phrase(origin, Language.find_or_create(origin_language)),
+            Phrase(translation, self.english),
+        )
+        session.add(meaning)
+        session.commit()
+        return meaning
+
+    def _answers(self, cue):
+        return AnswerVariant.answers_for_cue(self.danish.id, self.english.id, cue, 20)
+
+    def test_new_meanings_are_indexed_under_their_cue(self):
+        self._meaning("Bolden", "ball")
+        self._meaning("forår", "spring")
+        self._meaning("fjeder", "Spring ")
+
+        assert self._answers("ball") == [("Bolden", "bolden")]
+        assert self._answers("SPRING") == [("forår", "forår"), ("fjeder", "fjeder")]
+
+    def test_invalidated_meanings_leave_the_index(self):
+        meaning = self._meaning("bold", "ball")
+
+        meaning.validated = Meaning.INVALID
+        session.commit()
+        assert self._answers("ball") == []
+
+        meaning.validated = Meaning.VALID
+        session.commit()
+        assert self._answers("ball") == [("bold", "bold")]
+
+    def test_languages_without_a_normalizer_are_not_indexed(self):
+        self._meaning("Ball", "ball", origin_language="de")
+
+        assert session.query(AnswerVariant).count() == 0
@@ -52,3 +52,51 @@ class ArticleTest(ModelTestMixIn, TestCase):
         assert len(self.article2.topics) == 1
         assert health_society in article2_topics
         assert TopicOriginType.HARDSET == self.article2.topics[0].origin_type
+
+    def test_create_article_fragments(self):
+        from zeeguu.core.model import ArticleFragment
+        from zeeguu.core.model.new_text import NewText
+
+        existing_text = NewText.find_or_create(session, "Second paragraph.")
+        self.article1.htmlContent = (
+            "<h1>Title</h1><p> First paragraph. </p><p>Second paragraph.</p>"
+            "<ul><li>Item</li></ul><p></p><p>First paragraph.</p>"
+        )
+
+        self.article1.create_article_fragments(session)
+        session.commit()
+
+        fragments = ArticleFragment.get_all_article_fragments_in_order(self.article1.id)
+        assert [(f.order, f.formatting, f.text.content) for f in fragments] == [
+            (0, "h1", "Title"),
+            (1, "p", "First paragraph."),
+            (2, "p", "Second paragraph."),
+            (3, "li", "Item"),
+            (4, "p", "First paragraph."),
+        ]
+        assert fragments[1].text_id == fragments[4].text_id
+        assert fragments[2].text_id == existing_text.id
+
+        # Fragments that are already there are not created again
+        self.article1.create_article_fragments(session)
+        session.commit()
+        assert len(ArticleFragment.get_all_article_fragments_in_order(self.article1.id)) == 5
+
+    def test_find_by_content_and_source(self):
+        from zeeguu.core.model import Article
+
+        article = self.article1
+        preview = article.content[:1000]
+
+        def find(title, content_preview, feed_id=article.feed_id):
+            return Article.find_by_content_and_source(
+                title, content_preview, feed_id, article.language_id
+            )
+
+        assert find(article.title, preview) == article
+        # Re-crawls that differ in spacing and case, with a typo in the title
+        assert find(article.title[:-1] + "#", "  " + preview.upper()) == article
+
+        assert find(article.title, preview + " More") is None
+        assert find("Something else entirely", preview) is None
+        assert find(article.title, preview, feed_id=article.feed_id + 1) is None
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import zeeguu.core
+from zeeguu.core.content_retriever.article_enrichment import (
+    NO_TOPIC_PRIORITY,
+    topic_demand_priority,
+)
+from zeeguu.core.model import ArticleEnrichmentJob
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.article_rule import ArticleRule
+
+session = zeeguu.core.model.db.session
+
+
+class ArticleEnrichmentJobTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+        self.article_1 = ArticleRule().article
+        self.article_2 = ArticleRule().article
+
+    def test_enqueue_is_idempotent(self):
+        first = ArticleEnrichmentJob.enqueue(session, self.article_1, "deepseek")
+        session.commit()
+        second = ArticleEnrichmentJob.enqueue(session, self.article_1, "deepseek")
+        session.commit()
+
+        assert first.id == second.id
+        assert ArticleEnrichmentJob.query.count() == 1
+
+    def test_claims_by_priority_and_provider(self):
+        ArticleEnrichmentJob.enqueue(session, self.article_1, "deepseek", priority=5)
+        ArticleEnrichmentJob.enqueue(session, self.article_2, "deepseek", priority=1)
+        session.commit()
+
+        assert ArticleEnrichmentJob.claim_next(session, "anthropic") is None
+
+        job = ArticleEnrichmentJob.claim_next(session, "deepseek")
+        assert job.article_id == self.article_2.id
+        assert job.status == ArticleEnrichmentJob.RUNNING
+        assert job.attempts == 1
+
+        assert ArticleEnrichmentJob.claim_next(session, "deepseek").article_id == self.article_1.id
+        assert ArticleEnrichmentJob.claim_next(session, "deepseek") is None
+
+    def test_failed_job_is_retried_later_then_given_up(self):
+        job = ArticleEnrichmentJob.enqueue(session, self.article_1, "deepseek")
+        session.commit()
+
+        for _ in range(ArticleEnrichmentJob.MAX_ATTEMPTS - 1):
+            assert ArticleEnrichmentJob.claim_next(session, "deepseek") is job
+            job.mark_failed(session, TimeoutError("LLM timeout"))
+            assert job.status == ArticleEnrichmentJob.PENDING
+            assert job.next_attempt_at > datetime.now()
+            assert ArticleEnrichmentJob.claim_next(session, "deepseek") is None
+
+            job.next_attempt_at = datetime.now() - timedelta(seconds=1)
+            session.commit()
+
+        assert ArticleEnrichmentJob.claim_next(session, "deepseek") is job
+        job.mark_failed(session, TimeoutError("LLM timeout"))
+        assert job.status == ArticleEnrichmentJob.FAILED
+
+    def test_stale_running_job_is_handed_out_again(self):
+        job = ArticleEnrichmentJob.enqueue(session, self.article_1, "deepseek")
+        session.commit()
+        ArticleEnrichmentJob.claim_next(session, "deepseek")
+
+        job.started_at = datetime.now() - timedelta(
+            seconds=ArticleEnrichmentJob.STALE_AFTER_SECONDS + 1
+        )
+        session.commit()
+
+        assert ArticleEnrichmentJob.claim_next(session, "deepseek") is job
+        assert job.attempts == 2
+
+    def test_least_served_topic_goes_first(self):
+        counts = {(1, 10): 7, (1, 11): 2}
+
+        assert topic_demand_priority(1, [10, 11], counts) == 2
+        assert topic_demand_priority(1, [12], counts) == 0
+        assert topic_demand_priority(1, [], counts) == NO_TOPIC_PRIORITY
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+
+from elasticsearch import Elasticsearch
+from werkzeug.serving import make_server
+
+from zeeguu.core.elastic.bulk_reindex import Checkpoint, reindex_articles
+from zeeguu.core.elastic.stub_server import create_stub_app
+from zeeguu.core.model import ArticleTopicMap
+from zeeguu.core.model.article_topic_map import TopicOriginType
+from zeeguu.core.model.db import db
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.article_rule import ArticleRule
+from zeeguu.core.test.rules.topic_rule import TopicRule
+
+INDEX = "zeeguu-test"
+
+
+class BulkReindexTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+        topic = TopicRule.get_or_create_topic(1)
+        self.articles = [ArticleRule().article for _ in range(5)]
+        for article in self.articles[:4]:
+            db.session.add(ArticleTopicMap(article, topic, TopicOriginType.HARDSET))
+        # Has only an inferred topic
+        db.session.add(
+            ArticleTopicMap(self.articles[4], topic, TopicOriginType.INFERRED)
+        )
+        db.session.commit()
+
+        self.server = make_server(
+            "127.0.0.1", 0, create_stub_app(request_overhead=0, per_doc_latency=0)
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.es = Elasticsearch(f"http://127.0.0.1:{self.server.server_port}")
+
+        folder = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(folder, "checkpoint.json")
+
+    def tearDown(self):
+        self.server.shutdown()
+        super().tearDown()
+
+    def _reindex(self, **kwargs):
+        return reindex_articles(
+            self.app,
+            self.es,
+            Checkpoint(self.checkpoint_path),
+            chunk_size=2,
+            workers=2,
+            index=INDEX,
+            **kwargs,
+        )
+
+    def _indexed_ids(self):
+        hits = self.es.search(index=INDEX, size=100)["hits"]["hits"]
+        return sorted(hit["_source"]["article_id"] for hit in hits)
+
+    def test_indexes_the_articles_with_topics(self):
+        progress = self._reindex()
+
+        expected = sorted(article.id for article in self.articles[:4])
+        assert self._indexed_ids() == expected
+        assert progress.indexed == 4
+        assert Checkpoint(self.checkpoint_path).last_id == expected[-1]
+
+    def test_an_interrupted_run_is_resumed(self):
+        self._reindex(limit=2)
+        assert len(self._indexed_ids()) == 2
+
+        progress = self._reindex()
+
+        assert progress.indexed == 2
+        assert self._indexed_ids() == sorted(a.id for a in self.articles[:4])
+
+    def test_articles_already_in_the_index_are_skipped(self):
+        self.es.index(index=INDEX, document={"article_id": self.articles[1].id})
+
+        progress = self._reindex()
+
+        assert progress.indexed == 3
+        assert self._indexed_ids() == sorted(a.id for a in self.articles[:4])
+
+    def test_a_deleted_index_is_indexed_again(self):
+        self._reindex()
+        self.es.indices.delete(index=INDEX)
+        os.remove(self.checkpoint_path)
+
+        progress = self._reindex()
+
+        assert progress.indexed == 4
+        assert self._indexed_ids() == sorted(a.id for a in self.articles[:4])
+
+    def test_articles_without_topics_include_those_not_marked_broken(self):
+        article = ArticleRule().article
+        article.broken = None
+        db.session.commit()
+
+        self._reindex(with_topics=False)
+
+        assert self._indexed_ids() == [article.id]
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.test.redis_down import UnreachableRedis, cache_with_redis_down
+from zeeguu.core.utils import caching
+from zeeguu.core.utils.caching import (
+    Cache,
+    cache_on_data_keys,
+    clear_all_caches,
+    register_cache,
+)
+
+
+class CacheTest(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = Cache("test-lru", max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.get("a")
+        cache["c"] = 3
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_size_limit_in_bytes(self):
+        cache = Cache("test-bytes", max_bytes=1000)
+        cache["a"] = "x" * 600
+        cache["b"] = "y" * 600
+
+        assert "a" not in cache
+        assert "b" in cache
+        assert cache.stats()["bytes"] <= 1000
+
+    def test_entries_expire(self):
+        cache = Cache("test-ttl", ttl_seconds=0.05)
+        cache["a"] = 1
+        assert cache.get("a") == 1
+
+        time.sleep(0.1)
+
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    @patch.object(caching.SQLiteBackend, "USE_RESOLUTION_SECONDS", 0)
+    def test_sqlite_entries_outlive_the_cache(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+        cache = Cache("test-sqlite", max_entries=2, path=path)
+        cache["a"] = {"text": "Hej"}
+        time.sleep(0.01)
+        cache["b"] = 2
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache["c"] = 3
+
+        reopened = Cache("test-sqlite", path=path)
+        assert reopened.get("a") == {"text": "Hej"}
+        assert "b" not in reopened
+        assert reopened.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["backend"] == "sqlite"
+
+    def test_sqlite_entries_over_max_bytes_are_evicted(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+        cache = Cache("test-sqlite-bytes", max_bytes=250, path=path)
+        cache["a"] = "a" * 100
+        time.sleep(0.01)
+        cache["b"] = "b" * 100
+        time.sleep(0.01)
+        cache["c"] = "c" * 100
+        time.sleep(0.01)
+        cache["d"] = "d" * 1000
+
+        assert "c" not in cache
+        assert cache.get("d") == "d" * 1000
+        assert cache.stats()["evictions"] == 3
+
+    def test_sqlite_entries_are_not_cleared_between_tests(self):
+        path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+        cache = register_cache(Cache("test-sqlite-persistent", path=path))
+        cache["a"] = 1
+
+        clear_all_caches()
+
+        assert cache.get("a") == 1
+
+    def test_redis_failures_are_misses(self):
+        cache = cache_with_redis_down("test-redis-down")
+
+        cache["a"] = 1
+        assert cache.get("a") is None
+        assert cache.get_or_load("a", lambda: 2) == 2
+        del cache["a"]
+        cache.clear()
+        assert cache.stats()["backend"] == "redis"
+
+    def test_unreachable_redis_falls_back_to_memory(self):
+        with patch.multiple(
+            caching, SHARED_CACHE_URL="redis://localhost:1", _redis_client=None
+        ), patch("redis.Redis.from_url", lambda *a, **k: UnreachableRedis()):
+            cache = Cache("test-redis-unreachable", shared=True)
+
+        cache["a"] = 1
+        assert cache.get("a") == 1
+        assert cache.stats()["backend"] == "memory"
+
+    def test_none_is_cached(self):
+        cache = Cache("test-none")
+        calls = []
+
+        def load():
+            calls.append(1)
+            return None
+
+        assert cache.get_or_load("a", load) is None
+        assert cache.get_or_load("a", load) is None
+        assert calls == [1]
+
+    def test_concurrent_misses_load_once(self):
+        cache = Cache("test-single-flight")
+        calls = []
+
+        def load():
+            time.sleep(0.1)
+            calls.append(1)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_or_load("a", load)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["value"] * 8
+        assert calls == [1]
+        assert cache.stats()["loads"] == 1
+
+    def test_failed_load_is_not_cached(self):
+        cache = Cache("test-failure")
+
+        def fail():
+            raise ValueError("no")
+
+        with self.assertRaises(ValueError):
+            cache.get_or_load("a", fail)
+
+        assert "a" not in cache
+        assert cache.get_or_load("a", lambda: 1) == 1
+        assert cache.stats()["load_failures"] == 1
+
+    def test_cache_on_data_keys(self):
+        calls = []
+
+        @cache_on_data_keys("word", name="test-data-keys")
+        def translate(data):
+            calls.append(data["word"])
+            return data["word"].upper()
+
+        assert translate({"word": "hus", "context": "1"}) == "HUS"
+        assert translate({"word": "hus", "context": "2"}) == "HUS"
+        assert calls == ["hus"]
+        assert translate.cache_info()["hits"] == 1
+
+        translate.cache_clear()
+        translate({"word": "hus"})
+        assert calls == ["hus", "hus"]
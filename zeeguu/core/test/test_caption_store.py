@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.youtube_api import caption_store
+from zeeguu.core.youtube_api.caption_store import CaptionStore
+
+
+def _caption(video_unique_key, time_start, text):
+    return {
+        "video_unique_key": video_unique_key,
+        "time_start": time_start,
+        "time_end": time_start + 1000,
+        "text": text,
+    }
+
+
+class CaptionStoreTest(TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "captions.json")
+        self._write(
+            [
+                _caption("aaaaaaaaaaa", 0, "Hej"),
+                _caption("bbbbbbbbbbb", 0, "Hola"),
+                _caption("aaaaaaaaaaa", 1000, "med dig"),
+            ]
+        )
+
+    def _write(self, captions):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(captions, f)
+
+    def test_captions_of_a_video_in_file_order(self):
+        store = CaptionStore(self.path)
+
+        assert store.captions_for("aaaaaaaaaaa") == [
+            {"time_start": 0, "time_end": 1000, "text": "Hej"},
+            {"time_start": 1000, "time_end": 2000, "text": "med dig"},
+        ]
+        assert store.captions_for("ccccccccccc") == []
+
+    def test_index_is_rebuilt_when_the_file_changes(self):
+        store = CaptionStore(self.path)
+        assert len(store.captions_for("aaaaaaaaaaa")) == 2
+
+        self._write([_caption("aaaaaaaaaaa", 0, "Farvel")])
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert [c["text"] for c in store.captions_for("aaaaaaaaaaa")] == ["Farvel"]
+
+    def test_index_is_reused_by_a_new_store(self):
+        CaptionStore(self.path).captions_for("aaaaaaaaaaa")
+        built_at = os.stat(self.path + ".index.sqlite").st_mtime_ns
+
+        assert CaptionStore(self.path).captions_for("bbbbbbbbbbb")[0]["text"] == "Hola"
+        assert os.stat(self.path + ".index.sqlite").st_mtime_ns == built_at
+
+    def test_missing_file(self):
+        os.remove(self.path)
+
+        with self.assertRaises(FileNotFoundError):
+            CaptionStore(self.path).captions_for("aaaaaaaaaaa")
+
+    def test_index_goes_to_the_temporary_folder_if_the_data_folder_is_read_only(self):
+        data_folder = os.path.dirname(self.path)
+        mkstemp = tempfile.mkstemp
+
+        def read_only_data_folder(dir=None, **kwargs):
+            if dir == data_folder:
+                raise PermissionError(30, "Read-only file system")
+            return mkstemp(dir=dir, **kwargs)
+
+        with patch.object(tempfile, "tempdir", tempfile.mkdtemp()), patch.object(
+            caption_store.tempfile, "mkstemp", read_only_data_folder
+        ):
+            store = CaptionStore(self.path)
+            assert store.captions_for("bbbbbbbbbbb")[0]["text"] == "Hola"
+
+        assert not os.path.exists(self.path + ".index.sqlite")
+        assert os.path.dirname(store.index_path) != data_folder
@@ -0,0 +1,86 @@
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from wordstats import LanguageInfo, WordInfo
+
+from zeeguu.core.model import phrase
+from zeeguu.core.model.language import Language
+from zeeguu.core.model.phrase import Phrase
+from zeeguu.core.word_stats.compact_language_info import (
+    UNKNOWN_RANK,
+    CompactLanguageInfo,
+)
+
+# word, occurrences: as in a hermit frequency list, most frequent first
+FREQUENCY_LIST = [("und", 9000), ("hund", 700), ("straße", 300), ("ähnlich", 40)]
+
+
+def _language_info():
+    info = LanguageInfo("xx")
+    for rank, (word, occurrences) in enumerate(FREQUENCY_LIST, start=1):
+        info.word_info_dict[word] = WordInfo(
+            word, "xx", occurrences / 100, (rank - 1) // 500 / 100.0,
+            occurrences / 100, rank, (rank - 1) // 1000 + 1,
+        )
+    return info
+
+
+class CompactLanguageInfoTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.full = _language_info()
+        self.compact = CompactLanguageInfo.build(self.full, self.folder)
+
+    def test_ranks_for(self):
+        words = ["Hund", "ÄHNLICH", "und", "katze", "", "straße" * 20, "straß"]
+
+        assert self.compact.ranks_for(words) == [2, 4, 1] + [UNKNOWN_RANK] * 4
+        assert self.compact.ranks_for([]) == []
+
+    def test_reads_like_language_info(self):
+        for word in ["straße", "Und", "katze"]:
+            expected, actual = self.full[word], self.compact[word]
+            for attribute in ["rank", "frequency", "importance", "difficulty", "klevel"]:
+                assert getattr(actual, attribute) == getattr(expected, attribute)
+
+        assert self.compact.all_words() == self.full.all_words()
+
+    def test_is_opened_from_disk(self):
+        opened = CompactLanguageInfo.open(self.folder, "xx")
+
+        assert len(opened) == len(FREQUENCY_LIST)
+        assert opened.ranks_for(["hund"]) == [2]
+        assert CompactLanguageInfo.open(self.folder, "yy") is None
+
+
+class PhraseRankTest(TestCase):
+    def setUp(self):
+        compact = CompactLanguageInfo.build(_language_info(), tempfile.mkdtemp())
+
+        def ranks_for(words, lang_code):
+            if "???" in words:
+                raise UnicodeError("can't look up ???")
+            return compact.ranks_for(words)
+
+        patcher = patch.object(phrase, "ranks_for", ranks_for)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _rank(self, content):
+        return Phrase(content, Language("xx", "Test"))._compute_rank()
+
+    def test_rank_of_the_rarest_word(self):
+        assert self._rank("und Straße hund") == 3
+
+    def test_a_failing_word_counts_as_very_rare(self):
+        assert self._rank("und ??? hund") == Phrase.IMPOSSIBLE_RANK
+        assert self._rank("??? ???") == Phrase.IMPOSSIBLE_RANK
+
+    def test_words_without_a_rank_do_not_count(self):
+        with patch.object(phrase, "ranks_for", lambda words, code: [None] * len(words)):
+            unranked = Phrase("und hund", Language("xx", "Test"))
+            unranked.ensure_rank_is_calculated()
+            assert unranked._compute_rank() is None
+
+        assert unranked.rank is None
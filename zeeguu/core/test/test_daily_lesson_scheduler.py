@@ -0,0 +1,97 @@
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from zeeguu.core.audio_lessons import daily_lesson_scheduler
+from zeeguu.core.audio_lessons.daily_lesson_scheduler import (
+    DailyLessonScheduler,
+    MeaningToPrepare,
+)
+from zeeguu.core.audio_lessons.script_generator import GeneratedScript
+from zeeguu.core.model import AudioLessonMeaning
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.meaning_rule import MeaningRule
+from zeeguu.core.test.rules.user_rule import UserRule
+from zeeguu.core.test.rules.user_word_rule import UserWordRule
+
+
+class DailyLessonSchedulerTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+        self.ana = UserRule().user
+        self.ben = UserRule().user
+        self.ben.native_language = self.ana.native_language
+
+        shared_meaning = MeaningRule().meaning
+        self.words = [
+            UserWordRule(self.ana, shared_meaning).user_word,
+            UserWordRule(self.ben, shared_meaning).user_word,
+            UserWordRule(self.ben, MeaningRule().meaning).user_word,
+        ]
+
+        self.generator = MagicMock()
+        self.generator.voice_synthesizer.script_segment_requests.return_value = [
+            ("Hej", "woman", "da", 1.0, "en")
+        ]
+        self.generator.voice_synthesizer.get_audio_duration.return_value = 42
+        self.scheduler = DailyLessonScheduler(self.generator, output=lambda text: None)
+
+        self.patches = [
+            patch.object(daily_lesson_scheduler, "ZEEGUU_DATA_FOLDER", tempfile.mkdtemp()),
+            patch.object(
+                daily_lesson_scheduler,
+                "generate_lesson_script",
+                side_effect=lambda **kwargs: GeneratedScript(
+                    f"Woman: {kwargs['origin_word']}", "test-model", "v1"
+                ),
+            ),
+        ]
+        for each in self.patches:
+            each.start()
+        self.generate_lesson_script = daily_lesson_scheduler.generate_lesson_script
+
+    def tearDown(self):
+        for each in self.patches:
+            each.stop()
+        super().tearDown()
+
+    def _prepare(self):
+        self.scheduler.prepare_meanings(
+            MeaningToPrepare(
+                user_word,
+                user_word.user.learned_language.code,
+                user_word.user.native_language.code,
+                "A2",
+            )
+            for user_word in self.words
+        )
+
+    def test_meanings_shared_by_users_are_generated_once(self):
+        self._prepare()
+
+        assert self.generate_lesson_script.call_count == 2
+        # All the scripts' lines go to the TTS in one batch
+        self.generator.voice_synthesizer.synthesize_segments.assert_called_once()
+        assert len(self.generator.voice_synthesizer.synthesize_segments.call_args[0][0]) == 2
+        for user_word in self.words:
+            lesson = AudioLessonMeaning.find(
+                user_word.meaning, teacher_language=self.ana.native_language
+            )
+            assert lesson.duration_seconds == 42
+
+    def test_rerun_does_not_write_the_scripts_again(self):
+        self._prepare()
+        self._prepare()
+
+        assert self.generate_lesson_script.call_count == 2
+
+    def test_failed_script_does_not_stop_the_others(self):
+        self.generate_lesson_script.side_effect = [
+            Exception("LLM down"),
+            GeneratedScript("Woman: hej", "test-model", "v1"),
+        ]
+
+        self._prepare()
+
+        assert self.scheduler.counts["scripts-failed"] == 1
+        assert self.scheduler.counts["scripts-written"] == 1
+        assert self.scheduler.counts["meanings-synthesized"] == 1
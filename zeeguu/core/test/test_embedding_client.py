@@ -0,0 +1,99 @@
+from unittest import TestCase
+
+import requests_mock
+
+from zeeguu.core.semantic_vector_api.embedding_client import EmbeddingClient
+from zeeguu.core.semantic_vector_api.stub_server import stub_embedding
+from zeeguu.core.test.redis_down import cache_with_redis_down
+from zeeguu.core.utils.caching import Cache
+
+API = "http://embeddings.test"
+
+
+def _batch_response(request, context):
+    data = request.json()
+    return {
+        "embeddings": [
+            stub_embedding(text, data.get("article_language"), 8)
+            for text in data["article_contents"]
+        ]
+    }
+
+
+def _single_response(request, context):
+    data = request.json()
+    return stub_embedding(data["article_content"], data.get("article_language"), 8)
+
+
+class EmbeddingClientTest(TestCase):
+    def setUp(self):
+        self.cache = Cache("test-embeddings")
+        self.client = EmbeddingClient(
+            API, model_id="test-model", max_batch_size=2, cache=self.cache
+        )
+
+    def test_distinct_texts_are_sent_in_batches(self):
+        with requests_mock.Mocker() as m:
+            batch = m.post(f"{API}/get_article_embeddings", json=_batch_response)
+
+            vectors = self.client.embeddings(["a", "b", "a", "c", "b"], "danish")
+
+        assert vectors == [stub_embedding(text, "danish", 8) for text in "abacb"]
+        assert batch.call_count == 2
+        sent = [call.json()["article_contents"] for call in batch.request_history]
+        assert sent == [["a", "b"], ["c"]]
+
+    def test_cached_vectors_are_not_requested_again(self):
+        with requests_mock.Mocker() as m:
+            batch = m.post(f"{API}/get_article_embeddings", json=_batch_response)
+
+            self.client.embeddings(["a", "b"], "danish")
+            self.client.embedding("a", "danish")
+            self.client.embedding("a", "german")
+
+        assert batch.call_count == 2
+        assert batch.last_request.json()["article_contents"] == ["a"]
+        assert self.cache.stats()["hits"] == 1
+
+    def test_embeddings_are_computed_while_redis_is_down(self):
+        client = EmbeddingClient(
+            API, model_id="test-model", cache=cache_with_redis_down("test-embeddings-down")
+        )
+        with requests_mock.Mocker() as m:
+            batch = m.post(f"{API}/get_article_embeddings", json=_batch_response)
+
+            vectors = client.embeddings(["a", "b"], "danish")
+
+        assert vectors == [stub_embedding(text, "danish", 8) for text in "ab"]
+        assert batch.call_count == 1
+
+    def test_the_model_id_is_part_of_the_key(self):
+        other_model = EmbeddingClient(API, model_id="other-model", cache=self.cache)
+        with requests_mock.Mocker() as m:
+            batch = m.post(f"{API}/get_article_embeddings", json=_batch_response)
+
+            self.client.embedding("a")
+            other_model.embedding("a")
+
+        assert batch.call_count == 2
+
+    def test_falls_back_to_one_request_per_text(self):
+        with requests_mock.Mocker() as m:
+            batch = m.post(f"{API}/get_article_embeddings", status_code=404)
+            single = m.post(f"{API}/get_article_embedding", json=_single_response)
+
+            vectors = self.client.embeddings(["a", "b", "c"], "danish")
+            self.client.embedding("d", "danish")
+
+        assert vectors == [stub_embedding(text, "danish", 8) for text in "abc"]
+        assert batch.call_count == 1
+        assert single.call_count == 4
+
+    def test_errors_are_raised_and_not_cached(self):
+        with requests_mock.Mocker() as m:
+            m.post(f"{API}/get_article_embeddings", status_code=500)
+
+            with self.assertRaises(Exception):
+                self.client.embedding("a")
+
+        assert len(self.cache) == 0
@@ -0,0 +1,67 @@
+import threading
+import time
+from unittest import TestCase
+
+from zeeguu.core.nlp_pipeline.lazy_registry import LazyRegistry
+
+
+class LazyRegistryTest(TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def _factory(self, value, delay=0):
+        def build():
+            time.sleep(delay)
+            self.calls.append(value)
+            return value
+
+        return build
+
+    def test_nothing_is_loaded_before_first_access(self):
+        registry = LazyRegistry({"da": self._factory("da-model")})
+
+        assert "da" in registry
+        assert "en" not in registry
+        assert not registry.is_loaded("da")
+        assert self.calls == []
+
+    def test_value_is_built_once(self):
+        registry = LazyRegistry({"da": self._factory("da-model")})
+
+        assert registry["da"] == "da-model"
+        assert registry["da"] == "da-model"
+        assert self.calls == ["da-model"]
+
+    def test_unknown_key_raises(self):
+        registry = LazyRegistry({"da": self._factory("da-model")})
+
+        with self.assertRaises(KeyError):
+            registry["en"]
+        assert registry.get("en") is None
+
+    def test_concurrent_first_access_is_single_flight(self):
+        registry = LazyRegistry({"da": self._factory("da-model", delay=0.05)})
+
+        threads = [threading.Thread(target=lambda: registry["da"]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert self.calls == ["da-model"]
+
+    def test_idle_instances_are_evicted(self):
+        registry = LazyRegistry(
+            {"da": self._factory("da-model"), "en": self._factory("en-model")},
+            idle_eviction_seconds=0.01,
+        )
+
+        registry["da"]
+        time.sleep(0.02)
+        registry["en"]
+
+        assert not registry.is_loaded("da")
+        assert registry.is_loaded("en")
+
+        registry["da"]
+        assert self.calls == ["da-model", "en-model", "da-model"]
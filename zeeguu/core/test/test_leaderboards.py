@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import zeeguu.core
+from zeeguu.core.leaderboards.daily_activity_rollup import (
+    roll_up_closed_days,
+    rolled_up_window,
+)
+from zeeguu.core.leaderboards.leaderboards import exercise_time_leaderboard
+from zeeguu.core.model import User
+from zeeguu.core.model.user_exercise_session import UserExerciseSession
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.user_rule import UserRule
+
+session = zeeguu.core.model.db.session
+
+
+class LeaderboardRollupTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+
+        self.user_1 = UserRule().user
+        self.user_2 = UserRule().user
+        self.today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+
+        for user, days_ago, minutes in [
+            (self.user_1, 10, 30),
+            (self.user_1, 6, 15),
+            (self.user_1, 1, 5),
+            (self.user_2, 6, 40),
+            (self.user_2, 0, 20),
+        ]:
+            start = self.today - timedelta(days=days_ago)
+            session.add(
+                UserExerciseSession(
+                    user.id, start, current_time=start + timedelta(minutes=minutes)
+                )
+            )
+        session.commit()
+
+    def _leaderboard(self, from_date=None, to_date=None):
+        user_ids = (
+            session.query(User.id.label("user_id"))
+            .filter(User.id.in_([self.user_1.id, self.user_2.id]))
+            .subquery()
+        )
+        return [
+            (row.user_id, int(row.value))
+            for row in exercise_time_leaderboard(user_ids, None, from_date, to_date)
+        ]
+
+    def test_rollups_give_the_same_leaderboard(self):
+        periods = [
+            (None, None),
+            (self.today - timedelta(days=7, hours=3), None),
+            (self.today - timedelta(days=8), self.today - timedelta(days=2)),
+        ]
+        before = [self._leaderboard(*period) for period in periods]
+
+        roll_up_closed_days()
+
+        assert rolled_up_window() is not None
+        assert [self._leaderboard(*period) for period in periods] == before
+
+    def test_totals_are_in_milliseconds(self):
+        roll_up_closed_days()
+
+        assert dict(self._leaderboard()) == {
+            self.user_1.id: 50 * 60 * 1000,
+            self.user_2.id: 60 * 60 * 1000,
+        }
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from zeeguu.core.llm_services import haiku_client, response_cache
+from zeeguu.core.llm_services.response_cache import (
+    LLMResponseNotRecorded,
+    cached_completion,
+)
+from zeeguu.core.llm_services.translation_validator import TranslationValidator
+from zeeguu.core.test.conftest import get_mock
+from zeeguu.core.utils.caching import SQLiteBackend
+
+
+def _completion(text):
+    return {"content": [{"text": text}], "stop_reason": "end_turn"}
+
+
+class LLMResponseCacheTest(TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "llm_response_cache.sqlite")
+        self.addCleanup(response_cache.configure, "off")
+
+        env = patch.dict(os.environ, {"ANTHROPIC_TEXT_SIMPLIFICATION_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def _api_answers(self, *responses):
+        return get_mock().post(haiku_client.ANTHROPIC_URL, responses)
+
+    def test_repeated_prompt_is_sent_once(self):
+        response_cache.configure("on", self.path)
+        api = self._api_answers({"json": _completion("Hej")})
+
+        for _ in range(3):
+            assert haiku_client.haiku_completion("Simplify: Hej", 100) == "Hej"
+
+        assert api.call_count == 1
+
+    def test_prompts_for_variety_and_errors_are_not_cached(self):
+        response_cache.configure("on", self.path)
+        api = self._api_answers(
+            {"status_code": 529, "json": {}},
+            {"json": _completion("Hej")},
+            {"json": _completion("Hallo")},
+        )
+
+        assert haiku_client.haiku_completion("Simplify: Hej", 100) is None
+        assert haiku_client.haiku_completion("Simplify: Hej", 100) == "Hej"
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0.7) == "Hallo"
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0.7) == "Hallo"
+
+        assert api.call_count == 4
+
+    def test_requests_go_to_the_api_when_the_cache_fails(self):
+        response_cache.configure("on", self.path)
+        api = self._api_answers({"json": _completion("Hej")})
+        locked = sqlite3.OperationalError("database is locked")
+
+        with patch.object(SQLiteBackend, "_connection", side_effect=locked):
+            assert haiku_client.haiku_completion("Simplify: Hej", 100) == "Hej"
+        with patch.object(SQLiteBackend, "set", side_effect=locked):
+            assert haiku_client.haiku_completion("Simplify: Hej", 100) == "Hej"
+
+        assert api.call_count == 2
+
+    def test_recorded_responses_are_replayed(self):
+        response_cache.configure("record", self.path)
+        self._api_answers({"json": _completion("Hej")})
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0.7) == "Hej"
+
+        response_cache.configure("replay", self.path)
+        api = self._api_answers({"status_code": 500, "json": {}})
+
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0.7) == "Hej"
+        with self.assertRaises(LLMResponseNotRecorded):
+            haiku_client.haiku_completion_or_raise("Simplify: Hallo", 100)
+        assert api.call_count == 0
+
+    def test_callers_caching_different_types_do_not_share_entries(self):
+        response_cache.configure("on", self.path)
+        self._api_answers({"json": _completion("Hej")})
+        validator = TranslationValidator.__new__(TranslationValidator)
+        validator.MODEL_NAME = haiku_client.HAIKU_MODEL
+        validator.client = MagicMock()
+        validator.client.messages.create.return_value = SimpleNamespace(
+            content=[SimpleNamespace(text="Hallo")]
+        )
+
+        # Same model, prompt, system, max_tokens and temperature
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0) == "Hej"
+        assert validator._complete("Simplify: Hej", 100) == "Hallo"
+        assert haiku_client.haiku_completion("Simplify: Hej", 100, 0) == "Hej"
+
+    def test_identical_requests_in_flight_are_sent_once(self):
+        response_cache.configure("on", self.path)
+        sent = []
+
+        def request():
+            time.sleep(0.1)
+            sent.append(1)
+            return "VALID|common|A1|single_word"
+
+        def validate():
+            results.append(
+                cached_completion("anthropic", "model", None, "Validate", 10, 0, request)
+            )
+
+        results = []
+        threads = [threading.Thread(target=validate) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["VALID|common|A1|single_word"] * 8
+        assert sent == [1]
+        stats = response_cache._cache.stats()
+        assert (stats["misses"], stats["coalesced"]) == (8, 7)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from zeeguu.core.language import ml_cefr_classifier
+from zeeguu.core.language.ml_cefr_classifier import (
+    FEATURE_COUNT,
+    extract_features,
+    extract_features_batch,
+    predict_cefr_level,
+    predict_cefr_levels,
+)
+
+ARTICLES = [
+    ("Der Hund läuft. Warum? Weil er will!\n\nNeuer Absatz; mit: Satzzeichen.", 40, 12),
+    ("Ein Satz ohne Ende", None, None),
+    ("", 55, 0),
+    ("... !!! ???", None, 3),
+]
+
+
+class MLCefrClassifierTest(TestCase):
+    def test_batch_rows_are_the_single_article_features(self):
+        matrix = extract_features_batch(ARTICLES)
+
+        assert matrix.shape == (len(ARTICLES), FEATURE_COUNT)
+        for row, article in zip(matrix, ARTICLES):
+            assert np.array_equal(row, extract_features(*article))
+
+    def test_features(self):
+        features = extract_features("Ein kurzer Satz. Noch einer?\n\nEnde!", None, None)
+
+        assert features[0] == 50  # default FK difficulty
+        assert features[1] == 6  # word count from the text
+        assert features[4] == 2  # words per sentence
+        assert features[10] == 2 / 3  # interactive ratio
+
+    def test_one_predict_call_for_many_articles(self):
+        model = MagicMock()
+        model.predict.return_value = np.array(["A2", "B1", "A1", "A1"])
+
+        with patch.object(ml_cefr_classifier, "load_model", return_value=model):
+            levels = predict_cefr_levels(ARTICLES, "de")
+
+        assert levels == ["A2", "B1", "A1", "A1"]
+        model.predict.assert_called_once()
+        assert model.predict.call_args[0][0].shape == (len(ARTICLES), FEATURE_COUNT)
+
+    def test_no_model(self):
+        with patch.object(ml_cefr_classifier, "load_model", return_value=None):
+            assert predict_cefr_levels(ARTICLES, "xx") == [None] * len(ARTICLES)
+            assert predict_cefr_level("Hej", "xx", 50, 1) is None
+            assert predict_cefr_levels([], "xx") == []
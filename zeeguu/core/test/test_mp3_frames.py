@@ -0,0 +1,170 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.audio_lessons import mp3_frames
+from zeeguu.core.audio_lessons.mp3_frames import (
+    Mp3Format,
+    Mp3Frame,
+    audio_frames,
+    duration_in_seconds,
+    join_mp3_files,
+    silent_frames,
+)
+
+# MPEG 2, 24kHz, mono, 32kbps: what Google TTS produces
+GOOGLE_TTS_FRAME = Mp3Frame(0, 0, 576, Mp3Format(2, 24000, 1), 4)
+
+
+def _mp3(seconds, template=GOOGLE_TTS_FRAME):
+    return silent_frames(template, seconds)
+
+
+class Mp3FramesTest(TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def _file(self, name, data):
+        path = os.path.join(self.folder, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_duration_is_read_from_the_frame_headers(self):
+        assert abs(duration_in_seconds(_mp3(2.0)) - 2.0) < 0.03
+
+    def test_tags_and_garbage_are_skipped(self):
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"12345"
+        id3v1 = b"TAG" + bytes(125)
+        data = id3v2 + _mp3(0.5) + b"\x00\x01" + _mp3(0.5) + id3v1
+
+        assert abs(duration_in_seconds(data) - 1.0) < 0.05
+
+    def test_files_and_silences_are_joined_at_frame_level(self):
+        hello = self._file("hello.mp3", _mp3(1.0))
+        world = self._file("world.mp3", _mp3(0.5))
+        output = os.path.join(self.folder, "lesson.mp3")
+
+        join_mp3_files([hello, 2.0, world, hello], output)
+
+        with open(output, "rb") as f:
+            data = f.read()
+        frames = audio_frames(data)
+        assert {frame.format for frame in frames} == {GOOGLE_TTS_FRAME.format}
+        assert abs(duration_in_seconds(data) - 4.5) < 0.1
+
+    def test_different_formats_are_decoded_instead(self):
+        azure_frame = Mp3Frame(0, 0, 576, Mp3Format(2, 16000, 1), 4)
+        google = self._file("google.mp3", _mp3(1.0))
+        azure = self._file("azure.mp3", _mp3(1.0, azure_frame))
+        output = os.path.join(self.folder, "lesson.mp3")
+
+        with patch.object(mp3_frames, "_join_by_decoding") as join_by_decoding:
+            join_mp3_files([google, 1.0, azure], output)
+
+        join_by_decoding.assert_called_once_with([google, 1.0, azure], output)
+
+
+class ParallelSynthesisTest(TestCase):
+    def setUp(self):
+        from zeeguu.core.audio_lessons import voice_synthesizer
+
+        with patch.object(voice_synthesizer, "ZEEGUU_DATA_FOLDER", tempfile.mkdtemp()):
+            self.synthesizer = voice_synthesizer.VoiceSynthesizer()
+        # Provider pools sized by the TTS_CONCURRENCY patched in the test
+        executors = patch.dict(voice_synthesizer._provider_executors, clear=True)
+        executors.start()
+        self.addCleanup(executors.stop)
+
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        def fake_text_to_speech(text, voice_config, speaking_rate=1.0):
+            with self.lock:
+                self.requests.append(text)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.05)
+            with self.lock:
+                self.in_flight -= 1
+            return _mp3(0.2 * len(text.split()))
+
+        self.synthesizer.text_to_speech = fake_text_to_speech
+
+    def test_segments_are_synthesized_concurrently_and_once(self):
+        texts = [f"word number {i}" for i in range(6)] + ["word number 0"]
+        progress = []
+
+        with patch.dict(
+            "zeeguu.core.audio_lessons.voice_synthesizer.TTS_CONCURRENCY",
+            {"google": 3},
+        ):
+            paths = self.synthesizer.synthesize_segments(
+                [(text, "woman", "da", 1.0, "en") for text in texts],
+                on_progress=lambda done, total, voice: progress.append(done),
+            )
+
+        assert len(self.requests) == 6
+        assert self.max_in_flight == 3
+        assert paths[0] == paths[-1]
+        assert all(os.path.exists(path) for path in paths)
+        assert progress[-1] == len(texts)
+
+        # Everything is cached now
+        self.synthesizer.synthesize_segments([(texts[0], "woman", "da", 1.0, "en")])
+        assert len(self.requests) == 6
+
+    def test_concurrency_is_limited_across_lessons(self):
+        def synthesize(lesson):
+            self.synthesizer.synthesize_segments(
+                [(f"lesson {lesson} word {i}", "woman", "da", 1.0, "en") for i in range(4)]
+            )
+
+        with patch.dict(
+            "zeeguu.core.audio_lessons.voice_synthesizer.TTS_CONCURRENCY",
+            {"google": 2},
+        ):
+            lessons = [threading.Thread(target=synthesize, args=(l,)) for l in range(3)]
+            for lesson in lessons:
+                lesson.start()
+            for lesson in lessons:
+                lesson.join()
+
+        assert len(self.requests) == 12
+        assert self.max_in_flight == 2
+
+    def test_script_is_joined_and_its_duration_read_without_decoding(self):
+        script = "Teacher: Hello there [1 seconds]\nWoman: hej med dig [2 seconds]"
+        output = os.path.join(self.synthesizer.lessons_dir, "lesson.mp3")
+
+        self.synthesizer._synthesize_script_to_file(script, output, "da", "en")
+
+        # 0.4s + 1s + 0.6s + 2s
+        assert self.synthesizer.get_audio_duration(output) == 4
+
+    def test_segments_evicted_before_joining_are_synthesized_again(self):
+        script = "Teacher: Hello there [1 seconds]\nWoman: hej med dig [2 seconds]"
+        output = os.path.join(self.synthesizer.lessons_dir, "lesson.mp3")
+        self.synthesizer._synthesize_script_to_file(script, output, "da", "en")
+        synthesize_segments = self.synthesizer.synthesize_segments
+
+        def evicted_after_lookup(requests, on_progress=None):
+            paths = synthesize_segments(requests, on_progress)
+            # Another process evicts a cached segment before it is joined
+            if not self.evicted:
+                self.evicted = paths[0]
+                os.remove(paths[0])
+            return paths
+
+        self.evicted = None
+        self.synthesizer.synthesize_segments = evicted_after_lookup
+        self.synthesizer._synthesize_script_to_file(script, output, "da", "en")
+
+        assert os.path.exists(self.evicted)
+        assert self.requests.count("Hello there") == 2
+        assert self.synthesizer.get_audio_duration(output) == 4
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from zeeguu.core.content_cleaning.content_cleaner import cleanup_non_content_bits
+from zeeguu.core.content_quality.advertorial_detection import has_advertorial_keywords
+from zeeguu.core.content_quality.disturbing_content_detection import (
+    is_disturbing_content_based_on_keywords,
+)
+from zeeguu.core.util.multi_pattern import MultiPatternMatcher
+
+
+class MultiPatternMatcherTest(TestCase):
+    def test_finds_overlapping_and_prefix_patterns(self):
+        matcher = MultiPatternMatcher(["stabbed", "stabbed to death", "bed", "death"])
+
+        assert matcher.found_in("he was stabbed to death") == {
+            "stabbed",
+            "stabbed to death",
+            "bed",
+            "death",
+        }
+        assert matcher.found_in("nothing here") == set()
+
+    def test_first_found_is_in_pattern_order(self):
+        matcher = MultiPatternMatcher(["sudoku", "crossword no"])
+
+        assert matcher.first_found_in("crossword no 12 and sudoku") == "sudoku"
+        assert matcher.first_found_in("prize crossword no 12") == "crossword no"
+
+    def test_special_characters_are_literal(self):
+        matcher = MultiPatternMatcher(["-30%", "a.b"])
+
+        assert matcher.found_in("save -30% on axb") == {"-30%"}
+
+
+class PatternBasedCleaningTest(TestCase):
+    def test_junk_patterns_are_removed(self):
+        text = "First paragraph of the story.\n\nArtiklen fortsætter efter annoncen Second paragraph."
+
+        assert "Artiklen fortsætter" not in cleanup_non_content_bits(text)
+        assert "Second paragraph." in cleanup_non_content_bits(text)
+
+    def test_disturbing_keywords_keep_their_order(self):
+        assert is_disturbing_content_based_on_keywords(
+            "Gunman stabbed two in a shooting", language="en"
+        ) == (True, "Disturbing content keywords: shooting, stabbed, gunman")
+
+    def test_advertorial_keywords_are_counted(self):
+        assert has_advertorial_keywords("Bon plan : code promo Amazon")
+        assert not has_advertorial_keywords("Un bon plan", threshold=2)
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from zeeguu.core.audio_lessons.mp3_frames import Mp3Format, Mp3Frame, silent_frames
+from zeeguu.core.audio_lessons.segment_store import SegmentStore
+
+GOOGLE_TTS_FRAME = Mp3Frame(0, 0, 576, Mp3Format(2, 24000, 1), 4)
+ONE_SECOND = silent_frames(GOOGLE_TTS_FRAME, 1.0)
+
+
+class SegmentStoreTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = SegmentStore(self.root, max_bytes=10 * len(ONE_SECOND))
+
+    def test_segments_are_sharded_and_found_again(self):
+        assert self.store.lookup("da-voice", "hej", 1.0) is None
+
+        path = self.store.put("da-voice", "hej", 1.0, ONE_SECOND)
+
+        relative = os.path.relpath(path, self.root).split(os.sep)
+        assert len(relative) == 3 and len(relative[0]) == 2 and len(relative[1]) == 2
+        assert self.store.lookup("da-voice", "hej", 1.0) == path
+        assert self.store.lookup("da-voice", "hej", 0.9) is None
+
+    def test_the_index_knows_sizes(self):
+        self.store.put("da-voice", "hej", 1.0, ONE_SECOND)
+        self.store.put("da-voice", "hej", 1.0, ONE_SECOND)
+
+        assert self.store.total_bytes() == len(ONE_SECOND)
+        assert self.store.stats()["segments"] == 1
+
+    def test_least_recently_used_segments_are_evicted(self):
+        paths = [
+            self.store.put("da-voice", f"word {i}", 1.0, ONE_SECOND) for i in range(10)
+        ]
+        # Make the first one the most recently used
+        self.store._db().execute(
+            "UPDATE segment SET last_access = ? WHERE path = ?",
+            (time.time() + 3600, os.path.relpath(paths[0], self.root)),
+        )
+        self.store._db().commit()
+
+        self.store.put("da-voice", "one word too many", 1.0, ONE_SECOND)
+
+        assert self.store.total_bytes() <= 9 * len(ONE_SECOND)
+        assert os.path.exists(paths[0])
+        assert not os.path.exists(paths[1])
+        assert self.store.lookup("da-voice", "word 1", 1.0) is None
+
+    def test_files_deleted_behind_its_back_are_forgotten(self):
+        path = self.store.put("da-voice", "hej", 1.0, ONE_SECOND)
+        os.remove(path)
+
+        assert self.store.lookup("da-voice", "hej", 1.0) is None
+        assert self.store.total_bytes() == 0
+
+    def test_flat_files_from_before_sharding_are_moved(self):
+        file_name, _ = SegmentStore._file_name("da-voice", "hej", 1.0)
+        with open(os.path.join(self.root, file_name), "wb") as f:
+            f.write(ONE_SECOND)
+
+        path = self.store.lookup("da-voice", "hej", 1.0)
+
+        assert path == self.store.path_for("da-voice", "hej", 1.0)
+        assert os.path.exists(path)
+        assert not os.path.exists(os.path.join(self.root, file_name))
+        assert self.store.total_bytes() == len(ONE_SECOND)
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import msgpack
+import requests_mock
+
+from zeeguu.core.tokenization import TokenizerModel
+from zeeguu.core.tokenization import stanza_client
+from zeeguu.core.tokenization.stanza_client import StanzaServiceClient
+
+SERVICE = "http://stanza.test"
+TOKENS = [{"text": "Hallo", "token_i": 0, "has_space": False, "pos": None}]
+
+
+def _msgpack_response(request, context):
+    context.headers["Content-Type"] = "application/msgpack"
+    return msgpack.packb({"tokens": TOKENS})
+
+
+class StanzaServiceClientTest(TestCase):
+    def setUp(self):
+        patcher = patch.multiple(
+            stanza_client,
+            STANZA_SERVICE_URL=SERVICE,
+            USE_MSGPACK=True,
+            _service_speaks_msgpack=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = StanzaServiceClient(
+            SimpleNamespace(code="de"), TokenizerModel.STANZA_TOKEN_ONLY
+        )
+
+    def test_requests_are_sent_in_msgpack_once_the_service_answers_in_it(self):
+        with requests_mock.Mocker() as m:
+            tokenize = m.post(f"{SERVICE}/tokenize", content=_msgpack_response)
+
+            assert self.client.tokenize_text("Hallo") == TOKENS
+            assert self.client.tokenize_text("Hallo") == TOKENS
+
+        first, second = tokenize.request_history
+        assert "application/msgpack" in first.headers["Accept"]
+        assert first.json()["text"] == "Hallo"
+        assert second.headers["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(second.body)["text"] == "Hallo"
+
+    def test_json_services_get_json(self):
+        with requests_mock.Mocker() as m:
+            tokenize = m.post(f"{SERVICE}/tokenize", json={"tokens": TOKENS})
+
+            assert self.client.tokenize_text("Hallo") == TOKENS
+            assert self.client.tokenize_text("Hallo") == TOKENS
+
+        assert all(each.json()["text"] == "Hallo" for each in tokenize.request_history)
+
+    def test_falls_back_to_json_when_msgpack_is_refused(self):
+        stanza_client._service_speaks_msgpack = True
+
+        def response(request, context):
+            if request.headers["Content-Type"] == "application/msgpack":
+                context.status_code = 415
+                return b""
+            context.headers["Content-Type"] = "application/json"
+            return b'{"tokens": []}'
+
+        with requests_mock.Mocker() as m:
+            tokenize = m.post(f"{SERVICE}/tokenize", content=response)
+
+            assert self.client.tokenize_text("Hallo") == []
+
+        assert tokenize.call_count == 2
+        assert not stanza_client._service_speaks_msgpack
+
+    def test_undecodable_responses_fall_back_to_the_local_tokenizer(self):
+        local = SimpleNamespace(tokenize_text=lambda *args: TOKENS)
+
+        for body in [msgpack.packb({"tokens": TOKENS}) + b"\x01", b"\xc1"]:
+            with requests_mock.Mocker() as m, patch.object(
+                stanza_client, "_get_local_tokenizer", return_value=local
+            ) as local_tokenizer:
+                m.post(
+                    f"{SERVICE}/tokenize",
+                    content=body,
+                    headers={"Content-Type": "application/msgpack"},
+                )
+
+                assert self.client.tokenize_text("Hallo") == TOKENS
+
+            local_tokenizer.assert_called_once()
+        assert not stanza_client._service_speaks_msgpack
+
+    def test_clients_share_the_session(self):
+        other = StanzaServiceClient(
+            SimpleNamespace(code="da"), TokenizerModel.STANZA_TOKEN_ONLY
+        )
+        with requests_mock.Mocker() as m:
+            m.post(f"{SERVICE}/sentences", json={"sentences": ["Hej."]})
+
+            self.client.get_sentences("Hallo.")
+            other.get_sentences("Hej.")
+
+        session = stanza_client._get_session()
+        assert session is stanza_client._get_session()
+        assert session.get_adapter(SERVICE).max_retries.total == 2
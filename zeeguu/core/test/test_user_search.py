@@ -115,4 +115,41 @@ class UserSearchTest(ModelTestMixIn):
         users = [user for user, avatar in results]
 
         self.assertNotIn(self.searching_user.id, [u.id for u in users])
-        self.assertEqual(2, len(users))  # Ensure only the other two users are returned
\ No newline at end of file
+        self.assertEqual(2, len(users))  # Ensure only the other two users are returned
+
+    def test_anonymous_users_are_not_returned(self):
+        anonymous = UserRule().user
+        anonymous.username = "johnny"
+        anonymous.email = "some-uuid" + User.ANONYMOUS_EMAIL_DOMAIN
+        UserRule().user.username = "bigjohn"
+        session.commit()
+
+        results = User.search(self.searching_user.id, "john")
+
+        users = [user for user, avatar in results]
+
+        self.assertNotIn(anonymous, users)
+        self.assertEqual(1, len(users))
+
+    def test_short_terms_match_anywhere_in_the_username(self):
+        UserRule().user.username = "johnny"
+        UserRule().user.username = "bigjo"
+        UserRule().user.username = "mary"
+        session.commit()
+
+        results = User.search(self.searching_user.id, "jo")
+
+        self.assertEqual(2, len(results))
+
+    def test_renamed_user_is_found_by_new_username(self):
+        renamed = UserRule().user
+        renamed.username = "johnny"
+        session.commit()
+
+        renamed.username = "mary"
+        session.commit()
+
+        self.assertEqual([], User.search(self.searching_user.id, "john"))
+        self.assertEqual(
+            [renamed], [user for user, avatar in User.search(self.searching_user.id, "mary")]
+        )
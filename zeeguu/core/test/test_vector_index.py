@@ -0,0 +1,160 @@
+import threading
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from elasticsearch import Elasticsearch
+from werkzeug.serving import make_server
+
+from zeeguu.core.elastic.elastic_query_builder import (
+    build_elastic_semantic_sim_query_for_article,
+    build_elastic_semantic_sim_query_for_topic_cls,
+)
+from zeeguu.core.elastic.stub_server import create_stub_app
+from zeeguu.core.elastic import settings
+from zeeguu.core.semantic_search import elastic_semantic_search, vector_index
+from zeeguu.core.semantic_search.vector_index import ArticleVectorIndex
+
+INDEX = "zeeguu-test"
+DANISH = SimpleNamespace(name="Danish")
+
+
+def _documents(count, rng):
+    return [
+        {
+            "article_id": article_id,
+            "language": "Danish" if article_id % 3 else "Spanish",
+            "topics": ["Sports"] if article_id % 2 else [],
+            "sem_vec": rng.standard_normal(16).tolist(),
+        }
+        for article_id in range(1, count + 1)
+    ]
+
+
+class ArticleVectorIndexTest(TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.docs = _documents(60, self.rng)
+        self.index = ArticleVectorIndex()
+        for doc in self.docs:
+            self.index.add_document(doc)
+
+    def test_filters(self):
+        query = self.rng.standard_normal(16)
+
+        found = self.index.search(query, 10, language="Danish", exclude_ids=[1, 2])
+        assert len(found) == 10
+        for article_id, _ in found:
+            assert self.docs[article_id - 1]["language"] == "Danish"
+            assert article_id not in (1, 2)
+
+        found = self.index.search(query, 10, require_topics=True)
+        assert all(article_id % 2 for article_id, _ in found)
+
+    def test_an_article_finds_itself_first(self):
+        doc = self.docs[4]
+
+        [(article_id, score)] = self.index.search(doc["sem_vec"], 1)
+
+        assert article_id == doc["article_id"]
+        assert abs(score - 1.0) < 1e-6
+
+    def test_updated_and_removed_articles(self):
+        moved = dict(self.docs[0], sem_vec=self.docs[1]["sem_vec"], language="Danish")
+        self.index.add_document(moved)
+        self.index.remove(2)
+
+        [(article_id, _)] = self.index.search(self.docs[1]["sem_vec"], 1)
+
+        assert article_id == 1
+        assert len(self.index) == 59
+
+    def test_no_results_while_the_embedding_service_is_down(self):
+        article = SimpleNamespace(id=1000, language=DANISH)
+
+        with patch.multiple(
+            elastic_semantic_search,
+            local_vector_index=lambda: self.index,
+            get_embedding_from_text=lambda text: None,
+            get_embedding_from_article=lambda article: None,
+        ):
+            found = elastic_semantic_search.find_articles_based_on_text("Hej")
+            similar = elastic_semantic_search.articles_like_this_semantic(article)
+
+        assert found == ([], [])
+        assert similar == ([], [])
+
+    def _stub_elasticsearch(self):
+        server = make_server(
+            "127.0.0.1", 0, create_stub_app(request_overhead=0, per_doc_latency=0)
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    def test_same_results_as_the_knn_queries(self):
+        es = Elasticsearch(self._stub_elasticsearch())
+        for doc in self.docs:
+            es.index(index=INDEX, document=doc)
+
+        loaded = ArticleVectorIndex()
+        assert loaded.load_from_elasticsearch(es, INDEX) == 60
+
+        article = SimpleNamespace(id=7)
+        query = self.docs[6]["sem_vec"]
+        for body, local in [
+            (
+                build_elastic_semantic_sim_query_for_article(10, DANISH, query, article),
+                loaded.search(query, 10, language="Danish", exclude_ids=[7]),
+            ),
+            (
+                build_elastic_semantic_sim_query_for_topic_cls(9, query, filter_ids=[7]),
+                loaded.search(query, 9, exclude_ids=[7], require_topics=True),
+            ),
+        ]:
+            hits = es.search(index=INDEX, body=body)["hits"]["hits"]
+            assert [h["_source"]["article_id"] for h in hits] == [a for a, _ in local]
+            assert np.allclose([h["_score"] for h in hits], [s for _, s in local])
+
+    def test_loads_in_the_background_and_reconciles(self):
+        url = self._stub_elasticsearch()
+        es = Elasticsearch(url)
+        for doc in self.docs:
+            es.index(index=INDEX, id=doc["article_id"], document=doc)
+        patches = [
+            patch.multiple(settings, ES_CONN_STRING=url, ES_ZINDEX=INDEX),
+            patch.multiple(
+                vector_index,
+                USE_LOCAL_VECTOR_INDEX=True,
+                _index=None,
+                _worker=None,
+                _refreshed_at=0.0,
+                _reconciled_at=0.0,
+                _failed_at=None,
+            ),
+        ]
+        for each in patches:
+            each.start()
+            self.addCleanup(each.stop)
+
+        # Not loaded yet: the lookups go to ES meanwhile
+        assert vector_index.local_vector_index() is None
+        vector_index.load_in_background().join()
+        loaded = vector_index.local_vector_index()
+        assert len(loaded) == 60
+
+        # Another process re-embeds article 1 and removes article 2
+        moved = dict(self.docs[0], sem_vec=self.docs[1]["sem_vec"])
+        es.index(index=INDEX, id=1, document=moved)
+        es.index(index=INDEX, id=2, document=dict(self.docs[1], sem_vec=None))
+        vector_index._reconciled_at = -vector_index.RECONCILE_SECONDS
+        vector_index._refreshed_at = -vector_index.REFRESH_SECONDS
+        vector_index.local_vector_index()
+        vector_index.load_in_background().join()
+
+        reconciled = vector_index.local_vector_index()
+        assert reconciled is not loaded
+        assert len(reconciled) == 59
+        [(article_id, _)] = reconciled.search(self.docs[1]["sem_vec"], 1)
+        assert article_id == 1
@@ -0,0 +1,110 @@
+from unittest.mock import patch
+
+from zeeguu.core.content_retriever.video_dowloader import ingest_videos
+from zeeguu.core.model import Video
+from zeeguu.core.model.db import db
+from zeeguu.core.test.conftest import get_mock
+from zeeguu.core.test.model_test_mixin import ModelTestMixIn
+from zeeguu.core.test.rules.language_rule import LanguageRule
+from zeeguu.core.youtube_api import stub_server, youtube_api
+
+API = "http://youtube.test"
+RECORDED_DANISH_VIDEO = "8-GrLwHK8SQ"
+
+
+class VideoIngestionTest(ModelTestMixIn):
+    def setUp(self):
+        super().setUp()
+        LanguageRule.get_or_create_language("da")
+
+        self.stub = stub_server.create_stub_app(request_overhead=0)
+        client = self.stub.test_client()
+
+        def relayed_to_stub(request, context):
+            response = client.get(request.path_url)
+            context.status_code = response.status_code
+            return response.data
+
+        for endpoint in ["videos", "channels"]:
+            get_mock().get(f"{API}/{endpoint}", content=relayed_to_stub)
+
+        recording = stub_server.load_recording()
+        for patcher in [
+            patch.multiple(
+                youtube_api,
+                VIDEO_URL=f"{API}/videos",
+                CHANNEL_URL=f"{API}/channels",
+                get_captions_from_json=lambda key, lang: stub_server.stub_captions(
+                    recording, key
+                ),
+            ),
+            patch.object(Video, "assign_inferred_topics"),
+            patch("zeeguu.core.elastic.indexing.index_video"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_videos_are_stored_with_captions_and_tags(self):
+        [video] = ingest_videos(db.session, [RECORDED_DANISH_VIDEO], "da")
+
+        assert video.broken == 0
+        assert video.channel.name == "Løbeklubben"
+        assert video.captions[0].get_content().startswith("Hej og velkommen")
+        # As long as the video: 4m12s
+        assert video.captions[-1].time_end >= 252_000
+        tags = db.session.execute(
+            db.text(
+                "select video_tag.tag from video_tag_map join video_tag"
+                " on video_tag.id = video_tag_map.tag_id where video_id = :id"
+            ),
+            {"id": video.id},
+        ).scalars()
+        assert sorted(tags) == ["løb", "maraton", "motion", "træning"]
+
+    def test_metadata_is_fetched_fifty_ids_at_a_time(self):
+        keys = [RECORDED_DANISH_VIDEO] + [f"video{i:06}" for i in range(59)]
+
+        videos = ingest_videos(db.session, keys, "da")
+
+        assert len(videos) == 60
+        # Two for the videos, one for their three channels
+        assert self.stub.config["request_count"] == 3
+
+    def test_videos_already_crawled_are_not_fetched_again(self):
+        ingest_videos(db.session, [RECORDED_DANISH_VIDEO], "da")
+        self.stub.config["request_count"] = 0
+
+        videos = ingest_videos(
+            db.session, [RECORDED_DANISH_VIDEO, RECORDED_DANISH_VIDEO], "da"
+        )
+
+        assert videos == []
+        assert self.stub.config["request_count"] == 0
+
+    def test_api_errors_leave_the_videos_out(self):
+        get_mock().get(
+            f"{API}/videos",
+            status_code=403,
+            json={"error": {"code": 403, "message": "Quota exceeded"}},
+        )
+
+        assert youtube_api.fetch_videos_info([RECORDED_DANISH_VIDEO], "da") == []
+
+        get_mock().get(f"{API}/videos", status_code=503, text="Backend Error")
+
+        assert youtube_api.fetch_videos_info([RECORDED_DANISH_VIDEO], "da") == []
+
+    def test_a_failed_caption_fetch_only_breaks_its_video(self):
+        recording = stub_server.load_recording()
+
+        def captions(key, lang):
+            if key == RECORDED_DANISH_VIDEO:
+                raise OSError("Read-only file system")
+            return stub_server.stub_captions(recording, key)
+
+        keys = [RECORDED_DANISH_VIDEO, RECORDED_DANISH_VIDEO + "-copy"]
+        with patch.object(youtube_api, "get_captions_from_json", captions):
+            failed, captioned = youtube_api.fetch_videos_info(keys, "da")
+
+        assert failed["broken"] == youtube_api.NO_CAPTIONS_AVAILABLE
+        assert captioned["broken"] == 0
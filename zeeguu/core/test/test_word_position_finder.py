@@ -0,0 +1,87 @@
+import re
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from zeeguu.core.tokenization import word_position_finder
+from zeeguu.core.tokenization.token import Token
+from zeeguu.core.tokenization.word_position_finder import (
+    find_word_positions_in_text,
+    word_appears_standalone,
+)
+
+GERMAN = SimpleNamespace(code="de")
+
+
+class _SentenceSplittingTokenizer:
+    """Words and punctuation, with a new sentence after every period"""
+
+    calls = 0
+
+    def tokenize_text(self, text, as_serializable_dictionary=True):
+        _SentenceSplittingTokenizer.calls += 1
+        tokens = []
+        sent_i = token_i = 0
+        for word in re.findall(r"\w+|[^\w\s]", text):
+            tokens.append(Token(word, 0, sent_i, token_i))
+            token_i += 1
+            if word == ".":
+                sent_i += 1
+                token_i = 0
+        return tokens
+
+
+class WordPositionFinderTest(TestCase):
+    def setUp(self):
+        word_position_finder._tokenized.clear()
+        _SentenceSplittingTokenizer.calls = 0
+        patcher = patch.object(
+            word_position_finder,
+            "_get_tokenizer",
+            lambda language: _SentenceSplittingTokenizer(),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_standalone_word(self):
+        result = word_appears_standalone("Haus", "Das Haus ist alt.", GERMAN)
+
+        assert result["standalone"]
+        assert not result["only_in_compounds"]
+
+    def test_word_only_in_compounds(self):
+        result = word_appears_standalone(
+            "Haus", "Das Hausboot liegt am Bootshaus", GERMAN
+        )
+
+        assert not result["standalone"]
+        assert result["only_in_compounds"]
+        assert result["compound_examples"] == ["Hausboot", "Bootshaus"]
+
+    def test_word_not_found(self):
+        result = word_appears_standalone("Katze", "Das Haus ist alt", GERMAN)
+
+        assert not result["standalone"]
+        assert not result["only_in_compounds"]
+
+    def test_strict_and_fuzzy_positions_of_a_phrase(self):
+        context = "Er gibt auf. Sie gibt nicht auf. Er gibt aufwendig auf."
+
+        strict = find_word_positions_in_text("gibt auf", context, GERMAN, strict_matching=True)
+        fuzzy = find_word_positions_in_text("gibt auf", context, GERMAN)
+
+        assert [(p["sentence_i"], p["token_i"]) for p in strict["found_positions"]] == [(0, 1)]
+        assert [(p["sentence_i"], p["token_i"]) for p in fuzzy["found_positions"]] == [
+            (0, 1),
+            (2, 1),
+        ]
+        assert fuzzy["found_positions"][0]["tokens_matched"] == 2
+
+    def test_each_text_is_tokenized_once(self):
+        context = "Das Hausboot liegt am Bootshaus."
+
+        word_appears_standalone("Haus", context, GERMAN)
+        find_word_positions_in_text("Haus", context, GERMAN, strict_matching=True)
+        find_word_positions_in_text("Haus", context, GERMAN)
+
+        assert _SentenceSplittingTokenizer.calls == 2
@@ -5,11 +5,19 @@ This client provides the same interface as StanzaTokenizer but delegates
 actual tokenization to the Stanza service via HTTP.
 
 If the service is unavailable, falls back to local StanzaTokenizer.
+
+All the clients share one pooled keep-alive session. When msgpack is
+installed, responses are asked for in msgpack (Accept header); once the
+service has answered in msgpack, the requests are sent in msgpack too.
+Services that only speak JSON keep getting JSON.
 """
 
 import os
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from zeeguu.core.model.language import Language
 from zeeguu.core.tokenization.zeeguu_tokenizer import ZeeguuTokenizer, TokenizerModel
 from zeeguu.core.tokenization.token import Token
@@ -29,6 +37,98 @@ MODEL_TYPE_MAP = {
 # Request timeout - tokenization should be fast, but allow some buffer for long articles
 REQUEST_TIMEOUT = 30  # seconds
 
+# Connections kept open to the service; one per thread that tokenizes at once
+POOL_SIZE = int(os.environ.get("STANZA_CLIENT_POOL_SIZE", "16"))
+
+# Tokenizing is idempotent, so failed connections and overloaded-service
+# responses are retried (after 0.2s, then 0.4s) before falling back to local.
+# Timeouts are not: a service that is that slow would only be slowed further
+RETRY = Retry(
+    total=2,
+    read=0,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=None,
+    raise_on_status=False,
+)
+
+MSGPACK = "application/msgpack"
+JSON = "application/json"
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# STANZA_WIRE_FORMAT=json turns msgpack off
+USE_MSGPACK = msgpack is not None and os.environ.get("STANZA_WIRE_FORMAT") != "json"
+
+_session = None
+_session_lock = threading.Lock()
+# Set once the service has answered in msgpack: it can read msgpack too
+_service_speaks_msgpack = False
+
+
+def _get_session():
+    """
+    The session shared by all the clients. The service sets no cookies, so
+    the only state it holds is urllib3's connection pool, which is thread safe.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=RETRY
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _post(url, payload, timeout=REQUEST_TIMEOUT):
+    """POSTs the payload to the service and returns the decoded response"""
+    global _service_speaks_msgpack
+
+    headers = {"Accept": f"{MSGPACK}, {JSON};q=0.5"} if USE_MSGPACK else {}
+    if USE_MSGPACK and _service_speaks_msgpack:
+        response = _get_session().post(
+            url,
+            data=msgpack.packb(payload),
+            headers={**headers, "Content-Type": MSGPACK},
+            timeout=timeout,
+        )
+        if response.status_code != 415:
+            return _decoded(response)
+        # The service was replaced by one that only reads JSON
+        _service_speaks_msgpack = False
+
+    response = _get_session().post(url, json=payload, headers=headers, timeout=timeout)
+    return _decoded(response)
+
+
+def _decoded(response):
+    """
+    The body of the response. A body that can't be decoded (e.g. cut short)
+    raises a RequestException, like a failed request, so that the callers
+    fall back to the local tokenizer.
+    """
+    global _service_speaks_msgpack
+
+    response.raise_for_status()
+    if response.headers.get("Content-Type", "").startswith(MSGPACK):
+        try:
+            data = msgpack.unpackb(response.content)
+        except (msgpack.ExtraData, msgpack.UnpackException, ValueError) as e:
+            raise requests.exceptions.ContentDecodingError(
+                f"Invalid msgpack response: {e}", response=response
+            )
+        _service_speaks_msgpack = True
+        return data
+    return response.json()
+
 
 def _get_local_tokenizer(language, model):
     """Get local StanzaTokenizer as fallback."""
@@ -87,9 +187,9 @@ class StanzaServiceClient(ZeeguuTokenizer):
             return []
 
         try:
-            response = requests.post(
+            data = _post(
                 f"{self.service_url}/tokenize",
-                json={
+                {
                     "text": text,
                     "language": self.language.code,
                     "model": self.model_string,
@@ -98,10 +198,7 @@ class StanzaServiceClient(ZeeguuTokenizer):
                     "start_sentence_i": start_sentence_i,
                     "start_paragraph_i": start_paragraph_i,
                 },
-                timeout=REQUEST_TIMEOUT,
             )
-            response.raise_for_status()
-            data = response.json()
 
         except requests.RequestException as e:
             logger.warning(f"Stanza service failed, falling back to local: {e}")
@@ -139,17 +236,14 @@ class StanzaServiceClient(ZeeguuTokenizer):
             return []
 
         try:
-            response = requests.post(
+            data = _post(
                 f"{self.service_url}/sentences",
-                json={
+                {
                     "text": text,
                     "language": self.language.code,
                     "model": self.model_string,
                 },
-                timeout=REQUEST_TIMEOUT,
             )
-            response.raise_for_status()
-            data = response.json()
             return data.get("sentences", [])
         except requests.RequestException as e:
             logger.warning(
@@ -176,9 +270,9 @@ class StanzaServiceClient(ZeeguuTokenizer):
             return []
 
         try:
-            response = requests.post(
+            data = _post(
                 f"{self.service_url}/tokenize_batch",
-                json={
+                {
                     "texts": texts,
                     "language": self.language.code,
                     "model": self.model_string,
@@ -186,8 +280,6 @@ class StanzaServiceClient(ZeeguuTokenizer):
                 },
                 timeout=REQUEST_TIMEOUT * 2,  # Longer timeout for batch
             )
-            response.raise_for_status()
-            data = response.json()
             return [r.get("tokens", []) for r in data.get("results", [])]
 
         except requests.RequestException as e:
@@ -5,9 +5,25 @@ Locates words/phrases in tokenized text for bookmark position anchoring.
 Tokenizes both target and context, then compares token sequences.
 """
 
+from zeeguu.core.utils.caching import approximate_size, named_cache
 from zeeguu.logging import log
 
 
+def _approximate_tokenized_size(value):
+    # Tokens are alike, so sizing the first one stands in for walking all
+    tokens, normalized = value
+    if not tokens:
+        return approximate_size(value)
+    return len(tokens) * (approximate_size(tokens[0]) + approximate_size(normalized[0]))
+
+
+# Tokenized texts, per (language, text): the same bookmark context is looked
+# up strictly and fuzzily, and by several callers of the same request
+_tokenized = named_cache(
+    "word_position_finder", max_entries=2048, size_of=_approximate_tokenized_size
+)
+
+
 def _get_tokenizer(from_lang):
     """Get the appropriate tokenizer for a language."""
     from zeeguu.core.tokenization.zeeguu_tokenizer import TokenizerModel
@@ -25,54 +41,91 @@ def _normalize_token(text):
     return "".join(c for c in text.lower() if c.isalnum())
 
 
-def find_word_positions_in_text(target_word, context_text, from_lang, strict_matching=False, use_legacy_api=False):
+def _tokenize_and_normalize(text, from_lang):
     """
-    Find all positions of a target word/phrase in context text.
-
-    Tokenizes both target and context using the same tokenizer, then finds
-    where the target token sequence appears in the context tokens.
-
-    Returns:
-        dict with 'found_positions' list and 'tokens_list'
+    The tokens of text (Token objects, flattened) and their normalized
+    texts, as two tuples; memoized per (language, text)
     """
-    try:
+
+    def tokenize():
         tokenizer = _get_tokenizer(from_lang)
+        tokens = tuple(tokenizer.tokenize_text(text, as_serializable_dictionary=False))
+        return tokens, tuple(_normalize_token(t.text) for t in tokens)
+
+    return _tokenized.get_or_load((from_lang.code, text), tokenize)
 
-        # Tokenize both target and context with same tokenizer
-        target_tokens = list(tokenizer.tokenize_text(target_word, as_serializable_dictionary=False))
-        context_tokens = list(tokenizer.tokenize_text(context_text, as_serializable_dictionary=False))
 
-        # Normalize target tokens for comparison
-        target_normalized = [_normalize_token(t.text) for t in target_tokens]
-        target_len = len(target_normalized)
+def _matching_starts(target_normalized, context_normalized):
+    """
+    The context positions where the target sequence starts, as two lists:
+    strict (every token equal) and fuzzy (every token equal, or one a
+    substring of the other). Strict matches are fuzzy matches too, so both
+    come out of one pass over the windows, each dropped at its first token
+    that doesn't match even fuzzily.
+    """
+    strict = []
+    fuzzy = []
+    target_len = len(target_normalized)
+    for i in range(len(context_normalized) - target_len + 1):
+        equal = True
+        for t, c in zip(target_normalized, context_normalized[i : i + target_len]):
+            if t == c:
+                continue
+            if t in c or c in t:
+                equal = False
+                continue
+            break
+        else:
+            fuzzy.append(i)
+            if equal:
+                strict.append(i)
+    return strict, fuzzy
+
+
+def _find_matches(target_word, context_text, from_lang):
+    """
+    The context tokens, the target length in tokens, and the strict and
+    fuzzy start positions of the target in the context
+    """
+    _, target_normalized = _tokenize_and_normalize(target_word, from_lang)
+    context_tokens, context_normalized = _tokenize_and_normalize(context_text, from_lang)
+    if not target_normalized:
+        return context_tokens, 0, [], []
+
+    strict, fuzzy = _matching_starts(target_normalized, context_normalized)
+    return context_tokens, len(target_normalized), strict, fuzzy
 
-        if target_len == 0:
-            return {'found_positions': [], 'tokens_list': context_tokens}
 
-        found_positions = []
+def _positions(context_tokens, starts, target_len):
+    return [
+        {
+            'sentence_i': context_tokens[i].sent_i,
+            'token_i': context_tokens[i].token_i,
+            'tokens_matched': target_len
+        }
+        for i in starts
+    ]
 
-        # Slide through context looking for target sequence
-        for i in range(len(context_tokens) - target_len + 1):
-            context_slice = [_normalize_token(context_tokens[i + j].text) for j in range(target_len)]
 
-            if strict_matching:
-                matches = (context_slice == target_normalized)
-            else:
-                # Fuzzy: each token must match (equal or substring)
-                matches = all(
-                    t == c or t in c or c in t
-                    for t, c in zip(target_normalized, context_slice)
-                )
+def find_word_positions_in_text(target_word, context_text, from_lang, strict_matching=False, use_legacy_api=False):
+    """
+    Find all positions of a target word/phrase in context text.
 
-            if matches:
-                token = context_tokens[i]
-                found_positions.append({
-                    'sentence_i': token.sent_i,
-                    'token_i': token.token_i,
-                    'tokens_matched': target_len
-                })
+    Tokenizes both target and context using the same tokenizer, then finds
+    where the target token sequence appears in the context tokens.
 
-        return {'found_positions': found_positions, 'tokens_list': context_tokens}
+    Returns:
+        dict with 'found_positions' list and 'tokens_list'
+    """
+    try:
+        context_tokens, target_len, strict, fuzzy = _find_matches(
+            target_word, context_text, from_lang
+        )
+        starts = strict if strict_matching else fuzzy
+        return {
+            'found_positions': _positions(context_tokens, starts, target_len),
+            'tokens_list': list(context_tokens),
+        }
 
     except Exception as e:
         log(f"ERROR: Tokenization failed for word '{target_word}' in context '{context_text}': {str(e)}")
@@ -166,16 +219,10 @@ def word_appears_standalone(target_word, context_text, from_lang):
         }
     """
     try:
-        # Check strict matching (standalone tokens)
-        strict_result = find_word_positions_in_text(target_word, context_text, from_lang, strict_matching=True)
-        strict_positions = strict_result['found_positions']
-
-        # Check fuzzy matching (includes compounds)
-        fuzzy_result = find_word_positions_in_text(target_word, context_text, from_lang, strict_matching=False)
-        fuzzy_positions = fuzzy_result['found_positions']
+        context_tokens, _, strict, fuzzy = _find_matches(target_word, context_text, from_lang)
 
         # If strict finds it, word appears standalone
-        if len(strict_positions) > 0:
+        if strict:
             return {
                 'standalone': True,
                 'only_in_compounds': False,
@@ -184,17 +231,8 @@ def word_appears_standalone(target_word, context_text, from_lang):
             }
 
         # If fuzzy finds it but strict doesn't, word only appears in compounds
-        if len(fuzzy_positions) > 0:
-            # Extract the compound words
-            tokens_list = fuzzy_result['tokens_list']
-            compound_examples = []
-            for pos in fuzzy_positions:
-                # Find the token at this position
-                for token in tokens_list:
-                    if token.sent_i == pos['sentence_i'] and token.token_i == pos['token_i']:
-                        compound_examples.append(token.text)
-                        break
-
+        if fuzzy:
+            compound_examples = [context_tokens[i].text for i in fuzzy]
             return {
                 'standalone': False,
                 'only_in_compounds': True,
@@ -227,7 +265,7 @@ def find_target_in_tokenized_context(target_word, context_tokenized, from_lang,
     Re-uses the same tokenizer to tokenize `target_word` so the comparison
     happens against the exact tokens the client will receive in
     `context_tokenized`. This is the inverse of `find_word_positions_in_text`,
-    which re-tokenizes the context every call — here the context tokens are
+    which tokenizes the context itself — here the context tokens are
     already available, so we avoid the extra Stanza pass.
 
     Args:
@@ -247,15 +285,12 @@ def find_target_in_tokenized_context(target_word, context_tokenized, from_lang,
         return None
 
     try:
-        tokenizer = _get_tokenizer(from_lang)
-        target_tokens = list(
-            tokenizer.tokenize_text(target_word, as_serializable_dictionary=False, flatten=True)
-        )
+        _, target_normalized = _tokenize_and_normalize(target_word, from_lang)
     except Exception as e:
         log(f"find_target_in_tokenized_context: tokenization failed for '{target_word}': {e}")
         return None
 
-    target_normalized = [_normalize_token(t.text) for t in target_tokens]
+    target_normalized = list(target_normalized)
     target_len = len(target_normalized)
     if target_len == 0:
         return None
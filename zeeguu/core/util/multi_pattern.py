@@ -0,0 +1,85 @@
+"""
+Finding which of many literal patterns occur in a text, in one pass.
+
+The patterns are compiled once into a single regex shaped like a trie
+(e.g. "stab", "stabbed", "stabbing" become stab(?:b(?:ed|ing))?), so the
+regex engine walks the text once instead of once per pattern, as the
+`pattern in text` loops it replaces did.
+
+The result is exactly what those loops computed: the set of patterns that
+occur as a substring of the text, including patterns that overlap or that
+are prefixes of other patterns.
+"""
+
+import re
+from functools import lru_cache
+
+
+def _trie_regex(node):
+    alternatives = [
+        re.escape(char) + _trie_regex(child)
+        for char, child in sorted(node.items())
+        if char != ""
+    ]
+    if not alternatives:
+        return ""
+
+    body = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+    if "" in node:
+        # A pattern ends here; the greedy ? still prefers the longer ones
+        return f"(?:{body})?"
+    return body
+
+
+class MultiPatternMatcher:
+    def __init__(self, patterns):
+        self.patterns = tuple(dict.fromkeys(p for p in patterns if p))
+
+        trie = {}
+        for pattern in self.patterns:
+            node = trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+        # The lookahead makes the matches zero width, so finditer tries every
+        # position, and gives the longest pattern that starts there
+        self._regex = (
+            re.compile(f"(?=({_trie_regex(trie)}))") if self.patterns else None
+        )
+
+        # Whenever a pattern matches at a position, so do all the patterns
+        # that are prefixes of it
+        pattern_set = set(self.patterns)
+        self._prefixes_of = {
+            pattern: [
+                pattern[:i] for i in range(1, len(pattern) + 1) if pattern[:i] in pattern_set
+            ]
+            for pattern in self.patterns
+        }
+
+    def found_in(self, text):
+        """The set of patterns that occur in text"""
+        if not text or self._regex is None:
+            return set()
+
+        longest_matches = {match.group(1) for match in self._regex.finditer(text)}
+
+        found = set()
+        for longest in longest_matches:
+            found.update(self._prefixes_of[longest])
+        return found
+
+    def first_found_in(self, text):
+        """The first pattern (in the original order) that occurs in text, or None"""
+        found = self.found_in(text)
+        return next((p for p in self.patterns if p in found), None)
+
+    def __repr__(self):
+        return f"<MultiPatternMatcher {len(self.patterns)} patterns>"
+
+
+@lru_cache(maxsize=None)
+def matcher_for(patterns: tuple):
+    """Compiles a matcher once per (hashable) pattern tuple."""
+    return MultiPatternMatcher(patterns)
@@ -1,27 +1,652 @@
+"""
+In-process caches with bounded size, optional expiry and metrics.
+
+Every cache is registered by name, so that /metrics can report hits,
+misses, evictions and (approximate) memory for all of them:
+
+    from zeeguu.core.utils.caching import named_cache
+
+    _models = named_cache("ml_cefr_models")
+    model = _models.get_or_load(language_code, lambda: load_from_disk(language_code))
+
+A cache can be bounded by number of entries (LRU), by approximate size in
+bytes, and/or by time to live. get_or_load is single-flight: when many
+threads miss on the same key at the same time, only one of them runs the
+loader and the others wait for its result.
+
+Caches created with shared=True are kept in Redis when
+ZEEGUU_SHARED_CACHE_URL is set (and the redis package is installed), so
+that all the API workers see the same entries. Otherwise, or if Redis
+can't be reached when the cache is created, they are in memory like the
+others. Redis failing later makes lookups misses, not errors.
+
+Caches created with a path are kept in an SQLite file there, which all
+the processes on the machine share and which outlives them (e.g. the
+responses of the LLM APIs, see zeeguu.core.llm_services.response_cache).
+"""
+
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
 from functools import wraps
 
+from zeeguu.logging import log
+
+SHARED_CACHE_URL = os.environ.get("ZEEGUU_SHARED_CACHE_URL")
+
+_MISSING = object()
+
+# Upper bound on the objects visited when estimating the size of a value,
+# so that sizing a huge dict doesn't cost more than loading it did
+_MAX_OBJECTS_TO_SIZE = 100_000
+
+
+def approximate_size(value):
+    """
+    Rough deep size of value in bytes: sys.getsizeof of the value and of
+    everything reachable through containers and instance dicts.
+    """
+    seen = set()
+    to_visit = [value]
+    total = 0
+
+    while to_visit and len(seen) < _MAX_OBJECTS_TO_SIZE:
+        obj = to_visit.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        try:
+            total += sys.getsizeof(obj)
+        except TypeError:
+            continue
+
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(obj, dict):
+            to_visit.extend(obj.keys())
+            to_visit.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            to_visit.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            to_visit.append(obj.__dict__)
+
+    return total
+
+
+class MemoryBackend:
+    """
+    An LRU dict of key -> (expires_at, size, value).
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key, now):
+        """Returns (value or _MISSING, expired)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING, False
+
+        expires_at, _, value = entry
+        if expires_at is not None and expires_at <= now:
+            self.delete(key)
+            return _MISSING, True
+
+        self._entries.move_to_end(key)
+        return value, False
+
+    def set(self, key, value, ttl_seconds, now, size):
+        """Stores the value; returns the number of entries evicted for it"""
+        self.delete(key)
+
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+
+        evicted = 0
+        while self._over_capacity() and len(self._entries) > 1:
+            self._pop_oldest()
+            evicted += 1
+        return evicted
+
+    def delete(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def entry_count(self):
+        return len(self._entries)
+
+    def byte_count(self):
+        return self._bytes
+
+    def _over_capacity(self):
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        if self.max_bytes is not None and self._bytes > self.max_bytes:
+            return True
+        return False
+
+    def _pop_oldest(self):
+        _, (_, size, _) = self._entries.popitem(last=False)
+        self._bytes -= size
+
+
+class RedisBackend:
+    """
+    Keeps the entries of one cache in Redis, pickled, under
+    zeeguu:cache:<cache name>:<key>. Redis takes care of expiry; eviction
+    is left to the server's maxmemory-policy.
+
+    When Redis fails, the cache degrades instead of failing its callers: the
+    error is logged, a get is a miss and a set or delete does nothing.
+    """
+
+    def __init__(self, client, name):
+        from redis.exceptions import RedisError
+
+        self.client = client
+        self.prefix = f"zeeguu:cache:{name}:"
+        self._errors = RedisError
+
+    def _redis_key(self, key):
+        return self.prefix + repr(key)
+
+    def _failed(self, operation, error):
+        log(f"Redis {operation} for {self.prefix}* failed: {error}")
+
+    def get(self, key, now):
+        try:
+            raw = self.client.get(self._redis_key(key))
+        except self._errors as e:
+            self._failed("get", e)
+            return _MISSING, False
+        if raw is None:
+            return _MISSING, False
+        return pickle.loads(raw), False
+
+    def set(self, key, value, ttl_seconds, now, size):
+        try:
+            self.client.set(
+                self._redis_key(key),
+                pickle.dumps(value),
+                px=int(ttl_seconds * 1000) if ttl_seconds is not None else None,
+            )
+        except self._errors as e:
+            self._failed("set", e)
+        return 0
+
+    def delete(self, key):
+        try:
+            self.client.delete(self._redis_key(key))
+        except self._errors as e:
+            self._failed("delete", e)
+
+    def clear(self):
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except self._errors as e:
+            self._failed("clear", e)
+
+    def entry_count(self):
+        return None
+
+    def byte_count(self):
+        return None
+
+
+class SQLiteBackend:
+    """
+    Keeps the entries of a cache in an SQLite file, pickled, under repr(key).
+
+    Expiry is by wall clock time, since the entries outlive the process;
+    expired entries are deleted when looked up, and all of them at most
+    every PURGE_INTERVAL_SECONDS. The size limits are enforced on every
+    set, evicting the least recently used entries; sizes are those of the
+    pickles. So that hits don't all turn into writes, the time an entry
+    was last used is only updated once it is USE_RESOLUTION_SECONDS old.
+    """
+
+    PURGE_INTERVAL_SECONDS = 60
+    USE_RESOLUTION_SECONDS = 60
+
+    def __init__(self, path, max_entries=None, max_bytes=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._purged_at = 0
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.executescript(
+                """
+                PRAGMA journal_mode = WAL;
+                CREATE TABLE IF NOT EXISTS entry (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    used_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entry_by_use ON entry (used_at);
+                CREATE INDEX IF NOT EXISTS entry_by_expiry ON entry (expires_at);
+                """
+            )
+            self._local.connection = connection
+        return connection
+
+    def _bounded(self):
+        return self.max_entries is not None or self.max_bytes is not None
+
+    def get(self, key, now):
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, expires_at, used_at FROM entry WHERE key = ?", (repr(key),)
+        ).fetchone()
+        if row is None:
+            return _MISSING, False
+
+        value, expires_at, used_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            self.delete(key)
+            return _MISSING, True
+
+        if self._bounded() and used_at <= now - self.USE_RESOLUTION_SECONDS:
+            connection.execute(
+                "UPDATE entry SET used_at = ? WHERE key = ?", (now, repr(key))
+            )
+        return pickle.loads(value), False
+
+    def set(self, key, value, ttl_seconds, now, size):
+        now = time.time()
+        blob = pickle.dumps(value)
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entry VALUES (?, ?, ?, ?, ?)",
+            (
+                repr(key),
+                blob,
+                len(blob),
+                now + ttl_seconds if ttl_seconds is not None else None,
+                now,
+            ),
+        )
+        if self._purged_at <= now - self.PURGE_INTERVAL_SECONDS:
+            self._purged_at = now
+            connection.execute("DELETE FROM entry WHERE expires_at <= ?", (now,))
+        return self._evict(connection, repr(key))
+
+    def _evict(self, connection, newest_key):
+        evicted = 0
+        if self.max_entries is not None and self.entry_count() > self.max_entries:
+            # From the most recently used, the entries beyond the limit
+            evicted += connection.execute(
+                """
+                DELETE FROM entry WHERE key IN (
+                    SELECT key FROM entry ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+        if self.max_bytes is not None and self.byte_count() > self.max_bytes:
+            # As in MemoryBackend, the newest entry is kept in any case
+            evicted += connection.execute(
+                """
+                DELETE FROM entry WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY used_at DESC) AS kept
+                        FROM entry
+                    )
+                    WHERE kept > ?
+                ) AND key != ?
+                """,
+                (self.max_bytes, newest_key),
+            ).rowcount
+        return evicted
+
+    def delete(self, key):
+        self._connection().execute("DELETE FROM entry WHERE key = ?", (repr(key),))
 
-def cache_on_data_keys(*cache_keys):
+    def clear(self):
+        self._connection().execute("DELETE FROM entry")
+
+    def entry_count(self):
+        [(count,)] = self._connection().execute("SELECT COUNT(*) FROM entry")
+        return count
+
+    def byte_count(self):
+        [(size,)] = self._connection().execute("SELECT TOTAL(size) FROM entry")
+        return int(size)
+
+
+_redis_client = None
+
+
+def _shared_backend(name):
+    """A RedisBackend if a shared cache is configured and reachable, else None"""
+    global _redis_client
+
+    if not SHARED_CACHE_URL:
+        return None
+
+    if _redis_client is None:
+        try:
+            import redis
+        except ImportError:
+            log("ZEEGUU_SHARED_CACHE_URL is set, but redis is not installed")
+            return None
+
+        client = redis.Redis.from_url(
+            SHARED_CACHE_URL, socket_connect_timeout=1, socket_timeout=1
+        )
+        try:
+            client.ping()
+        except redis.exceptions.RedisError as e:
+            log(f"Redis is not reachable, keeping cache {name} in memory: {e}")
+            return None
+        _redis_client = client
+
+    return RedisBackend(_redis_client, name)
+
+
+class _Flight:
+    """A load in progress, which other threads missing on the same key wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Cache:
+    """
+    A named, thread safe cache. See the module docstring.
+
+    Supports the dict operations that the ad-hoc caches it replaces were
+    used with (cache[key], cache[key] = value, key in cache, cache.get).
+
+    size_of estimates the bytes of a value; caches of many similar objects,
+    for which walking every one of them costs more than the lookup saves,
+    can pass a cheaper estimate.
+
+    path is that of an SQLite file to keep the entries in (see
+    SQLiteBackend); it takes precedence over shared.
+    """
+
+    def __init__(
+        self,
+        name,
+        max_entries=None,
+        max_bytes=None,
+        ttl_seconds=None,
+        shared=False,
+        size_of=approximate_size,
+        path=None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.shared = False
+        self._size_of = size_of
+
+        # Entries kept in a file are meant to outlive the process; they
+        # are not emptied by clear_all_caches
+        self.persistent = path is not None
+
+        self._backend = None
+        self._backend_name = "memory"
+        if path is not None:
+            self._backend = SQLiteBackend(path, max_entries, max_bytes)
+            self._backend_name = "sqlite"
+        elif shared:
+            self._backend = _shared_backend(name)
+            self.shared = self._backend is not None
+            if self.shared:
+                self._backend_name = "redis"
+        if self._backend is None:
+            self._backend = MemoryBackend(max_entries, max_bytes)
+
+        self._lock = threading.Lock()
+        # MemoryBackend is a plain OrderedDict, used holding the lock; the
+        # others are thread safe, and are used without it, since they do
+        # network or disk I/O that would hold up every other thread
+        memory = self._backend_name == "memory"
+        self._backend_lock = self._lock if memory else nullcontext()
+        self._in_flight = {}
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.load_failures = 0
+        self.load_seconds = 0.0
+
+    def _peek(self, key):
+        """(value or _MISSING, expired), without counting the lookup"""
+        with self._backend_lock:
+            return self._backend.get(key, time.monotonic())
+
+    def _lookup(self, key):
+        value, expired = self._peek(key)
+        with self._lock:
+            if expired:
+                self.expirations += 1
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl_seconds=_MISSING):
+        if ttl_seconds is _MISSING:
+            ttl_seconds = self.ttl_seconds
+        # The other backends measure what they store themselves
+        size = self._size_of(value) if self._backend_name == "memory" else 0
+
+        with self._backend_lock:
+            evicted = self._backend.set(key, value, ttl_seconds, time.monotonic(), size)
+        with self._lock:
+            self.evictions += evicted
+
+    def delete(self, key):
+        with self._backend_lock:
+            self._backend.delete(key)
+
+    def clear(self):
+        """Empties the cache. Returns the number of entries that were in it."""
+        with self._backend_lock:
+            count = self._backend.entry_count()
+            self._backend.clear()
+        return count
+
+    def get_or_load(self, key, loader):
+        """
+        Returns the cached value for key, or caches and returns loader().
+        Concurrent misses on the same key run the loader only once; if it
+        raises, the exception is raised in all the waiting threads and
+        nothing is cached.
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        start = None
+        try:
+            # Another thread may have loaded it since the lookup above
+            value, _ = self._peek(key)
+            if value is not _MISSING:
+                flight.value = value
+                return value
+            start = time.monotonic()
+            flight.value = loader()
+            self.set(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.load_failures += 1
+            raise
+        finally:
+            with self._lock:
+                if start is not None:
+                    self.loads += 1
+                    self.load_seconds += time.monotonic() - start
+                del self._in_flight[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._backend_lock:
+            entries = self._backend.entry_count()
+            size = self._backend.byte_count()
+        with self._lock:
+            return {
+                "name": self.name,
+                "backend": self._backend_name,
+                "entries": entries,
+                "bytes": size,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "loads": self.loads,
+                "coalesced": self.coalesced,
+                "load_failures": self.load_failures,
+                "load_seconds": round(self.load_seconds, 3),
+            }
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self.delete(key)
+
+    def __contains__(self, key):
+        value, _ = self._peek(key)
+        return value is not _MISSING
+
+    def __len__(self):
+        with self._backend_lock:
+            return self._backend.entry_count() or 0
+
+    def __repr__(self):
+        return f"<Cache {self.name}>"
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def named_cache(name, **policy):
+    """
+    Returns the cache registered under name, creating it with the given
+    policy (see Cache) the first time.
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = Cache(name, **policy)
+        return _caches[name]
+
+
+def register_cache(cache):
+    """
+    Registers a cache created with Cache(...) under its name, replacing the
+    one registered under it before, if any; for caches that are set up
+    again when their configuration changes.
+    """
+    with _caches_lock:
+        _caches[cache.name] = cache
+    return cache
+
+
+def all_cache_stats():
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in sorted(caches, key=lambda c: c.name)]
+
+
+def clear_all_caches():
+    """
+    Empties every named cache but the persistent ones (e.g. a recording of
+    LLM responses); for tests, which reuse ids between cases
+    """
+    with _caches_lock:
+        caches = [cache for cache in _caches.values() if not cache.persistent]
+    for cache in caches:
+        cache.clear()
+
+
+def cache_on_data_keys(*cache_keys, name=None, max_entries=10_000, **policy):
     """Decorator that caches functions taking 'data' as first parameter"""
 
     def decorator(func):
-        cache = {}
+        cache = named_cache(
+            name or f"{func.__module__}.{func.__name__}",
+            max_entries=max_entries,
+            **policy,
+        )
 
         @wraps(func)
         def wrapper(data, *args, **kwargs):
             # Create cache key from specified dictionary keys
             cache_key = tuple(data.get(key) for key in cache_keys)
-
-            if cache_key not in cache:
-                cache[cache_key] = func(data, *args, **kwargs)
-
-            return cache[cache_key]
+            return cache.get_or_load(cache_key, lambda: func(data, *args, **kwargs))
 
         # Add cache management methods
-        wrapper.cache_clear = lambda: cache.clear()
-        wrapper.cache_info = (
-            lambda: f"Cache size: {len(cache)}, Keys: {list(cache.keys())}"
-        )
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        wrapper.cache_info = cache.stats
 
         return wrapper
 
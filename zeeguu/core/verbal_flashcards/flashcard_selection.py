@@ -1,12 +1,8 @@
 import os
 
-from sqlalchemy import func
-from sqlalchemy.orm import aliased
-
+from zeeguu.core.model.answer_variant import AnswerVariant
 from zeeguu.core.model.bookmark import Bookmark
-from zeeguu.core.model.db import db
-from zeeguu.core.model.meaning import Meaning
-from zeeguu.core.model.phrase import Phrase
+from zeeguu.core.utils.caching import named_cache
 from zeeguu.core.verbal_flashcards.fuzzy_match import (
     optimal_string_alignment_distance,
 )
@@ -20,6 +16,17 @@ VERBAL_FLASHCARDS_REQUIRE_LEVEL_3_ENV = "VERBAL_FLASHCARDS_REQUIRE_LEVEL_3"
 MAX_ANSWER_VARIANTS = 20
 MAX_ANSWER_VARIANT_EDIT_DISTANCE = 2
 
+# The flashcards of a user are paged through in several requests; they are
+# computed once and kept for this long, or until the user answers a card
+FLASHCARD_COLLECTION_TTL_SECONDS = 60
+# user id -> (settings the collection was computed with, flashcards)
+_flashcard_collection_cache = named_cache(
+    "verbal_flashcard_collections",
+    ttl_seconds=FLASHCARD_COLLECTION_TTL_SECONDS,
+    max_entries=10_000,
+    shared=True,
+)
+
 
 def requires_level_3_flashcards():
     raw_value = os.environ.get(VERBAL_FLASHCARDS_REQUIRE_LEVEL_3_ENV, "false")
@@ -63,7 +70,7 @@ def _add_unique_text(texts, text):
         texts.append(cleaned_text)
 
 
-def _is_close_answer_variant(primary_answer, candidate_answer, language_code):
+def _is_close_answer_variant(primary_form, candidate_form):
     """
     Keep database variants scoped to likely surface-form relatives.
 
@@ -72,17 +79,15 @@ def _is_close_answer_variant(primary_answer, candidate_answer, language_code):
     but they are unrelated answers. Until Zeeguu has a meaning-family or
     inflection-group model, only accept variants that are at most two edits
     away from the scheduled answer, which keeps cases like "bold" / "bolden".
-    """
-    try:
-        normalizer = normalizer_for(language_code)
-    except UnsupportedLanguageError:
-        return False
-
-    primary_form = normalizer.canonical_form(primary_answer)
-    candidate_form = normalizer.canonical_form(candidate_answer)
 
+    Both are canonical forms (see AnswerVariant.canonical_form).
+    """
     return (
-        optimal_string_alignment_distance(primary_form, candidate_form)
+        optimal_string_alignment_distance(
+            primary_form,
+            candidate_form,
+            max_distance=MAX_ANSWER_VARIANT_EDIT_DISTANCE,
+        )
         <= MAX_ANSWER_VARIANT_EDIT_DISTANCE
     )
 
@@ -107,38 +112,20 @@ def answer_variants_for_bookmark(bookmark):
     variants = []
     _add_unique_text(variants, primary_answer)
 
-    origin_language_id = meaning.origin.language_id
-    origin_language_code = meaning.origin.language.code
-    translation_language_id = meaning.translation.language_id
-    prompt_key = meaning.translation.content.lower().strip()
-
-    OriginPhrase = aliased(Phrase)
-    TranslationPhrase = aliased(Phrase)
-    if db.engine.dialect.name == "sqlite":
-        translation_filter = func.lower(TranslationPhrase.content) == prompt_key
-    else:
-        translation_filter = TranslationPhrase.content_lower == prompt_key
-
-    candidate_meanings = (
-        Meaning.query
-        .join(OriginPhrase, Meaning.origin_id == OriginPhrase.id)
-        .join(TranslationPhrase, Meaning.translation_id == TranslationPhrase.id)
-        .filter(OriginPhrase.language_id == origin_language_id)
-        .filter(TranslationPhrase.language_id == translation_language_id)
-        .filter(translation_filter)
-        .filter(Meaning.validated != Meaning.INVALID)
-        .order_by(Meaning.id.asc())
-        .limit(MAX_ANSWER_VARIANTS)
-        .all()
-    )
+    try:
+        normalizer = normalizer_for(meaning.origin.language.code)
+    except UnsupportedLanguageError:
+        return variants
+    primary_form = normalizer.canonical_form(primary_answer)
 
-    for candidate_meaning in candidate_meanings:
-        candidate_answer = candidate_meaning.origin.content
-        if _is_close_answer_variant(
-            primary_answer,
-            candidate_answer,
-            origin_language_code,
-        ):
+    candidates = AnswerVariant.answers_for_cue(
+        meaning.origin.language_id,
+        meaning.translation.language_id,
+        meaning.translation.content,
+        MAX_ANSWER_VARIANTS,
+    )
+    for candidate_answer, candidate_form in candidates:
+        if _is_close_answer_variant(primary_form, candidate_form):
             _add_unique_text(variants, candidate_answer)
 
     return variants
@@ -147,7 +134,26 @@ def answer_variants_for_bookmark(bookmark):
 def get_flashcard_collection(user):
     """
     Return Zeeguu study words as minimal verbal flashcards.
+
+    Cached per user (see FLASHCARD_COLLECTION_TTL_SECONDS), so that paging
+    through the cards doesn't recompute the study queue for every page.
     """
+    settings = (user.learned_language_id, requires_level_3_flashcards())
+    cached = _flashcard_collection_cache.get(user.id)
+    if cached is not None and cached[0] == settings:
+        return list(cached[1])
+
+    flashcards = _compute_flashcard_collection(user)
+    _flashcard_collection_cache.set(user.id, (settings, flashcards))
+    return list(flashcards)
+
+
+def forget_flashcard_collection(user):
+    """Called when the user's study queue changes, e.g. after an answer"""
+    _flashcard_collection_cache.delete(user.id)
+
+
+def _compute_flashcard_collection(user):
     user_words = BasicSRSchedule.user_words_to_study(user)
     flashcards = []
     seen_words = set()
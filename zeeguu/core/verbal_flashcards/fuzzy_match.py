@@ -1,18 +1,20 @@
-from zeeguu.core.verbal_flashcards.text_normalization import (
-    normalizer_for,
-    sanitize_spoken_text,
-)
+from zeeguu.core.verbal_flashcards.text_normalization import normalizer_for
 
 
 FUZZY_ACCEPTANCE_BUFFER = 0.1
 
 
-def optimal_string_alignment_distance(source, target):
+def optimal_string_alignment_distance(source, target, max_distance=None):
     """
     Return optimal string alignment distance.
 
     OSA is a restricted edit distance: adjacent transpositions count as one
     edit, but the same substring cannot be edited more than once.
+
+    With max_distance, only the diagonal band of the matrix that can still
+    lead to a distance within it is computed, and the computation stops as
+    soon as no path can; distances above max_distance are then reported as
+    max_distance + 1. Distances within it are exact.
     """
     if source == target:
         return 0
@@ -20,49 +22,79 @@ def optimal_string_alignment_distance(source, target):
     source_length = len(source)
     target_length = len(target)
 
+    if max_distance is not None and abs(source_length - target_length) > max_distance:
+        return max_distance + 1
     if source_length == 0:
         return target_length
     if target_length == 0:
         return source_length
 
-    distance = {}
-    for i in range(-1, source_length + 1):
-        distance[(i, -1)] = i + 1
-    for j in range(-1, target_length + 1):
-        distance[(-1, j)] = j + 1
-
-    for i in range(source_length):
-        for j in range(target_length):
-            substitution_cost = 0 if source[i] == target[j] else 1
-            distance[(i, j)] = min(
-                distance[(i - 1, j)] + 1,
-                distance[(i, j - 1)] + 1,
-                distance[(i - 1, j - 1)] + substitution_cost,
-            )
+    band = max(source_length, target_length) if max_distance is None else max_distance
+    # Cells outside the band are at least this far, whatever their real value
+    too_far = band + 1
+
+    # Only three rows of the matrix are ever needed: the transposition looks
+    # two rows back
+    before_previous = None
+    previous = list(range(target_length + 1))
+    for j in range(band + 1, target_length + 1):
+        previous[j] = too_far
+
+    for i in range(1, source_length + 1):
+        current = [too_far] * (target_length + 1)
+        if i <= band:
+            current[0] = i
+
+        source_char = source[i - 1]
+        previous_source_char = source[i - 2] if i > 1 else None
+        # Runs for every cell: comparisons are cheaper than calling min()
+        for j in range(max(1, i - band), min(target_length, i + band) + 1):
+            target_char = target[j - 1]
+            substitution_cost = 0 if source_char == target_char else 1
+
+            value = previous[j] + 1
+            insertion = current[j - 1] + 1
+            if insertion < value:
+                value = insertion
+            substitution = previous[j - 1] + substitution_cost
+            if substitution < value:
+                value = substitution
 
             if (
-                i > 0
-                and j > 0
-                and source[i] == target[j - 1]
-                and source[i - 1] == target[j]
+                previous_source_char == target_char
+                and j > 1
+                and source_char == target[j - 2]
             ):
-                distance[(i, j)] = min(
-                    distance[(i, j)],
-                    distance[(i - 2, j - 2)] + substitution_cost,
-                )
+                transposition = before_previous[j - 2] + substitution_cost
+                if transposition < value:
+                    value = transposition
+
+            current[j] = value if value < too_far else too_far
+
+        # A transposition can skip one row, so give up only when two
+        # consecutive rows are out of reach
+        if max_distance is not None and min(current) > band and min(previous) > band:
+            return too_far
 
-    return distance[(source_length - 1, target_length - 1)]
+        before_previous, previous = previous, current
+
+    return min(previous[target_length], too_far)
 
 
 def normalized_optimal_string_alignment_similarity(source, target):
     """Return a similarity score in the range [0, 1]."""
+    return _similarity_from_distance(
+        source, target, optimal_string_alignment_distance(source, target)
+    )
+
+
+def _similarity_from_distance(source, target, distance):
     if not source and not target:
         return 1.0
     if not source or not target:
         return 0.0
 
     max_length = max(len(source), len(target))
-    distance = optimal_string_alignment_distance(source, target)
     return max(0.0, 1.0 - (distance / max_length))
 
 
@@ -78,41 +110,37 @@ def jaro_similarity(source, target):
         return 0.0
 
     match_distance = max(source_length, target_length) // 2 - 1
-    source_matches = [False] * source_length
     target_matches = [False] * target_length
-    matches = 0
-    transpositions = 0
+    source_matched_chars = []
 
-    for i in range(source_length):
+    for i, source_char in enumerate(source):
         start = max(0, i - match_distance)
         end = min(i + match_distance + 1, target_length)
 
-        for j in range(start, end):
-            if target_matches[j]:
-                continue
-            if source[i] != target[j]:
-                continue
+        # The first unmatched occurrence of the character in the window
+        j = target.find(source_char, start, end)
+        while j != -1 and target_matches[j]:
+            j = target.find(source_char, j + 1, end)
 
-            source_matches[i] = True
+        if j != -1:
             target_matches[j] = True
-            matches += 1
-            break
+            source_matched_chars.append(source_char)
 
+    matches = len(source_matched_chars)
     if matches == 0:
         return 0.0
 
-    target_index = 0
-    for i in range(source_length):
-        if not source_matches[i]:
-            continue
-
-        while not target_matches[target_index]:
-            target_index += 1
-
-        if source[i] != target[target_index]:
-            transpositions += 1
-
-        target_index += 1
+    # Matched characters in source order against matched ones in target order
+    target_matched_chars = [
+        target_char
+        for target_char, is_matched in zip(target, target_matches)
+        if is_matched
+    ]
+    transpositions = sum(
+        1
+        for source_char, target_char in zip(source_matched_chars, target_matched_chars)
+        if source_char != target_char
+    )
 
     return (
         (matches / source_length)
@@ -158,7 +186,10 @@ def allowed_optimal_string_alignment_distance(expected_word, language_code=None)
     future analysis, but it does not decide correctness.
     """
     normalizer = normalizer_for(language_code)
-    normalized_length = len(normalizer.canonical_form(expected_word))
+    return _allowed_distance_for_length(len(normalizer.canonical_form(expected_word)))
+
+
+def _allowed_distance_for_length(normalized_length):
     if normalized_length <= 2:
         return 0
     if normalized_length <= 4:
@@ -178,32 +209,51 @@ def fuzzy_match_threshold(expected_word, language_code=None):
     uses allowed_optimal_string_alignment_distance instead.
     """
     normalizer = normalizer_for(language_code)
-    normalized_length = len(normalizer.canonical_form(expected_word))
+    return _match_threshold_for_length(len(normalizer.canonical_form(expected_word)))
+
+
+def _match_threshold_for_length(normalized_length):
     if normalized_length <= 0:
         return 1.0
 
-    allowed_distance = allowed_optimal_string_alignment_distance(
-        expected_word,
-        language_code,
-    )
+    allowed_distance = _allowed_distance_for_length(normalized_length)
     return max(0.0, 1.0 - (allowed_distance / normalized_length))
 
 
+class _WordForms:
+    """
+    A word with its normalized forms, computed once.
+
+    calculate_accuracy compares every spoken word with every expected word
+    (of every answer variant), so normalizing inside score_word_match
+    repeated the same normalization for each pair.
+    """
+
+    __slots__ = ("forms", "allowed_distance", "match_threshold")
+
+    def __init__(self, word, normalizer):
+        word = word or ""
+        canonical = normalizer.canonical_form(word)
+        # Compared pairwise: raw, canonical, and ASR-tolerant
+        self.forms = (word, canonical, normalizer.asr_tolerant_form(word))
+        self.allowed_distance = _allowed_distance_for_length(len(canonical))
+        self.match_threshold = _match_threshold_for_length(len(canonical))
+
+
 def score_word_match(user_word, expected_word, language_code=None):
     """Compare two words using exact, normalized, and edit-distance signals."""
-    user_word = user_word or ""
-    expected_word = expected_word or ""
     normalizer = normalizer_for(language_code)
-
-    normalized_user_word = normalizer.canonical_form(user_word)
-    normalized_expected_word = normalizer.canonical_form(expected_word)
-    asr_user_word = normalizer.asr_tolerant_form(user_word)
-    asr_expected_word = normalizer.asr_tolerant_form(expected_word)
-    allowed_distance = allowed_optimal_string_alignment_distance(
-        expected_word,
-        language_code,
+    return _score_word_forms(
+        _WordForms(user_word, normalizer),
+        _WordForms(expected_word, normalizer),
     )
 
+
+def _score_word_forms(user, expected):
+    user_word, normalized_user_word, asr_user_word = user.forms
+    expected_word, normalized_expected_word, asr_expected_word = expected.forms
+    allowed_distance = expected.allowed_distance
+
     if user_word == expected_word:
         return {
             "isMatch": True,
@@ -233,33 +283,20 @@ def score_word_match(user_word, expected_word, language_code=None):
             "matchThreshold": 1.0,
         }
 
-    optimal_string_alignment = min(
-        optimal_string_alignment_distance(user_word, expected_word),
-        optimal_string_alignment_distance(
-            normalized_user_word,
-            normalized_expected_word,
-        ),
-        optimal_string_alignment_distance(asr_user_word, asr_expected_word),
-    )
+    # Each pair's distance gives both the minimum distance and the
+    # normalized similarity
+    pairs = list(zip(user.forms, expected.forms))
+    distances = [optimal_string_alignment_distance(u, e) for u, e in pairs]
+
+    optimal_string_alignment = min(distances)
     normalized_optimal_string_alignment = max(
-        normalized_optimal_string_alignment_similarity(user_word, expected_word),
-        normalized_optimal_string_alignment_similarity(
-            normalized_user_word,
-            normalized_expected_word,
-        ),
-        normalized_optimal_string_alignment_similarity(asr_user_word, asr_expected_word),
-    )
-    jaro_winkler = max(
-        boundary_aware_jaro_winkler_similarity(user_word, expected_word),
-        boundary_aware_jaro_winkler_similarity(
-            normalized_user_word,
-            normalized_expected_word,
-        ),
-        boundary_aware_jaro_winkler_similarity(asr_user_word, asr_expected_word),
+        _similarity_from_distance(u, e, distance)
+        for (u, e), distance in zip(pairs, distances)
     )
+    jaro_winkler = max(boundary_aware_jaro_winkler_similarity(u, e) for u, e in pairs)
 
     is_match = optimal_string_alignment <= allowed_distance
-    match_threshold = fuzzy_match_threshold(expected_word, language_code)
+    match_threshold = expected.match_threshold
 
     return {
         "isMatch": is_match,
@@ -279,25 +316,33 @@ def calculate_accuracy(user_speech, expected_text, language_code=None):
     Calculate accuracy between user speech and expected text.
     Each expected word looks for the closest unmatched spoken word.
     """
-    user_speech = sanitize_spoken_text(user_speech, language_code)
-    expected_text = sanitize_spoken_text(expected_text, language_code)
+    normalizer = normalizer_for(language_code)
+    return _calculate_accuracy(
+        _spoken_words(user_speech, normalizer), expected_text, normalizer
+    )
 
-    user_words = [w for w in user_speech.split() if len(w) > 0]
-    expected_words = [w for w in expected_text.split() if len(w) > 0]
+
+def _spoken_words(text, normalizer):
+    text = normalizer.sanitize_spoken_text(text)
+    return [(word, _WordForms(word, normalizer)) for word in text.split()]
+
+
+def _calculate_accuracy(user_words, expected_text, normalizer):
+    expected_words = _spoken_words(expected_text, normalizer)
 
     word_matches = []
     accepted_words = 0
     matched_indices = set()
     word_score_total = 0.0
 
-    for i, expected_word in enumerate(expected_words):
+    for i, (expected_word, expected_forms) in enumerate(expected_words):
         best_candidate = None
 
-        for j, user_word in enumerate(user_words):
+        for j, (user_word, user_forms) in enumerate(user_words):
             if j in matched_indices:
                 continue
 
-            scores = score_word_match(user_word, expected_word, language_code)
+            scores = _score_word_forms(user_forms, expected_forms)
             candidate = {
                 "userWord": user_word,
                 "actualPosition": j,
@@ -339,17 +384,14 @@ def calculate_accuracy(user_speech, expected_text, language_code=None):
                 "allowedOptimalStringAlignmentDistance": (
                     best_score["allowedOptimalStringAlignmentDistance"]
                     if best_score
-                    else allowed_optimal_string_alignment_distance(
-                        expected_word,
-                        language_code,
-                    )
+                    else expected_forms.allowed_distance
                 ),
                 "jaroWinkler": best_score["jaroWinkler"] if best_score else 0.0,
                 "combinedScore": round(combined_score, 3),
                 "matchThreshold": (
                     best_score["matchThreshold"]
                     if best_score
-                    else fuzzy_match_threshold(expected_word, language_code)
+                    else expected_forms.match_threshold
                 ),
                 "isClose": bool(
                     best_score
@@ -400,8 +442,10 @@ def calculate_accuracy_against_variants(user_speech, expected_texts, language_co
     if not variants:
         variants = [""]
 
+    normalizer = normalizer_for(language_code)
+    user_words = _spoken_words(user_speech, normalizer)
     scored_variants = [
-        calculate_accuracy(user_speech, expected_text, language_code=language_code)
+        _calculate_accuracy(user_words, expected_text, normalizer)
         for expected_text in variants
     ]
 
@@ -2,6 +2,7 @@ from zeeguu.core.model.exercise_outcome import ExerciseOutcome
 from zeeguu.core.verbal_flashcards.flashcard_selection import (
     answer_variants_for_bookmark,
     find_flashcard_submission_target,
+    forget_flashcard_collection,
 )
 from zeeguu.core.verbal_flashcards.fuzzy_match import calculate_accuracy_against_variants
 
@@ -49,6 +50,7 @@ def record_flashcard_answer(
         session_id,
         other_feedback,
     )
+    forget_flashcard_collection(user)
 
     response_data = {
         "success": True,
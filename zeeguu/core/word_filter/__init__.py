@@ -1,8 +1,28 @@
+from functools import lru_cache
+
 from .profanity_filter import load_bad_words
 from .proper_noun_filter import load_proper_name_list
 
-BAD_WORD_LIST = load_bad_words()
-PROPER_NAMES_LIST = load_proper_name_list()
+
+# The lists are read from disk on first use rather than at import time;
+# most processes that import this package never need them.
+@lru_cache(maxsize=None)
+def bad_word_list():
+    return load_bad_words()
+
+
+@lru_cache(maxsize=None)
+def proper_names_list():
+    return load_proper_name_list()
+
+
+def __getattr__(name):
+    # Backwards compatibility for code that still reads the module constants
+    if name == "BAD_WORD_LIST":
+        return bad_word_list()
+    if name == "PROPER_NAMES_LIST":
+        return proper_names_list()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def remove_words_based_on_list(candidates, words_to_remove_list):
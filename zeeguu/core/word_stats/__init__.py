@@ -1,13 +1,84 @@
-from wordstats import LanguageInfo
+import os
 
-lang_cache = {}
+from wordstats import LanguageInfo, Word
 
+from zeeguu.config import ZEEGUU_DATA_FOLDER
+from zeeguu.core.utils.caching import named_cache
+from zeeguu.core.word_stats.compact_language_info import CompactLanguageInfo
 
-def lang_info(lang_code):
-    if not lang_cache.get(lang_code):
+lang_cache = named_cache("word_stats")
+
+# Memory-mapped word frequency data; see CompactLanguageInfo
+INDEX_FOLDER = (
+    os.path.join(ZEEGUU_DATA_FOLDER, "wordstats_index") if ZEEGUU_DATA_FOLDER else None
+)
+
+
+def _load_lang_info(lang_code):
+    # Shared with wordstats' Word.stats, which would otherwise load its
+    # own copy of the language
+    if lang_code in Word.stats_dict:
+        return Word.stats_dict[lang_code]
+
+    info = _open_index(lang_code)
+    if info is None:
         print(f"loading word stats for {lang_code}")
-        lang_cache[lang_code] = LanguageInfo.load(lang_code)
-    return lang_cache[lang_code]
+        info = LanguageInfo.load(lang_code)
+    Word.stats_dict[lang_code] = info
+    return info
+
+
+def _open_index(lang_code):
+    if not INDEX_FOLDER:
+        return None
+    return CompactLanguageInfo.open(INDEX_FOLDER, lang_code)
+
+
+def lang_info(lang_code):
+    return lang_cache.get_or_load(lang_code, lambda: _load_lang_info(lang_code))
+
+
+def ranks_for(words, lang_code):
+    """
+    The wordstats ranks of the words, in one lookup when the language
+    has a compact index
+    """
+    info = lang_info(lang_code)
+    if isinstance(info, CompactLanguageInfo):
+        return info.ranks_for(words)
+    return [info[word].rank for word in words]
+
+
+def use_compact_word_stats(language_codes, build_missing=False):
+    """
+    Makes lang_info and wordstats' Word.stats read the memory-mapped index of
+    the given languages. Languages without an index are built first if
+    build_missing, and are otherwise left to load the wordstats way, when
+    first needed.
+
+    Returns the codes of the languages that are now served from the index.
+    """
+    if not INDEX_FOLDER:
+        return []
+
+    served = []
+    for lang_code in language_codes:
+        if lang_code in Word.stats_dict:
+            # Already loaded (or mocked, in the tests); keep that one
+            continue
+
+        info = _open_index(lang_code)
+        if info is None and build_missing:
+            os.makedirs(INDEX_FOLDER, exist_ok=True)
+            info = CompactLanguageInfo.build(LanguageInfo.load(lang_code), INDEX_FOLDER)
+        if info is None:
+            continue
+
+        Word.stats_dict[lang_code] = info
+        lang_cache[lang_code] = info
+        served.append(lang_code)
+
+    return served
 
 
 # lang_info("da")
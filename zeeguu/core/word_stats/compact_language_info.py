@@ -0,0 +1,146 @@
+import os
+import shutil
+from collections import namedtuple
+
+import numpy as np
+from wordstats.metrics_computers import compute_difficulty, compute_klevel
+from wordstats.word_info import UnknownWordInfo
+
+# What a wordstats WordInfo offers to its readers; importance and frequency
+# are both the rounded log of the occurrence count
+CompactWordInfo = namedtuple(
+    "CompactWordInfo",
+    ["word", "language_id", "frequency", "difficulty", "importance", "rank", "klevel"],
+)
+
+UNKNOWN_RANK = UnknownWordInfo().rank
+
+_WORDS = "words.npy"
+_RANKS = "ranks.npy"
+_FREQUENCIES = "frequencies.npy"
+
+
+class CompactLanguageInfo:
+    """
+    The word frequency data of a language as three arrays: the lowercased
+    words in byte order (UTF-8, fixed width), and their ranks and
+    frequencies. Reads like a wordstats LanguageInfo (get, [], all_words),
+    and adds the batched ranks_for.
+
+    Built once per language into a folder of .npy files (see build), which
+    every process then opens memory-mapped and read-only: the pages are
+    shared by all the workers on the machine, instead of each of them
+    holding a dict of some 200k WordInfo objects per language.
+
+    The index is a copy of the frequency list of the installed wordstats
+    package; rebuild it when that is upgraded
+    (tools/build_wordstats_index.py --rebuild).
+    """
+
+    def __init__(self, language_code, words, ranks, frequencies):
+        self.language_id = language_code
+        self._words = words
+        self._ranks = ranks
+        self._frequencies = frequencies
+        self._width = words.dtype.itemsize
+
+    @classmethod
+    def build(cls, language_info, folder):
+        """
+        Writes the index of a wordstats LanguageInfo to folder/<language>.
+        A concurrent build of the same language wins if it finishes first.
+        """
+        entries = sorted(
+            (word.encode("utf-8"), info.rank, info.frequency)
+            for word, info in language_info.word_info_dict.items()
+        )
+        words = np.array([word for word, _, _ in entries], dtype=np.bytes_)
+        ranks = np.array([rank for _, rank, _ in entries], dtype=np.int32)
+        frequencies = np.array(
+            [frequency for _, _, frequency in entries], dtype=np.float64
+        )
+
+        destination = cls.path(folder, language_info.language_id)
+        staging = f"{destination}.tmp-{os.getpid()}"
+        os.makedirs(staging, exist_ok=True)
+        np.save(os.path.join(staging, _RANKS), ranks)
+        np.save(os.path.join(staging, _FREQUENCIES), frequencies)
+        np.save(os.path.join(staging, _WORDS), words)
+        try:
+            os.rename(staging, destination)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return cls.open(folder, language_info.language_id)
+
+    @classmethod
+    def open(cls, folder, language_code):
+        """The memory-mapped index, or None if it hasn't been built"""
+        path = cls.path(folder, language_code)
+        if not os.path.exists(os.path.join(path, _WORDS)):
+            return None
+
+        def load(name):
+            return np.load(os.path.join(path, name), mmap_mode="r")
+
+        return cls(language_code, load(_WORDS), load(_RANKS), load(_FREQUENCIES))
+
+    @staticmethod
+    def path(folder, language_code):
+        return os.path.join(folder, language_code)
+
+    def __len__(self):
+        return len(self._words)
+
+    def _positions(self, words):
+        """Index of each word in the arrays, -1 for the words not there"""
+        if not words:
+            return np.empty(0, dtype=np.intp)
+
+        encoded = [word.lower().encode("utf-8") for word in words]
+        # Longer keys would be truncated to a prefix that might be a word
+        too_long = np.array([len(key) > self._width for key in encoded])
+        keys = np.array(encoded, dtype=self._words.dtype)
+
+        positions = np.searchsorted(self._words, keys)
+        in_bounds = positions < len(self._words)
+        positions[~in_bounds] = 0
+        found = in_bounds & ~too_long & (self._words[positions] == keys)
+        return np.where(found, positions, -1)
+
+    def ranks_for(self, words):
+        """The ranks of the words, UNKNOWN_RANK for the ones not in the list"""
+        positions = self._positions(words)
+        ranks = np.where(positions >= 0, self._ranks[positions], UNKNOWN_RANK)
+        return ranks.tolist()
+
+    def get(self, word):
+        """A WordInfo-like tuple, or an UnknownWordInfo, as LanguageInfo.get"""
+        key = word.lower().encode("utf-8")
+        if len(key) > self._width:
+            return UnknownWordInfo()
+        position = int(self._words.searchsorted(key))
+        if position == len(self._words) or self._words[position] != key:
+            return UnknownWordInfo()
+
+        rank = int(self._ranks[position])
+        frequency = float(self._frequencies[position])
+        return CompactWordInfo(
+            word.lower(),
+            self.language_id,
+            frequency,
+            # wordstats computes these from the 0-based position in the list
+            compute_difficulty(rank - 1),
+            frequency,
+            rank,
+            compute_klevel(rank - 1),
+        )
+
+    def __getitem__(self, word):
+        return self.get(word)
+
+    def all_words(self):
+        """The words, most frequent first"""
+        return [
+            word.decode("utf-8") for word in self._words[np.argsort(self._ranks)]
+        ]
@@ -0,0 +1,211 @@
+"""
+Captions from captions.json, looked up by video through an SQLite index.
+
+captions.json is a list of {video_unique_key, time_start, time_end, text}
+dicts for all the videos, which get_captions_from_json used to parse and
+scan for every video. The first lookup copies it into an SQLite file next
+to it (captions.json.index.sqlite), with an index on video_unique_key; a
+lookup then only reads the captions of its video.
+
+The index remembers the modification time and size of the file it was
+built from, and is rebuilt when captions.json changes. It is built into a
+temporary file and moved in place, so that other processes reading the old
+index are not disturbed. If the folder of captions.json can't be written
+to (e.g. a read-only data volume), the index is kept in the temporary
+folder instead.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+
+# Rows inserted per executemany while building the index
+_BUILD_BATCH_SIZE = 10_000
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _json_array_items(text):
+    """
+    The items of the JSON array in text, decoded one at a time, so that a
+    file of a million captions doesn't turn into a million dicts at once.
+    """
+    decoder = json.JSONDecoder()
+    position = _WHITESPACE.match(text, 0).end()
+    if text[position : position + 1] != "[":
+        raise ValueError("captions.json should contain a list")
+    position += 1
+
+    while True:
+        position = _WHITESPACE.match(text, position).end()
+        if text[position : position + 1] == "]":
+            return
+        item, position = decoder.raw_decode(text, position)
+        yield item
+        position = _WHITESPACE.match(text, position).end()
+        if text[position : position + 1] == ",":
+            position += 1
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _fallback_index_path(captions_path):
+    """Where the index of captions_path goes when its folder is read only"""
+    digest = hashlib.sha256(os.path.abspath(captions_path).encode()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"captions-{digest[:16]}.index.sqlite")
+
+
+class CaptionStore:
+    def __init__(self, captions_path, index_path=None):
+        self.captions_path = captions_path
+        self.index_path = index_path or captions_path + ".index.sqlite"
+
+        self._lock = threading.Lock()
+        # Signature of the captions.json that the index on disk was built from
+        self._indexed = None
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+    def captions_for(self, video_unique_key):
+        """
+        The captions of the video, in the order of the file, as dicts with
+        time_start, time_end and text. Raises FileNotFoundError if there is
+        no captions.json.
+        """
+        rows = self._connection().execute(
+            "SELECT time_start, time_end, text FROM caption"
+            " WHERE video_unique_key = ? ORDER BY position",
+            (video_unique_key,),
+        )
+        return [
+            {"time_start": time_start, "time_end": time_end, "text": text}
+            for time_start, time_end, text in rows
+        ]
+
+    def _connection(self):
+        signature = self._up_to_date_index()
+        local = self._local
+        if getattr(local, "signature", None) != signature:
+            if getattr(local, "connection", None) is not None:
+                local.connection.close()
+            local.connection = sqlite3.connect(
+                f"file:{self.index_path}?mode=ro", uri=True
+            )
+            local.signature = signature
+        return local.connection
+
+    def _up_to_date_index(self):
+        signature = _signature(self.captions_path)
+        if signature != self._indexed:
+            with self._lock:
+                if signature != self._indexed:
+                    self._index(signature)
+                    self._indexed = signature
+        return signature
+
+    def _index(self, signature):
+        if self._signature_on_disk() == signature:
+            return
+        try:
+            self._build(signature)
+        except OSError as e:
+            fallback = _fallback_index_path(self.captions_path)
+            if self.index_path == fallback:
+                raise
+            print(f"Could not write {self.index_path} ({e}), indexing in {fallback}")
+            self.index_path = fallback
+            if self._signature_on_disk() != signature:
+                self._build(signature)
+
+    def _signature_on_disk(self):
+        try:
+            connection = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+        except sqlite3.OperationalError:
+            return None
+        try:
+            [(signature,)] = connection.execute(
+                "SELECT value FROM meta WHERE key = 'source_signature'"
+            )
+            return signature
+        except (sqlite3.DatabaseError, ValueError):
+            return None
+        finally:
+            connection.close()
+
+    def _build(self, signature):
+        with open(self.captions_path, encoding="utf-8") as f:
+            text = f.read()
+
+        folder = os.path.dirname(os.path.abspath(self.index_path))
+        descriptor, building = tempfile.mkstemp(dir=folder, suffix=".sqlite")
+        os.close(descriptor)
+        try:
+            connection = sqlite3.connect(building)
+            try:
+                self._fill(connection, text, signature)
+            finally:
+                connection.close()
+            os.replace(building, self.index_path)
+        except BaseException:
+            os.remove(building)
+            raise
+
+    @staticmethod
+    def _fill(connection, text, signature):
+        connection.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE caption (
+                video_unique_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                -- No type, so that times come back as captions.json has them
+                time_start,
+                time_end,
+                text TEXT
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        insert = "INSERT INTO caption VALUES (?, ?, ?, ?, ?)"
+        batch = []
+        for position, caption in enumerate(_json_array_items(text)):
+            batch.append(
+                (
+                    caption["video_unique_key"],
+                    position,
+                    caption["time_start"],
+                    caption["time_end"],
+                    caption["text"],
+                )
+            )
+            if len(batch) == _BUILD_BATCH_SIZE:
+                connection.executemany(insert, batch)
+                batch = []
+        connection.executemany(insert, batch)
+        # Cheaper to build once the rows are in than to maintain
+        connection.execute(
+            "CREATE INDEX caption_by_video ON caption (video_unique_key, position)"
+        )
+        connection.execute(
+            "INSERT INTO meta VALUES ('source_signature', ?)", (signature,)
+        )
+        connection.commit()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def caption_store(captions_path):
+    """The CaptionStore of the given captions.json, shared by all threads"""
+    with _stores_lock:
+        if captions_path not in _stores:
+            _stores[captions_path] = CaptionStore(captions_path)
+        return _stores[captions_path]
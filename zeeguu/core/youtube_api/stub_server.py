@@ -0,0 +1,130 @@
+"""
+A stand-in for the YouTube Data API, for benchmarking and developing offline.
+
+Serves /videos and /channels (the list endpoints, with comma separated ids)
+from the responses in recorded_responses.json. Ids that were not recorded
+get a copy of one of the recorded items, chosen by the hash of the id, so
+that any number of videos can be crawled; pass replay_unknown_ids=False to
+leave them out, as the API does for deleted videos. Each request sleeps
+request_overhead seconds, to model the round trip.
+
+stub_captions stands in for get_captions_from_json / the transcript fetch,
+with the recorded captions repeated to the length of the video (and, for
+a copy, followed by its id, so that its text differs from the original's).
+
+Point zeeguu at it with ZEEGUU_YOUTUBE_API_URL=http://127.0.0.1:<port>
+
+Usage:
+    python -m zeeguu.core.youtube_api.stub_server [--port 8002] [--request-overhead 0.05]
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import time
+
+import isodate
+from flask import Flask, jsonify, request
+
+RECORDING = os.path.join(os.path.dirname(__file__), "recorded_responses.json")
+
+
+def load_recording(path=RECORDING):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _recorded(recorded_items, item_id):
+    """The recorded item with item_id, or the one that stands in for it"""
+    by_id = {item["id"]: item for item in recorded_items}
+    if item_id in by_id:
+        return by_id[item_id]
+    ids = sorted(by_id)
+    digest = hashlib.sha256(item_id.encode("utf-8")).digest()
+    return by_id[ids[int.from_bytes(digest[:4], "little") % len(ids)]]
+
+
+def _replayed(recorded_items, item_id):
+    item = copy.deepcopy(_recorded(recorded_items, item_id))
+    item["id"] = item_id
+    return item
+
+
+def stub_captions(recording, video_unique_key, latency=0.0):
+    """Captions in the {text, captions} shape of get_captions_from_json"""
+    time.sleep(latency)
+    video = _recorded(recording["videos"], video_unique_key)
+    duration_ms = (
+        isodate.parse_duration(video["contentDetails"]["duration"]).total_seconds()
+        * 1000
+    )
+
+    captions = []
+    offset = 0
+    while offset < duration_ms:
+        for each in recording["captions"][video["id"]]:
+            captions.append(
+                {
+                    "time_start": offset + each["time_start"],
+                    "time_end": offset + each["time_end"],
+                    "text": each["text"],
+                }
+            )
+        offset = captions[-1]["time_end"]
+
+    if video_unique_key != video["id"]:
+        # Each video has its own source, and sources are unique by text
+        captions.append(
+            {"time_start": offset, "time_end": offset + 1000, "text": video_unique_key}
+        )
+
+    return {
+        "text": "\n".join(each["text"] for each in captions),
+        "captions": captions,
+    }
+
+
+def create_stub_app(recording=None, request_overhead=0.05, replay_unknown_ids=True):
+    recording = recording or load_recording()
+    app = Flask("youtube-api-stub")
+    app.config["request_count"] = 0
+
+    def listed(kind, recorded_items):
+        app.config["request_count"] += 1
+        time.sleep(request_overhead)
+        recorded_ids = {item["id"] for item in recorded_items}
+        items = [
+            _replayed(recorded_items, item_id)
+            for item_id in request.args.get("id", "").split(",")
+            if item_id and (replay_unknown_ids or item_id in recorded_ids)
+        ]
+        return jsonify(
+            {
+                "kind": f"youtube#{kind}ListResponse",
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)},
+                "items": items,
+            }
+        )
+
+    @app.route("/videos")
+    def videos():
+        return listed("video", recording["videos"])
+
+    @app.route("/channels")
+    def channels():
+        return listed("channel", recording["channels"])
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--port", type=int, default=8002)
+    parser.add_argument("--request-overhead", type=float, default=0.05)
+    args = parser.parse_args()
+
+    create_stub_app(request_overhead=args.request_overhead).run(
+        port=args.port, threaded=True
+    )
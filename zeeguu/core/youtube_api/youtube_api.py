@@ -1,12 +1,14 @@
 import html
-import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+
 import isodate
 import requests
 
 from zeeguu.config import ZEEGUU_DATA_FOLDER
 from zeeguu.core.util.text import remove_emojis
+from zeeguu.core.youtube_api.caption_store import caption_store
 from langdetect import detect, LangDetectException
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
@@ -52,7 +54,19 @@ DUBBED_AUDIO = 3
 CAPTIONS_TOO_SHORT = 4
 VIDEO_IS_MISSING_DURATION = 5
 
-SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+# Can point to a stand-in, e.g. zeeguu.core.youtube_api.stub_server
+YOUTUBE_API_URL = os.getenv(
+    "ZEEGUU_YOUTUBE_API_URL", "https://www.googleapis.com/youtube/v3"
+)
+SEARCH_URL = f"{YOUTUBE_API_URL}/search"
+VIDEO_URL = f"{YOUTUBE_API_URL}/videos"
+CHANNEL_URL = f"{YOUTUBE_API_URL}/channels"
+
+# The videos and channels endpoints take up to 50 comma separated ids
+MAX_IDS_PER_REQUEST = 50
+
+# Caption fetches are network bound; a few in parallel, not to get blocked
+CAPTION_WORKERS = 8
 
 
 def get_video_unique_keys(lang, category_id=None, topic_id=None, max_results=50):
@@ -153,7 +167,102 @@ def fetch_video_info(
     relaxed for user-shared videos (the user already chose the video, so we don't
     reject on language/length).
     """
+    # see https://developers.google.com/youtube/v3/docs/videos/list
+    # Quota: 1 unit per video
+    item = _fetch_items(VIDEO_URL, "snippet,contentDetails", [video_unique_key]).get(
+        video_unique_key
+    )
+    if item is None:
+        raise ValueError(f"Video {video_unique_key} not found, or API quota exceeded")
+
+    video_info = _video_info_from_item(item, lang, enforce_language)
+    if video_info["broken"] != 0:
+        return video_info
+
+    if provided_captions is not None:
+        captions = provided_captions
+    else:
+        captions = get_captions_from_json(video_unique_key, lang)
+
+    _add_captions(video_info, captions, enforce_caption_length)
+    return video_info
+
+
+def fetch_videos_info(video_unique_keys, lang, workers=CAPTION_WORKERS):
+    """
+    fetch_video_info for many videos: the metadata in requests of up to 50
+    ids, and the captions on a pool of workers, only for the videos that
+    passed the duration and language checks.
+
+    Videos that the API doesn't return (deleted, private, or quota
+    exceeded) are left out. Videos whose captions fail to be fetched are
+    marked NO_CAPTIONS_AVAILABLE, without failing the others.
+
+    :return: list of video info dicts, in the order of video_unique_keys
+    """
+    items = _fetch_items(VIDEO_URL, "snippet,contentDetails", video_unique_keys)
+    for each in video_unique_keys:
+        if each not in items:
+            print(f"Video {each} not found, or API quota exceeded")
+
+    video_infos = [
+        _video_info_from_item(items[each], lang, enforce_language=True)
+        for each in video_unique_keys
+        if each in items
+    ]
+
+    to_caption = [each for each in video_infos if each["broken"] == 0]
+    if to_caption:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            all_captions = pool.map(
+                lambda info: _captions_or_none(info["video_unique_key"], lang),
+                to_caption,
+            )
+            for video_info, captions in zip(to_caption, all_captions):
+                _add_captions(video_info, captions, enforce_caption_length=True)
+
+    return video_infos
+
+
+def _captions_or_none(video_unique_key, lang):
+    try:
+        return get_captions_from_json(video_unique_key, lang)
+    except Exception as e:
+        print(f"Error fetching captions for {video_unique_key}: {e}")
+        return None
+
+
+def _fetch_items(url, part, ids):
+    """
+    The items of a videos/channels list request, by id, fetching up to
+    MAX_IDS_PER_REQUEST ids per request. Quota is per request, not per id.
 
+    A failed request (e.g. quota exceeded, or an API error) is logged, and
+    its ids are left out.
+    """
+    ids = list(dict.fromkeys(ids))
+    items = {}
+    for start in range(0, len(ids), MAX_IDS_PER_REQUEST):
+        params = {
+            "part": part,
+            "id": ",".join(ids[start : start + MAX_IDS_PER_REQUEST]),
+            "key": YOUTUBE_API_KEY,
+        }
+        response = requests.get(url, params=params)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if not response.ok or "error" in data:
+            error = data.get("error", {}).get("message") or response.text[:200]
+            print(f"YouTube API request failed ({response.status_code}): {error}")
+            continue
+        for item in data.get("items", []):
+            items[item["id"]] = item
+    return items
+
+
+def _video_info_from_item(item, lang, enforce_language):
     def _get_thumbnail(item):
         return (
             item["snippet"]["thumbnails"].get("maxres", {}).get("url")
@@ -164,24 +273,7 @@ def fetch_video_info(
             .get("url", "No thumbnail available")
         )
 
-    VIDEO_URL = "https://www.googleapis.com/youtube/v3/videos"
-    # see https://developers.google.com/youtube/v3/docs/videos/list
-    # Quota: 1 unit per video
-
-    params = {
-        "part": "snippet,contentDetails",
-        "id": video_unique_key,
-        "key": YOUTUBE_API_KEY,
-    }
-
-    response = requests.get(VIDEO_URL, params=params)
-    video_data = response.json()
-
-    if "items" not in video_data or not video_data["items"]:
-        raise ValueError(f"Video {video_unique_key} not found, or API quota exceeded")
-
-    item = video_data["items"][0]
-
+    video_unique_key = item["id"]
     video_info = {
         "video_unique_key": video_unique_key,
         "title": remove_emojis(item["snippet"]["title"]),
@@ -215,15 +307,15 @@ def fetch_video_info(
     ):
         print(f"Video {video_unique_key} is not in the expected language {lang}.")
         video_info["broken"] = NOT_IN_EXPECTED_LANGUAGE
-        return video_info
 
-    if provided_captions is not None:
-        captions = provided_captions
-    else:
-        captions = get_captions_from_json(video_unique_key, lang)
+    return video_info
+
 
+def _add_captions(video_info, captions, enforce_caption_length):
     if captions is None:
-        print(f"Could not fetch captions for video {video_unique_key} in {lang}")
+        print(
+            f"Could not fetch captions for video {video_info['video_unique_key']}"
+        )
         video_info["broken"] = NO_CAPTIONS_AVAILABLE
     elif enforce_caption_length and is_captions_too_short(
         captions["text"], video_info["duration"]
@@ -233,8 +325,6 @@ def fetch_video_info(
         video_info["text"] = captions["text"]
         video_info["captions"] = captions["captions"]
 
-    return video_info
-
 
 def get_captions_with_yttapi(video_unique_key, lang):
     try:
@@ -242,24 +332,11 @@ def get_captions_with_yttapi(video_unique_key, lang):
         transcript_list = YouTubeTranscriptApi.list_transcripts(video_unique_key)
         transcript = transcript_list.find_manually_created_transcript([lang])
 
-        transcript_data = transcript.fetch()
         transcript_data = transcript.fetch()
 
-        caption_list = []
-        full_text = []
         caption_list = []
         full_text = []
 
-        for caption in transcript_data:
-            clean_text = text_cleaner(caption.text)
-            caption_list.append(
-                {
-                    "time_start": caption.start * 1000,
-                    "time_end": (caption.start + caption.duration) * 1000,
-                    "text": clean_text,
-                }
-            )
-            full_text.append(clean_text)
         for caption in transcript_data:
             clean_text = text_cleaner(caption.text)
             caption_list.append(
@@ -295,49 +372,33 @@ def get_captions_with_yttapi(video_unique_key, lang):
         return None
 
 
-def get_captions_from_json(video_unique_key, lang):
+def get_captions_from_json(video_unique_key, lang=None):
     """
     Temporary solution to fetch captions from uploaded file with captions (captions.json)
+
+    Looked up through an index of the file, see caption_store.
     """
+    captions_path = os.path.join(ZEEGUU_DATA_FOLDER, "video", "captions.json")
     try:
-        print("Fetching captions from captions.json...")
-        captions_path = os.path.join(ZEEGUU_DATA_FOLDER, "video", "captions.json")
-        print(f"Looking for captions file at: {captions_path}")
-
-        with open(captions_path, "r", encoding="utf-8") as f:
-            caption_data = json.load(f)
-        print(f"Found {len(caption_data)} captions in captions.json")
-
-        caption_list = []
-        full_text = []
-
-        print(f"Searching for video {video_unique_key} in captions.json...")
-        for caption in caption_data:
-            if caption["video_unique_key"] == video_unique_key:
-
-                caption_list.append(
-                    {
-                        "time_start": caption["time_start"],
-                        "time_end": caption["time_end"],
-                        "text": caption["text"],
-                    }
-                )
-                full_text.append(caption["text"])
-
-        print(
-            f"FOUND {len(caption_list)} CAPTIONS FOR VIDEO {video_unique_key} IN captions.json"
-        )
-
-        if len(caption_list) == 0:
-            return None
-        else:
-            return {
-                "text": "\n".join(full_text),
-                "captions": caption_list,
-            }
+        caption_list = caption_store(captions_path).captions_for(video_unique_key)
     except FileNotFoundError:
         print(f"Caption file not found at {captions_path}.")
         return None
+    except OSError as e:
+        print(f"Could not read the captions in {captions_path}: {e}")
+        return None
+
+    print(
+        f"FOUND {len(caption_list)} CAPTIONS FOR VIDEO {video_unique_key} IN captions.json"
+    )
+
+    if len(caption_list) == 0:
+        return None
+    else:
+        return {
+            "text": "\n".join(caption["text"] for caption in caption_list),
+            "captions": caption_list,
+        }
 
 
 def text_cleaner(text):
@@ -382,6 +443,15 @@ def is_video_language_correct(title, description, language):
 
 
 def fetch_channel_info(channel_id):
+    return fetch_channels_info([channel_id])[channel_id]
+
+
+def fetch_channels_info(channel_ids):
+    """
+    The info of the given channels, by channel id, fetched in requests of
+    up to 50 ids. Channels that the API doesn't return are left out.
+    """
+
     def _get_thumbnail(snippet):
         return (
             snippet["thumbnails"].get("high", {}).get("url")
@@ -391,33 +461,26 @@ def fetch_channel_info(channel_id):
             .get("url", "No thumbnail available")
         )
 
-    CHANNEL_URL = "https://www.googleapis.com/youtube/v3/channels"
     # see https://developers.google.com/youtube/v3/docs/channels/list
-    # Quota: 1 unit per channel
-
-    channel_params = {
-        "part": "snippet,statistics",
-        "id": channel_id,
-        "key": YOUTUBE_API_KEY,
-    }
-
-    response = requests.get(CHANNEL_URL, params=channel_params)
-    channel_data = response.json()
-
-    channel = channel_data.get("items", [])[0]
-    snippet = channel["snippet"]
-    statistics = channel["statistics"]
-
-    channel_info = {
-        "channelId": channel_id,
-        "channelName": remove_emojis(snippet["title"]),
-        "description": remove_emojis(snippet.get("description", "")),
-        "viewCount": statistics["viewCount"],
-        "subscriberCount": statistics["subscriberCount"],
-        "thumbnail": _get_thumbnail(snippet),
-    }
+    # Quota: 1 unit per request
+
+    channels = {}
+    for channel_id, channel in _fetch_items(
+        CHANNEL_URL, "snippet,statistics", channel_ids
+    ).items():
+        snippet = channel["snippet"]
+        statistics = channel["statistics"]
+
+        channels[channel_id] = {
+            "channelId": channel_id,
+            "channelName": remove_emojis(snippet["title"]),
+            "description": remove_emojis(snippet.get("description", "")),
+            "viewCount": statistics["viewCount"],
+            "subscriberCount": statistics["subscriberCount"],
+            "thumbnail": _get_thumbnail(snippet),
+        }
 
-    return channel_info
+    return channels
 
 
 def is_captions_too_short(caption_text: str, video_duration_in_seconds: int) -> bool:
@@ -1,6 +1,5 @@
 # -*- coding: utf8 -*-
 import logging
-from sentry_sdk import capture_exception
 import sys
 
 
@@ -35,5 +34,7 @@ def critical(msg):
 
 
 def print_and_log_to_sentry(e: Exception):
+    from sentry_sdk import capture_exception
+
     log(f"#### Exception: '{e}'")
     capture_exception(e)
@@ -19,6 +19,13 @@ Options:
     --articles-per-feed N  Max articles to process per feed before moving to next (default: 1)
     --recent-days N        Only process articles from last N days (overrides feed last_crawled_time)
     --max-articles N       Maximum articles to download per feed (default: 1000)
+    --enrich-workers N     Threads making LLM calls for the crawled articles (default: 4)
+    --max-enrich-time SEC  How long to keep enriching after the crawl is done (default: 600)
+
+The LLM pass over the new articles (assessment, summaries, classification)
+runs in background workers fed by the ArticleEnrichmentJob queue, so a slow
+LLM doesn't hold up the crawl. Jobs left when --max-enrich-time runs out are
+picked up by the next crawl (or by enrichment_worker.py).
 """
 from datetime import datetime, timedelta
 import sys
@@ -34,6 +41,7 @@ from zeeguu.logging import log
 from zeeguu.core.content_retriever.article_downloader import download_from_feed
 from zeeguu.core.model import Feed, Language
 from zeeguu.operations.crawler.crawl_report import CrawlReport
+from zeeguu.operations.crawler.enrichment_worker import EnrichmentWorkers
 import logging
 
 # Configure logging to show INFO level
@@ -265,6 +273,7 @@ def crawl_round_robin(languages_to_crawl, articles_per_feed=1, recent_days=None,
                     limit=max_articles_per_feed,
                     simplification_provider=simplification_provider,
                     topic_simplification_counts=topic_simplification_counts,
+                    enqueue_enrichment=True,
                 )
 
                 feed_time = time() - feed_start_time
@@ -341,6 +350,10 @@ parser.add_argument('--max-articles', type=int, default=1000,
                    help='Maximum articles to download per feed (default: 1000)')
 parser.add_argument('--provider', type=str, choices=['deepseek', 'anthropic'], default='deepseek',
                    help='LLM provider for article simplification (default: deepseek)')
+parser.add_argument('--enrich-workers', type=int, default=4,
+                   help='Threads making LLM calls for the crawled articles (default: 4)')
+parser.add_argument('--max-enrich-time', type=int, default=600,
+                   help='Seconds to keep enriching after the crawl is done (default: 600)')
 
 args = parser.parse_args()
 
@@ -372,8 +385,14 @@ if args.recent_days:
 log("")
 
 try:
+    enrichment_workers = EnrichmentWorkers(app, {args.provider: args.enrich_workers})
+    enrichment_workers.start()
+
     crawl_reports = crawl_round_robin(languages_to_crawl, args.articles_per_feed, args.recent_days, args.max_articles, args.provider)
 
+    log(f"\n=== Crawl done at {datetime.now()}, waiting up to {args.max_enrich_time}s for LLM enrichment ===")
+    enrichment_workers.drain(args.max_enrich_time)
+
     end = datetime.now()
     total_duration = end - start
     log(f"\n=== Finished at: {end} ===")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Workers that process the ArticleEnrichmentJob queue: the LLM pass over
+crawled articles (see zeeguu/core/content_retriever/article_enrichment.py).
+
+Every LLM provider gets its own threads, which bounds the number of
+concurrent calls per provider. The default is DEFAULT_CONCURRENCY; override
+it with --concurrency or the ENRICHMENT_CONCURRENCY env var, e.g.
+"deepseek=4,anthropic=2".
+
+crawl.py runs these in the background while it crawls, and then gives them
+--max-enrich-time seconds to drain the queue. They can also run on their own.
+
+Usage:
+    python zeeguu/operations/crawler/enrichment_worker.py                      # until the queue is drained
+    python zeeguu/operations/crawler/enrichment_worker.py --forever
+    python zeeguu/operations/crawler/enrichment_worker.py --concurrency deepseek=8
+"""
+
+import argparse
+import os
+import threading
+import traceback
+from time import time
+
+from zeeguu.logging import log
+
+DEFAULT_CONCURRENCY = {"deepseek": 4, "anthropic": 2}
+
+# How long an idle worker waits before looking at the queue again
+IDLE_POLL_SECONDS = 5
+
+
+def parse_concurrency(spec):
+    """ "deepseek=4,anthropic=2" -> {"deepseek": 4, "anthropic": 2}"""
+    concurrency = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        provider, count = part.split("=")
+        concurrency[provider.strip()] = int(count)
+    return concurrency
+
+
+class EnrichmentWorkers:
+    def __init__(self, app, concurrency=None):
+        self.app = app
+        self.concurrency = (
+            concurrency
+            or parse_concurrency(os.environ.get("ENRICHMENT_CONCURRENCY"))
+            or DEFAULT_CONCURRENCY
+        )
+        self.processed = 0
+        self._processed_lock = threading.Lock()
+        self._threads = []
+        self._draining = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        for provider, count in self.concurrency.items():
+            for i in range(count):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(provider,),
+                    name=f"enrich-{provider}-{i}",
+                    # A job left behind by a killed thread is handed out again
+                    # after ArticleEnrichmentJob.STALE_AFTER_SECONDS
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+        log(f"Started enrichment workers: {self.concurrency}")
+
+    def _work(self, provider):
+        from zeeguu.core.content_retriever.article_enrichment import run_enrichment_job
+        from zeeguu.core.model import ArticleEnrichmentJob
+        from zeeguu.core.model.db import db
+
+        with self.app.app_context():
+            while not self._stopped.is_set():
+                try:
+                    job = ArticleEnrichmentJob.claim_next(db.session, provider)
+                    if job is None:
+                        if self._draining.is_set():
+                            break
+                        self._stopped.wait(IDLE_POLL_SECONDS)
+                        continue
+
+                    run_enrichment_job(db.session, job)
+                    with self._processed_lock:
+                        self.processed += 1
+
+                except Exception:
+                    # Never let one bad job kill the worker
+                    traceback.print_exc()
+                    db.session.rollback()
+
+            db.session.remove()
+
+    def drain(self, timeout=None):
+        """
+        Lets the workers finish the jobs that are due, then stops them.
+        Returns False if they were still busy after timeout seconds.
+        """
+        self._draining.set()
+        deadline = time() + timeout if timeout is not None else None
+        for thread in self._threads:
+            remaining = max(0, deadline - time()) if deadline is not None else None
+            thread.join(remaining)
+
+        self._stopped.set()
+        drained = not any(thread.is_alive() for thread in self._threads)
+        log(
+            f"Enrichment workers processed {self.processed} articles"
+            + ("" if drained else " (stopped before the queue was drained)")
+        )
+        return drained
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process the article enrichment queue")
+    parser.add_argument(
+        "--concurrency",
+        type=parse_concurrency,
+        default=None,
+        help='Threads per provider, e.g. "deepseek=4,anthropic=2"',
+    )
+    parser.add_argument(
+        "--forever",
+        action="store_true",
+        help="Keep waiting for new jobs instead of stopping when the queue is drained",
+    )
+    args = parser.parse_args()
+
+    from zeeguu.api.app import create_app_for_scripts
+
+    app = create_app_for_scripts()
+    app.app_context().push()
+
+    workers = EnrichmentWorkers(app, args.concurrency)
+    workers.start()
+    if args.forever:
+        for thread in workers._threads:
+            thread.join()
+    else:
+        workers.drain()